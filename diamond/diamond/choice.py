@@ -19,17 +19,16 @@ import copy
 import io
 from lxml import etree
 
-from gi.repository import GObject as gobject
-
 from . import tree
 
-class Choice(gobject.GObject):
+class Choice(object):
 
-  __gsignals__ = { "on-set-data" : (gobject.SignalFlags.RUN_LAST, gobject.TYPE_NONE, (str,)),
-                   "on-set-attr"  : (gobject.SignalFlags.RUN_LAST, gobject.TYPE_NONE, (str, str))}
+  __slots__ = ("choices", "index", "name", "schemaname", "cardinality", "parent",
+               "active", "xmlnode", "recurse", "_signals", "__weakref__")
 
   def __init__(self, choices, schemaname="", cardinality=''):
-    gobject.GObject.__init__(self)
+    # the treesignals adapter, if anything has connected to this choice
+    self._signals = None
 
     self.choices = choices
     if choices == []:
@@ -38,8 +37,6 @@ class Choice(gobject.GObject):
     name = ""
     for choice in choices:
       assert choice.__class__ is tree.Tree
-      choice.connect("on-set-data", self._on_set_data)
-      choice.connect("on-set-attr", self._on_set_attr)
 
     name = ":".join(choice.name for choice in choices)
 
@@ -49,12 +46,6 @@ class Choice(gobject.GObject):
     self.parent = None
     self.set_default_active()
 
-  def _on_set_data(self, node, data):
-    self.emit("on-set-data", data)
-
-  def _on_set_attr(self, node, attr, value):
-    self.emit("on-set-attr", attr, value)
-
   def get_attrs(self):
     """Get all attributes"""
     return self.get_current_tree().get_attrs()
@@ -99,11 +90,25 @@ class Choice(gobject.GObject):
   def add_children(self, schema):
     return self.get_current_tree().add_children(schema)
 
+  def __getstate__(self):
+    # neither the signal adapter nor the lxml node can be pickled
+    return dict((attr, getattr(self, attr)) for attr in Choice.__slots__
+                if attr not in ["xmlnode", "_signals", "__weakref__"] and hasattr(self, attr))
+
+  def __setstate__(self, state):
+    self._signals = None
+    for attr in state:
+      setattr(self, attr, state[attr])
+
   def pickle(self):
     return base64.b64encode(bz2.compress(pickle.dumps(self)))
 
   def recompute_validity(self):
+    # the parent depends on which tree is current, so it must be told even
+    # if the validity of the current tree has not changed
     self.get_current_tree().recompute_validity()
+    if self.parent is not None:
+      self.parent.recompute_validity()
 
   def copy(self):
     new_choices = []
@@ -179,5 +184,3 @@ class Choice(gobject.GObject):
 
   def __repr__(self):
     return self.get_name_path() + "[" + self.name + "]"
- 
-gobject.type_register(Choice)
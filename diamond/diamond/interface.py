@@ -37,6 +37,7 @@ from . import plugins
 from . import schema
 from . import scherror
 from . import tree
+from . import treesignals
 
 import io
 
@@ -806,15 +807,17 @@ class Diamond:
         self.statusbar.set_statusbar("Trying to paste invalid XML.")
         return
 
-      if node.parent is not None:
-        newnode.set_parent(node.parent)
-        children = node.parent.get_children()
-        children.insert(children.index(node), newnode)
-        children.remove(node)
+      with tree.batch_validity():
+        if node.parent is not None:
+          newnode.set_parent(node.parent)
+          children = node.parent.get_children()
+          children.insert(children.index(node), newnode)
+          children.remove(node)
+          node.parent.recompute_validity()
+        newnode.recompute_validity()
  
       self.treeview.freeze_child_notify()
       iter = self.set_treestore(self.selected_iter, [newnode], True, True)
-      newnode.recompute_validity()
       self.treeview.thaw_child_notify()
 
       self.treeview.get_selection().select_iter(iter)
@@ -1072,13 +1075,13 @@ class Diamond:
   
     for t in new_tree:
       if t is not None and t in self.signals:
-        t.disconnect(self.signals[t][0])
-        t.disconnect(self.signals[t][1])
+        treesignals.disconnect(t, self.signals[t][0])
+        treesignals.disconnect(t, self.signals[t][1])
 
       if isinstance(t, tree.Tree):
         if t.is_hidden():
-          attrid = t.connect("on-set-attr", self.on_set_attr, self.treestore.get_path(iter))
-          dataid = t.connect("on-set-data", self.on_set_data, self.treestore.get_path(iter))
+          attrid = treesignals.connect(t, "on-set-attr", self.on_set_attr, self.treestore.get_path(iter))
+          dataid = treesignals.connect(t, "on-set-data", self.on_set_data, self.treestore.get_path(iter))
           self.signals[t] = (attrid, dataid)
           continue
 
@@ -1089,8 +1092,8 @@ class Diamond:
         else:
           child_iter = self.treestore.append(iter, [t, t, liststore])
 
-        attrid = t.connect("on-set-attr", self.on_set_attr, self.treestore.get_path(child_iter))
-        dataid = t.connect("on-set-data", self.on_set_data, self.treestore.get_path(child_iter))
+        attrid = treesignals.connect(t, "on-set-attr", self.on_set_attr, self.treestore.get_path(child_iter))
+        dataid = treesignals.connect(t, "on-set-data", self.on_set_data, self.treestore.get_path(child_iter))
         self.signals[t] = (attrid, dataid)
  
         if recurse and t.active: self.set_treestore(child_iter, t.children, recurse)
@@ -1099,8 +1102,8 @@ class Diamond:
         liststore = self.create_liststore(t)
         ts_choice = t.get_current_tree()
         if ts_choice.is_hidden():
-          attrid = t.connect("on-set-attr", self.on_set_attr, self.treestore.get_path(iter))
-          dataid = t.connect("on-set-data", self.on_set_data, self.treestore.get_path(iter))
+          attrid = treesignals.connect(t, "on-set-attr", self.on_set_attr, self.treestore.get_path(iter))
+          dataid = treesignals.connect(t, "on-set-data", self.on_set_data, self.treestore.get_path(iter))
           self.signals[t] = (attrid, dataid)
           continue
 
@@ -1109,8 +1112,8 @@ class Diamond:
         else:
           child_iter = self.treestore.append(iter, [t, ts_choice, liststore])
 
-        attrid = t.connect("on-set-attr", self.on_set_attr, self.treestore.get_path(child_iter))
-        dataid = t.connect("on-set-data", self.on_set_data, self.treestore.get_path(child_iter))
+        attrid = treesignals.connect(t, "on-set-attr", self.on_set_attr, self.treestore.get_path(child_iter))
+        dataid = treesignals.connect(t, "on-set-data", self.on_set_data, self.treestore.get_path(child_iter))
         self.signals[t] = (attrid, dataid)
 
         if recurse and t.active: self.set_treestore(child_iter, ts_choice.children, recurse)
@@ -1368,8 +1371,8 @@ class Diamond:
       self.expand_treestore(iter)
       iter = self.treestore.insert_after(self.treestore.iter_parent(iter), iter, 
                                          [new_tree, new_tree.get_current_tree(), liststore])
-      attrid = new_tree.connect("on-set-attr", self.on_set_attr, self.treestore.get_path(iter))
-      dataid = new_tree.connect("on-set-data", self.on_set_data, self.treestore.get_path(iter))
+      attrid = treesignals.connect(new_tree, "on-set-attr", self.on_set_attr, self.treestore.get_path(iter))
+      dataid = treesignals.connect(new_tree, "on-set-data", self.on_set_data, self.treestore.get_path(iter))
       self.signals[new_tree] = (attrid, dataid)
       self.set_saved(False)
 
@@ -15,6 +15,7 @@
 
 import base64
 import bz2
+import collections
 import copy
 import sys
 
@@ -26,24 +27,155 @@ from . import debug
 from . import choice
 from . import plist
 from . import preprocess
+from . import schemacache
 from . import tree
 
-def memoise(f):
-    cache = {}
-    def memf(*x):
-        if x not in cache:
-            cache[x] = f(*x)
-        return cache[x]
-    return memf
+RELAXNGNS = "http://relaxng.org/ns/structure/1.0"
+RELAXNG = "{" + RELAXNGNS + "}"
+
+class BoundedCache(object):
+  """
+  A least recently used cache holding at most maxsize entries. A maxsize of
+  None means the cache is unbounded.
+  """
+
+  def __init__(self, maxsize = None):
+    self.maxsize = maxsize
+    self.entries = collections.OrderedDict()
+
+  def __len__(self):
+    return len(self.entries)
+
+  def __contains__(self, key):
+    return key in self.entries
+
+  def __getitem__(self, key):
+    value = self.entries[key]
+    self.entries.move_to_end(key)
+    return value
+
+  def __setitem__(self, key, value):
+    self.entries[key] = value
+    self.entries.move_to_end(key)
+    if self.maxsize is not None:
+      while len(self.entries) > self.maxsize:
+        self.entries.popitem(last = False)
+
+  def clear(self):
+    self.entries.clear()
+
+class Prototype(object):
+  """
+  An immutable description of a node allowed by the schema, from which fresh
+  tree.Tree and choice.Choice instances are made. facts holds the keyword
+  arguments of the tree.Tree (or choice.Choice) constructor; choices is None
+  for an element, or the tuple of alternatives for a choice.
+  """
+
+  __slots__ = ("facts", "choices")
+
+  def __init__(self, facts, choices = None):
+    self.facts = dict(facts)
+    self.choices = None if choices is None else tuple(choices)
+
+  @property
+  def name(self):
+    if self.choices is None:
+      return self.facts.get("name", "")
+    return ":".join(choice.name for choice in self.choices)
+
+  @property
+  def schemaname(self):
+    return self.facts.get("schemaname", "")
+
+  @property
+  def cardinality(self):
+    return self.facts.get("cardinality", "")
+
+  def get_choices(self):
+    return [self] if self.choices is None else list(self.choices)
+
+  def instantiate(self):
+    if self.choices is None:
+      return tree.Tree(**self.facts)
+    return choice.Choice([x.instantiate() for x in self.choices], **self.facts)
+
+class AvailableNodes(object):
+  """
+  The element children of an XML node that have not yet been assigned to a
+  schema child. They are bucketed once, in document order, by tag and by
+  (tag, name attribute), so that assigning every child of the node takes time
+  linear in the number of children.
+  """
+
+  def __init__(self, xmlnode):
+    self.buckets = {}
+    # start[key] is the index of the first possibly available node in
+    # buckets[key]; everything before it has been taken
+    self.start = {}
+    self.taken = set()
+
+    for xml in xmlnode.iterchildren(tag=etree.Element):
+      self.buckets.setdefault(xml.tag, []).append(xml)
+      name = xml.get("name")
+      if name is not None:
+        self.buckets.setdefault((xml.tag, name), []).append(xml)
+
+  def take(self, key, count = None):
+    """
+    Take up to count (or, if count is None, all) available nodes from the
+    bucket key, in document order.
+    """
+
+    bucket = self.buckets.get(key, [])
+
+    i = self.start.get(key, 0)
+    while i < len(bucket) and bucket[i] in self.taken:
+      i += 1
+    self.start[key] = i
+
+    result = []
+    while i < len(bucket) and (count is None or len(result) < count):
+      xml = bucket[i]
+      if xml not in self.taken:
+        self.taken.add(xml)
+        result.append(xml)
+      i += 1
+
+    return result
 
 ##########################
 #     SCHEMA CLASS       #
 ##########################
 
 class Schema(object):
-  def __init__(self, schemafile):
+  # maximum number of elements whose resolved children are remembered
+  cache_size = 8192
+
+  def __init__(self, schemafile, cache = True, cache_size = None):
     p = etree.XMLParser(remove_comments=True)
-    self.tree = etree.parse(io.BytesIO(preprocess.preprocess(schemafile)), p)
+
+    # fingerprint: a hash of the schema and all files it includes, or None
+    # if the schema cannot be cached
+    self.fingerprint = schemacache.fingerprint(schemafile) if cache else None
+
+    data = schemacache.load(self.fingerprint)
+    if data is None:
+      grammar = preprocess.preprocess(schemafile)
+      self.tree = etree.parse(io.BytesIO(grammar), p)
+      self.defines = self.index_defines()
+
+      # record the defines by position, so they can be recovered from the
+      # cached grammar without searching it
+      positions = {}
+      for i, child in enumerate(self.tree.getroot()):
+        if child.tag == RELAXNG + "define" and self.defines.get(child.get("name")) is child:
+          positions[child.get("name")] = i
+      schemacache.store(self.fingerprint, {"grammar": grammar, "defines": positions})
+    else:
+      self.tree = etree.parse(io.BytesIO(data["grammar"]), p)
+      children = list(self.tree.getroot())
+      self.defines = dict((name, children[i]) for name, i in data["defines"].items())
 
     self.callbacks = {'element': self.cb_element,
                       'documentation': self.cb_documentation,
@@ -66,6 +198,16 @@ class Schema(object):
                       'ignore' : self.cb_ignore,
                       'notAllowed' : self.cb_notallowed}
 
+    if cache_size is not None:
+      self.cache_size = cache_size
+    self.children_cache = BoundedCache(self.cache_size)
+
+    # prototypes[schemaname] is the tuple of prototypes of the valid children
+    # of the node with that schemaname. nodes[schemaname] is the prototype of
+    # the node itself.
+    self.prototypes = {}
+    self.nodes = {}
+
     self.lost_eles  = []
     self.added_eles = []
     self.lost_attrs  = []
@@ -73,13 +215,56 @@ class Schema(object):
 
     return
 
-  @memoise
+  def clear_cache(self):
+    """
+    Forget everything remembered about the schema elements visited so far.
+    """
+
+    self.children_cache.clear()
+    self.prototypes.clear()
+    self.nodes.clear()
+
+  def compile(self):
+    """
+    Compile the prototypes of every node reachable from the start of the
+    grammar, so that later reads never need to interpret the grammar.
+    """
+
+    pending = [":start"]
+    while len(pending) > 0:
+      for prototype in self.prototype_children(pending.pop()):
+        for alternative in prototype.get_choices():
+          if alternative.schemaname not in self.prototypes:
+            pending.append(alternative.schemaname)
+
+  def index_defines(self):
+    """
+    Return a dictionary mapping the name of each top level define in the
+    grammar to its element. Where a name is defined more than once the first
+    definition wins.
+    """
+
+    defines = {}
+    root = self.tree.getroot()
+    if root.tag != RELAXNG + "grammar":
+      return defines
+
+    for define in root.iterchildren(tag=RELAXNG + "define"):
+      name = define.get("name")
+      if name not in defines:
+        defines[name] = define
+
+    return defines
+
   def element_children(self, element):
     """
     Return a list of the children of the supplied element, following references
     as required.
     """
 
+    if element in self.children_cache:
+      return self.children_cache[element]
+
     children = []
     for child1 in element.iterchildren(tag=etree.Element):
       if self.tag(child1) == "ref":
@@ -89,18 +274,16 @@ class Schema(object):
 
         name = child1.get("name")
 
-        xpath = self.tree.xpath('/t:grammar/t:define[@name="' + name + '"]',
-               namespaces={'t': 'http://relaxng.org/ns/structure/1.0'})
-
-        if len(xpath) == 0:
+        if name not in self.defines:
           debug.deprint("Warning: Schema reference %s not found" % name, 0)
           continue
 
-        for child2 in self.element_children(xpath[0]):
+        for child2 in self.element_children(self.defines[name]):
           children.append(child2)
       else:
         children.append(child1)
 
+    self.children_cache[element] = children
     return children
     
   def choice_children(self, children):
@@ -121,6 +304,17 @@ class Schema(object):
     if isinstance(eid, tree.Tree):
       eid = eid.schemaname
 
+    return [prototype.instantiate() for prototype in self.prototype_children(eid)]
+
+  def prototype_children(self, eid):
+    """
+    Return the prototypes of the valid children of the node with schemaname
+    eid, compiling them from the grammar on first use.
+    """
+
+    if eid in self.prototypes:
+      return self.prototypes[eid]
+
     if eid == ":start":
       try:
         node = self.tree.xpath('/t:grammar/t:start', namespaces={'t': 'http://relaxng.org/ns/structure/1.0'})[0]
@@ -131,7 +325,8 @@ class Schema(object):
       xpath = self.tree.xpath(eid)
       if len(xpath) == 0:
         debug.deprint("Warning: no element with XPath %s" % eid)
-        return []
+        self.prototypes[eid] = ()
+        return ()
       node = xpath[0]
 
     results = []
@@ -144,21 +339,25 @@ class Schema(object):
       for result in results:
         debug.deprint("  %s" % result.name, 0)
       sys.exit(1)
-      
-    return results
+
+    self.prototypes[eid] = tuple(results)
+    return self.prototypes[eid]
 
   def valid_node(self, eid):
     if isinstance(eid, tree.Tree) or isinstance(eid, choice.Choice):
       eidtree = eid
       eid = eid.schemaname
 
-    xpath = self.tree.xpath(eid)
-    if len(xpath) == 0:
-      debug.deprint("Warning: no element with XPath %s" % eid)
-      return None
-    node = xpath[0]
+    if eid not in self.nodes:
+      xpath = self.tree.xpath(eid)
+      if len(xpath) == 0:
+        debug.deprint("Warning: no element with XPath %s" % eid)
+        return None
+      self.nodes[eid] = self.to_tree(xpath[0])
 
-    node = self.to_tree(node)
+    node = self.nodes[eid]
+    if isinstance(node, Prototype):
+      node = node.instantiate()
   
     if eidtree is not None:
       node.cardinality = eidtree.cardinality
@@ -167,6 +366,11 @@ class Schema(object):
     return node
 
   def to_tree(self, element):
+    """
+    Compile the supplied element into the Prototype, or list of prototypes, it
+    describes.
+    """
+
     tag = self.tag(element)
     f = self.callbacks[tag]
     facts = {}
@@ -238,7 +442,7 @@ class Schema(object):
     except KeyError:
       pass
 
-    return tree.Tree(**newfacts)
+    return Prototype(newfacts)
 
   def cb_documentation(self, element, facts):
     facts['doc'] = element.text
@@ -404,7 +608,7 @@ class Schema(object):
         f = self.callbacks[tag]
         self.append(r, f(child, newfacts))
 
-      return choice.Choice(r, **facts)
+      return Prototype(facts, r)
 
   def cb_empty(self, element, facts):
     pass
@@ -518,14 +722,16 @@ class Schema(object):
     self.lost_attrs  = []
     self.added_attrs = []
 
-    if root is None:
-      datatree = self.valid_children(":start")[0]
-    else:
-      datatree = self.valid_node(root)
+    # validity is settled in one pass once the whole document has been read
+    with tree.batch_validity():
+      if root is None:
+        datatree = self.valid_children(":start")[0]
+      else:
+        datatree = self.valid_node(root)
 
-    xmlnode  = doc.getroot()
-    self.xml_read_merge(datatree, xmlnode)
-    self.xml_read_core(datatree.get_current_tree(), xmlnode, doc)
+      xmlnode  = doc.getroot()
+      self.xml_read_merge(datatree, xmlnode)
+      self.xml_read_core(datatree.get_current_tree(), xmlnode, doc)
 
     if len(self.lost_eles) != 0:
       debug.deprint("WARNING: Lost XML elements:\n" + str(self.lost_eles))
@@ -660,24 +866,25 @@ class Schema(object):
 
   ###########################################################################################
   # initialise the availability data
-  # avail[name][xmlnode] records whether xmlnode is available or not
+  # used[xmlnode] records whether xmlnode has been read, and avail holds the xml nodes
+  # not yet assigned to a schema child
   ###########################################################################################
   def init_avail_data(self, xmlnode, schemachildren):
     used = {}
-    avail = {}
     
     for xml in xmlnode.iterchildren(tag=etree.Element):
       used[xml] = False
     
-    for schemachild in schemachildren:
-      for name in schemachild.get_possible_names():
-        avail[name] = {}
+    return (used, AvailableNodes(xmlnode))
 
-    for name in avail:
-      for xmldata in xmlnode.iterchildren(tag=name):
-        avail[name][xmldata] = True
-        
-    return (used, avail)
+  # the bucket of available xml nodes that the supplied tree may take
+  def xml_key(self, curtree):
+    if "name" in curtree.attrs:
+      datatype = curtree.attrs["name"][0]
+      if datatype == 'fixed':
+        return (curtree.name, curtree.get_attr("name"))
+
+    return curtree.name
 
   ###########################################################################################
   # assign the available xml nodes to the children the schema says should be there
@@ -691,50 +898,16 @@ class Schema(object):
     for schemachild in priority_queue:
       if schemachild.cardinality in ['', '?']:
         for curtree in schemachild.get_choices():
-          name = curtree.name
-
-          have_fixed_name = False
-          if "name" in curtree.attrs:
-            datatype = curtree.attrs["name"][0]
-            if datatype == 'fixed':
-              have_fixed_name = True
-
-          if have_fixed_name is False:
-            xml = xmlnode.xpath(name)
-          else:
-            xml = xmlnode.xpath(name + '[@name="%s"]' % curtree.get_attr("name"))
-
-          for xmldata in xml:
-            if avail[name][xmldata]:
-              avail[name][xmldata] = False
-              xmls[schemachild.schemaname] = [xmldata]
-              break 
+          xml = avail.take(self.xml_key(curtree), 1)
+          if len(xml) > 0:
+            xmls[schemachild.schemaname] = xml
 
           if schemachild.schemaname not in xmls:
-            if schemachild.cardinality == '':
-              xmls[schemachild.schemaname] = copy.deepcopy([])
-            else:
-              xmls[schemachild.schemaname] = copy.deepcopy([])
+            xmls[schemachild.schemaname] = []
       elif schemachild.cardinality in ['*', '+']:
-        xmls[schemachild.schemaname] = copy.deepcopy([])
+        xmls[schemachild.schemaname] = []
         for curtree in schemachild.get_choices():
-          name = curtree.name
-
-          have_fixed_name = False
-          if "name" in curtree.attrs:
-            datatype = curtree.attrs["name"][0]
-            if datatype == 'fixed':
-              have_fixed_name = True
-
-          if have_fixed_name is False:
-            xml = xmlnode.xpath(name)
-          else:
-            xml = xmlnode.xpath(name + '[@name="%s"]' % curtree.get_attr("name"))
-
-          for xmldata in xml:
-            if avail[name][xmldata]:
-              avail[name][xmldata] = False
-              xmls[schemachild.schemaname].append(xmldata)
+          xmls[schemachild.schemaname].extend(avail.take(self.xml_key(curtree)))
                 
     return xmls
 
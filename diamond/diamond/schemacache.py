@@ -0,0 +1,122 @@
+#    This file is part of Diamond.
+#
+#    Diamond is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    Diamond is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Diamond.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Persistent on-disk cache of preprocessed schemas. Entries are keyed on a hash
+of the contents of the schema and of every file it includes, so editing any of
+them invalidates the entry. The cache lives in $HOME/.diamond/cache, or in the
+directory named by the environment variable $DIAMOND_CACHE_PATH. Setting
+$DIAMOND_CACHE_PATH to an empty string disables the cache.
+"""
+
+import hashlib
+import os
+import os.path
+import pickle
+import tempfile
+
+from . import debug
+from . import preprocess
+
+# Bump this whenever the format of the cached data changes.
+CACHE_VERSION = 1
+
+def cache_dir():
+  """
+  Return the cache directory, or None if caching is disabled.
+  """
+
+  if "DIAMOND_CACHE_PATH" in os.environ:
+    path = os.environ["DIAMOND_CACHE_PATH"]
+    return path if path else None
+
+  return os.path.join(os.path.expanduser('~'), ".diamond", "cache")
+
+def fingerprint(schemafile):
+  """
+  Return a hash of the supplied schema and all files it includes, or None if
+  the schema cannot be fingerprinted (e.g. it includes remote files).
+  """
+
+  if not isinstance(schemafile, str):
+    return None
+
+  files = preprocess.dependencies(schemafile)
+  if files is None:
+    return None
+
+  h = hashlib.sha1(("diamond-schema-%d" % CACHE_VERSION).encode())
+  try:
+    for filename in files:
+      with open(filename, "rb") as f:
+        h.update(hashlib.sha1(f.read()).digest())
+  except IOError:
+    return None
+
+  return h.hexdigest()
+
+def cache_file(key):
+  path = cache_dir()
+  if path is None or key is None:
+    return None
+
+  return os.path.join(path, key + ".pickle")
+
+def load(key):
+  """
+  Return the data cached under key, or None if there is no usable entry.
+  """
+
+  filename = cache_file(key)
+  if filename is None or not os.path.isfile(filename):
+    return None
+
+  try:
+    with open(filename, "rb") as f:
+      data = pickle.load(f)
+  except Exception:
+    debug.deprint("Warning: Ignoring unreadable schema cache entry " + filename)
+    return None
+
+  if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+    return None
+
+  return data
+
+def store(key, data):
+  """
+  Cache data under key. Failure to write the cache is not an error.
+  """
+
+  filename = cache_file(key)
+  if filename is None:
+    return
+
+  data = dict(data)
+  data["version"] = CACHE_VERSION
+
+  tmpname = None
+  try:
+    os.makedirs(os.path.dirname(filename), exist_ok = True)
+    # write to a temporary file and rename it, so that concurrent readers
+    # never see a partially written entry
+    handle, tmpname = tempfile.mkstemp(dir = os.path.dirname(filename), suffix = ".tmp")
+    with os.fdopen(handle, "wb") as f:
+      pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmpname, filename)
+  except Exception:
+    debug.deprint("Warning: Could not write schema cache entry " + filename)
+    if tmpname is not None and os.path.exists(tmpname):
+      os.remove(tmpname)
@@ -15,6 +15,7 @@
 
 import base64
 import bz2
+import contextlib
 import copy
 import pickle
 import re
@@ -22,20 +23,77 @@ import zlib
 from lxml import etree
 import sys
 
-from gi.repository import GObject as gobject
-
 from . import debug
 from . import mixedtree
 
-class Tree(gobject.GObject):
+# The trees whose validity must be recomputed when the outermost
+# batch_validity block is left, or None outside such a block.
+_dirty = None
+
+@contextlib.contextmanager
+def batch_validity():
+  """
+  Defer validity updates. Within the block recompute_validity only marks trees
+  as dirty; on leaving the outermost block a single bottom-up pass recomputes
+  the dirty trees and their ancestors, each exactly once.
+  """
+
+  global _dirty
+
+  if _dirty is not None:
+    yield
+    return
+
+  _dirty = set()
+  try:
+    yield
+  finally:
+    dirty = _dirty
+    _dirty = None
+    settle_validity(dirty)
+
+def settle_validity(trees):
+  """
+  Recompute the validity of the supplied trees and all of their ancestors,
+  visiting children before their parents.
+  """
+
+  nodes = {}
+  children = {}
+  roots = []
+  for tree in trees:
+    while id(tree) not in nodes:
+      nodes[id(tree)] = tree
+      if tree.parent is None:
+        roots.append(tree)
+        break
+      children.setdefault(id(tree.parent), []).append(tree)
+      tree = tree.parent
+
+  for root in roots:
+    stack = [(root, False)]
+    while len(stack) > 0:
+      tree, settled = stack.pop()
+      if settled:
+        tree.valid = tree.compute_validity()
+      else:
+        stack.append((tree, True))
+        for child in children.get(id(tree), []):
+          stack.append((child, False))
+
+class Tree(object):
   """This class maps pretty much 1-to-1 with an xml tree.
-     It is used to represent the options in-core."""
+     It is used to represent the options in-core. It has no GUI
+     dependencies; the signals emitted when data or attributes are set
+     are provided by the treesignals module."""
 
-  __gsignals__ = { "on-set-data" : (gobject.SignalFlags.RUN_LAST, gobject.TYPE_NONE, (str,)),
-                   "on-set-attr"  : (gobject.SignalFlags.RUN_LAST, gobject.TYPE_NONE, (str, str))}
+  __slots__ = ("name", "schemaname", "children", "cardinality", "active", "doc",
+               "parent", "valid", "datatype", "data", "attrs",
+               "xmlnode", "recurse", "_signals", "__weakref__")
   
   def __init__(self, name="", schemaname="", attrs={}, children=None, cardinality='', datatype=None, doc=None):
-    gobject.GObject.__init__(self)
+    # the treesignals adapter, if anything has connected to this tree
+    self._signals = None
 
     # name: the element name in the options XML
     # e.g. "fluidity_options"
@@ -93,7 +151,7 @@ class Tree(gobject.GObject):
       else:
         self.attrs[key] = attrs[key]
 
-    self.recompute_validity()
+    self.valid = self.compute_validity()
 
   def set_attr(self, attr, val):
     """Set an attribute."""
@@ -103,7 +161,8 @@ class Tree(gobject.GObject):
       raise Exception("invalid data: (%s, %s)" % (datatype, val))
     self.attrs[attr] = (datatype, newdata)
     self.recompute_validity()
-    self.emit("on-set-attr", attr, val)
+    if self._signals is not None:
+      self._signals.emit("on-set-attr", attr, val)
 
   def get_attr(self, attr):
     """Get an attribute."""
@@ -120,7 +179,8 @@ class Tree(gobject.GObject):
       raise Exception("invalid data: (%s, %s)" % (str(self.datatype), data))
     self.data = data
     self.recompute_validity()
-    self.emit("on-set-data", data)
+    if self._signals is not None:
+      self._signals.emit("on-set-data", data)
 
   def valid_data(self, datatype, data):
     if datatype is None:
@@ -181,50 +241,63 @@ class Tree(gobject.GObject):
 
     return new_copy
 
-  def recompute_validity(self):
-    from . import choice # try to get around circular import (in interface.py) by importing here
-
-    new_valid = True
+  def compute_validity(self):
+    """
+    Return whether this tree is valid, given the current validity of its
+    children.
+    """
 
     # if any children are invalid,
     # we are invalid too
     for child in self.children:
       if child.active is False: continue
 
-      if child.__class__ is choice.Choice:
-        child = child.get_current_tree()
-
-      if child.valid is False:
-        new_valid = False
+      if child.get_current_tree().valid is False:
+        return False
 
     # if any attributes are unset,
     # we are invalid.
-    for attr in list(self.attrs.keys()):
+    for attr in self.attrs:
       (datatype, val) = self.attrs[attr]
       if not datatype is None and val is None:
-        new_valid = False
+        return False
 
     # if we're supposed to have data and don't,
     # we are invalid.
     if self.datatype is not None:
       if not hasattr(self, "data"):
-        new_valid = False
+        return False
 
       if self.data is None:
-        new_valid = False
+        return False
 
-    # so we are valid.
-    # in either case, let's let the parent know.
-    self.valid = new_valid
+    return True
 
-    if self.parent is not None:
-      self.parent.recompute_validity()
+  def recompute_validity(self):
+    """
+    Recompute the validity of this tree, and let the ancestors know if it has
+    changed. Inside a batch_validity block the work is deferred.
+    """
+
+    if _dirty is not None:
+      _dirty.add(self)
+      return
+
+    tree = self
+    while tree is not None:
+      new_valid = tree.compute_validity()
+      if new_valid == tree.valid:
+        break
+
+      tree.valid = new_valid
+      tree = tree.parent
 
   def find_or_add(self, treelist):
     """Append a child node to this node in the tree.
        If it already exists, make tree point to it."""
 
     outlist = []
+    added = False
 
     for tree in treelist:
       found = False
@@ -239,6 +312,7 @@ class Tree(gobject.GObject):
         self.children.append(tree)
         tree.recompute_validity()
         outlist.append(tree)
+        added = True
 
       for tree in outlist:
         if tree.cardinality in ['+', '*']:
@@ -248,6 +322,9 @@ class Tree(gobject.GObject):
             new_tree = self.add_inactive_instance(tree)
             outlist.insert(outlist.index(tree)+1, new_tree)
 
+    if added:
+      self.recompute_validity()
+
     return outlist
 
   def write(self, filename):
@@ -283,6 +360,16 @@ class Tree(gobject.GObject):
 
     return sub_tree
 
+  def __getstate__(self):
+    # neither the signal adapter nor the lxml node can be pickled
+    return dict((attr, getattr(self, attr)) for attr in Tree.__slots__
+                if attr not in ["xmlnode", "_signals", "__weakref__"] and hasattr(self, attr))
+
+  def __setstate__(self, state):
+    self._signals = None
+    for attr in state:
+      setattr(self, attr, state[attr])
+
   def pickle(self):
     if hasattr(self, "xmlnode"):
       del self.xmlnode
@@ -557,5 +644,3 @@ class Tree(gobject.GObject):
         return False
 
     return True
- 
-gobject.type_register(Tree)
@@ -0,0 +1,76 @@
+#    This file is part of Diamond.
+#
+#    Diamond is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    Diamond is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with Diamond.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+GObject signals for tree.Tree and choice.Choice. The trees themselves are plain
+Python objects; a TreeSignals adapter is attached to a node the first time
+something connects to it, and the node emits through the adapter when its data
+or attributes are set. Handlers are called with the node, not the adapter, as
+their first argument.
+"""
+
+import weakref
+
+from gi.repository import GObject as gobject
+
+from . import choice
+
+class TreeSignals(gobject.GObject):
+
+  __gsignals__ = { "on-set-data" : (gobject.SignalFlags.RUN_LAST, gobject.TYPE_NONE, (str,)),
+                   "on-set-attr"  : (gobject.SignalFlags.RUN_LAST, gobject.TYPE_NONE, (str, str))}
+
+  def __init__(self, node):
+    gobject.GObject.__init__(self)
+    self.node = weakref.ref(node)
+
+gobject.type_register(TreeSignals)
+
+def adapter(node):
+  """
+  Return the signal adapter of the supplied tree or choice, creating it if
+  necessary. The trees of a choice forward their signals to the choice.
+  """
+
+  if node._signals is None:
+    node._signals = TreeSignals(node)
+
+    if isinstance(node, choice.Choice):
+      signals = node._signals
+      for tree_choice in node.choices:
+        adapter(tree_choice).connect("on-set-data", lambda tree_signals, data: signals.emit("on-set-data", data))
+        adapter(tree_choice).connect("on-set-attr", lambda tree_signals, attr, value: signals.emit("on-set-attr", attr, value))
+
+  return node._signals
+
+def connect(node, signal, callback, *data):
+  """
+  Connect callback to the named signal of node. callback is called as
+  callback(node, signal arguments..., data...). Returns the handler id.
+  """
+
+  def handler(signals, *args):
+    target = signals.node()
+    if target is not None:
+      callback(target, *args)
+
+  return adapter(node).connect(signal, handler, *data)
+
+def disconnect(node, handler_id):
+  """
+  Disconnect a handler previously returned by connect.
+  """
+
+  adapter(node).disconnect(handler_id)
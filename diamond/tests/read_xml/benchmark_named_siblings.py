@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+# Regression benchmark for reading options files in which one element has
+# thousands of named children, as fluidity files have scalar_field::Name
+# siblings. Run directly to print timings; run through unittest to check that
+# the children of an element are all assigned to the schema and read back.
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+import diamond.debug
+import diamond.schema
+
+SCHEMA = """<?xml version="1.0" encoding="UTF-8"?>
+<grammar xmlns="http://relaxng.org/ns/structure/1.0" datatypeLibrary="http://www.w3.org/2001/XMLSchema-datatypes">
+  <start>
+    <element name="options">
+      <element name="dimension"><data type="integer"/></element>
+      <zeroOrMore>
+        <choice>
+          <element name="scalar_field"><attribute name="name"><value>Pressure</value></attribute><ref name="field"/></element>
+          <element name="scalar_field"><attribute name="name"><data type="string"/></attribute><ref name="field"/></element>
+        </choice>
+      </zeroOrMore>
+      <zeroOrMore>
+        <element name="vector_field"><attribute name="name"><data type="string"/></attribute><ref name="field"/></element>
+      </zeroOrMore>
+      <optional><element name="output"><empty/></element></optional>
+    </element>
+  </start>
+  <define name="field">
+    <choice>
+      <element name="prognostic"><element name="value"><data type="float"/></element></element>
+      <element name="diagnostic"><empty/></element>
+    </choice>
+  </define>
+</grammar>
+"""
+
+def write_options(filename, n):
+	f = open(filename, "w")
+	f.write('<?xml version="1.0" encoding="utf-8"?>\n<options>\n  <dimension>3</dimension>\n')
+	for i in range(n):
+		if i % 2 == 0:
+			f.write('  <scalar_field name="Field%d"><prognostic><value>%d.0</value></prognostic></scalar_field>\n' % (i, i))
+		else:
+			f.write('  <scalar_field name="Field%d"><diagnostic/></scalar_field>\n' % i)
+		if i % 10 == 0:
+			f.write('  <vector_field name="Vector%d"><diagnostic/></vector_field>\n' % i)
+	f.write('  <scalar_field name="Pressure"><diagnostic/></scalar_field>\n  <output/>\n</options>\n')
+	f.close()
+
+class NamedSiblings(unittest.TestCase):
+	sizes = [1000, 2000, 4000]
+
+	def setUp(self):
+		diamond.debug.SetDebugLevel(0)
+		self.workdir = tempfile.mkdtemp()
+		schemafile = os.path.join(self.workdir, "siblings.rng")
+		f = open(schemafile, "w")
+		f.write(SCHEMA)
+		f.close()
+		self.schema = diamond.schema.Schema(schemafile, cache = False)
+
+		self.files = {}
+		for n in self.sizes:
+			self.files[n] = os.path.join(self.workdir, "siblings_%d.xml" % n)
+			write_options(self.files[n], n)
+
+	def tearDown(self):
+		shutil.rmtree(self.workdir)
+
+	def time_assign(self, n):
+		"""
+		Time assigning the children of the root element to the schema.
+		"""
+
+		from lxml import etree
+
+		xmlnode = etree.parse(self.files[n]).getroot()
+		schemachildren = self.schema.valid_children(self.schema.valid_children(":start")[0])
+
+		start = time.time()
+		priority_queue = self.schema.construct_priority_queue(schemachildren)
+		(used, avail) = self.schema.init_avail_data(xmlnode, schemachildren)
+		xmls = self.schema.assign_xml_nodes(priority_queue, xmlnode, avail)
+		elapsed = time.time() - start
+
+		assigned = sum([len(x) for x in xmls.values()])
+		return (elapsed, assigned)
+
+	def time_read(self, n):
+		start = time.time()
+		optionsTree = self.schema.read(self.files[n])
+		elapsed = time.time() - start
+
+		self.assertTrue(optionsTree.valid)
+		self.assertEqual(self.schema.read_errors(), ([], [], [], []))
+		return elapsed
+
+	def testAssign(self):
+		for n in self.sizes:
+			(elapsed, assigned) = self.time_assign(n)
+			self.assertEqual(assigned, n + (n + 9) // 10 + 3)
+
+	def testRead(self):
+		optionsTree = self.schema.read(self.files[self.sizes[0]])
+		fields = [child.get_current_tree() for child in optionsTree.children if child.active]
+		names = [field.get_attr("name") for field in fields if field.name == "scalar_field"]
+		self.assertEqual(names[:3], ["Pressure", "Field0", "Field1"])
+		self.assertEqual(len(names), self.sizes[0] + 1)
+
+if __name__ == '__main__':
+	if len(sys.argv) > 1:
+		NamedSiblings.sizes = [int(arg) for arg in sys.argv[1:]]
+
+	benchmark = NamedSiblings("testRead")
+	benchmark.setUp()
+	try:
+		for n in benchmark.sizes:
+			(assign, assigned) = benchmark.time_assign(n)
+			read = benchmark.time_read(n)
+			print("%6d siblings: assign %.4fs, read %.3fs" % (n, assign, read))
+	finally:
+		benchmark.tearDown()
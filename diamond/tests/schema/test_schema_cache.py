@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import diamond.schema
+import diamond.schemacache
+
+class TestSchemaCache(unittest.TestCase):
+	def setUp(self):
+		self.cachedir = tempfile.mkdtemp()
+		self.olddir = os.environ.get("DIAMOND_CACHE_PATH")
+		os.environ["DIAMOND_CACHE_PATH"] = self.cachedir
+
+	def tearDown(self):
+		if self.olddir is None:
+			del os.environ["DIAMOND_CACHE_PATH"]
+		else:
+			os.environ["DIAMOND_CACHE_PATH"] = self.olddir
+		shutil.rmtree(self.cachedir)
+
+	def testWarmStart(self):
+		cold = diamond.schema.Schema("first.rng")
+		self.assertNotEqual(cold.fingerprint, None)
+		self.assertEqual(len(os.listdir(self.cachedir)), 1)
+
+		warm = diamond.schema.Schema("first.rng")
+		self.assertEqual(warm.fingerprint, cold.fingerprint)
+		self.assertEqual(sorted(warm.defines.keys()), sorted(cold.defines.keys()))
+		self.assertEqual([x.schemaname for x in warm.valid_children(":start")], [x.schemaname for x in cold.valid_children(":start")])
+
+	def testInvalidation(self):
+		workdir = tempfile.mkdtemp()
+		try:
+			for filename in ["first.rng", "../../../schema/spud_base.rng"]:
+				shutil.copy(filename, workdir)
+			schemafile = os.path.join(workdir, "first.rng")
+			before = diamond.schemacache.fingerprint(schemafile)
+
+			# touching an included file must change the fingerprint
+			with open(os.path.join(workdir, "spud_base.rng"), "a") as f:
+				f.write("\n")
+			after = diamond.schemacache.fingerprint(schemafile)
+			self.assertNotEqual(before, after)
+		finally:
+			shutil.rmtree(workdir)
+
+	def testDisabled(self):
+		os.environ["DIAMOND_CACHE_PATH"] = ""
+		diamond.schema.Schema("first.rng")
+		self.assertEqual(os.listdir(self.cachedir), [])
+
+if __name__ == '__main__':
+	unittest.main()
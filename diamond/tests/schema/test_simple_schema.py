@@ -18,6 +18,30 @@ class TestSchemaModule(unittest.TestCase):
 
 	def testStartChildren(self):
 		self.assertNotEqual(self.schema.valid_children(":start")[0], None)
+
+	def testBoundedCache(self):
+		schema = diamond.schema.Schema("first.rng", cache_size = 1)
+		start = schema.valid_children(":start")[0]
+		start.add_children(schema)
+		self.assertEqual(len(schema.children_cache), 1)
+		schema.clear_cache()
+		self.assertEqual(len(schema.children_cache), 0)
+		self.assertEqual([x.schemaname for x in schema.valid_children(start)], [x.schemaname for x in self.schema.valid_children(start)])
+
+	def testPrototypes(self):
+		first = self.schema.valid_children(":start")[0]
+		second = self.schema.valid_children(":start")[0]
+		self.assertNotEqual(first, second)
+		self.assertEqual(first.schemaname, second.schemaname)
+		first.children.append(second)
+		self.assertEqual(self.schema.valid_children(":start")[0].children, [])
+
+	def testCompile(self):
+		self.schema.compile()
+		start = self.schema.valid_children(":start")[0]
+		self.assertTrue(start.schemaname in self.schema.prototypes)
+		for child in self.schema.valid_children(start):
+			self.assertTrue(child.schemaname in self.schema.prototypes)
 		
 if __name__ == '__main__':
 	unittest.main()
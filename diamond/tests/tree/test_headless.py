@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import sys
+import unittest
+
+import diamond.choice as choice
+import diamond.tree as tree
+
+class TestHeadless(unittest.TestCase):
+	def setUp(self):
+		self.root = tree.Tree("root")
+		self.first = tree.Tree("first", datatype = str)
+		self.second = tree.Tree("second", attrs = {"name": (str, None)})
+		self.choice = choice.Choice([self.first, self.second])
+		self.root.find_or_add([self.choice])
+
+	def testNoGObject(self):
+		self.first.set_data("value")
+		self.second.set_attr("name", "value")
+		self.assertFalse("gi.repository" in sys.modules)
+
+	def testPickle(self):
+		self.first.set_data("value")
+		self.root.xmlnode = object()
+
+		copy = self.root.unpickle(self.root.pickle())
+		self.assertEqual(copy.children[0].choices[0].data, "value")
+		self.assertFalse(hasattr(copy, "xmlnode"))
+		self.assertTrue(copy.valid)
+
+if __name__ == '__main__':
+	unittest.main()
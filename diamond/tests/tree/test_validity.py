@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import diamond.tree as tree
+import unittest
+
+class TestValidity(unittest.TestCase):
+	def setUp(self):
+		self.root = tree.Tree("root")
+		self.middle = tree.Tree("middle")
+		self.leaf = tree.Tree("leaf", datatype = str)
+		self.middle.find_or_add([self.leaf])
+		self.root.find_or_add([self.middle])
+
+	def testPropagation(self):
+		self.assertFalse(self.leaf.valid)
+		self.assertFalse(self.middle.valid)
+		self.assertFalse(self.root.valid)
+
+		self.leaf.set_data("value")
+		self.assertTrue(self.leaf.valid)
+		self.assertTrue(self.middle.valid)
+		self.assertTrue(self.root.valid)
+
+	def testBatch(self):
+		with tree.batch_validity():
+			self.leaf.set_data("value")
+			self.assertFalse(self.root.valid)
+			with tree.batch_validity():
+				self.middle.recompute_validity()
+			self.assertFalse(self.root.valid)
+
+		self.assertTrue(self.leaf.valid)
+		self.assertTrue(self.middle.valid)
+		self.assertTrue(self.root.valid)
+
+	def testInactive(self):
+		self.middle.active = False
+		self.root.recompute_validity()
+		self.assertTrue(self.root.valid)
+		self.assertFalse(self.middle.valid)
+
+if __name__ == '__main__':
+	unittest.main()
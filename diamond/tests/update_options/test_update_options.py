@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, "bin", "spud-update-options")
+DIAMOND = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir)
+
+SCHEMA = """<?xml version="1.0" encoding="UTF-8"?>
+<grammar xmlns="http://relaxng.org/ns/structure/1.0" datatypeLibrary="http://www.w3.org/2001/XMLSchema-datatypes">
+  <start>
+    <element name="options">
+      <element name="dimension"><data type="integer"/></element>
+    </element>
+  </start>
+</grammar>
+"""
+
+OPTIONS = '<?xml version="1.0" encoding="utf-8"?>\n<options><dimension>3</dimension></options>\n'
+INVALID = '<?xml version="1.0" encoding="utf-8"?>\n<options><dimension>3</dimension><unknown/></options>\n'
+
+class TestUpdateOptions(unittest.TestCase):
+	def setUp(self):
+		self.workdir = tempfile.mkdtemp()
+		with open(os.path.join(self.workdir, "test.rng"), "w") as f:
+			f.write(SCHEMA)
+		for filename in ["a.xml", "b.xml"]:
+			with open(os.path.join(self.workdir, filename), "w") as f:
+				f.write(OPTIONS)
+
+		self.env = dict(os.environ)
+		self.env["PYTHONPATH"] = os.pathsep.join([os.path.abspath(DIAMOND)] + [path for path in [os.environ.get("PYTHONPATH")] if path])
+		self.env["DIAMOND_CACHE_PATH"] = os.path.join(self.workdir, "cache")
+
+	def tearDown(self):
+		shutil.rmtree(self.workdir)
+
+	def update(self, *args, cwd = None):
+		return subprocess.run([sys.executable, SCRIPT, "-s", "test.rng"] + list(args), cwd = cwd or self.workdir, env = self.env,
+		                      stdout = subprocess.PIPE, stderr = subprocess.STDOUT, universal_newlines = True)
+
+	def read(self, filename):
+		with open(os.path.join(self.workdir, filename)) as f:
+			return f.read()
+
+	def write(self, filename, contents):
+		with open(os.path.join(self.workdir, filename), "w") as f:
+			f.write(contents)
+
+	def testManifestBeforeFiles(self):
+		result = self.update("-m", "a.xml", "b.xml")
+		self.assertEqual(result.returncode, 0, result.stdout)
+		self.assertIn("Updated: 2", result.stdout)
+		manifest = json.loads(self.read(".spud-update-manifest"))
+		self.assertEqual(sorted(manifest["files"].keys()), ["a.xml", "b.xml"])
+
+		result = self.update("-m", "a.xml", "b.xml")
+		self.assertEqual(result.returncode, 0, result.stdout)
+		self.assertIn("Unchanged: 2", result.stdout)
+
+	def testManifestFile(self):
+		result = self.update("--manifest-file", "manifest.json", "a.xml")
+		self.assertEqual(result.returncode, 0, result.stdout)
+		self.assertEqual(list(json.loads(self.read("manifest.json"))["files"].keys()), ["a.xml"])
+
+	def testRefuseToOverwrite(self):
+		result = self.update("--manifest-file", "a.xml", "b.xml")
+		self.assertNotEqual(result.returncode, 0)
+		self.assertEqual(self.read("a.xml"), OPTIONS)
+		self.assertEqual(self.read("b.xml"), OPTIONS)
+
+	def testParallel(self):
+		result = self.update("a.xml")
+		self.assertEqual(result.returncode, 0, result.stdout)
+		updated = self.read("a.xml")
+		self.assertNotEqual(updated, OPTIONS)
+
+		files = {}
+		for i in range(12):
+			files["file%02d.xml" % i] = [OPTIONS, INVALID, updated][i % 3]
+		for jobs in ["1", "4"]:
+			os.mkdir(os.path.join(self.workdir, jobs))
+			shutil.copy(os.path.join(self.workdir, "test.rng"), os.path.join(self.workdir, jobs))
+			for filename, contents in files.items():
+				self.write(os.path.join(jobs, filename), contents)
+
+		serial = self.update("-j", "1", *sorted(files), cwd = os.path.join(self.workdir, "1"))
+		parallel = self.update("-j", "4", *sorted(files), cwd = os.path.join(self.workdir, "4"))
+		self.assertEqual(serial.returncode, 0, serial.stdout)
+		self.assertEqual(parallel.returncode, 0, parallel.stdout)
+		self.assertIn("Invalid: 4\nUpdated: 4\nUnchanged: 4", serial.stdout)
+		self.assertEqual([line for line in serial.stdout.splitlines() if line.startswith("./file") and ": " in line],
+		                 ["./%s: %s" % (filename, ["Updated", "Invalid", "Unchanged"][i % 3]) for i, filename in enumerate(sorted(files))])
+		self.assertEqual(parallel.stdout, serial.stdout)
+		for filename, contents in files.items():
+			self.assertEqual(self.read(os.path.join("4", filename)), self.read(os.path.join("1", filename)))
+			if contents is not OPTIONS:
+				self.assertEqual(self.read(os.path.join("4", filename)), contents)
+
+	def testOverlappingPatterns(self):
+		result = self.update("-j", "4", "*.xml", "a.xml", "./b.xml")
+		self.assertEqual(result.returncode, 0, result.stdout)
+		self.assertIn("Updated: 2\nUnchanged: 0", result.stdout)
+		self.assertEqual(result.stdout.count("a.xml: Updated"), 1)
+		self.assertEqual(result.stdout.count("b.xml: Updated"), 1)
+
+if __name__ == '__main__':
+	unittest.main()
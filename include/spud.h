@@ -35,19 +35,130 @@
 extern "C" {
 #endif
 
+  // Memory used by an options tree, as reported by spud_memory_stats. The
+  // fields are those of Spud::MemoryStats.
+  typedef struct{
+    long long nodes;
+    long long bytes;
+    long long shared_nodes;
+    long long saved_bytes;
+    long long node_bytes;
+    long long name_bytes;
+    long long child_bytes;
+    long long data_bytes;
+    long long pool_bytes;
+    long long pool_used_bytes;
+  } spud_memory_stats_t;
+
+  // Independent option contexts. A NULL context is the default context, used
+  // by the spud_ functions without a context argument.
+
+  void* spud_context_create();
+  void spud_context_destroy(void* context);
+
+  void spud_context_clear_options(void* context);
+
+  int spud_context_load_options(void* context, const char* filename, const int filename_len);
+  int spud_context_write_options(void* context, const char* filename, const int filename_len);
+  int spud_context_load_snapshot(void* context, const char* filename, const int filename_len);
+  int spud_context_write_snapshot(void* context, const char* filename, const int filename_len);
+
+  // Buffers written by the _to_buffer functions are allocated by libspud, and
+  // must be released with spud_free_buffer.
+
+  int spud_context_load_options_from_buffer(void* context, const char* buffer, const int buffer_len);
+  int spud_context_write_options_to_buffer(void* context, char** buffer, int* buffer_len);
+  int spud_context_load_snapshot_from_buffer(void* context, const char* buffer, const int buffer_len);
+  int spud_context_write_snapshot_to_buffer(void* context, char** buffer, int* buffer_len);
+  void spud_free_buffer(char* buffer);
+
+  int spud_context_get_child_name(void* context, const char* key, const int key_len, const int index, char* child_name, const int child_name_len);
+
+  int spud_context_get_number_of_children(void* context, const char* key, const int key_len, int* child_count);
+
+  // Lists all children of the option at key in one call. child_names is set to
+  // a buffer of child_names_len bytes holding the name of each child followed by
+  // a NUL, to be released with spud_free_buffer. types, ranks and shapes (two
+  // entries per child) may each be NULL, or hold max_children children.
+  int spud_context_list_children(void* context, const char* key, const int key_len, char** child_names, int* child_names_len, int* child_count, const int max_children, int* types, int* ranks, int* shapes);
+
+  int spud_context_option_count(void* context, const char* key, const int key_len);
+
+  // Find the keys of all options matching a key containing wildcards. On
+  // return *keys holds *key_count keys, each followed by a NUL, and must be
+  // freed with spud_free_buffer.
+  int spud_context_find_options(void* context, const char* key, const int key_len, char** keys, int* keys_len, int* key_count);
+
+  int spud_context_have_option(void* context, const char* key, const int key_len);
+
+  int spud_context_get_option_type(void* context, const char* key, const int key_len, int* type);
+  int spud_context_get_option_rank(void* context, const char* key, const int key_len, int* rank);
+  int spud_context_get_option_shape(void* context, const char* key, const int key_len, int* shape);
+
+  int spud_context_get_option(void* context, const char* key, const int key_len, void* val);
+
+  // Get the type, rank, shape and data of the option at key with a single
+  // lookup. On return *val holds *val_len bytes of data, in row-major order,
+  // and must be freed with spud_free_buffer.
+  int spud_context_get_option_data(void* context, const char* key, const int key_len, int* type, int* rank, int* shape, char** val, int* val_len);
+
+  int spud_context_add_option(void* context, const char* key, const int key_len);
+
+  int spud_context_set_option(void* context, const char* key, const int key_len, const void* val, const int type, const int rank, const int* shape);
+
+  int spud_context_set_option_attribute(void* context, const char* key, const int key_len, const char* val, const int val_len);
+
+  int spud_context_move_option(void* context, const char* key1, const int key1_len, const char* key2, const int key2_len);
+  int spud_context_copy_option(void* context, const char* key1, const int key1_len, const char* key2, const int key2_len);
+
+  int spud_context_delete_option(void* context, const char* key, const int key_len);
+
+  void spud_context_print_options(void* context);
+
+  int spud_context_memory_stats(void* context, spud_memory_stats_t* stats);
+
+  void spud_context_set_access_profile(void* context, const int enabled);
+  int spud_context_dump_access_profile(void* context, const char* filename, const int filename_len);
+
+  int spud_context_lookup(void* context, const char* key, const int key_len, int* handle);
+  int spud_context_release_handle(void* context, const int handle);
+
+  int spud_context_handle_have_option(void* context, const int handle);
+
+  int spud_context_handle_get_option_type(void* context, const int handle, int* type);
+  int spud_context_handle_get_option_rank(void* context, const int handle, int* rank);
+  int spud_context_handle_get_option_shape(void* context, const int handle, int* shape);
+
+  int spud_context_handle_get_option(void* context, const int handle, void* val);
+  int spud_context_handle_get_option_data(void* context, const int handle, int* type, int* rank, int* shape, char** val, int* val_len);
+
+  int spud_context_handle_set_option(void* context, const int handle, const void* val, const int type, const int rank, const int* shape);
+
+  // The default context
+
   void spud_clear_options();
   void* spud_get_manager();
   void spud_set_manager(void* m);
   
   int spud_load_options(const char* filename, const int filename_len);
   int spud_write_options(const char* filename, const int filename_len);
+  int spud_load_snapshot(const char* filename, const int filename_len);
+  int spud_write_snapshot(const char* filename, const int filename_len);
+  int spud_load_options_from_buffer(const char* buffer, const int buffer_len);
+  int spud_write_options_to_buffer(char** buffer, int* buffer_len);
+  int spud_load_snapshot_from_buffer(const char* buffer, const int buffer_len);
+  int spud_write_snapshot_to_buffer(char** buffer, int* buffer_len);
 
   int spud_get_child_name(const char* key, const int key_len, const int index, char* child_name, const int child_name_len);
 
   int spud_get_number_of_children(const char* key, const int key_len, int* child_count);
 
+  int spud_list_children(const char* key, const int key_len, char** child_names, int* child_names_len, int* child_count, const int max_children, int* types, int* ranks, int* shapes);
+
   int spud_option_count(const char* key, const int key_len);
 
+  int spud_find_options(const char* key, const int key_len, char** keys, int* keys_len, int* key_count);
+
   int spud_have_option(const char* key, const int key_len);
 
   int spud_get_option_type(const char* key, const int key_len, int* type);
@@ -55,6 +166,7 @@ extern "C" {
   int spud_get_option_shape(const char* key, const int key_len, int* shape);
 
   int spud_get_option(const char* key, const int key_len, void* val);
+  int spud_get_option_data(const char* key, const int key_len, int* type, int* rank, int* shape, char** val, int* val_len);
 
   int spud_add_option(const char* key, const int key_len);
 
@@ -69,6 +181,25 @@ extern "C" {
 
   void spud_print_options();
 
+  int spud_memory_stats(spud_memory_stats_t* stats);
+
+  void spud_set_access_profile(const int enabled);
+  int spud_dump_access_profile(const char* filename, const int filename_len);
+
+  int spud_lookup(const char* key, const int key_len, int* handle);
+  int spud_release_handle(const int handle);
+
+  int spud_handle_have_option(const int handle);
+
+  int spud_handle_get_option_type(const int handle, int* type);
+  int spud_handle_get_option_rank(const int handle, int* rank);
+  int spud_handle_get_option_shape(const int handle, int* shape);
+
+  int spud_handle_get_option(const int handle, void* val);
+  int spud_handle_get_option_data(const int handle, int* type, int* rank, int* shape, char** val, int* val_len);
+
+  int spud_handle_set_option(const int handle, const void* val, const int type, const int rank, const int* shape);
+
 #ifdef __cplusplus
 }
 #endif
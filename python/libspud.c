@@ -1,3 +1,4 @@
+#define PY_SSIZE_T_CLEAN
 #include <Python.h>
 #include <string.h>
 #include "spud.h"
@@ -80,6 +81,147 @@ error_checking(int outcome, char *functionname)
     return NULL;
 }
 
+// A libspud.Context, an options tree independent of the default tree used by
+// the module functions
+typedef struct {
+    PyObject_HEAD
+    void *context;
+} ContextObject;
+
+static PyTypeObject ContextType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "libspud.Context",          /* tp_name */
+    sizeof(ContextObject),      /* tp_basicsize */
+};
+
+static PyObject *
+Context_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
+{
+    ContextObject *self;
+
+    if (!PyArg_ParseTuple(args, "")){
+        return NULL;
+    }
+    self = (ContextObject *) type->tp_alloc(type, 0);
+    if (self != NULL){
+        self->context = spud_context_create();
+    }
+
+    return (PyObject *) self;
+}
+
+static void
+Context_dealloc(ContextObject *self)
+{
+    spud_context_destroy(self->context);
+    Py_TYPE(self)->tp_free((PyObject *) self);
+}
+
+static void *
+context_of(PyObject *self)
+{   // the functions below are both module functions and Context methods: NULL,
+    // the default context, unless self is a Context
+    if (self != NULL && PyObject_TypeCheck(self, &ContextType)){
+        return ((ContextObject *) self)->context;
+    }
+    return NULL;
+}
+
+// An option addressed either by key or by a handle returned by lookup, in the
+// context of the function called
+typedef struct {
+    void *context;
+    const char *key;
+    int key_len;
+    int handle; // zero when the option is addressed by key
+} option_ref;
+
+static int
+parse_option_ref(PyObject *self, PyObject *arg, option_ref *ref)
+{   // accepts a key string or an integer handle
+    ref->context = context_of(self);
+    ref->key = NULL;
+    ref->key_len = 0;
+    ref->handle = 0;
+    if (PyInt_Check(arg)){
+        ref->handle = (int) PyLong_AsLong(arg);
+        if (ref->handle == -1 && PyErr_Occurred()){
+            return 0;
+        }
+        return 1;
+    }
+    if (!PyArg_Parse(arg, "s", &ref->key)){
+        return 0;
+    }
+    ref->key_len = strlen(ref->key);
+    return 1;
+}
+
+static int
+parse_option_ref_args(PyObject *self, PyObject *args, option_ref *ref)
+{
+    PyObject* firstArg;
+
+    if (!PyArg_ParseTuple(args, "O", &firstArg)){
+        return 0;
+    }
+    return parse_option_ref(self, firstArg, ref);
+}
+
+static int
+ref_have_option(const option_ref *ref)
+{
+    if (ref->handle){
+        return spud_context_handle_have_option(ref->context, ref->handle);
+    }
+    return spud_context_have_option(ref->context, ref->key, ref->key_len);
+}
+
+static int
+ref_get_option_type(const option_ref *ref, int *type)
+{
+    if (ref->handle){
+        return spud_context_handle_get_option_type(ref->context, ref->handle, type);
+    }
+    return spud_context_get_option_type(ref->context, ref->key, ref->key_len, type);
+}
+
+static int
+ref_get_option_rank(const option_ref *ref, int *rank)
+{
+    if (ref->handle){
+        return spud_context_handle_get_option_rank(ref->context, ref->handle, rank);
+    }
+    return spud_context_get_option_rank(ref->context, ref->key, ref->key_len, rank);
+}
+
+static int
+ref_get_option_shape(const option_ref *ref, int *shape)
+{
+    if (ref->handle){
+        return spud_context_handle_get_option_shape(ref->context, ref->handle, shape);
+    }
+    return spud_context_get_option_shape(ref->context, ref->key, ref->key_len, shape);
+}
+
+static int
+ref_get_option_data(const option_ref *ref, int *type, int *rank, int *shape, char **val, int *val_len)
+{
+    if (ref->handle){
+        return spud_context_handle_get_option_data(ref->context, ref->handle, type, rank, shape, val, val_len);
+    }
+    return spud_context_get_option_data(ref->context, ref->key, ref->key_len, type, rank, shape, val, val_len);
+}
+
+static int
+ref_set_option(const option_ref *ref, const void *val, int type, int rank, const int *shape)
+{
+    if (ref->handle){
+        return spud_context_handle_set_option(ref->context, ref->handle, val, type, rank, shape);
+    }
+    return spud_context_set_option(ref->context, ref->key, ref->key_len, val, type, rank, shape);
+}
+
 static PyObject *
 libspud_load_options(PyObject *self, PyObject *args)
 {
@@ -90,7 +232,7 @@ libspud_load_options(PyObject *self, PyObject *args)
     if (!PyArg_ParseTuple(args, "s", &key))
         return NULL;
     key_len = strlen(key);
-    outcomeLoadOptions = spud_load_options(key,key_len);
+    outcomeLoadOptions = spud_context_load_options(context_of(self), key,key_len);
 
     return error_checking(outcomeLoadOptions, "load options");
 }
@@ -98,7 +240,7 @@ libspud_load_options(PyObject *self, PyObject *args)
 static PyObject*
 libspud_print_options(PyObject *self, PyObject *args)
 {
-    spud_print_options();
+    spud_context_print_options(context_of(self));
 
     Py_RETURN_NONE;
 }
@@ -106,7 +248,7 @@ libspud_print_options(PyObject *self, PyObject *args)
 static PyObject*
 libspud_clear_options(PyObject *self, PyObject *args)
 {
-    spud_clear_options();
+    spud_context_clear_options(context_of(self));
 
     Py_RETURN_NONE;
 }
@@ -122,7 +264,7 @@ libspud_get_number_of_children(PyObject *self, PyObject *args)
     if (!PyArg_ParseTuple(args, "s", &key))
         return NULL;
     key_len = strlen(key);
-    outcomeGetNumChildren = spud_get_number_of_children(key, key_len, &child_count);
+    outcomeGetNumChildren = spud_context_get_number_of_children(context_of(self), key, key_len, &child_count);
     if (error_checking(outcomeGetNumChildren, "get number of children") == NULL){
         return NULL;
     }
@@ -147,7 +289,7 @@ libspud_get_child_name(PyObject *self, PyObject *args)
         return NULL;
     }
     key_len = strlen(key);
-    outcomeGetChildName = spud_get_child_name(key, key_len, index, child_name, MAXLENGTH);
+    outcomeGetChildName = spud_context_get_child_name(context_of(self), key, key_len, index, child_name, MAXLENGTH);
     if (error_checking(outcomeGetChildName, "get child name") == NULL){
         return NULL;
     }
@@ -155,6 +297,96 @@ libspud_get_child_name(PyObject *self, PyObject *args)
     return Py_BuildValue("s", child_name);
 }
 
+static PyObject *
+type_object(int type)
+{   // the Python type corresponding to a spud option type
+    if (type == SPUD_DOUBLE){
+        Py_INCREF(&PyFloat_Type);
+        return (PyObject*) &PyFloat_Type;
+    }
+    else if (type == SPUD_INT){
+        Py_INCREF(&PyInt_Type);
+        return (PyObject*) &PyInt_Type;
+    }
+    else if (type == SPUD_NONE){
+        Py_RETURN_NONE;
+    }
+    else if (type == SPUD_STRING){
+        Py_INCREF(&PyString_Type);
+        return (PyObject*) &PyString_Type;
+    }
+
+    PyErr_SetString(SpudError,"Error: Get option type function failed");
+    return NULL;
+}
+
+static PyObject *
+libspud_list_children(PyObject *self, PyObject *args)
+{
+    const char *key;
+    int info = 0;
+    char *child_names;
+    const char *child_name;
+    int child_names_len;
+    int child_count;
+    int max_children = 0;
+    int *types = NULL;
+    int *ranks = NULL;
+    int *shapes = NULL;
+    int i;
+    int outcomeListChildren;
+    PyObject *pylist = NULL;
+
+    if (!PyArg_ParseTuple(args, "s|p", &key, &info)){
+        return NULL;
+    }
+    if (info){
+        outcomeListChildren = spud_context_get_number_of_children(context_of(self), key, strlen(key), &max_children);
+        if (error_checking(outcomeListChildren, "list children") == NULL){
+            return NULL;
+        }
+        types = PyMem_New(int, max_children + 1);
+        ranks = PyMem_New(int, max_children + 1);
+        shapes = PyMem_New(int, 2 * max_children + 2);
+        if (types == NULL || ranks == NULL || shapes == NULL){
+            PyErr_NoMemory();
+            goto done;
+        }
+    }
+    outcomeListChildren = spud_context_list_children(context_of(self), key, strlen(key), &child_names, &child_names_len, &child_count, max_children, types, ranks, shapes);
+    if (error_checking(outcomeListChildren, "list children") == NULL){
+        goto done;
+    }
+    if (info && child_count > max_children){
+        child_count = max_children;
+    }
+
+    pylist = PyList_New(child_count);
+    child_name = child_names;
+    for (i = 0; pylist != NULL && i < child_count; i++){
+        PyObject *element;
+        if (info){
+            element = Py_BuildValue("(sN i(ii))", child_name, type_object(types[i]), ranks[i], shapes[2 * i], shapes[2 * i + 1]);
+        }
+        else{
+            element = PyUnicode_FromString(child_name);
+        }
+        if (element == NULL){
+            Py_CLEAR(pylist);
+            break;
+        }
+        PyList_SET_ITEM(pylist, i, element);
+        child_name += strlen(child_name) + 1;
+    }
+    spud_free_buffer(child_names);
+
+done:
+    PyMem_Free(types);
+    PyMem_Free(ranks);
+    PyMem_Free(shapes);
+    return pylist;
+}
+
 static PyObject *
 libspud_option_count(PyObject *self, PyObject *args)
 {
@@ -166,23 +398,57 @@ libspud_option_count(PyObject *self, PyObject *args)
         return NULL;
     }
     key_len = strlen(key);
-    numoptions = spud_option_count(key, key_len);
+    numoptions = spud_context_option_count(context_of(self), key, key_len);
 
     return Py_BuildValue("i", numoptions);
 }
 
 static PyObject *
-libspud_have_option(PyObject *self, PyObject *args)
+libspud_find_options(PyObject *self, PyObject *args)
 {
     const char *key;
-    int key_len;
-    int haveoption;
+    char *keys;
+    const char *found;
+    int keys_len;
+    int key_count;
+    int i;
+    int outcomeFindOptions;
+    PyObject *pylist;
 
     if (!PyArg_ParseTuple(args, "s", &key)){
         return NULL;
     }
-    key_len = strlen(key);
-    haveoption = spud_have_option(key, key_len);
+    outcomeFindOptions = spud_context_find_options(context_of(self), key, strlen(key), &keys, &keys_len, &key_count);
+    if (error_checking(outcomeFindOptions, "find options") == NULL){
+        return NULL;
+    }
+
+    pylist = PyList_New(key_count);
+    found = keys;
+    for (i = 0; pylist != NULL && i < key_count; i++){
+        PyObject *element = PyUnicode_FromString(found);
+        if (element == NULL){
+            Py_CLEAR(pylist);
+            break;
+        }
+        PyList_SET_ITEM(pylist, i, element);
+        found += strlen(found) + 1;
+    }
+    spud_free_buffer(keys);
+
+    return pylist;
+}
+
+static PyObject *
+libspud_have_option(PyObject *self, PyObject *args)
+{
+    option_ref ref;
+    int haveoption;
+
+    if (!parse_option_ref_args(self, args, &ref)){
+        return NULL;
+    }
+    haveoption = ref_have_option(&ref);
 
     if (haveoption == 0){
         Py_RETURN_FALSE;
@@ -203,7 +469,7 @@ libspud_add_option(PyObject *self, PyObject *args)
         return NULL;
     }
     key_len = strlen(key);
-    outcomeAddOption = spud_add_option(key, key_len);
+    outcomeAddOption = spud_context_add_option(context_of(self), key, key_len);
     return error_checking(outcomeAddOption, "add option");
 
 }
@@ -211,52 +477,31 @@ libspud_add_option(PyObject *self, PyObject *args)
 static PyObject *
 libspud_get_option_type(PyObject *self, PyObject *args)
 {
-    const char *key;
-    int key_len;
+    option_ref ref;
     int type;
     int outcomeGetOptionType;
 
-    if (!PyArg_ParseTuple(args, "s", &key)){
+    if (!parse_option_ref_args(self, args, &ref)){
         return NULL;
     }
-    key_len = strlen(key);
-    outcomeGetOptionType = spud_get_option_type(key, key_len, &type);
+    outcomeGetOptionType = ref_get_option_type(&ref, &type);
     if (error_checking(outcomeGetOptionType, "get option type") == NULL){
         return NULL;
     }
-    if (type == SPUD_DOUBLE){
-        Py_INCREF(&PyFloat_Type);
-        return (PyObject*) &PyFloat_Type;
-    }
-    else if (type == SPUD_INT){
-        Py_INCREF(&PyInt_Type);
-        return (PyObject*) &PyInt_Type;
-    }
-    else if (type == SPUD_NONE){
-        Py_RETURN_NONE;
-    }
-    else if (type == SPUD_STRING){
-        Py_INCREF(&PyString_Type);
-        return (PyObject*) &PyString_Type;
-    }
-
-    PyErr_SetString(SpudError,"Error: Get option type function failed");
-    return NULL;
+    return type_object(type);
 }
 
 static PyObject *
 libspud_get_option_rank(PyObject *self, PyObject *args)
 {
-    const char *key;
-    int key_len;
+    option_ref ref;
     int rank;
     int outcomeGetOptionRank;
 
-    if (!PyArg_ParseTuple(args, "s", &key)){
+    if (!parse_option_ref_args(self, args, &ref)){
         return NULL;
     }
-    key_len = strlen(key);
-    outcomeGetOptionRank = spud_get_option_rank(key, key_len, &rank);
+    outcomeGetOptionRank = ref_get_option_rank(&ref, &rank);
     if (error_checking(outcomeGetOptionRank, "get option rank") == NULL){
         return NULL;
     }
@@ -267,16 +512,14 @@ libspud_get_option_rank(PyObject *self, PyObject *args)
 static PyObject *
 libspud_get_option_shape(PyObject *self, PyObject *args)
 {
-    const char *key;
-    int key_len;
+    option_ref ref;
     int shape[2];
     int outcomeGetOptionShape;
 
-    if (!PyArg_ParseTuple(args, "s", &key)){
+    if (!parse_option_ref_args(self, args, &ref)){
         return NULL;
     }
-    key_len = strlen(key);
-    outcomeGetOptionShape = spud_get_option_shape(key, key_len, shape);
+    outcomeGetOptionShape = ref_get_option_shape(&ref, shape);
     if (error_checking(outcomeGetOptionShape, "get option shape") == NULL){
         return NULL;
     }
@@ -285,197 +528,153 @@ libspud_get_option_shape(PyObject *self, PyObject *args)
 }
 
 static PyObject*
-spud_get_option_aux_list_ints(const char *key, int key_len, int type, int rank, int *shape)
-{   // this function is for getting option when the option is of type a list of ints
-    int outcomeGetOption;
-    int size = shape[0];
-    int val [size];
+spud_get_option_aux_list(const char *val, int type, int size)
+{   // this function is for getting option when the option is of type a list of ints or doubles
     int j;
 
-    outcomeGetOption = spud_get_option(key, key_len, val);
-    if (error_checking(outcomeGetOption, "get option aux list") == NULL){
-        return NULL;
-    }
     PyObject* pylist = PyList_New(size);
     if (pylist == NULL){
-        printf("New list error.");
         return NULL;
     }
     for (j = 0; j < size; j++){
-        PyObject* element = Py_BuildValue("i", val[j]);
-        PyList_SetItem(pylist, j, element);
-    }
-
-    return pylist;
-}
-
-static PyObject*
-spud_get_option_aux_list_doubles(const char *key, int key_len, int type, int rank, int *shape)
-{   // this function is for getting option when the option is of type a list of doubles
-    int outcomeGetOption;
-    int size = shape[0];
-    double val [size];
-    int j;
-
-    outcomeGetOption = spud_get_option(key, key_len, val);
-    if (error_checking(outcomeGetOption, "get option aux list") == NULL){
-        return NULL;
-    }
-    PyObject* pylist = PyList_New(size);
-    if (pylist == NULL){
-        printf("New list error.");
-        return NULL;
-    }
-    for (j = 0; j < size; j++){
-        PyObject* element = Py_BuildValue("d", val[j]);
-        PyList_SetItem(pylist, j, element);
-    }
-
-    return pylist;
-}
-
-static PyObject *
-spud_get_option_aux_scalar_or_string(const char *key, int key_len, int type, int rank, int *shape)
-{   // this function is for getting option when the option is of type a scalar or string
-    int outcomeGetOption;
-    if (type == SPUD_DOUBLE){
-        double val;
-        outcomeGetOption = spud_get_option(key, key_len, &val);
-        if (error_checking(outcomeGetOption, "get option aux scalar or string") == NULL){
-            return NULL;
+        PyObject* element;
+        if (type == SPUD_INT){
+            element = PyLong_FromLong(((const int*)val)[j]);
         }
-        return Py_BuildValue("d", val);
-    }
-    else if (type == SPUD_INT){
-        int val;
-        outcomeGetOption = spud_get_option(key, key_len, &val);
-        if (error_checking(outcomeGetOption, "get option aux scalar or string") == NULL){
-            return NULL;
+        else{
+            element = PyFloat_FromDouble(((const double*)val)[j]);
         }
-        return Py_BuildValue("i", val);
-    }
-    else if (type == SPUD_STRING) {
-        int size = shape[0];
-        char val[size+1];
-        int i;
-        for (i = 0; i < size+1; i++)
-          val[i] = '\0';
-
-        outcomeGetOption = spud_get_option(key, key_len, val);
-        if (error_checking(outcomeGetOption, "get option aux scalar or string") == NULL){
+        if (element == NULL){
+            Py_DECREF(pylist);
             return NULL;
         }
-        return Py_BuildValue("s", val);
+        PyList_SET_ITEM(pylist, j, element);
     }
 
-    PyErr_SetString(SpudError,"Error: Get option aux scalar failed");
-    return NULL;
+    return pylist;
 }
 
 static PyObject*
-spud_get_option_aux_tensor_doubles(const char *key, int key_len, int type, int rank, int *shape)
-{   // this function is for getting option when the option is of type a tensor o doubles
-    int outcomeGetOption;
+spud_get_option_aux_tensor(const char *val, int type, int *shape)
+{   // this function is for getting option when the option is of type a tensor of ints or doubles
     int rowsize = shape[0];
     int colsize = shape[1];
-    int size = rowsize*colsize;
-    double val [size];
+    size_t rowbytes = colsize * (type == SPUD_INT ? sizeof(int) : sizeof(double));
     int m;
-    int n;
-    int counter;
 
-    outcomeGetOption = spud_get_option(key, key_len, val);
-    if (error_checking(outcomeGetOption, "get option aux tensor") == NULL){
-        return NULL;
-    }
     PyObject* pylist = PyList_New(rowsize);
     if (pylist == NULL){
-        printf("New list error");
         return NULL;
     }
-    counter = 0;
     for (m = 0; m < rowsize; m++){
-        PyObject* pysublist = PyList_New(colsize);
+        PyObject* pysublist = spud_get_option_aux_list(val + m * rowbytes, type, colsize);
         if (pysublist == NULL){
-            printf("New sublist error");
+            Py_DECREF(pylist);
             return NULL;
         }
-        for (n = 0; n < colsize; n++){
-            PyObject* element = Py_BuildValue("d", val[counter]);
-            PyList_SetItem(pysublist, n, element);
-            counter++;
-        }
-        PyList_SetItem(pylist, m, pysublist);
+        PyList_SET_ITEM(pylist, m, pysublist);
     }
 
     return pylist;
 }
 
 static PyObject*
-spud_get_option_aux_tensor_ints(const char *key, int key_len, int type, int rank, int *shape)
-{   // this function is for getting option when the option is of type a tensor of ints
-    int outcomeGetOption;
-    int rowsize = shape[0];
-    int colsize = shape[1];
-    int size = rowsize*colsize;
-    int val [size];
-    int m;
-    int n;
-    int counter;
+spud_get_option_aux(const char *val, int val_len, int type, int rank, int *shape)
+{   // this function builds the value of an option from its raw data
+    if (rank == 0){ // scalar
+        if (type == SPUD_DOUBLE){
+            return PyFloat_FromDouble(*((const double*)val));
+        }
+        else if (type == SPUD_INT){
+            return PyLong_FromLong(*((const int*)val));
+        }
+    }
+    else if (rank == 1){ // list or string
+        if (type == SPUD_INT || type == SPUD_DOUBLE){
+            return spud_get_option_aux_list(val, type, shape[0]);
+        }
+        else if (type == SPUD_STRING){
+            return Py_BuildValue("s#", val, (Py_ssize_t)val_len);
+        }
+    }
+    else if (rank == 2){ // tensor
+        if (type == SPUD_INT || type == SPUD_DOUBLE){
+            return spud_get_option_aux_tensor(val, type, shape);
+        }
+    }
 
-    outcomeGetOption = spud_get_option(key, key_len, val);
-    if (error_checking(outcomeGetOption, "get option aux tensor") == NULL){
+    PyErr_SetString(SpudError,"Error: Get option failed.");
+    return NULL;
+}
+
+static PyObject*
+spud_get_option_aux_array(const char *val, int val_len, int type, int rank, int *shape)
+{   // this function is for getting option as a NumPy array, or as a memoryview if NumPy is not available
+    const char *format = type == SPUD_INT ? "i" : "d";
+    PyObject* pybuffer;
+    PyObject* pyshape;
+    PyObject* numpy;
+    PyObject* result = NULL;
+
+    // The data is copied once, into a bytearray owned by the returned array
+    pybuffer = PyByteArray_FromStringAndSize(val, val_len);
+    if (pybuffer == NULL){
         return NULL;
     }
-    PyObject* pylist = PyList_New(rowsize);
-    if (pylist == NULL){
-        printf("New list error");
+    pyshape = rank == 1 ? Py_BuildValue("(i)", shape[0]) : Py_BuildValue("(i,i)", shape[0], shape[1]);
+    if (pyshape == NULL){
+        Py_DECREF(pybuffer);
         return NULL;
     }
-    counter = 0;
-    for (m = 0; m < rowsize; m++){
-        PyObject* pysublist = PyList_New(colsize);
-        if (pysublist == NULL){
-            printf("New sublist error");
-            return NULL;
+
+    numpy = PyImport_ImportModule("numpy");
+    if (numpy != NULL){
+        PyObject* pyarray = PyObject_CallMethod(numpy, "frombuffer", "Os", pybuffer, format);
+        if (pyarray != NULL){
+            result = PyObject_CallMethod(pyarray, "reshape", "O", pyshape);
+            Py_DECREF(pyarray);
         }
-        for (n = 0; n < colsize; n++){
-            PyObject* element = Py_BuildValue("i", val[counter]);
-            PyList_SetItem(pysublist, n, element);
-            counter++;
+        Py_DECREF(numpy);
+    }
+    else if (PyErr_ExceptionMatches(PyExc_ImportError)){
+        PyObject* pyview;
+        PyErr_Clear();
+        pyview = PyMemoryView_FromObject(pybuffer);
+        if (pyview != NULL){
+            result = PyObject_CallMethod(pyview, "cast", "sO", format, pyshape);
+            Py_DECREF(pyview);
         }
-        PyList_SetItem(pylist, m, pysublist);
     }
+    Py_DECREF(pyshape);
+    Py_DECREF(pybuffer);
 
-    return pylist;
+    return result;
 }
 
 static PyObject *
-libspud_get_option(PyObject *self, PyObject *args)
+libspud_get_option(PyObject *self, PyObject *args, PyObject *kwargs)
 {
-    const char *key;
-    int key_len;
+    static char *kwlist[] = {"key", "as_array", NULL};
+    option_ref ref;
+    PyObject* firstArg;
+    int asArray = 0;
     int type;
     int rank = 0;
     int shape[2];
-    int outcomeGetOptionType;
-    int outcomeGetOptionRank;
-    int outcomeGetOptionShape;
+    char *val;
+    int val_len;
+    int outcomeGetOption;
+    PyObject *result;
 
-    if(!PyArg_ParseTuple(args, "s", &key)){
-        return NULL;
-    }
-    key_len = strlen(key);
-    outcomeGetOptionRank = spud_get_option_rank(key, key_len, &rank);
-    if (error_checking(outcomeGetOptionRank, "get option") == NULL){
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|p:get_option", kwlist, &firstArg, &asArray)){
         return NULL;
     }
-    outcomeGetOptionType = spud_get_option_type(key, key_len, &type);
-    if (error_checking(outcomeGetOptionType, "get option") == NULL){
+    if (!parse_option_ref(self, firstArg, &ref)){
         return NULL;
     }
-    outcomeGetOptionShape = spud_get_option_shape(key, key_len, shape);
-    if (error_checking(outcomeGetOptionShape, "get option") == NULL){
+    // The type, rank, shape and data are all fetched with a single lookup
+    outcomeGetOption = ref_get_option_data(&ref, &type, &rank, shape, &val, &val_len);
+    if (error_checking(outcomeGetOption, "get option") == NULL){
         return NULL;
     }
 
@@ -484,36 +683,22 @@ libspud_get_option(PyObject *self, PyObject *args)
         snprintf(errormessage, MAXLENGTH, "Error: The specified option has a different \
                         type from that of the option argument provided in %s", "get option");
         PyErr_SetString(SpudTypeError, errormessage);
+        spud_free_buffer(val);
         return NULL;
     }
-    else if (rank == 0){ // scalar
-        return spud_get_option_aux_scalar_or_string(key, key_len, type, rank, shape);
-    }
-    else if (rank == 1){ // list or string
-        if (type == SPUD_INT){  //a list of ints
-            return spud_get_option_aux_list_ints(key, key_len, type, rank, shape);
-        }
-        else if (type == SPUD_DOUBLE){  //a list of doubles
-            return spud_get_option_aux_list_doubles(key, key_len, type, rank, shape);
-        }
-        else if (type == SPUD_STRING){  //string
-            return spud_get_option_aux_scalar_or_string(key, key_len, type, rank, shape);
-        }
+    if (asArray && (rank == 1 || rank == 2) && (type == SPUD_INT || type == SPUD_DOUBLE)){
+        result = spud_get_option_aux_array(val, val_len, type, rank, shape);
     }
-    else if (rank == 2){ // tensor
-        if (type == SPUD_DOUBLE){  //a tensor of doubles
-            return spud_get_option_aux_tensor_doubles(key, key_len, type, rank, shape);
-        }
-        else if (type == SPUD_INT){  //a tensor of ints
-            return spud_get_option_aux_tensor_ints(key, key_len, type, rank, shape);
-        }
+    else{
+        result = spud_get_option_aux(val, val_len, type, rank, shape);
     }
+    spud_free_buffer(val);
 
-    PyErr_SetString(SpudError,"Error: Get option failed.");
-    return NULL;
+    return result;
 }
+
 static PyObject*
-set_option_aux_list_ints(PyObject *pylist, const char *key, int key_len, int type, int rank, int *shape)
+set_option_aux_list_ints(PyObject *pylist, const option_ref *ref, int type, int rank, int *shape)
 {   // this function is for setting option when the second argument is of type a list of ints
     int j;
     int psize = PyList_Size(pylist);
@@ -528,7 +713,7 @@ set_option_aux_list_ints(PyObject *pylist, const char *key, int key_len, int typ
         PyArg_Parse(pelement, "i", &element);
         val[j] = element;
     }
-    outcomeSetOption = spud_set_option(key, key_len, val, type, rank, shape);
+    outcomeSetOption = ref_set_option(ref, val, type, rank, shape);
     if (error_checking(outcomeSetOption, "set option aux list ints") == NULL){
         return NULL;
     }
@@ -536,7 +721,7 @@ set_option_aux_list_ints(PyObject *pylist, const char *key, int key_len, int typ
 }
 
 static PyObject*
-set_option_aux_list_doubles(PyObject *pylist, const char *key, int key_len, int type, int rank, int *shape)
+set_option_aux_list_doubles(PyObject *pylist, const option_ref *ref, int type, int rank, int *shape)
 {   // this function is for setting option when the second argument is of type a list of doubles
     int j;
     int psize = PyList_Size(pylist);
@@ -551,7 +736,7 @@ set_option_aux_list_doubles(PyObject *pylist, const char *key, int key_len, int
         element = PyFloat_AS_DOUBLE(pelement);
         val[j] = element;
     }
-    outcomeSetOption = spud_set_option(key, key_len, val, type, rank, shape);
+    outcomeSetOption = ref_set_option(ref, val, type, rank, shape);
     if (error_checking(outcomeSetOption, "set option aux list ints") == NULL){
         return NULL;
     }
@@ -560,13 +745,102 @@ set_option_aux_list_doubles(PyObject *pylist, const char *key, int key_len, int
 }
 
 static PyObject*
-set_option_aux_string(PyObject *pystring, const char *key, int key_len, int type, int rank, int *shape)
+set_option_aux_string(PyObject *pystring, const option_ref *ref, int type, int rank, int *shape)
 {   // this function is for setting option when the second argument is of type string
     const char *val = PyString_AsString(pystring);
-    int outcomeSetOption = spud_set_option(key, key_len, val, type, rank, shape);
+    int outcomeSetOption = ref_set_option(ref, val, type, rank, shape);
     return error_checking(outcomeSetOption, "set option aux string");
 }
 
+static PyObject*
+set_option_aux_buffer(PyObject *pybuffer, const option_ref *ref)
+{   // this function is for setting option when the second argument is a C-contiguous buffer of ints or doubles,
+    // such as a NumPy array, which gives the option its type, rank and shape
+    Py_buffer view;
+    const char *format;
+    int type;
+    int shape[2] = {-1, -1};
+    void *val;
+    Py_ssize_t size;
+    Py_ssize_t j;
+    int outcomeSetOption;
+
+    if (PyObject_GetBuffer(pybuffer, &view, PyBUF_C_CONTIGUOUS | PyBUF_FORMAT) < 0){
+        return NULL;
+    }
+    if (view.ndim > 2){
+        PyErr_SetString(SpudRankError, "Error: Only buffers of rank 0, 1 or 2 may be set in set option");
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    for (j = 0; j < view.ndim; j++){
+        if (view.shape[j] > INT_MAX){
+            PyErr_SetString(PyExc_OverflowError, "Error: Buffer too large in set option");
+            PyBuffer_Release(&view);
+            return NULL;
+        }
+        shape[j] = view.shape[j];
+    }
+
+    // Only native byte order is accepted
+    format = view.format == NULL ? "B" : view.format;
+#if PY_LITTLE_ENDIAN
+    if (format[0] == '@' || format[0] == '=' || format[0] == '<'){
+#else
+    if (format[0] == '@' || format[0] == '=' || format[0] == '>' || format[0] == '!'){
+#endif
+        format++;
+    }
+    if (format[0] == '\0' || format[1] != '\0' || strchr("dfbhilq", format[0]) == NULL){
+        PyErr_Format(SpudTypeError, "Error: Buffers of format '%s' may not be set in set option, only ints or doubles", format);
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+
+    size = view.len / view.itemsize;
+    if (size == 0){
+        PyErr_SetString(SpudShapeError, "Error: Empty buffers may not be set in set option");
+        PyBuffer_Release(&view);
+        return NULL;
+    }
+    type = (format[0] == 'd' || format[0] == 'f') ? SPUD_DOUBLE : SPUD_INT;
+    if (format[0] == 'd' || format[0] == 'i'){
+        val = view.buf;
+    }
+    else{ // converted to a double or int copy
+        val = PyMem_Malloc(size > 0 ? size * (type == SPUD_DOUBLE ? sizeof(double) : sizeof(int)) : 1);
+        if (val == NULL){
+            PyBuffer_Release(&view);
+            return PyErr_NoMemory();
+        }
+        for (j = 0; j < size; j++){
+            long long element;
+            switch (format[0]){
+                case 'f': ((double*)val)[j] = ((const float*)view.buf)[j]; continue;
+                case 'b': element = ((const signed char*)view.buf)[j]; break;
+                case 'h': element = ((const short*)view.buf)[j]; break;
+                case 'l': element = ((const long*)view.buf)[j]; break;
+                default: element = ((const long long*)view.buf)[j]; break;
+            }
+            if (element < INT_MIN || element > INT_MAX){
+                PyErr_SetString(PyExc_OverflowError, "Error: Buffer value does not fit in an int in set option");
+                PyMem_Free(val);
+                PyBuffer_Release(&view);
+                return NULL;
+            }
+            ((int*)val)[j] = (int)element;
+        }
+    }
+
+    outcomeSetOption = ref_set_option(ref, val, type, view.ndim, shape);
+    if (val != view.buf){
+        PyMem_Free(val);
+    }
+    PyBuffer_Release(&view);
+
+    return error_checking(outcomeSetOption, "set option aux buffer");
+}
+
 static PyObject*
 libspud_set_option_attribute(PyObject *self, PyObject *args)
 {
@@ -584,7 +858,7 @@ libspud_set_option_attribute(PyObject *self, PyObject *args)
     key_len = strlen(key);
     PyArg_Parse(secondArg, "s", &val);
     val_len = strlen(val);
-    outcomeSetOption = spud_set_option_attribute(key, key_len, val, val_len);
+    outcomeSetOption = spud_context_set_option_attribute(context_of(self), key, key_len, val, val_len);
     return error_checking(outcomeSetOption, "set option attribute");
 }
 
@@ -599,12 +873,40 @@ libspud_delete_option(PyObject *self, PyObject *args)
     firstArg = PyTuple_GetItem(args, 0);
     PyArg_Parse(firstArg, "s", &key);
     key_len = strlen(key);
-    outcomeDeleteOption = spud_delete_option(key, key_len);
+    outcomeDeleteOption = spud_context_delete_option(context_of(self), key, key_len);
     return error_checking(outcomeDeleteOption, "delete option");
 }
 
 static PyObject*
-set_option_aux_tensor_doubles(PyObject *pylist, const char *key, int key_len, int type, int rank, int *shape)
+libspud_copy_option(PyObject *self, PyObject *args)
+{
+    const char*key1;
+    const char*key2;
+    int outcomeCopyOption;
+
+    if (!PyArg_ParseTuple(args, "ss", &key1, &key2)){
+        return NULL;
+    }
+    outcomeCopyOption = spud_context_copy_option(context_of(self), key1, strlen(key1), key2, strlen(key2));
+    return error_checking(outcomeCopyOption, "copy option");
+}
+
+static PyObject*
+libspud_move_option(PyObject *self, PyObject *args)
+{
+    const char*key1;
+    const char*key2;
+    int outcomeMoveOption;
+
+    if (!PyArg_ParseTuple(args, "ss", &key1, &key2)){
+        return NULL;
+    }
+    outcomeMoveOption = spud_context_move_option(context_of(self), key1, strlen(key1), key2, strlen(key2));
+    return error_checking(outcomeMoveOption, "move option");
+}
+
+static PyObject*
+set_option_aux_tensor_doubles(PyObject *pylist, const option_ref *ref, int type, int rank, int *shape)
 {   // this function is for setting option when the second argument is of type a tensor of doubles
     int i;
     int j;
@@ -627,12 +929,12 @@ set_option_aux_tensor_doubles(PyObject *pylist, const char *key, int key_len, in
         }
     }
 
-    outcomeSetOption = spud_set_option(key, key_len, val, type, rank, shape);
+    outcomeSetOption = ref_set_option(ref, val, type, rank, shape);
     return error_checking(outcomeSetOption, "set option aux tensor doubles");
 }
 
 static PyObject*
-set_option_aux_tensor_ints(PyObject *pylist, const char *key, int key_len, int type, int rank, int *shape)
+set_option_aux_tensor_ints(PyObject *pylist, const option_ref *ref, int type, int rank, int *shape)
 {   // this function is for setting option when the second argument is of type a tensor of ints
     int i;
     int j;
@@ -654,23 +956,23 @@ set_option_aux_tensor_ints(PyObject *pylist, const char *key, int key_len, int t
         }
     }
 
-    outcomeSetOption = spud_set_option(key, key_len, val, type, rank, shape);
+    outcomeSetOption = ref_set_option(ref, val, type, rank, shape);
     return error_checking(outcomeSetOption, "set option aux tensor ints");
 }
 
 static PyObject*
-set_option_aux_scalar(PyObject *pyscalar, const char *key, int key_len, int type, int rank, int *shape)
+set_option_aux_scalar(PyObject *pyscalar, const option_ref *ref, int type, int rank, int *shape)
 {   // this function is for setting option when the second argument is of type scalar
     int outcomeSetOption = SPUD_NO_ERROR;
 
     if (type == SPUD_DOUBLE){ //scalar is double
         double val = PyFloat_AS_DOUBLE(pyscalar);
-        outcomeSetOption = spud_set_option(key, key_len, &val, type, rank, shape);
+        outcomeSetOption = ref_set_option(ref, &val, type, rank, shape);
     }
     else if (type == SPUD_INT){
         int val;
         PyArg_Parse(pyscalar, "i", &val);
-        outcomeSetOption = spud_set_option(key, key_len, &val, type, rank, shape);
+        outcomeSetOption = ref_set_option(ref, &val, type, rank, shape);
     }
 
     return error_checking(outcomeSetOption, "set option aux scalar");
@@ -680,8 +982,7 @@ set_option_aux_scalar(PyObject *pyscalar, const char *key, int key_len, int type
 static PyObject*
 libspud_set_option(PyObject *self, PyObject *args)
 {
-    const char *key;
-    int key_len;
+    option_ref ref;
     int type=-1;
     int rank=-1;
     int shape[2];
@@ -695,11 +996,12 @@ libspud_set_option(PyObject *self, PyObject *args)
 
     firstArg = PyTuple_GetItem(args, 0);
     secondArg = PyTuple_GetItem(args, 1);
-    PyArg_Parse(firstArg, "s", &key);
-    key_len = strlen(key);
+    if (!parse_option_ref(self, firstArg, &ref)){
+        return NULL;
+    }
 
-    if (!spud_have_option(key, key_len)){ //option does not exist yet
-        int outcomeAddOption = spud_add_option(key, key_len);
+    if (!ref.handle && !spud_context_have_option(ref.context, ref.key, ref.key_len)){ //option does not exist yet
+        int outcomeAddOption = spud_context_add_option(ref.context, ref.key, ref.key_len);
         error_checking(outcomeAddOption, "set option");
     }
 
@@ -751,27 +1053,30 @@ libspud_set_option(PyObject *self, PyObject *args)
             shape[1] = pysublistSize;
         }
     }
+    else if (PyObject_CheckBuffer(secondArg)){ // a buffer, such as a NumPy array
+        set_option_aux_buffer(secondArg, &ref);
+    }
 
     if (rank == 0){ // scalar
-        set_option_aux_scalar(secondArg, key, key_len, type, rank, shape);
+        set_option_aux_scalar(secondArg, &ref, type, rank, shape);
     }
     else if (rank == 1){ // list or string
         if (PyString_Check(secondArg)){ // pystring
-            set_option_aux_string(secondArg, key, key_len, type, rank, shape);
+            set_option_aux_string(secondArg, &ref, type, rank, shape);
         }
         else if (type == SPUD_INT) { // list of ints
-            set_option_aux_list_ints(secondArg, key, key_len, type, rank, shape);
+            set_option_aux_list_ints(secondArg, &ref, type, rank, shape);
         }
         else if (type == SPUD_DOUBLE){ // list of doubles
-            set_option_aux_list_doubles(secondArg, key, key_len, type, rank, shape);
+            set_option_aux_list_doubles(secondArg, &ref, type, rank, shape);
         }
     }
     else if (rank == 2){ // tensor
         if (type == SPUD_DOUBLE) { // tensor of doubles
-            set_option_aux_tensor_doubles(secondArg, key, key_len, type, rank, shape);
+            set_option_aux_tensor_doubles(secondArg, &ref, type, rank, shape);
         }
         else if (type == SPUD_INT) { // tensor of ints
-            set_option_aux_tensor_ints(secondArg, key, key_len, type, rank, shape);
+            set_option_aux_tensor_ints(secondArg, &ref, type, rank, shape);
         }
     }
 
@@ -783,6 +1088,39 @@ libspud_set_option(PyObject *self, PyObject *args)
     }
 }
 
+static PyObject*
+libspud_lookup(PyObject *self, PyObject *args)
+{
+    const char *key;
+    int key_len;
+    int handle;
+    int outcomeLookup;
+
+    if (!PyArg_ParseTuple(args, "s", &key)){
+        return NULL;
+    }
+    key_len = strlen(key);
+    outcomeLookup = spud_context_lookup(context_of(self), key, key_len, &handle);
+    if (error_checking(outcomeLookup, "lookup") == NULL){
+        return NULL;
+    }
+
+    return Py_BuildValue("i", handle);
+}
+
+static PyObject*
+libspud_release_handle(PyObject *self, PyObject *args)
+{
+    int handle;
+    int outcomeReleaseHandle;
+
+    if (!PyArg_ParseTuple(args, "i", &handle)){
+        return NULL;
+    }
+    outcomeReleaseHandle = spud_context_release_handle(context_of(self), handle);
+    return error_checking(outcomeReleaseHandle, "release handle");
+}
+
 static PyObject*
 libspud_write_options(PyObject *self, PyObject *args)
 {
@@ -794,10 +1132,149 @@ libspud_write_options(PyObject *self, PyObject *args)
     firstArg = PyTuple_GetItem(args, 0);
     PyArg_Parse(firstArg, "s", &filename);
     filename_len = strlen(filename);
-    outcomeWriteOptions = spud_write_options (filename, filename_len);
+    outcomeWriteOptions = spud_context_write_options(context_of(self), filename, filename_len);
     return error_checking(outcomeWriteOptions, "write options");
 }
 
+static PyObject*
+libspud_load_snapshot(PyObject *self, PyObject *args)
+{
+    const char *filename;
+    int outcomeLoadSnapshot;
+
+    if (!PyArg_ParseTuple(args, "s", &filename))
+        return NULL;
+    outcomeLoadSnapshot = spud_context_load_snapshot(context_of(self), filename, strlen(filename));
+    return error_checking(outcomeLoadSnapshot, "load snapshot");
+}
+
+static PyObject*
+libspud_write_snapshot(PyObject *self, PyObject *args)
+{
+    const char *filename;
+    int outcomeWriteSnapshot;
+
+    if (!PyArg_ParseTuple(args, "s", &filename))
+        return NULL;
+    outcomeWriteSnapshot = spud_context_write_snapshot(context_of(self), filename, strlen(filename));
+    return error_checking(outcomeWriteSnapshot, "write snapshot");
+}
+
+static PyObject*
+libspud_load_options_from_buffer(PyObject *self, PyObject *args)
+{
+    const char *buffer;
+    Py_ssize_t buffer_len;
+    int outcomeLoadOptions;
+
+    if (!PyArg_ParseTuple(args, "s#", &buffer, &buffer_len))
+        return NULL;
+    if (buffer_len > INT_MAX){
+        PyErr_SetString(SpudFileError, "Error: The buffer is too large to load");
+        return NULL;
+    }
+    outcomeLoadOptions = spud_context_load_options_from_buffer(context_of(self), buffer, buffer_len);
+    return error_checking(outcomeLoadOptions, "load options from buffer");
+}
+
+static PyObject*
+libspud_write_options_to_buffer(PyObject *self, PyObject *args)
+{
+    char *buffer;
+    int buffer_len;
+    int outcomeWriteOptions;
+    PyObject *pybuffer;
+
+    outcomeWriteOptions = spud_context_write_options_to_buffer(context_of(self), &buffer, &buffer_len);
+    if (outcomeWriteOptions != SPUD_NO_ERROR){
+        return error_checking(outcomeWriteOptions, "write options to buffer");
+    }
+    pybuffer = PyBytes_FromStringAndSize(buffer, buffer_len);
+    spud_free_buffer(buffer);
+    return pybuffer;
+}
+
+static PyObject*
+libspud_load_snapshot_from_buffer(PyObject *self, PyObject *args)
+{
+    const char *buffer;
+    Py_ssize_t buffer_len;
+    int outcomeLoadSnapshot;
+
+    if (!PyArg_ParseTuple(args, "s#", &buffer, &buffer_len))
+        return NULL;
+    if (buffer_len > INT_MAX){
+        PyErr_SetString(SpudFileError, "Error: The buffer is too large to load");
+        return NULL;
+    }
+    outcomeLoadSnapshot = spud_context_load_snapshot_from_buffer(context_of(self), buffer, buffer_len);
+    return error_checking(outcomeLoadSnapshot, "load snapshot from buffer");
+}
+
+static PyObject*
+libspud_write_snapshot_to_buffer(PyObject *self, PyObject *args)
+{
+    char *buffer;
+    int buffer_len;
+    int outcomeWriteSnapshot;
+    PyObject *pybuffer;
+
+    outcomeWriteSnapshot = spud_context_write_snapshot_to_buffer(context_of(self), &buffer, &buffer_len);
+    if (outcomeWriteSnapshot != SPUD_NO_ERROR){
+        return error_checking(outcomeWriteSnapshot, "write snapshot to buffer");
+    }
+    pybuffer = PyBytes_FromStringAndSize(buffer, buffer_len);
+    spud_free_buffer(buffer);
+    return pybuffer;
+}
+
+static PyObject*
+libspud_memory_stats(PyObject *self, PyObject *args)
+{
+    spud_memory_stats_t stats;
+    int outcomeMemoryStats;
+
+    outcomeMemoryStats = spud_context_memory_stats(context_of(self), &stats);
+    if (outcomeMemoryStats != SPUD_NO_ERROR){
+        return error_checking(outcomeMemoryStats, "memory stats");
+    }
+    return Py_BuildValue("{s:L,s:L,s:L,s:L,s:L,s:L,s:L,s:L,s:L,s:L}",
+                         "nodes", stats.nodes,
+                         "bytes", stats.bytes,
+                         "shared_nodes", stats.shared_nodes,
+                         "saved_bytes", stats.saved_bytes,
+                         "node_bytes", stats.node_bytes,
+                         "name_bytes", stats.name_bytes,
+                         "child_bytes", stats.child_bytes,
+                         "data_bytes", stats.data_bytes,
+                         "pool_bytes", stats.pool_bytes,
+                         "pool_used_bytes", stats.pool_used_bytes);
+}
+
+static PyObject*
+libspud_set_access_profile(PyObject *self, PyObject *args)
+{
+    int enabled;
+
+    if (!PyArg_ParseTuple(args, "p", &enabled))
+        return NULL;
+    spud_context_set_access_profile(context_of(self), enabled);
+
+    Py_RETURN_NONE;
+}
+
+static PyObject*
+libspud_dump_access_profile(PyObject *self, PyObject *args)
+{
+    const char *filename;
+    int outcomeDumpAccessProfile;
+
+    if (!PyArg_ParseTuple(args, "s", &filename))
+        return NULL;
+    outcomeDumpAccessProfile = spud_context_dump_access_profile(context_of(self), filename, strlen(filename));
+    return error_checking(outcomeDumpAccessProfile, "dump access profile");
+}
+
 static PyMethodDef libspudMethods[] = {
     {"load_options",  libspud_load_options, METH_VARARGS,
      PyDoc_STR("Reads the xml file into the options tree.")},
@@ -809,8 +1286,14 @@ static PyMethodDef libspudMethods[] = {
      PyDoc_STR("get number of children under key.")},
     {"get_child_name",  libspud_get_child_name, METH_VARARGS,
      PyDoc_STR("Get name of the indexth child of key.")},
+    {"list_children",  libspud_list_children, METH_VARARGS,
+     PyDoc_STR("Returns the names of all children of key in one call. If info is true, \
+     returns (name, type, rank, shape) tuples instead.")},
     {"option_count",  libspud_option_count, METH_VARARGS,
      PyDoc_STR("Return the number of options matching key.")},
+    {"find_options",  libspud_find_options, METH_VARARGS,
+     PyDoc_STR("Return the keys of all options matching key. Each segment of key may be \
+     *, name::* or a name, optionally followed by an [index].")},
     {"have_option",  libspud_have_option, METH_VARARGS,
      PyDoc_STR("Checks whether key is present in options dictionary.")},
     {"get_option_type",  libspud_get_option_type, METH_VARARGS,
@@ -819,19 +1302,54 @@ static PyMethodDef libspudMethods[] = {
      PyDoc_STR("Return the rank of option specified by key.")},
     {"get_option_shape",  libspud_get_option_shape, METH_VARARGS,
      PyDoc_STR("Return the shape of option specified by key.")},
-    {"get_option",  libspud_get_option, METH_VARARGS,
-     PyDoc_STR("Retrives option values from the options dictionary.")},
+    {"get_option",  (PyCFunction)(void(*)(void))libspud_get_option, METH_VARARGS | METH_KEYWORDS,
+     PyDoc_STR("Retrives option values from the options dictionary. With as_array=True, \
+     arrays of ints or doubles are returned as a NumPy array, or as a memoryview if NumPy \
+     is not available.")},
     {"set_option",  libspud_set_option, METH_VARARGS,
-     PyDoc_STR("Sets options in the options tree.")},
+     PyDoc_STR("Sets options in the options tree. Arrays of ints or doubles may be \
+     given as any C-contiguous buffer, such as a NumPy array.")},
     {"write_options",  libspud_write_options, METH_VARARGS,
      PyDoc_STR("Write options tree out to the xml file specified by name.")},
+    {"load_snapshot",  libspud_load_snapshot, METH_VARARGS,
+     PyDoc_STR("Replaces the options tree with a binary snapshot written by write_snapshot.")},
+    {"write_snapshot",  libspud_write_snapshot, METH_VARARGS,
+     PyDoc_STR("Write the options tree out to a binary snapshot file specified by name.")},
+    {"load_options_from_buffer",  libspud_load_options_from_buffer, METH_VARARGS,
+     PyDoc_STR("Reads the xml in the supplied bytes or string into the options tree.")},
+    {"write_options_to_buffer",  libspud_write_options_to_buffer, METH_NOARGS,
+     PyDoc_STR("Returns the options tree as xml, in bytes.")},
+    {"load_snapshot_from_buffer",  libspud_load_snapshot_from_buffer, METH_VARARGS,
+     PyDoc_STR("Replaces the options tree with the binary snapshot in the supplied bytes.")},
+    {"write_snapshot_to_buffer",  libspud_write_snapshot_to_buffer, METH_NOARGS,
+     PyDoc_STR("Returns the options tree as a binary snapshot, in bytes.")},
     {"delete_option",  libspud_delete_option, METH_VARARGS,
      PyDoc_STR("Delete options at the specified key.")},
+    {"copy_option",  libspud_copy_option, METH_VARARGS,
+     PyDoc_STR("Copy the option at the first key, and its children, to the second key.")},
+    {"move_option",  libspud_move_option, METH_VARARGS,
+     PyDoc_STR("Move the option at the first key, and its children, to the second key.")},
     {"set_option_attribute",  libspud_set_option_attribute, METH_VARARGS,
      PyDoc_STR("As set_option, but additionally attempts to mark the option at the \
      specified key as an attribute. Set_option_attribute accepts only string data for val.")},
     {"add_option",  libspud_add_option, METH_VARARGS,
      PyDoc_STR("Creates a new option at the supplied key.")},
+    {"lookup",  libspud_lookup, METH_VARARGS,
+     PyDoc_STR("Returns a handle for the option at key, which may be passed in place of \
+     the key to have_option, get_option_type, get_option_rank, get_option_shape, \
+     get_option and set_option.")},
+    {"release_handle",  libspud_release_handle, METH_VARARGS,
+     PyDoc_STR("Releases a handle returned by lookup.")},
+    {"memory_stats",  libspud_memory_stats, METH_NOARGS,
+     PyDoc_STR("Returns a dict of the memory used by the options tree: the number of \
+     nodes, their total bytes, the bytes used by nodes, names, children and data, \
+     the bytes shared by copies, and the bytes reserved and used by the node pool.")},
+    {"set_access_profile",  libspud_set_access_profile, METH_VARARGS,
+     PyDoc_STR("Starts, if enabled is true, or stops counting and timing the accesses to \
+     the options tree by key, per method and key. Starting discards any earlier profile.")},
+    {"dump_access_profile",  libspud_dump_access_profile, METH_VARARGS,
+     PyDoc_STR("Writes the access profile to the file specified by name, as JSON if the \
+     name ends in .json and as CSV otherwise.")},
     {NULL, NULL, 0, NULL},
             /* Sentinel */
 };
@@ -893,6 +1411,22 @@ initlibspud(void)
     PyModule_AddObject(m, "SpudShapeError", SpudShapeError);
     PyModule_AddObject(m, "SpudRankError", SpudRankError);
 
+    ContextType.tp_flags = Py_TPFLAGS_DEFAULT;
+    ContextType.tp_doc = PyDoc_STR("An options tree independent of the default tree. Its \
+methods are the functions of this module, acting on this tree.");
+    ContextType.tp_new = Context_new;
+    ContextType.tp_dealloc = (destructor) Context_dealloc;
+    ContextType.tp_methods = libspudMethods;
+    if (PyType_Ready(&ContextType) < 0){
+#if PY_MAJOR_VERSION >= 3
+        return NULL;
+#else
+        return;
+#endif
+    }
+    Py_INCREF(&ContextType);
+    PyModule_AddObject(m, "Context", (PyObject *) &ContextType);
+
 
 #if PY_MAJOR_VERSION>=3 || PY_MINOR_VERSION > 6
     manager = PyCapsule_Import("spud_manager._spud_manager", 0);
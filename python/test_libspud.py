@@ -1,3 +1,8 @@
+import array
+import json
+import locale
+import os
+
 import libspud
 
 libspud.load_options('test.flml')
@@ -121,4 +126,263 @@ except libspud.SpudError as e:
   pass
   
 
+handle = libspud.lookup('/test')
+assert libspud.get_option(handle) == [2.3,3.3]
+assert libspud.get_option_rank(handle) == 1
+libspud.set_option(handle, [1.5,2.5])
+assert libspud.get_option('/test') == [1.5,2.5]
+libspud.delete_option('/test')
+assert not libspud.have_option(handle)
+try:
+  libspud.get_option(handle)
+  assert False
+except libspud.SpudKeyError as e:
+  pass
+libspud.release_handle(handle)
+try:
+  libspud.set_option('/test', 1)
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+handle = libspud.lookup('/test')
+libspud.delete_option('/test')
+try:
+  libspud.set_option('/test', 2)
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+assert not libspud.have_option(handle)
+libspud.delete_option('/test')
+libspud.release_handle(handle)
+try:
+  libspud.set_option('/test/value', 1)
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+handle = libspud.lookup('/test/value')
+libspud.copy_option('/test', '/test_copy')
+libspud.set_option('/test_copy/value', 2)
+libspud.delete_option('/test')
+libspud.move_option('/test_copy', '/test')
+assert libspud.get_option('/test/value') == 2
+assert not libspud.have_option(handle)
+try:
+  libspud.get_option(handle)
+  assert False
+except libspud.SpudKeyError as e:
+  pass
+libspud.delete_option('/test')
+libspud.release_handle(handle)
+
+context = libspud.Context()
+context.load_options('test.flml')
+assert context.get_option('/geometry/dimension') == 2
+try:
+  context.set_option('/test', 7)
+except libspud.SpudNewKeyWarning as e:
+  pass
+assert context.get_option('/test') == 7
+assert not libspud.have_option('/test')
+try:
+  libspud.set_option('/test', 8)
+except libspud.SpudNewKeyWarning as e:
+  pass
+assert context.get_option('/test') == 7
+handle = context.lookup('/test')
+assert context.get_option(handle) == 7
+libspud.delete_option('/test')
+context.clear_options()
+assert not context.have_option(handle)
+del context
+
+libspud.write_snapshot('test_out.snapshot')
+dimension = libspud.get_option('/geometry/dimension')
+libspud.clear_options()
+libspud.load_snapshot('test_out.snapshot')
+assert libspud.get_option('/geometry/dimension') == dimension
+try:
+  libspud.load_snapshot('test_out.flml')
+  assert False
+except libspud.SpudFileError as e:
+  pass
+assert libspud.get_option('/geometry/dimension') == dimension
+
+xml = libspud.write_options_to_buffer()
+snapshot = libspud.write_snapshot_to_buffer()
+assert open('test_out.flml', 'rb').read() == xml
+context = libspud.Context()
+context.load_options_from_buffer(xml)
+assert context.write_options_to_buffer() == xml
+context.clear_options()
+context.load_snapshot_from_buffer(snapshot)
+assert context.get_option('/geometry/dimension') == dimension
+try:
+  context.load_snapshot_from_buffer(xml)
+  assert False
+except libspud.SpudFileError as e:
+  pass
+del context
+
+children = libspud.list_children('/geometry')
+assert children == [libspud.get_child_name('/geometry', i) for i in range(libspud.get_number_of_children('/geometry'))]
+assert libspud.list_children('/geometry', True)[0] == ('dimension', int, 0, (-1, -1))
+try:
+  libspud.list_children('/nonexistent')
+  assert False
+except libspud.SpudKeyError as e:
+  pass
+
+fields = libspud.find_options('/material_phase::*/scalar_field::*')
+assert len(fields) == libspud.option_count('/material_phase/scalar_field')
+assert '/material_phase::Material1/scalar_field::Density' in fields
+assert all(libspud.have_option(field) for field in fields)
+assert libspud.find_options('/material_phase[0]/scalar_field[1]') == [fields[1]]
+assert libspud.find_options('/material_phase::*/nonexistent') == []
+
+context = libspud.Context()
+context.load_options('test.flml')
+try:
+  context.set_option('/escaped', 'a < b & "c" \'d\'\ttab')
+except libspud.SpudNewKeyWarning as e:
+  pass
+xml = context.write_options_to_buffer()
+context.clear_options()
+context.load_options_from_buffer(xml)
+assert context.get_option('/escaped') == 'a < b & "c" \'d\'\ttab'
+del context
+
+stats = libspud.memory_stats()
+assert stats['nodes'] > 0
+assert stats['bytes'] == stats['node_bytes'] + stats['name_bytes'] + stats['child_bytes'] + stats['data_bytes']
+assert 0 < stats['pool_used_bytes'] <= stats['pool_bytes']
+context = libspud.Context()
+assert context.memory_stats()['nodes'] == 1
+del context
+
+context = libspud.Context()
+try:
+  context.add_option('/profiled')
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+context.set_access_profile(True)
+for i in range(3):
+  assert context.have_option('/profiled')
+context.set_access_profile(False)
+assert not context.have_option('/unprofiled')
+context.dump_access_profile('test_out.json')
+profile = json.load(open('test_out.json'))
+os.remove('test_out.json')
+assert [(access['method'], access['key'], access['calls']) for access in profile] == [('have_option', '/profiled', 3)]
+assert profile[0]['seconds'] > 0
+try:
+  context.dump_access_profile('/nonexistent/test_out.json')
+  assert False
+except libspud.SpudFileError as e:
+  pass
+del context
+
+context = libspud.Context()
+try:
+  context.set_option('/tensor', [[1, 2, 3], [4, 5, 6]])
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+context.set_access_profile(True)
+assert context.get_option('/tensor') == [[1, 2, 3], [4, 5, 6]]
+context.set_access_profile(False)
+context.dump_access_profile('test_out.json')
+profile = json.load(open('test_out.json'))
+os.remove('test_out.json')
+assert [(access['method'], access['key'], access['calls']) for access in profile] == [('get_option', '/tensor', 1)]
+try:
+  context.set_option('/big', [float(i) for i in range(100000)])
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+assert context.get_option(context.lookup('/big')) == [float(i) for i in range(100000)]
+try:
+  context.get_option('/missing')
+  assert False
+except libspud.SpudKeyError as e:
+  pass
+del context
+
+context = libspud.Context()
+try:
+  context.set_option('/array', array.array('d', [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]))
+  assert False
+except libspud.SpudNewKeyWarning as e:
+  pass
+assert context.get_option('/array') == [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]
+assert context.get_option('/array', as_array=True).tolist() == [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]
+context.set_option('/array', memoryview(array.array('i', range(6))).cast('B').cast('i', (2, 3)))
+assert context.get_option_type('/array') is int
+assert context.get_option_shape('/array') == (2, 3)
+assert context.get_option('/array') == [[0, 1, 2], [3, 4, 5]]
+assert context.get_option(context.lookup('/array'), as_array=True).tolist() == [[0, 1, 2], [3, 4, 5]]
+context.set_option('/array', array.array('q', [7, 8]))
+assert context.get_option('/array') == [7, 8]
+try:
+  context.set_option('/array', array.array('q', [2**40]))
+  assert False
+except OverflowError as e:
+  pass
+try:
+  context.set_option('/array', array.array('B', [1]))
+  assert False
+except libspud.SpudTypeError as e:
+  pass
+try:
+  context.set_option('/array', array.array('d'))
+  assert False
+except libspud.SpudShapeError as e:
+  pass
+assert context.get_option('/array') == [7, 8]
+assert context.get_option('/array', as_array=False) == [7, 8]
+del context
+
+context = libspud.Context()
+context.load_options_from_buffer(b'<?xml version="1.0" encoding="utf-8" ?>\n<numbers>\n'
+  b'<real><real_value rank="1" shape="13">NaN nan INF Inf -inf -INF 1e400 -1e400 0x10 -0x10 1.5abc .5 abc</real_value></real>\n'
+  b'<integer><integer_value rank="1" shape="8">99999999999 -99999999999 +3 1.9 abc 0x10 -0x10 -7</integer_value></integer>\n'
+  b'</numbers>\n')
+reals = context.get_option('/real')
+assert all(value != value for value in reals[:2])
+assert reals[2:] == [float('inf'), float('inf'), float('-inf'), float('-inf'), 1.7976931348623157e+308, -1.7976931348623157e+308, 0.0, 0.0, 1.5, 0.5, 0.0]
+assert context.get_option('/integer') == [2147483647, -2147483648, 3, 1, 0, 0, 0, -7]
+xml = context.write_options_to_buffer()
+assert b'>nan nan inf inf -inf -inf 1.79769313486232e+308 -1.79769313486232e+308 0 -0 1.5 0.5 0</real_value>' in xml
+assert b'>2147483647 -2147483648 3 1 0 0 0 -7</integer_value>' in xml
+context.set_option('/real', [1.0 / 3.0, -2.0 / 3.0, 0.1, 1e-300, 123456789012345678.0])
+xml = context.write_options_to_buffer()
+assert b'>0.333333333333333 -0.666666666666667 0.1 1e-300 1.23456789012346e+17</real_value>' in xml
+context.clear_options()
+context.load_options_from_buffer(xml)
+assert context.get_option('/real') == [float('%.15g' % value) for value in [1.0 / 3.0, -2.0 / 3.0, 0.1, 1e-300, 123456789012345678.0]]
+assert context.write_options_to_buffer() == xml
+del context
+
+# Numbers are read and written with a '.' decimal point whatever the locale
+for name in ['de_DE.UTF-8', 'de_DE.utf8', 'fr_FR.UTF-8', 'fr_FR.utf8', 'nl_NL.UTF-8', 'nl_NL.utf8']:
+  try:
+    locale.setlocale(locale.LC_NUMERIC, name)
+  except locale.Error as e:
+    continue
+  if locale.localeconv()['decimal_point'] != ',':
+    continue
+  context = libspud.Context()
+  context.load_options_from_buffer(b'<?xml version="1.0" encoding="utf-8" ?>\n<numbers>\n'
+    b'<real><real_value rank="1" shape="3">1.5 -0.25 2.5e-3</real_value></real>\n'
+    b'</numbers>\n')
+  assert context.get_option('/real') == [1.5, -0.25, 0.0025]
+  xml = context.write_options_to_buffer()
+  assert b'>1.5 -0.25 0.0025</real_value>' in xml
+  context.clear_options()
+  context.load_options_from_buffer(xml)
+  assert context.get_option('/real') == [1.5, -0.25, 0.0025]
+  del context
+  break
+locale.setlocale(locale.LC_NUMERIC, 'C')
+
 print("All tests passed!")
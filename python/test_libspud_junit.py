@@ -1,3 +1,6 @@
+import array
+import json
+import locale
 import os
 import libspud
 
@@ -127,5 +130,192 @@ test("libspud.get_option('/test') == [2.3,3.3]")
 exception_test("libspud.set_option('/test')", libspud.SpudError)
 
   
+handle = libspud.lookup('/test')
+test("libspud.get_option(handle) == [2.3,3.3]")
+test("libspud.get_option_rank(handle) == 1")
+libspud.set_option(handle, [1.5,2.5])
+test("libspud.get_option('/test') == [1.5,2.5]")
+libspud.delete_option('/test')
+test("not libspud.have_option(handle)")
+exception_test("libspud.get_option(handle)", libspud.SpudKeyError)
+libspud.release_handle(handle)
+exception_test("libspud.set_option('/test', 1)", libspud.SpudNewKeyWarning)
+handle = libspud.lookup('/test')
+libspud.delete_option('/test')
+exception_test("libspud.set_option('/test', 2)", libspud.SpudNewKeyWarning)
+test("not libspud.have_option(handle)")
+libspud.delete_option('/test')
+libspud.release_handle(handle)
+exception_test("libspud.set_option('/test/value', 1)", libspud.SpudNewKeyWarning)
+handle = libspud.lookup('/test/value')
+libspud.copy_option('/test', '/test_copy')
+libspud.set_option('/test_copy/value', 2)
+libspud.delete_option('/test')
+libspud.move_option('/test_copy', '/test')
+test("libspud.get_option('/test/value') == 2")
+test("not libspud.have_option(handle)")
+exception_test("libspud.get_option(handle)", libspud.SpudKeyError)
+libspud.delete_option('/test')
+libspud.release_handle(handle)
+
+context = libspud.Context()
+context.load_options(dirpath+'/test.flml')
+test("context.get_option('/geometry/dimension') == 2")
+exception_test("context.set_option('/test', 7)", libspud.SpudNewKeyWarning)
+test("context.get_option('/test') == 7")
+test("not libspud.have_option('/test')")
+exception_test("libspud.set_option('/test', 8)", libspud.SpudNewKeyWarning)
+test("context.get_option('/test') == 7")
+handle = context.lookup('/test')
+test("context.get_option(handle) == 7")
+libspud.delete_option('/test')
+context.clear_options()
+test("not context.have_option(handle)")
+del context
+
+snapshot_path = dirpath+'/test_out.snapshot'
+libspud.write_snapshot(snapshot_path)
+dimension = libspud.get_option('/geometry/dimension')
+libspud.clear_options()
+libspud.load_snapshot(snapshot_path)
+test("libspud.get_option('/geometry/dimension') == dimension")
+exception_test("libspud.load_snapshot(dirpath+'/test.flml')", libspud.SpudFileError)
+test("libspud.get_option('/geometry/dimension') == dimension")
+os.remove(snapshot_path)
+
+xml = libspud.write_options_to_buffer()
+snapshot = libspud.write_snapshot_to_buffer()
+libspud.write_options(dirpath+'/test_out.flml')
+test("open(dirpath+'/test_out.flml', 'rb').read() == xml")
+os.remove(dirpath+'/test_out.flml')
+context = libspud.Context()
+context.load_options_from_buffer(xml)
+test("context.write_options_to_buffer() == xml")
+context.clear_options()
+context.load_snapshot_from_buffer(snapshot)
+test("context.get_option('/geometry/dimension') == dimension")
+exception_test("context.load_snapshot_from_buffer(xml)", libspud.SpudFileError)
+del context
+
+escaped = 'a < b & "c" \'d\'\ttab'
+context = libspud.Context()
+context.load_options(dirpath+'/test.flml')
+exception_test("context.set_option('/escaped', escaped)", libspud.SpudNewKeyWarning)
+xml = context.write_options_to_buffer()
+context.clear_options()
+context.load_options_from_buffer(xml)
+test("context.get_option('/escaped') == escaped")
+del context
+
+test("libspud.list_children('/geometry') == [libspud.get_child_name('/geometry', i) for i in range(libspud.get_number_of_children('/geometry'))]")
+test("libspud.list_children('/geometry', True)[0] == ('dimension', int, 0, (-1, -1))")
+exception_test("libspud.list_children('/nonexistent')", libspud.SpudKeyError)
+
+fields = libspud.find_options('/material_phase::*/scalar_field::*')
+test("len(fields) == libspud.option_count('/material_phase/scalar_field')")
+test("'/material_phase::Material1/scalar_field::Density' in fields")
+test("all(libspud.have_option(field) for field in fields)")
+test("libspud.find_options('/material_phase[0]/scalar_field[1]') == [fields[1]]")
+test("libspud.find_options('/material_phase::*/nonexistent') == []")
+
+stats = libspud.memory_stats()
+test("stats['nodes'] > 0")
+test("stats['bytes'] == stats['node_bytes'] + stats['name_bytes'] + stats['child_bytes'] + stats['data_bytes']")
+test("0 < stats['pool_used_bytes'] <= stats['pool_bytes']")
+test("libspud.Context().memory_stats()['nodes'] == 1")
+
+profile_path = dirpath+'/test_out.json'
+context = libspud.Context()
+exception_test("context.add_option('/profiled')", libspud.SpudNewKeyWarning)
+context.set_access_profile(True)
+for i in range(3):
+    context.have_option('/profiled')
+context.set_access_profile(False)
+test("not context.have_option('/unprofiled')")
+context.dump_access_profile(profile_path)
+profile = json.load(open(profile_path))
+os.remove(profile_path)
+test("[(access['method'], access['key'], access['calls']) for access in profile] == [('have_option', '/profiled', 3)]")
+test("profile[0]['seconds'] > 0")
+exception_test("context.dump_access_profile('/nonexistent/test_out.json')", libspud.SpudFileError)
+del context
+
+context = libspud.Context()
+exception_test("context.set_option('/tensor', [[1, 2, 3], [4, 5, 6]])", libspud.SpudNewKeyWarning)
+context.set_access_profile(True)
+test("context.get_option('/tensor') == [[1, 2, 3], [4, 5, 6]]")
+context.set_access_profile(False)
+context.dump_access_profile(profile_path)
+profile = json.load(open(profile_path))
+os.remove(profile_path)
+test("[(access['method'], access['key'], access['calls']) for access in profile] == [('get_option', '/tensor', 1)]")
+big = [float(i) for i in range(100000)]
+exception_test("context.set_option('/big', big)", libspud.SpudNewKeyWarning)
+test("context.get_option(context.lookup('/big')) == big")
+exception_test("context.get_option('/missing')", libspud.SpudKeyError)
+del context
+
+context = libspud.Context()
+exception_test("context.set_option('/array', array.array('d', [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]))", libspud.SpudNewKeyWarning)
+test("context.get_option('/array') == [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]")
+test("context.get_option('/array', as_array=True).tolist() == [1.5, 2.5, 3.5, 4.5, 5.5, 6.5]")
+context.set_option('/array', memoryview(array.array('i', range(6))).cast('B').cast('i', (2, 3)))
+test("context.get_option_type('/array') is int")
+test("context.get_option_shape('/array') == (2, 3)")
+test("context.get_option('/array') == [[0, 1, 2], [3, 4, 5]]")
+test("context.get_option(context.lookup('/array'), as_array=True).tolist() == [[0, 1, 2], [3, 4, 5]]")
+context.set_option('/array', array.array('q', [7, 8]))
+test("context.get_option('/array') == [7, 8]")
+exception_test("context.set_option('/array', array.array('q', [2**40]))", OverflowError)
+exception_test("context.set_option('/array', array.array('B', [1]))", libspud.SpudTypeError)
+exception_test("context.set_option('/array', array.array('d'))", libspud.SpudShapeError)
+test("context.get_option('/array') == [7, 8]")
+test("context.get_option('/array', as_array=False) == [7, 8]")
+del context
+
+context = libspud.Context()
+context.load_options_from_buffer(b'<?xml version="1.0" encoding="utf-8" ?>\n<numbers>\n'
+  b'<real><real_value rank="1" shape="13">NaN nan INF Inf -inf -INF 1e400 -1e400 0x10 -0x10 1.5abc .5 abc</real_value></real>\n'
+  b'<integer><integer_value rank="1" shape="8">99999999999 -99999999999 +3 1.9 abc 0x10 -0x10 -7</integer_value></integer>\n'
+  b'</numbers>\n')
+reals = context.get_option('/real')
+test("all(value != value for value in reals[:2])")
+test("reals[2:] == [float('inf'), float('inf'), float('-inf'), float('-inf'), 1.7976931348623157e+308, -1.7976931348623157e+308, 0.0, 0.0, 1.5, 0.5, 0.0]")
+test("context.get_option('/integer') == [2147483647, -2147483648, 3, 1, 0, 0, 0, -7]")
+xml = context.write_options_to_buffer()
+test("b'>nan nan inf inf -inf -inf 1.79769313486232e+308 -1.79769313486232e+308 0 -0 1.5 0.5 0</real_value>' in xml")
+test("b'>2147483647 -2147483648 3 1 0 0 0 -7</integer_value>' in xml")
+thirds = [1.0 / 3.0, -2.0 / 3.0, 0.1, 1e-300, 123456789012345678.0]
+context.set_option('/real', thirds)
+xml = context.write_options_to_buffer()
+test("b'>0.333333333333333 -0.666666666666667 0.1 1e-300 1.23456789012346e+17</real_value>' in xml")
+context.clear_options()
+context.load_options_from_buffer(xml)
+test("context.get_option('/real') == [float('%.15g' % value) for value in thirds]")
+test("context.write_options_to_buffer() == xml")
+del context
+
+# Numbers are read and written with a '.' decimal point whatever the locale
+for name in ['de_DE.UTF-8', 'de_DE.utf8', 'fr_FR.UTF-8', 'fr_FR.utf8', 'nl_NL.UTF-8', 'nl_NL.utf8']:
+    try:
+        locale.setlocale(locale.LC_NUMERIC, name)
+    except locale.Error as e:
+        continue
+    if locale.localeconv()['decimal_point'] != ',':
+        continue
+    context = libspud.Context()
+    context.load_options_from_buffer(b'<?xml version="1.0" encoding="utf-8" ?>\n<numbers>\n'
+      b'<real><real_value rank="1" shape="3">1.5 -0.25 2.5e-3</real_value></real>\n'
+      b'</numbers>\n')
+    test("context.get_option('/real') == [1.5, -0.25, 0.0025]")
+    xml = context.write_options_to_buffer()
+    test("b'>1.5 -0.25 0.0025</real_value>' in xml")
+    context.clear_options()
+    context.load_options_from_buffer(xml)
+    test("context.get_option('/real') == [1.5, -0.25, 0.0025]")
+    del context
+    break
+locale.setlocale(locale.LC_NUMERIC, 'C')
+
 with open(os.path.dirname(os.path.abspath(__file__))+'/test_results.xml', 'w') as handle:
     suite.to_file(handle, [suite])
@@ -48,13 +48,37 @@ module spud
     & SPUD_NEW_KEY_WARNING         = -1, &
     & SPUD_ATTR_SET_FAILED_WARNING = -2
 
+  !! An independent options tree. Every procedure takes an optional context
+  !! argument, and acts on the default options tree if it is not present.
+  type, public :: spud_context
+    private
+    type(c_ptr) :: ptr = c_null_ptr
+  end type spud_context
+
+  !! Memory used by an options tree, as returned by memory_stats. All sizes
+  !! are in bytes; bytes is the sum of node_bytes, name_bytes, child_bytes and
+  !! data_bytes.
+  type, public, bind(c) :: spud_memory_stats
+    integer(c_long_long) :: nodes, bytes, shared_nodes, saved_bytes, &
+      & node_bytes, name_bytes, child_bytes, data_bytes, &
+      & pool_bytes, pool_used_bytes
+  end type spud_memory_stats
+
   public :: &
     & clear_options, &
     & load_options, &
     & write_options, &
+    & load_snapshot, &
+    & write_snapshot, &
+    & load_options_from_buffer, &
+    & write_options_to_buffer, &
+    & load_snapshot_from_buffer, &
+    & write_snapshot_to_buffer, &
     & get_child_name, &
     & get_number_of_children, &
+    & list_children, &
     & option_count, &
+    & find_options, &
     & have_option, &
     & option_type, &
     & option_rank, &
@@ -66,7 +90,14 @@ module spud
     & move_option, &
     & copy_option, &
     & delete_option, &
-    & print_options
+    & print_options, &
+    & memory_stats, &
+    & set_access_profile, &
+    & dump_access_profile, &
+    & lookup_option, &
+    & release_option_handle, &
+    & create_context, &
+    & destroy_context
 
   interface get_option
     module procedure &
@@ -79,7 +110,14 @@ module spud
       & get_option_integer_scalar, &
       & get_option_integer_vector, &
       & get_option_integer_tensor, &
-      & get_option_character
+      & get_option_character, &
+      & get_option_handle_real_scalar, &
+      & get_option_handle_real_vector, &
+      & get_option_handle_real_tensor, &
+      & get_option_handle_integer_scalar, &
+      & get_option_handle_integer_vector, &
+      & get_option_handle_integer_tensor, &
+      & get_option_handle_character
   end interface
 
   interface set_option
@@ -93,162 +131,407 @@ module spud
       & set_option_integer_scalar, &
       & set_option_integer_vector, &
       & set_option_integer_tensor, &
-      & set_option_character
+      & set_option_character, &
+      & set_option_handle_real_scalar, &
+      & set_option_handle_real_vector, &
+      & set_option_handle_real_tensor, &
+      & set_option_handle_integer_scalar, &
+      & set_option_handle_integer_vector, &
+      & set_option_handle_integer_tensor, &
+      & set_option_handle_character
+  end interface
+
+  ! Handle variants of the option queries, for options resolved once with
+  ! lookup_option
+  interface have_option
+    module procedure have_option, have_option_handle
+  end interface
+
+  interface option_type
+    module procedure option_type, option_type_handle
+  end interface
+
+  interface option_rank
+    module procedure option_rank, option_rank_handle
+  end interface
+
+  interface option_shape
+    module procedure option_shape, option_shape_handle
   end interface
 
   ! C interfaces
   interface
-     subroutine spud_clear_options() bind(c)
-     end subroutine spud_clear_options
+     function spud_context_create() bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr) :: spud_context_create
+     end function spud_context_create
+
+     subroutine spud_context_destroy(context) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+     end subroutine spud_context_destroy
+
+     subroutine spud_context_clear_options(context) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+     end subroutine spud_context_clear_options
+
+     function spud_context_load_options(context, key, key_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: key_len
+       character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
+       integer(c_int) :: spud_context_load_options
+     end function spud_context_load_options
+
+     function spud_context_write_options(context, key, key_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: key_len
+       character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
+       integer(c_int) :: spud_context_write_options
+     end function spud_context_write_options
 
-     function spud_load_options(key, key_len) bind(c)
+     function spud_context_load_snapshot(context, key, key_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
-       integer(c_int) :: spud_load_options
-     end function spud_load_options
+       integer(c_int) :: spud_context_load_snapshot
+     end function spud_context_load_snapshot
 
-     function spud_write_options(key, key_len) bind(c)
+     function spud_context_write_snapshot(context, key, key_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
-       integer(c_int) :: spud_write_options
-     end function spud_write_options
+       integer(c_int) :: spud_context_write_snapshot
+     end function spud_context_write_snapshot
+
+     function spud_context_load_options_from_buffer(context, buffer, buffer_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: buffer_len
+       character(len=1,kind=c_char), dimension(buffer_len), intent(in) :: buffer
+       integer(c_int) :: spud_context_load_options_from_buffer
+     end function spud_context_load_options_from_buffer
+
+     function spud_context_write_options_to_buffer(context, buffer, buffer_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       type(c_ptr), intent(out) :: buffer
+       integer(c_int), intent(out) :: buffer_len
+       integer(c_int) :: spud_context_write_options_to_buffer
+     end function spud_context_write_options_to_buffer
+
+     function spud_context_load_snapshot_from_buffer(context, buffer, buffer_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: buffer_len
+       character(len=1,kind=c_char), dimension(buffer_len), intent(in) :: buffer
+       integer(c_int) :: spud_context_load_snapshot_from_buffer
+     end function spud_context_load_snapshot_from_buffer
+
+     function spud_context_write_snapshot_to_buffer(context, buffer, buffer_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       type(c_ptr), intent(out) :: buffer
+       integer(c_int), intent(out) :: buffer_len
+       integer(c_int) :: spud_context_write_snapshot_to_buffer
+     end function spud_context_write_snapshot_to_buffer
+
+     subroutine spud_free_buffer(buffer) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: buffer
+     end subroutine spud_free_buffer
 
-     function spud_get_child_name(key, key_len, index, child_name, child_name_len) bind(c)
+     function spud_context_get_child_name(context, key, key_len, index, child_name, child_name_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        integer(c_int), intent(in), value :: child_name_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        integer(c_int), intent(in), value :: index
        character(len=1,kind=c_char), dimension(child_name_len), intent(out) :: child_name
-       integer(c_int) :: spud_get_child_name
-     end function spud_get_child_name
+       integer(c_int) :: spud_context_get_child_name
+     end function spud_context_get_child_name
+
+     function spud_context_get_number_of_children(context, key, key_len, child_count) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: key_len
+       character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
+       integer(c_int), intent(out) :: child_count
+       integer(c_int) :: spud_context_get_number_of_children
+     end function spud_context_get_number_of_children
 
-     function spud_get_number_of_children(key, key_len, child_count) bind(c)
+     function spud_context_list_children(context, key, key_len, child_names, child_names_len, child_count, max_children, types, ranks, shapes) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
+       type(c_ptr), intent(out) :: child_names
+       integer(c_int), intent(out) :: child_names_len
        integer(c_int), intent(out) :: child_count
-       integer(c_int) :: spud_get_number_of_children
-     end function spud_get_number_of_children
+       integer(c_int), intent(in), value :: max_children
+       type(c_ptr), intent(in), value :: types
+       type(c_ptr), intent(in), value :: ranks
+       type(c_ptr), intent(in), value :: shapes
+       integer(c_int) :: spud_context_list_children
+     end function spud_context_list_children
+
+     function spud_context_option_count(context, key, key_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: key_len
+       character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
+       integer(c_int) :: spud_context_option_count
+     end function spud_context_option_count
 
-     function spud_option_count(key, key_len) bind(c)
+     function spud_context_find_options(context, key, key_len, keys, keys_len, key_count) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
-       integer(c_int) :: spud_option_count
-     end function spud_option_count
+       type(c_ptr), intent(out) :: keys
+       integer(c_int), intent(out) :: keys_len
+       integer(c_int), intent(out) :: key_count
+       integer(c_int) :: spud_context_find_options
+     end function spud_context_find_options
 
-     function spud_have_option(key, key_len) bind(c)
+     function spud_context_have_option(context, key, key_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
-       integer(c_int) :: spud_have_option
-     end function spud_have_option
+       integer(c_int) :: spud_context_have_option
+     end function spud_context_have_option
 
-     function spud_get_option_type(key, key_len, option_type) bind(c)
+     function spud_context_get_option_type(context, key, key_len, option_type) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        integer(c_int), intent(out) :: option_type
-       integer(c_int) :: spud_get_option_type
-     end function spud_get_option_type
+       integer(c_int) :: spud_context_get_option_type
+     end function spud_context_get_option_type
 
-     function spud_get_option_rank(key, key_len, option_rank) bind(c)
+     function spud_context_get_option_rank(context, key, key_len, option_rank) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        integer(c_int), intent(out) :: option_rank
-       integer(c_int) :: spud_get_option_rank
-     end function spud_get_option_rank
+       integer(c_int) :: spud_context_get_option_rank
+     end function spud_context_get_option_rank
 
-     function spud_get_option_shape(key, key_len, shape) bind(c)
+     function spud_context_get_option_shape(context, key, key_len, shape) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        integer(c_int), dimension(2), intent(out) :: shape
-       integer(c_int) :: spud_get_option_shape
-     end function spud_get_option_shape
+       integer(c_int) :: spud_context_get_option_shape
+     end function spud_context_get_option_shape
 
-     function spud_add_option(key, key_len) bind(c)
+     function spud_context_add_option(context, key, key_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
-       integer(c_int) :: spud_add_option
-     end function spud_add_option
+       integer(c_int) :: spud_context_add_option
+     end function spud_context_add_option
 
-     function spud_set_option_attribute(key, key_len, val, val_len) bind(c)
+     function spud_context_set_option_attribute(context, key, key_len, val, val_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        integer(c_int), intent(in), value :: val_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        character(len=1,kind=c_char), dimension(val_len), intent(in) :: val
-       integer(c_int) :: spud_set_option_attribute
-     end function spud_set_option_attribute
+       integer(c_int) :: spud_context_set_option_attribute
+     end function spud_context_set_option_attribute
 
-     function spud_move_option(key1, key1_len, key2, key2_len) bind(c)
+     function spud_context_move_option(context, key1, key1_len, key2, key2_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key1_len
        integer(c_int), intent(in), value :: key2_len
        character(len = 1,kind=c_char), dimension(key1_len), intent(in) :: key1
        character(len = 1,kind=c_char), dimension(key2_len), intent(in) :: key2
-       integer(c_int) :: spud_move_option
-     end function spud_move_option
+       integer(c_int) :: spud_context_move_option
+     end function spud_context_move_option
 
-     function spud_copy_option(key1, key1_len, key2, key2_len) bind(c)
+     function spud_context_copy_option(context, key1, key1_len, key2, key2_len) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key1_len
        integer(c_int), intent(in), value :: key2_len
        character(len = 1,kind=c_char), dimension(key1_len), intent(in) :: key1
        character(len = 1,kind=c_char), dimension(key2_len), intent(in) :: key2
-       integer(c_int) :: spud_copy_option
-     end function spud_copy_option
+       integer(c_int) :: spud_context_copy_option
+     end function spud_context_copy_option
+
+     function spud_context_delete_option(context, key, key_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: key_len
+       character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
+       integer(c_int) :: spud_context_delete_option
+     end function spud_context_delete_option
+
+     subroutine spud_context_print_options(context) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+     end subroutine spud_context_print_options
+
+     function spud_context_memory_stats(context, stats) bind(c)
+       use iso_c_binding
+       import :: spud_memory_stats
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       type(spud_memory_stats), intent(out) :: stats
+       integer(c_int) :: spud_context_memory_stats
+     end function spud_context_memory_stats
+
+     subroutine spud_context_set_access_profile(context, enabled) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: enabled
+     end subroutine spud_context_set_access_profile
+
+     function spud_context_dump_access_profile(context, filename, filename_len) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: filename_len
+       character(len=1,kind=c_char), dimension(filename_len), intent(in) :: filename
+       integer(c_int) :: spud_context_dump_access_profile
+     end function spud_context_dump_access_profile
 
-     function spud_delete_option(key, key_len) bind(c)
+     function spud_context_lookup(context, key, key_len, handle) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
-       integer(c_int) :: spud_delete_option
-     end function spud_delete_option
+       integer(c_int), intent(out) :: handle
+       integer(c_int) :: spud_context_lookup
+     end function spud_context_lookup
+
+     function spud_context_release_handle(context, handle) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       integer(c_int) :: spud_context_release_handle
+     end function spud_context_release_handle
+
+     function spud_context_handle_have_option(context, handle) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       integer(c_int) :: spud_context_handle_have_option
+     end function spud_context_handle_have_option
+
+     function spud_context_handle_get_option_type(context, handle, option_type) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       integer(c_int), intent(out) :: option_type
+       integer(c_int) :: spud_context_handle_get_option_type
+     end function spud_context_handle_get_option_type
+
+     function spud_context_handle_get_option_rank(context, handle, option_rank) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       integer(c_int), intent(out) :: option_rank
+       integer(c_int) :: spud_context_handle_get_option_rank
+     end function spud_context_handle_get_option_rank
+
+     function spud_context_handle_get_option_shape(context, handle, shape) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       integer(c_int), dimension(2), intent(out) :: shape
+       integer(c_int) :: spud_context_handle_get_option_shape
+     end function spud_context_handle_get_option_shape
+
+     function spud_context_handle_get_option(context, handle, val) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       type(c_ptr), value, intent(in) :: val
+       integer(c_int) :: spud_context_handle_get_option
+     end function spud_context_handle_get_option
 
-     subroutine spud_print_options() bind(c)
-     end subroutine spud_print_options
+     function spud_context_handle_set_option(context, handle, val, type, rank, shape) bind(c)
+       use iso_c_binding
+       implicit none
+       type(c_ptr), intent(in), value :: context
+       integer(c_int), intent(in), value :: handle
+       type(c_ptr), value, intent(in) :: val
+       integer(c_int), intent(in), value :: type, rank
+       integer(c_int), intent(in), dimension(2) :: shape
+       integer(c_int) :: spud_context_handle_set_option
+     end function spud_context_handle_set_option
 
-     function spud_get_option(key, key_len, val) bind(c)
+     function spud_context_get_option(context, key, key_len, val) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        ! Here intent(in) refers to the c_ptr, not the target!
        type(c_ptr), value, intent(in) :: val
-       integer(c_int) :: spud_get_option
-     end function spud_get_option
+       integer(c_int) :: spud_context_get_option
+     end function spud_context_get_option
 
-     function spud_set_option(key, key_len, val, type, rank, shape) bind(c)
+     function spud_context_set_option(context, key, key_len, val, type, rank, shape) bind(c)
        use iso_c_binding
        implicit none
+       type(c_ptr), intent(in), value :: context
        integer(c_int), intent(in), value :: key_len
        character(len=1,kind=c_char), dimension(key_len), intent(in) :: key
        type(c_ptr), value, intent(in) :: val
        integer(c_int), intent(in), value :: type, rank
        integer(c_int), intent(in), dimension(2) :: shape
-       integer(c_int) :: spud_set_option
-     end function spud_set_option
+       integer(c_int) :: spud_context_set_option
+     end function spud_context_set_option
 
   end interface
 
@@ -282,17 +565,40 @@ contains
     
   end function array_string
 
-  subroutine clear_options()
-    call spud_clear_options
+  function create_context() result(context)
+    !!< Create a new, empty, options tree independent of the default tree
+
+    type(spud_context) :: context
+
+    context%ptr = spud_context_create()
+
+  end function create_context
+
+  subroutine destroy_context(context)
+    !!< Destroy an options tree created with create_context, and any handles
+    !!< into it
+
+    type(spud_context), intent(inout) :: context
+
+    call spud_context_destroy(context%ptr)
+    context%ptr = c_null_ptr
+
+  end subroutine destroy_context
+
+  subroutine clear_options(context)
+    type(spud_context), optional, intent(in) :: context
+
+    call spud_context_clear_options(context_ptr(context))
   end subroutine clear_options
 
-  subroutine load_options(filename, stat)
+  subroutine load_options(filename, stat, context)
     character(len = * ), intent(in) :: filename
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
-    lstat =  spud_load_options(string_array(filename), len_trim(filename))
+    lstat =  spud_context_load_options(context_ptr(context), string_array(filename), len_trim(filename))
 
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(filename, lstat, stat)
@@ -301,13 +607,14 @@ contains
 
   end subroutine load_options
 
-  subroutine write_options(filename, stat)
+  subroutine write_options(filename, stat, context)
     character(len = *), intent(in) :: filename
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
-    lstat = spud_write_options(string_array(filename), len_trim(filename))
+    lstat = spud_context_write_options(context_ptr(context), string_array(filename), len_trim(filename))
 
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(filename, lstat, stat)
@@ -316,11 +623,138 @@ contains
 
   end subroutine write_options
 
-  subroutine get_child_name(key, index, child_name, stat)
+  subroutine load_snapshot(filename, stat, context)
+    character(len = *), intent(in) :: filename
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_load_snapshot(context_ptr(context), string_array(filename), len_trim(filename))
+
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(filename, lstat, stat)
+      return
+    end if
+
+  end subroutine load_snapshot
+
+  subroutine write_snapshot(filename, stat, context)
+    character(len = *), intent(in) :: filename
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_write_snapshot(context_ptr(context), string_array(filename), len_trim(filename))
+
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(filename, lstat, stat)
+      return
+    end if
+
+  end subroutine write_snapshot
+
+  subroutine load_options_from_buffer(buffer, stat, context)
+    character(len = *), intent(in) :: buffer
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_load_options_from_buffer(context_ptr(context), string_array(buffer), len(buffer))
+
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error("buffer", lstat, stat)
+      return
+    end if
+
+  end subroutine load_options_from_buffer
+
+  subroutine write_options_to_buffer(buffer, stat, context)
+    character(len = :), allocatable, intent(out) :: buffer
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    type(c_ptr) :: lbuffer
+    integer :: lbuffer_len, lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_write_options_to_buffer(context_ptr(context), lbuffer, lbuffer_len)
+
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error("buffer", lstat, stat)
+      return
+    end if
+
+    call copy_buffer(lbuffer, lbuffer_len, buffer)
+
+  end subroutine write_options_to_buffer
+
+  subroutine load_snapshot_from_buffer(buffer, stat, context)
+    character(len = *), intent(in) :: buffer
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_load_snapshot_from_buffer(context_ptr(context), string_array(buffer), len(buffer))
+
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error("buffer", lstat, stat)
+      return
+    end if
+
+  end subroutine load_snapshot_from_buffer
+
+  subroutine write_snapshot_to_buffer(buffer, stat, context)
+    character(len = :), allocatable, intent(out) :: buffer
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    type(c_ptr) :: lbuffer
+    integer :: lbuffer_len, lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_write_snapshot_to_buffer(context_ptr(context), lbuffer, lbuffer_len)
+
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error("buffer", lstat, stat)
+      return
+    end if
+
+    call copy_buffer(lbuffer, lbuffer_len, buffer)
+
+  end subroutine write_snapshot_to_buffer
+
+  subroutine get_child_name(key, index, child_name, stat, context)
     character(len = *), intent(in) :: key
     integer, intent(in) :: index
     character(len = *), intent(out) :: child_name
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     character(len = 1, kind=c_char), dimension(len(child_name)) :: lchild_name
     integer :: lstat
@@ -330,7 +764,7 @@ contains
     end if
 
     lchild_name = ""
-    lstat = spud_get_child_name(string_array(key), len_trim(key), index, lchild_name, size(lchild_name))
+    lstat = spud_context_get_child_name(context_ptr(context), string_array(key), len_trim(key), index, lchild_name, size(lchild_name))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -340,14 +774,15 @@ contains
 
   end subroutine get_child_name
 
-  subroutine get_number_of_children(key, child_count, stat)
+  subroutine get_number_of_children(key, child_count, stat, context)
     character(len = *), intent(in) :: key
     integer, intent(out) :: child_count
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
-    lstat = spud_get_number_of_children(string_array(key), len_trim(key), child_count)
+    lstat = spud_context_get_number_of_children(context_ptr(context), string_array(key), len_trim(key), child_count)
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -355,27 +790,115 @@ contains
 
   end subroutine get_number_of_children
 
-  function option_count(key)
+  subroutine list_children(key, child_names, stat, types, ranks, shapes, context)
+    !!< List the names of all children of the option at key, and optionally
+    !!< their types, ranks and shapes, in one call
+
+    character(len = *), intent(in) :: key
+    character(len = *), dimension(:), allocatable, intent(out) :: child_names
+    integer, optional, intent(out) :: stat
+    integer, dimension(:), allocatable, optional, intent(out) :: types
+    integer, dimension(:), allocatable, optional, intent(out) :: ranks
+    integer, dimension(:, :), allocatable, optional, intent(out) :: shapes
+    type(spud_context), optional, intent(in) :: context
+
+    type(c_ptr) :: lchild_names
+    integer :: lchild_count, lchild_names_len, lstat, max_children
+    integer, dimension(:), allocatable, target :: ltypes, lranks
+    integer, dimension(:, :), allocatable, target :: lshapes
+    logical :: info
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    info = present(types) .or. present(ranks) .or. present(shapes)
+    max_children = 0
+    if(info) then
+      lstat = spud_context_get_number_of_children(context_ptr(context), string_array(key), len_trim(key), max_children)
+      if(lstat /= SPUD_NO_ERROR) then
+        call option_error(key, lstat, stat)
+        return
+      end if
+      allocate(ltypes(max(max_children, 1)), lranks(max(max_children, 1)), lshapes(2, max(max_children, 1)))
+      lstat = spud_context_list_children(context_ptr(context), string_array(key), len_trim(key), &
+        & lchild_names, lchild_names_len, lchild_count, max_children, c_loc(ltypes), c_loc(lranks), c_loc(lshapes))
+    else
+      lstat = spud_context_list_children(context_ptr(context), string_array(key), len_trim(key), &
+        & lchild_names, lchild_names_len, lchild_count, max_children, c_null_ptr, c_null_ptr, c_null_ptr)
+    end if
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(key, lstat, stat)
+      return
+    end if
+
+    call copy_strings(lchild_names, lchild_names_len, lchild_count, child_names)
+
+    if(info) then
+      lchild_count = min(lchild_count, max_children)
+      if(present(types)) then
+        types = ltypes(:lchild_count)
+      end if
+      if(present(ranks)) then
+        ranks = lranks(:lchild_count)
+      end if
+      if(present(shapes)) then
+        shapes = lshapes(:, :lchild_count)
+      end if
+    end if
+
+  end subroutine list_children
+
+  function option_count(key, context)
     character(len = *), intent(in) :: key
+    type(spud_context), optional, intent(in) :: context
 
     integer :: option_count
 
-    option_count = spud_option_count(string_array(key), len_trim(key))
+    option_count = spud_context_option_count(context_ptr(context), string_array(key), len_trim(key))
 
   end function option_count
 
-  function have_option(key)
+  subroutine find_options(key, keys, stat, context)
+    !!< Find the keys of all options matching key, whose segments may be
+    !!< "*", "name::*" or a name, each optionally followed by an [index]
+
+    character(len = *), intent(in) :: key
+    character(len = *), dimension(:), allocatable, intent(out) :: keys
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    type(c_ptr) :: lkeys
+    integer :: lkey_count, lkeys_len, lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_find_options(context_ptr(context), string_array(key), len_trim(key), lkeys, lkeys_len, lkey_count)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(key, lstat, stat)
+      return
+    end if
+
+    call copy_strings(lkeys, lkeys_len, lkey_count, keys)
+
+  end subroutine find_options
+
+  function have_option(key, context)
     character(len = *), intent(in) :: key
+    type(spud_context), optional, intent(in) :: context
 
     logical :: have_option
 
-    have_option = (spud_have_option(string_array(key), len_trim(key)) /= 0)
+    have_option = (spud_context_have_option(context_ptr(context), string_array(key), len_trim(key)) /= 0)
 
   end function have_option
 
-  function option_type(key, stat)
+  function option_type(key, stat, context)
     character(len = *), intent(in) :: key
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: option_type
 
@@ -385,7 +908,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_get_option_type(string_array(key), len_trim(key), option_type)
+    lstat = spud_context_get_option_type(context_ptr(context), string_array(key), len_trim(key), option_type)
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -393,9 +916,10 @@ contains
 
   end function option_type
 
-  function option_rank(key, stat)
+  function option_rank(key, stat, context)
     character(len = *), intent(in) :: key
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: option_rank
 
@@ -405,7 +929,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_get_option_rank(string_array(key), len_trim(key), option_rank)
+    lstat = spud_context_get_option_rank(context_ptr(context), string_array(key), len_trim(key), option_rank)
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -413,9 +937,10 @@ contains
 
   end function option_rank
 
-  function option_shape(key, stat)
+  function option_shape(key, stat, context)
     character(len = *), intent(in) :: key
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer, dimension(2) :: option_shape
 
@@ -425,13 +950,13 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_get_option_shape(string_array(key), len_trim(key), option_shape(1:2))  ! Slicing required by GCC 4.2
+    lstat = spud_context_get_option_shape(context_ptr(context), string_array(key), len_trim(key), option_shape(1:2))  ! Slicing required by GCC 4.2
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
     end if
 
-    if(option_rank(key, stat) == 2) then
+    if(option_rank(key, stat, context = context) == 2) then
       shape_store = option_shape(1)
       option_shape(1) = option_shape(2)
       option_shape(2) = shape_store
@@ -439,11 +964,12 @@ contains
 
   end function option_shape
 
-  subroutine get_option_real_scalar(key, val, stat, default)
+  subroutine get_option_real_scalar(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     real(D), intent(out) :: val
     integer, optional, intent(out) :: stat
     real(D), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     real(D), target :: lval
     integer :: lstat
@@ -452,15 +978,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_REAL, 0, (/-1, -1/), lstat)
+      call check_option(key, SPUD_REAL, 0, (/-1, -1/), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(key, len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), key, len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -470,11 +996,12 @@ contains
 
   end subroutine get_option_real_scalar
 
-  subroutine get_option_real_vector(key, val, stat, default)
+  subroutine get_option_real_vector(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     real(D), dimension(:), intent(inout) :: val
     integer, optional, intent(out) :: stat
     real(D), dimension(size(val)), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     real(D), dimension(size(val)), target :: lval
     integer :: lstat
@@ -483,15 +1010,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_REAL, 1, (/size(val), -1/), lstat)
+      call check_option(key, SPUD_REAL, 1, (/size(val), -1/), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -501,11 +1028,12 @@ contains
 
   end subroutine get_option_real_vector
 
-  subroutine get_option_real_tensor(key, val, stat, default)
+  subroutine get_option_real_tensor(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     real(D), dimension(:, :), intent(inout) :: val
     integer, optional, intent(out) :: stat
     real(D), dimension(size(val, 1), size(val, 2)), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     ! Note the transpose
@@ -515,15 +1043,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_REAL, 2, shape(val), lstat)
+      call check_option(key, SPUD_REAL, 2, shape(val), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -533,13 +1061,14 @@ contains
 
   end subroutine get_option_real_tensor
 
-  subroutine get_option_real_scalar_sp(key, val, stat, default)
+  subroutine get_option_real_scalar_sp(key, val, stat, default, context)
     ! Single precision version of routine. Note that values stored in the
     ! dictionary are always double precision.
     character(len = *), intent(in) :: key
     real, intent(out) :: val
     integer, optional, intent(out) :: stat
     real, optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     real(D), target :: lval
     integer :: lstat
@@ -548,15 +1077,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_REAL, 0, (/-1, -1/), lstat)
+      call check_option(key, SPUD_REAL, 0, (/-1, -1/), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -566,13 +1095,14 @@ contains
 
   end subroutine get_option_real_scalar_sp
 
-  subroutine get_option_real_vector_sp(key, val, stat, default)
+  subroutine get_option_real_vector_sp(key, val, stat, default, context)
     ! Single precision version of routine. Note that values stored in the
     ! dictionary are always double precision.
     character(len = *), intent(in) :: key
     real, dimension(:), intent(inout) :: val
     integer, optional, intent(out) :: stat
     real, dimension(size(val)), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     real(D), dimension(size(val)), target :: lval
@@ -581,15 +1111,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_REAL, 1, (/size(val), -1/), lstat)
+      call check_option(key, SPUD_REAL, 1, (/size(val), -1/), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -599,13 +1129,14 @@ contains
 
   end subroutine get_option_real_vector_sp
 
-  subroutine get_option_real_tensor_sp(key, val, stat, default)
+  subroutine get_option_real_tensor_sp(key, val, stat, default, context)
     ! Single precision version of routine. Note that values stored in the
     ! dictionary are always double precision.
     character(len = *), intent(in) :: key
     real, dimension(:, :), intent(inout) :: val
     integer, optional, intent(out) :: stat
     real, dimension(size(val, 1), size(val, 2)), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     real(D), dimension(size(val, 2), size(val, 1)), target :: lval
@@ -614,15 +1145,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_REAL, 2, shape(val), lstat)
+      call check_option(key, SPUD_REAL, 2, shape(val), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -632,11 +1163,12 @@ contains
 
   end subroutine get_option_real_tensor_sp
 
-  subroutine get_option_integer_scalar(key, val, stat, default)
+  subroutine get_option_integer_scalar(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     integer, intent(out) :: val
     integer, optional, intent(out) :: stat
     integer, optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     integer(c_int), target :: lval
@@ -645,15 +1177,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_INTEGER, 0, (/-1, -1/), lstat)
+      call check_option(key, SPUD_INTEGER, 0, (/-1, -1/), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -663,11 +1195,12 @@ contains
 
   end subroutine get_option_integer_scalar
 
-  subroutine get_option_integer_vector(key, val, stat, default)
+  subroutine get_option_integer_vector(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     integer, dimension(:), intent(inout) :: val
     integer, optional, intent(out) :: stat
     integer, dimension(size(val)), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     integer(c_int), dimension(size(val)), target :: lval
     integer :: lstat
@@ -676,15 +1209,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_INTEGER, 1, (/size(val), -1/), lstat)
+      call check_option(key, SPUD_INTEGER, 1, (/size(val), -1/), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -694,11 +1227,12 @@ contains
 
   end subroutine get_option_integer_vector
 
-  subroutine get_option_integer_tensor(key, val, stat, default)
+  subroutine get_option_integer_tensor(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     integer, dimension(:, :), intent(inout) :: val
     integer, optional, intent(out) :: stat
     integer, dimension(size(val, 1), size(val, 2)), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     integer(c_int), dimension(size(val, 2), size(val, 1)), target :: lval
@@ -707,15 +1241,15 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = default
     else
-      call check_option(key, SPUD_INTEGER, 2, shape(val), lstat)
+      call check_option(key, SPUD_INTEGER, 2, shape(val), lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -725,11 +1259,12 @@ contains
 
   end subroutine get_option_integer_tensor
 
-  subroutine get_option_character(key, val, stat, default)
+  subroutine get_option_character(key, val, stat, default, context)
     character(len = *), intent(in) :: key
     character(len = *), intent(out) :: val
     integer, optional, intent(out) :: stat
     character(len = *), optional, intent(in) :: default
+    type(spud_context), optional, intent(in) :: context
 
     character(len=1,kind=c_char), dimension(len(val)), target :: lval
     integer :: lstat
@@ -739,21 +1274,21 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key) .and. present(default)) then
+    if(.not. have_option(key, context = context) .and. present(default)) then
       val = trim(default)
     else
-      call check_option(key, SPUD_CHARACTER, 1, stat = lstat)
+      call check_option(key, SPUD_CHARACTER, 1, stat = lstat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
       end if
-      lshape = option_shape(key, stat)
+      lshape = option_shape(key, stat, context = context)
       if(lshape(1) > len(val)) then
         call option_error(key, SPUD_SHAPE_ERROR, stat)
         return
       end if
       lval = ""
-      lstat = spud_get_option(string_array(key), len_trim(key), c_loc(lval))
+      lstat = spud_context_get_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval))
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -763,9 +1298,10 @@ contains
 
   end subroutine get_option_character
 
-  subroutine add_option(key, stat)
+  subroutine add_option(key, stat, context)
     character(len = *), intent(in) :: key
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
@@ -773,7 +1309,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_add_option(string_array(key), len_trim(key))
+    lstat = spud_context_add_option(context_ptr(context), string_array(key), len_trim(key))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -781,10 +1317,11 @@ contains
 
   end subroutine add_option
 
-  subroutine set_option_real_scalar(key, val, stat)
+  subroutine set_option_real_scalar(key, val, stat, context)
     character(len = *), intent(in) :: key
     real(D), intent(in), target :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
@@ -792,7 +1329,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(val), SPUD_REAL, 0, (/-1, -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(val), SPUD_REAL, 0, (/-1, -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -800,10 +1337,11 @@ contains
 
   end subroutine set_option_real_scalar
 
-  subroutine set_option_real_vector(key, val, stat)
+  subroutine set_option_real_vector(key, val, stat, context)
     character(len = *), intent(in) :: key
     real(D), dimension(:), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     ! Buffer to make c_loc call legal.
@@ -815,7 +1353,7 @@ contains
 
     lval=val
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(lval), SPUD_REAL, 1, (/size(val), -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval), SPUD_REAL, 1, (/size(val), -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -823,10 +1361,11 @@ contains
 
   end subroutine set_option_real_vector
 
-  subroutine set_option_real_tensor(key, val, stat)
+  subroutine set_option_real_tensor(key, val, stat, context)
     character(len = *), intent(in) :: key
     real(D), dimension(:, :), intent(in), target :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     real(D), dimension(size(val, 2), size(val, 1)), target :: val_handle
@@ -837,7 +1376,7 @@ contains
 
     val_handle = transpose(val)
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(val_handle), SPUD_REAL, 2, shape(val_handle))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(val_handle), SPUD_REAL, 2, shape(val_handle))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -845,12 +1384,13 @@ contains
 
   end subroutine set_option_real_tensor
 
-  subroutine set_option_real_scalar_sp(key, val, stat)
+  subroutine set_option_real_scalar_sp(key, val, stat, context)
     ! Single precision version of routine. Note that values stored in the
     ! dictionary are always double precision.
     character(len = *), intent(in) :: key
     real, intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     real(D), target :: lval
@@ -860,7 +1400,7 @@ contains
     end if
 
     lval = val
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(lval), SPUD_REAL, 0, (/-1, -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval), SPUD_REAL, 0, (/-1, -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -868,12 +1408,13 @@ contains
 
   end subroutine set_option_real_scalar_sp
 
-  subroutine set_option_real_vector_sp(key, val, stat)
+  subroutine set_option_real_vector_sp(key, val, stat, context)
     ! Single precision version of routine. Note that values stored in the
     ! dictionary are always double precision.
     character(len = *), intent(in) :: key
     real, dimension(:), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     real(D), dimension(size(val)), target  :: lval
@@ -883,7 +1424,7 @@ contains
     end if
     
     lval=val
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(lval), SPUD_REAL, 1, (/size(val), -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval), SPUD_REAL, 1, (/size(val), -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -891,12 +1432,13 @@ contains
 
   end subroutine set_option_real_vector_sp
 
-  subroutine set_option_real_tensor_sp(key, val, stat)
+  subroutine set_option_real_tensor_sp(key, val, stat, context)
     ! Single precision version of routine. Note that values stored in the
     ! dictionary are always double precision.
     character(len = *), intent(in) :: key
     real, dimension(:, :), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     real(D), dimension(size(val, 2), size(val, 1)), target :: val_handle
@@ -907,7 +1449,7 @@ contains
 
     val_handle = transpose(val)
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(val_handle), SPUD_REAL, 2, shape(val_handle))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(val_handle), SPUD_REAL, 2, shape(val_handle))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -915,10 +1457,11 @@ contains
 
   end subroutine set_option_real_tensor_sp
 
-  subroutine set_option_integer_scalar(key, val, stat)
+  subroutine set_option_integer_scalar(key, val, stat, context)
     character(len = *), intent(in) :: key
     integer(c_int), intent(in), target :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
@@ -926,7 +1469,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(val), SPUD_INTEGER, 0, (/-1, -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(val), SPUD_INTEGER, 0, (/-1, -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -934,10 +1477,11 @@ contains
 
   end subroutine set_option_integer_scalar
 
-  subroutine set_option_integer_vector(key, val, stat)
+  subroutine set_option_integer_vector(key, val, stat, context)
     character(len = *), intent(in) :: key
     integer, dimension(:), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     integer(c_int), dimension(size(val)), target :: lval
@@ -948,7 +1492,7 @@ contains
 
     lval=val
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(lval), SPUD_INTEGER, 1, (/size(val), -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval), SPUD_INTEGER, 1, (/size(val), -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -956,10 +1500,11 @@ contains
 
   end subroutine set_option_integer_vector
 
-  subroutine set_option_integer_tensor(key, val, stat)
+  subroutine set_option_integer_tensor(key, val, stat, context)
     character(len = *), intent(in) :: key
     integer, dimension(:, :), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
     integer, dimension(size(val, 2), size(val, 1)), target :: val_handle
@@ -970,7 +1515,7 @@ contains
 
     val_handle = transpose(val)
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(val_handle), SPUD_INTEGER, 2, shape(val_handle))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(val_handle), SPUD_INTEGER, 2, shape(val_handle))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -978,10 +1523,11 @@ contains
 
   end subroutine set_option_integer_tensor
 
-  subroutine set_option_character(key, val, stat)
+  subroutine set_option_character(key, val, stat, context)
     character(len = *), intent(in) :: key
     character(len = *), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     character(len=1,kind=c_char), dimension(len(val)), target :: lval
     integer :: lstat
@@ -992,7 +1538,7 @@ contains
 
     lval=string_array(val)
 
-    lstat = spud_set_option(string_array(key), len_trim(key), c_loc(lval), SPUD_CHARACTER, 1, (/len_trim(val), -1/))
+    lstat = spud_context_set_option(context_ptr(context), string_array(key), len_trim(key), c_loc(lval), SPUD_CHARACTER, 1, (/len_trim(val), -1/))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -1000,10 +1546,11 @@ contains
 
   end subroutine set_option_character
 
-  subroutine set_option_attribute(key, val, stat)
+  subroutine set_option_attribute(key, val, stat, context)
     character(len = *), intent(in) :: key
     character(len = *), intent(in) :: val
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     character(len=1,kind=c_char), dimension(len(val)), target :: lval
     integer :: lstat
@@ -1014,7 +1561,7 @@ contains
 
     lval=string_array(val)
 
-    lstat = spud_set_option_attribute(string_array(key), len_trim(key), lval, len_trim(val))
+    lstat = spud_context_set_option_attribute(context_ptr(context), string_array(key), len_trim(key), lval, len_trim(val))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -1022,10 +1569,11 @@ contains
 
   end subroutine set_option_attribute
 
-  subroutine move_option(key1, key2, stat)
+  subroutine move_option(key1, key2, stat, context)
     character(len = *), intent(in) :: key1
     character(len = *), intent(in) :: key2
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
@@ -1033,7 +1581,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_move_option(string_array(key1), len_trim(key1), string_array(key2), len_trim(key2))
+    lstat = spud_context_move_option(context_ptr(context), string_array(key1), len_trim(key1), string_array(key2), len_trim(key2))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key1, lstat, stat)
       return
@@ -1041,10 +1589,11 @@ contains
 
   end subroutine move_option
 
-  subroutine copy_option(key1, key2, stat)
+  subroutine copy_option(key1, key2, stat, context)
     character(len = *), intent(in) :: key1
     character(len = *), intent(in) :: key2
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
@@ -1052,7 +1601,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_copy_option(string_array(key1), len_trim(key1), string_array(key2), len_trim(key2))
+    lstat = spud_context_copy_option(context_ptr(context), string_array(key1), len_trim(key1), string_array(key2), len_trim(key2))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key1, lstat, stat)
       return
@@ -1060,9 +1609,10 @@ contains
 
   end subroutine copy_option
 
-  subroutine delete_option(key, stat)
+  subroutine delete_option(key, stat, context)
     character(len = *), intent(in) :: key
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: lstat
 
@@ -1070,7 +1620,7 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    lstat = spud_delete_option(string_array(key), len_trim(key))
+    lstat = spud_context_delete_option(context_ptr(context), string_array(key), len_trim(key))
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -1078,33 +1628,570 @@ contains
 
   end subroutine delete_option
 
-  subroutine print_options()
+  subroutine print_options(context)
+    type(spud_context), optional, intent(in) :: context
 
-    call spud_print_options()
+    call spud_context_print_options(context_ptr(context))
 
   end subroutine print_options
 
-  subroutine option_error(key, error, stat)
-    !!< Handle option errors
+  subroutine memory_stats(stats, stat, context)
+    !!< Report the memory used by the options tree, and by the pool from which
+    !!< its options are allocated.
 
-    character(len = *), intent(in) :: key
-    ! Error code
-    integer, intent(in) :: error
-    ! Optional stat argument - die if error and it's not present
+    type(spud_memory_stats), intent(out) :: stats
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
 
     if(present(stat)) then
-      stat = error
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_memory_stats(context_ptr(context), stats)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error("/", lstat, stat)
       return
     end if
 
-    select case(error)
-      case(SPUD_NO_ERROR)
-        return
-      case(SPUD_KEY_ERROR)
-        write(0, *) "Option key error. Key is: " // trim(key)
-      case(SPUD_TYPE_ERROR)
-        write(0, *) "Option type error. Key is: " // trim(key)
+  end subroutine memory_stats
+
+  subroutine set_access_profile(enabled, context)
+    !!< Start or stop counting and timing the calls to get_option,
+    !!< have_option, option_count, get_child_name, option_type, option_rank
+    !!< and option_shape, by key. Starting discards any earlier profile.
+
+    logical, intent(in) :: enabled
+    type(spud_context), optional, intent(in) :: context
+
+    if(enabled) then
+      call spud_context_set_access_profile(context_ptr(context), 1)
+    else
+      call spud_context_set_access_profile(context_ptr(context), 0)
+    end if
+
+  end subroutine set_access_profile
+
+  subroutine dump_access_profile(filename, stat, context)
+    !!< Write the access profile to the named file, as JSON if the filename
+    !!< ends in .json and as CSV otherwise.
+
+    character(len = *), intent(in) :: filename
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_dump_access_profile(context_ptr(context), string_array(filename), len_trim(filename))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(filename, lstat, stat)
+      return
+    end if
+
+  end subroutine dump_access_profile
+
+  subroutine lookup_option(key, handle, stat, context)
+    !!< Resolve the supplied key once into a handle, which can be passed in
+    !!< place of the key to have_option, option_type, option_rank,
+    !!< option_shape, get_option and set_option. The handle becomes invalid
+    !!< if the option is deleted or moved.
+
+    character(len = *), intent(in) :: key
+    integer, intent(out) :: handle
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_lookup(context_ptr(context), string_array(key), len_trim(key), handle)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(key, lstat, stat)
+      return
+    end if
+
+  end subroutine lookup_option
+
+  subroutine release_option_handle(handle, stat, context)
+    integer, intent(in) :: handle
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_release_handle(context_ptr(context), handle)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine release_option_handle
+
+  function have_option_handle(handle, context)
+    integer, intent(in) :: handle
+    type(spud_context), optional, intent(in) :: context
+
+    logical :: have_option_handle
+
+    have_option_handle = (spud_context_handle_have_option(context_ptr(context), handle) /= 0)
+
+  end function have_option_handle
+
+  function option_type_handle(handle, stat, context)
+    integer, intent(in) :: handle
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: option_type_handle
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_handle_get_option_type(context_ptr(context), handle, option_type_handle)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end function option_type_handle
+
+  function option_rank_handle(handle, stat, context)
+    integer, intent(in) :: handle
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: option_rank_handle
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_handle_get_option_rank(context_ptr(context), handle, option_rank_handle)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end function option_rank_handle
+
+  function option_shape_handle(handle, stat, context)
+    integer, intent(in) :: handle
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer, dimension(2) :: option_shape_handle
+
+    integer :: lstat, shape_store
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_handle_get_option_shape(context_ptr(context), handle, option_shape_handle(1:2))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+    if(option_rank_handle(handle, stat, context = context) == 2) then
+      shape_store = option_shape_handle(1)
+      option_shape_handle(1) = option_shape_handle(2)
+      option_shape_handle(2) = shape_store
+    end if
+
+  end function option_shape_handle
+
+  subroutine get_option_handle_real_scalar(handle, val, stat, context)
+    integer, intent(in) :: handle
+    real(D), intent(out) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    real(D), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_REAL, 0, (/-1, -1/), lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val=lval
+
+  end subroutine get_option_handle_real_scalar
+
+  subroutine get_option_handle_real_vector(handle, val, stat, context)
+    integer, intent(in) :: handle
+    real(D), dimension(:), intent(inout) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    real(D), dimension(size(val)), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_REAL, 1, (/size(val), -1/), lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val=lval
+
+  end subroutine get_option_handle_real_vector
+
+  subroutine get_option_handle_real_tensor(handle, val, stat, context)
+    integer, intent(in) :: handle
+    real(D), dimension(:, :), intent(inout) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    ! Note the transpose
+    real(D), dimension(size(val, 2), size(val, 1)), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_REAL, 2, shape(val), lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val=transpose(lval)
+
+  end subroutine get_option_handle_real_tensor
+
+  subroutine get_option_handle_integer_scalar(handle, val, stat, context)
+    integer, intent(in) :: handle
+    integer, intent(out) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer(c_int), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_INTEGER, 0, (/-1, -1/), lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val=lval
+
+  end subroutine get_option_handle_integer_scalar
+
+  subroutine get_option_handle_integer_vector(handle, val, stat, context)
+    integer, intent(in) :: handle
+    integer, dimension(:), intent(inout) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer(c_int), dimension(size(val)), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_INTEGER, 1, (/size(val), -1/), lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val=lval
+
+  end subroutine get_option_handle_integer_vector
+
+  subroutine get_option_handle_integer_tensor(handle, val, stat, context)
+    integer, intent(in) :: handle
+    integer, dimension(:, :), intent(inout) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    ! Note the transpose
+    integer(c_int), dimension(size(val, 2), size(val, 1)), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_INTEGER, 2, shape(val), lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val=transpose(lval)
+
+  end subroutine get_option_handle_integer_tensor
+
+  subroutine get_option_handle_character(handle, val, stat, context)
+    integer, intent(in) :: handle
+    character(len = *), intent(out) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    character(len=1,kind=c_char), dimension(len(val)), target :: lval
+    integer :: lstat
+    integer, dimension(2) :: lshape
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    call check_option_handle(handle, SPUD_CHARACTER, 1, stat = lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    lshape = option_shape_handle(handle, stat, context = context)
+    if(lshape(1) > len(val)) then
+      call option_error(handle_name(handle), SPUD_SHAPE_ERROR, stat)
+      return
+    end if
+    lval = ""
+    lstat = spud_context_handle_get_option(context_ptr(context), handle, c_loc(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+    val = array_string(lval)
+
+  end subroutine get_option_handle_character
+
+  subroutine set_option_handle_real_scalar(handle, val, stat, context)
+    integer, intent(in) :: handle
+    real(D), intent(in), target :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(val), SPUD_REAL, 0, (/-1, -1/))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_real_scalar
+
+  subroutine set_option_handle_real_vector(handle, val, stat, context)
+    integer, intent(in) :: handle
+    real(D), dimension(:), intent(in) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+    real(D), dimension(size(val)), target :: lval
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lval = val
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(lval), SPUD_REAL, 1, (/size(val), -1/))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_real_vector
+
+  subroutine set_option_handle_real_tensor(handle, val, stat, context)
+    integer, intent(in) :: handle
+    real(D), dimension(:, :), intent(in) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+    real(D), dimension(size(val, 2), size(val, 1)), target :: lval
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lval = transpose(val)
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(lval), SPUD_REAL, 2, shape(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_real_tensor
+
+  subroutine set_option_handle_integer_scalar(handle, val, stat, context)
+    integer, intent(in) :: handle
+    integer(c_int), intent(in), target :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(val), SPUD_INTEGER, 0, (/-1, -1/))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_integer_scalar
+
+  subroutine set_option_handle_integer_vector(handle, val, stat, context)
+    integer, intent(in) :: handle
+    integer, dimension(:), intent(in) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+    integer(c_int), dimension(size(val)), target :: lval
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lval = val
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(lval), SPUD_INTEGER, 1, (/size(val), -1/))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_integer_vector
+
+  subroutine set_option_handle_integer_tensor(handle, val, stat, context)
+    integer, intent(in) :: handle
+    integer, dimension(:, :), intent(in) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: lstat
+    integer(c_int), dimension(size(val, 2), size(val, 1)), target :: lval
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lval = transpose(val)
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(lval), SPUD_INTEGER, 2, shape(lval))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_integer_tensor
+
+  subroutine set_option_handle_character(handle, val, stat, context)
+    integer, intent(in) :: handle
+    character(len = *), intent(in) :: val
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    character(len=1,kind=c_char), dimension(len(val)), target :: lval
+    integer :: lstat
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    lval=string_array(val)
+
+    lstat = spud_context_handle_set_option(context_ptr(context), handle, c_loc(lval), SPUD_CHARACTER, 1, (/len_trim(val), -1/))
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+  end subroutine set_option_handle_character
+
+  subroutine option_error(key, error, stat)
+    !!< Handle option errors
+
+    character(len = *), intent(in) :: key
+    ! Error code
+    integer, intent(in) :: error
+    ! Optional stat argument - die if error and it's not present
+    integer, optional, intent(out) :: stat
+
+    if(present(stat)) then
+      stat = error
+      return
+    end if
+
+    select case(error)
+      case(SPUD_NO_ERROR)
+        return
+      case(SPUD_KEY_ERROR)
+        write(0, *) "Option key error. Key is: " // trim(key)
+      case(SPUD_TYPE_ERROR)
+        write(0, *) "Option type error. Key is: " // trim(key)
       case(SPUD_RANK_ERROR)
         write(0, *) "Option rank error. Key is: " // trim(key)
       case(SPUD_SHAPE_ERROR)
@@ -1123,7 +2210,7 @@ contains
 
   end subroutine option_error
 
-  subroutine check_option(key, type, rank, shape, stat)
+  subroutine check_option(key, type, rank, shape, stat, context)
     !!< Check existence, type, rank, and optionally shape, of the option with
     !!< the supplied key
 
@@ -1132,6 +2219,7 @@ contains
     integer, intent(in) :: rank
     integer, dimension(2), optional, intent(in) :: shape
     integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
 
     integer :: i, lrank, lstat, ltype
     integer, dimension(2) :: lshape
@@ -1140,18 +2228,18 @@ contains
       stat = SPUD_NO_ERROR
     end if
 
-    if(.not. have_option(key)) then
+    if(.not. have_option(key, context = context)) then
       call option_error(key, SPUD_KEY_ERROR, stat)
       return
     end if
 
-    ltype = option_type(key, lstat)
+    ltype = option_type(key, lstat, context = context)
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
     end if
 
-    lrank = option_rank(key, lstat)
+    lrank = option_rank(key, lstat, context = context)
     if(lstat /= SPUD_NO_ERROR) then
       call option_error(key, lstat, stat)
       return
@@ -1164,7 +2252,7 @@ contains
       call option_error(key, SPUD_RANK_ERROR, stat)
       return
     else if(present(shape)) then
-      lshape = option_shape(key, stat)
+      lshape = option_shape(key, stat, context = context)
       if(lstat /= SPUD_NO_ERROR) then
         call option_error(key, lstat, stat)
         return
@@ -1180,4 +2268,127 @@ contains
 
   end subroutine check_option
 
+  subroutine check_option_handle(handle, type, rank, shape, stat, context)
+    !!< Check validity, type, rank, and optionally shape, of the option with
+    !!< the supplied handle
+
+    integer, intent(in) :: handle
+    integer, intent(in) :: type
+    integer, intent(in) :: rank
+    integer, dimension(2), optional, intent(in) :: shape
+    integer, optional, intent(out) :: stat
+    type(spud_context), optional, intent(in) :: context
+
+    integer :: i, lrank, lstat, ltype
+    integer, dimension(2) :: lshape
+
+    if(present(stat)) then
+      stat = SPUD_NO_ERROR
+    end if
+
+    ltype = option_type_handle(handle, lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+    lrank = option_rank_handle(handle, lstat, context = context)
+    if(lstat /= SPUD_NO_ERROR) then
+      call option_error(handle_name(handle), lstat, stat)
+      return
+    end if
+
+    if(type /= ltype) then
+      call option_error(handle_name(handle), SPUD_TYPE_ERROR, stat)
+      return
+    else if(rank /= lrank) then
+      call option_error(handle_name(handle), SPUD_RANK_ERROR, stat)
+      return
+    else if(present(shape)) then
+      lshape = option_shape_handle(handle, lstat, context = context)
+      if(lstat /= SPUD_NO_ERROR) then
+        call option_error(handle_name(handle), lstat, stat)
+        return
+      end if
+
+      do i = 1, rank
+        if(shape(i) /= lshape(i)) then
+          call option_error(handle_name(handle), SPUD_SHAPE_ERROR, stat)
+          return
+        end if
+      end do
+    end if
+
+  end subroutine check_option_handle
+
+  function context_ptr(context)
+    !!< The C pointer to the supplied context, which is null (the default
+    !!< context) if the context is not present
+
+    type(spud_context), optional, intent(in) :: context
+
+    type(c_ptr) :: context_ptr
+
+    if(present(context)) then
+      context_ptr = context%ptr
+    else
+      context_ptr = c_null_ptr
+    end if
+
+  end function context_ptr
+
+  subroutine copy_buffer(lbuffer, lbuffer_len, buffer)
+    !!< Copy a buffer written by libspud into a string, and release it
+
+    type(c_ptr), intent(in) :: lbuffer
+    integer, intent(in) :: lbuffer_len
+    character(len = :), allocatable, intent(out) :: buffer
+
+    character(len = 1, kind = c_char), dimension(:), pointer :: lbuffer_array
+
+    call c_f_pointer(lbuffer, lbuffer_array, (/lbuffer_len/))
+    allocate(character(len = lbuffer_len) :: buffer)
+    buffer = array_string(lbuffer_array)
+    call spud_free_buffer(lbuffer)
+
+  end subroutine copy_buffer
+
+  subroutine copy_strings(lbuffer, lbuffer_len, count, strings)
+    !!< Copy a buffer written by libspud holding count strings, each followed
+    !!< by a NUL, into an array of strings, and release it
+
+    type(c_ptr), intent(in) :: lbuffer
+    integer, intent(in) :: lbuffer_len
+    integer, intent(in) :: count
+    character(len = *), dimension(:), allocatable, intent(out) :: strings
+
+    character(len = 1, kind = c_char), dimension(:), pointer :: lbuffer_array
+    integer :: i, j, start
+
+    allocate(strings(count))
+    call c_f_pointer(lbuffer, lbuffer_array, (/lbuffer_len/))
+    start = 1
+    do i = 1, count
+      j = start
+      do while(lbuffer_array(j) /= c_null_char)
+        j = j + 1
+      end do
+      strings(i) = array_string(lbuffer_array(start:j - 1))
+      start = j + 1
+    end do
+    call spud_free_buffer(lbuffer)
+
+  end subroutine copy_strings
+
+  function handle_name(handle)
+    !!< Describe the supplied handle in error messages
+
+    integer, intent(in) :: handle
+
+    character(len = 32) :: handle_name
+
+    write(handle_name, "(a,i0)") "option handle ", handle
+
+  end function handle_name
+
 end module spud
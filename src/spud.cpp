@@ -27,189 +27,1602 @@
 
 #include "spud"
 
+#include <chrono>
+#include <cmath>
+#include <cstddef>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <locale.h>
+#include <new>
+#ifdef __APPLE__
+#include <xlocale.h>
+#endif
+
 using namespace std;
 
-namespace Spud{
+namespace Spud{
+
+  /**
+    * Flatten the supplied rank two data into row-major order, and find its
+    * shape.
+    */
+  template<class T>
+  static OptionError flatten(const vector< vector<T> >& val, vector<T>& val_handle, vector<int>& shape){
+    val_handle.clear();
+    for(size_t i = 0;i < val.size();i++){
+      if(i > 0 and val[i].size() != val[0].size()){
+        return SPUD_SHAPE_ERROR;
+      }
+      for(size_t j = 0;j < val[i].size();j++){
+        val_handle.push_back(val[i][j]);
+      }
+    }
+    shape.resize(2);
+    shape[0] = val.size();
+    if(val.size() == 0){
+      shape[1] = 0;
+    }else{
+      shape[1] = val[0].size();
+    }
+
+    return SPUD_NO_ERROR;
+  }
+
+  /**
+    * Switch the calling thread to the "C" locale while the object is in
+    * scope, so that strtod and snprintf use the classic number format, as
+    * std::istream and std::ostream did, whatever setlocale has been called
+    * with.
+    */
+  class ClassicLocale{
+    public:
+      ClassicLocale() : previous(uselocale(c_locale())){}
+      ~ClassicLocale(){
+        uselocale(previous);
+      }
+
+    private:
+      static locale_t c_locale(){
+        static const locale_t locale = newlocale(LC_ALL_MASK, "C", (locale_t)0);
+        return locale;
+      }
+
+      locale_t previous;
+  };
+
+  static inline logical_t is_space(const char& c){
+    return c == ' ' or c == '\t' or c == '\n' or c == '\v' or c == '\f' or c == '\r';
+  }
+
+  static inline logical_t is_digit(const char& c){
+    return c >= '0' and c <= '9';
+  }
+
+  /**
+    * Parse an int from the characters in [str, end), as std::istream >> int
+    * would: leading whitespace is skipped, parsing stops at the first
+    * character that cannot continue the number, and on failure val is zero
+    * or, on overflow, clamped. Returns a pointer past the parsed characters,
+    * or NULL on failure.
+    */
+  static const char* parse_int(const char* str, const char* end, int& val){
+    while(str != end and is_space(*str)){
+      str++;
+    }
+
+    logical_t negative = false;
+    if(str != end and (*str == '-' or *str == '+')){
+      negative = (*str == '-');
+      str++;
+    }
+
+    const char* digits = str;
+    long long magnitude = 0;
+    logical_t overflow = false;
+    for(;str != end and is_digit(*str);str++){
+      if(!overflow){
+        magnitude = 10 * magnitude + (*str - '0');
+        overflow = magnitude > (long long)numeric_limits<int>::max() + 1;
+      }
+    }
+
+    if(str == digits){
+      val = 0;
+      return NULL;
+    }else if(overflow or (!negative and magnitude > numeric_limits<int>::max())){
+      val = negative ? numeric_limits<int>::min() : numeric_limits<int>::max();
+      return NULL;
+    }
+
+    val = (int)(negative ? -magnitude : magnitude);
+    return str;
+  }
+
+  /**
+    * Parse a double from the characters in [str, end), as std::istream >>
+    * double would. Only decimal notation is accepted; on failure val is zero
+    * or, on overflow, the largest finite value. Returns a pointer past the
+    * parsed characters, or NULL on failure.
+    */
+  static const char* parse_double(const char* str, const char* end, double& val){
+    while(str != end and is_space(*str)){
+      str++;
+    }
+
+    // Find the extent of [+-]digits[.digits][(e|E)[+-]digits]
+    const char* start = str;
+    if(str != end and (*str == '-' or *str == '+')){
+      str++;
+    }
+    const char* mantissa = str;
+    logical_t found_digit = false;
+    for(;str != end and is_digit(*str);str++){
+      found_digit = true;
+    }
+    if(str != end and *str == '.'){
+      for(str++;str != end and is_digit(*str);str++){
+        found_digit = true;
+      }
+    }
+    if(!found_digit){
+      val = 0.0;
+      return NULL;
+    }
+    if(str != end and (*str == 'e' or *str == 'E')){
+      str++;
+      if(str != end and (*str == '-' or *str == '+')){
+        str++;
+      }
+      const char* exponent = str;
+      for(;str != end and is_digit(*str);str++){
+      }
+      if(str == exponent){
+        // An exponent marker without digits
+        val = 0.0;
+        return NULL;
+      }
+    }
+
+    if(str != end and (*str == 'x' or *str == 'X') and str - mantissa == 1 and *mantissa == '0'){
+      // Stop strtod from reading a hexadecimal number
+      val = (*start == '-') ? -0.0 : 0.0;
+      return str;
+    }
+
+    // strtod stops at the end of the extent found above
+    val = strtod(start, NULL);
+    if(val == HUGE_VAL){
+      val = numeric_limits<double>::max();
+      return NULL;
+    }else if(val == -HUGE_VAL){
+      val = -numeric_limits<double>::max();
+      return NULL;
+    }
+
+    return str;
+  }
+
+  /**
+    * Count the space separated tokens in the supplied string.
+    */
+  static size_t count_tokens(const string& str){
+    // Counts the starts of tokens, without branching so that the loop
+    // vectorises
+    if(str.empty()){
+      return 0;
+    }
+
+    const char* ptr = str.data();
+    size_t count = ptr[0] != ' ';
+    for(size_t i = 1;i < str.size();i++){
+      count += (ptr[i] != ' ') & (ptr[i - 1] == ' ');
+    }
+
+    return count;
+  }
+
+  /**
+    * Parse the space separated ints in the supplied string into val, which
+    * holds count_tokens(str) values, in one pass. Each token is converted as
+    * std::istream >> int would convert it.
+    */
+  static void parse_ints(const string& str, int* val){
+    const char* ptr = str.data();
+    const char* end = ptr + str.size();
+    while(ptr != end){
+      if(*ptr == ' '){
+        ptr++;
+        continue;
+      }
+      const char* token_end = ptr;
+      while(token_end != end and *token_end != ' '){
+        token_end++;
+      }
+
+      parse_int(ptr, token_end, *val++);
+
+      ptr = token_end;
+    }
+
+    return;
+  }
+
+  /**
+    * Parse the space separated doubles in the supplied string into val, which
+    * holds count_tokens(str) values, in one pass. Tokens "nan", "inf" and
+    * "-inf" (in any case) are converted to the corresponding special values,
+    * and all other tokens as std::istream >> double would convert them.
+    */
+  static void parse_doubles(const string& str, double* val){
+    ClassicLocale classic;
+    const char* ptr = str.data();
+    const char* end = ptr + str.size();
+    while(ptr != end){
+      if(*ptr == ' '){
+        ptr++;
+        continue;
+      }
+      const char* token_end = ptr;
+      while(token_end != end and *token_end != ' '){
+        token_end++;
+      }
+
+      double value;
+      size_t len = token_end - ptr;
+      if(len == 3 and tolower(ptr[0]) == 'n' and tolower(ptr[1]) == 'a' and tolower(ptr[2]) == 'n'){
+        value = numeric_limits<double>::quiet_NaN();
+      }else if(len == 3 and tolower(ptr[0]) == 'i' and tolower(ptr[1]) == 'n' and tolower(ptr[2]) == 'f'){
+        value = numeric_limits<double>::infinity();
+      }else if(len == 4 and ptr[0] == '-' and tolower(ptr[1]) == 'i' and tolower(ptr[2]) == 'n' and tolower(ptr[3]) == 'f'){
+        value = -numeric_limits<double>::infinity();
+      }else{
+        parse_double(ptr, token_end, value);
+      }
+      *val++ = value;
+
+      ptr = token_end;
+    }
+
+    return;
+  }
+
+  /**
+    * Parse the rank and shape attributes of a real_value or integer_value
+    * element, as std::istream would.
+    */
+  static void parse_rank_and_shape(const TiXmlElement* element, const size_t& size, int& rank, vector<int>& shape){
+    const char* rank_attr = element->Attribute("rank");
+    rank = 0;
+    if(rank_attr != NULL){
+      parse_int(rank_attr, rank_attr + strlen(rank_attr), rank);
+    }
+
+    shape.resize(2);
+    if(rank == 0){
+      shape[0] = -1;  shape[1] = -1;
+    }else if(rank == 1){
+      shape[0] = size;  shape[1] = -1;
+    }else if(rank == 2){
+      shape[0] = 0;  shape[1] = 0;
+      const char* shape_attr = element->Attribute("shape");
+      if(shape_attr != NULL){
+        const char* end = shape_attr + strlen(shape_attr);
+        const char* next = parse_int(shape_attr, end, shape[0]);
+        if(next != NULL){
+          parse_int(next, end, shape[1]);
+        }
+      }
+    }
+
+    return;
+  }
+
+  /**
+    * Append the supplied value to str, formatted as std::ostream << would
+    * format it with the given precision.
+    */
+  static inline void append_value(string& str, const double& val, const int& precision){
+    char buffer[32];
+    int len = snprintf(buffer, sizeof(buffer), "%.*g", precision, val);
+    str.append(buffer, len);
+  }
+
+  static inline void append_value(string& str, const int& val, const int& precision){
+    char buffer[16];
+    char* ptr = buffer + sizeof(buffer);
+    unsigned int magnitude = val < 0 ? -(unsigned int)val : val;
+    do{
+      *--ptr = '0' + magnitude % 10;
+      magnitude /= 10;
+    }while(magnitude > 0);
+    if(val < 0){
+      *--ptr = '-';
+    }
+    str.append(ptr, buffer + sizeof(buffer) - ptr);
+  }
+
+  template<class T>
+  static string format_values(const T* val, const size_t& size, const int& precision){
+    ClassicLocale classic;
+    string str;
+    str.reserve(size * (precision + 8));
+    for(size_t i = 0;i < size;i++){
+      if(i > 0){
+        str += ' ';
+      }
+      append_value(str, val[i], precision);
+    }
+
+    return str;
+  }
+
+  /**
+    * Write the supplied string to file, escaped as TinyXML escapes text and
+    * attribute values. Runs of characters that need no escaping are written
+    * in one go.
+    */
+  static void write_escaped(FILE* file, const string& str){
+    size_t run = 0;
+    for(size_t i = 0;i < str.size();){
+      unsigned char c = str[i];
+      if(c == '&' and i + 2 < str.size() and str[i + 1] == '#' and str[i + 2] == 'x'){
+        // Hexadecimal character references are passed through unchanged, up
+        // to their semicolon
+        i++;
+        while(i < str.size() - 1 and str[i] != ';'){
+          i++;
+        }
+        continue;
+      }
+
+      const char* entity = NULL;
+      switch(c){
+        case('&'):
+          entity = "&amp;";
+          break;
+        case('<'):
+          entity = "&lt;";
+          break;
+        case('>'):
+          entity = "&gt;";
+          break;
+        case('\"'):
+          entity = "&quot;";
+          break;
+        case('\''):
+          entity = "&apos;";
+          break;
+        default:
+          break;
+      }
+      if(entity == NULL and c >= 32){
+        i++;
+        continue;
+      }
+
+      fwrite(str.data() + run, 1, i - run, file);
+      if(entity != NULL){
+        fputs(entity, file);
+      }else{
+        fprintf(file, "&#x%02X;", (unsigned)c);
+      }
+      run = ++i;
+    }
+    fwrite(str.data() + run, 1, str.size() - run, file);
+
+    return;
+  }
+
+  /**
+    * Write the space separated values to file, formatted as format_values
+    * formats them, a block at a time rather than as one string.
+    */
+  template<class T>
+  static void write_values(FILE* file, const T* val, const size_t& size, const int& precision){
+    const size_t block_size = 1 << 16;
+
+    ClassicLocale classic;
+    string block;
+    block.reserve(block_size + 32);
+    for(size_t i = 0;i < size;i++){
+      if(i > 0){
+        block += ' ';
+      }
+      append_value(block, val[i], precision);
+      if(block.size() >= block_size){
+        fwrite(block.data(), 1, block.size(), file);
+        block.clear();
+      }
+    }
+    fwrite(block.data(), 1, block.size(), file);
+
+    return;
+  }
+
+  // Binary snapshot format. Fields are in the byte order of the machine that
+  // wrote the snapshot, identified by the endian tag, and each section starts
+  // on an eight byte boundary:
+  //   SnapshotHeader
+  //   uint64_t     string_offsets[strings + 1]
+  //   char         string_data[string_bytes]
+  //   SnapshotNode nodes[nodes], depth first with children in order
+  //   int32_t      ints[ints]
+  //   double       doubles[doubles]
+
+  static const char SNAPSHOT_MAGIC[8] = {'S', 'P', 'U', 'D', 'S', 'N', 'A', 'P'};
+  static const uint32_t SNAPSHOT_ENDIAN_TAG = 0x01020304;
+  static const uint32_t SNAPSHOT_SWAPPED_ENDIAN_TAG = 0x04030201;
+  static const uint32_t SNAPSHOT_VERSION = 1;
+
+  struct SnapshotHeader{
+    char magic[8];
+    uint32_t endian_tag;
+    uint32_t version;
+    uint64_t strings, string_bytes, nodes, ints, doubles;
+  };
+
+  struct SnapshotNode{
+    // Indices into the string table
+    uint32_t key, name;
+    uint32_t children;
+    uint32_t is_attribute;
+    int32_t rank, shape[2];
+    // Index into the string table
+    uint32_t data_string;
+    // Offsets and lengths in the ints and doubles sections
+    uint64_t data_int, ints, data_double, doubles;
+  };
+
+  static_assert(sizeof(SnapshotHeader) == 56 and sizeof(SnapshotNode) == 64, "Unexpected snapshot record padding");
+  static_assert(sizeof(int) == sizeof(int32_t) and sizeof(double) == 8, "Snapshots require 32 bit int and 64 bit double");
+
+  static inline size_t snapshot_align(const size_t& pos){
+    return (pos + 7) & ~(size_t)7;
+  }
+
+  template<class T>
+  static inline void swap_bytes(T& val){
+    char* bytes = reinterpret_cast<char*>(&val);
+    reverse(bytes, bytes + sizeof(T));
+  }
+
+  /**
+    * Return the index of str in the snapshot string table, adding it if
+    * necessary.
+    */
+  static uint32_t snapshot_string(const string& str, vector<const string*>& strings, unordered_map<string, uint32_t>& index){
+    unordered_map<string, uint32_t>::const_iterator it = index.find(str);
+    if(it != index.end()){
+      return it->second;
+    }
+
+    // Refer to the copy held by the index, which str may not outlive
+    uint32_t i = strings.size();
+    strings.push_back(&index.insert(pair<string, uint32_t>(str, i)).first->first);
+
+    return i;
+  }
+
+  /**
+    * Read the whole of the named file into buffer.
+    */
+  static logical_t read_file(const string& filename, string& buffer){
+    FILE* file = fopen(filename.c_str(), "rb");
+    if(file == NULL){
+      return false;
+    }
+
+    logical_t success = false;
+    if(fseek(file, 0, SEEK_END) == 0){
+      long size = ftell(file);
+      if(size >= 0 and fseek(file, 0, SEEK_SET) == 0){
+        buffer.resize(size);
+        success = size == 0 or fread(&buffer[0], 1, size, file) == (size_t)size;
+      }
+    }
+    fclose(file);
+
+    return success;
+  }
+
+  /**
+    * Return the supplied XML with each CR LF pair, and each CR on its own,
+    * replaced by a LF, as TiXmlDocument::LoadFile does for files.
+    */
+  static string normalise_line_breaks(const string& xml){
+    if(xml.find('\r') == string::npos){
+      return xml;
+    }
+
+    string normalised;
+    normalised.reserve(xml.size());
+    for(size_t i = 0;i < xml.size();i++){
+      if(xml[i] != '\r'){
+        normalised += xml[i];
+      }else{
+        normalised += '\n';
+        if(i + 1 < xml.size() and xml[i + 1] == '\n'){
+          i++;
+        }
+      }
+    }
+
+    return normalised;
+  }
+
+  /**
+    * The heap memory used by the supplied string, which is none if it is
+    * short enough to be stored within the string itself.
+    */
+  static inline size_t heap_bytes(const string& str){
+    const char* data = str.data();
+    if(data >= (const char*)&str and data < (const char*)(&str + 1)){
+      return 0;
+    }
+
+    return str.capacity() + 1;
+  }
+
+  // Elements with more children than this index them by key, rather than
+  // searching them in turn
+  static const size_t CHILD_INDEX_THRESHOLD = 8;
+
+  /**
+    * Test whether the supplied child key has the form "prefix::*".
+    */
+  static inline bool has_key_prefix(const string& key, const string& prefix){
+    return key.compare(0, prefix.size(), prefix) == 0 and key.compare(prefix.size(), 2, "::") == 0;
+  }
+
+  /**
+    * The size of a single value of the supplied option type.
+    */
+  static inline size_t value_bytes(const OptionType& type){
+    switch(type){
+      case(SPUD_DOUBLE):
+        return sizeof(double);
+      case(SPUD_INT):
+        return sizeof(int);
+      case(SPUD_STRING):
+        return sizeof(char);
+      default:
+        return 0;
+    }
+  }
+
+  /**
+    * The approximate heap memory used by the supplied child index.
+    */
+  template<class T>
+  static size_t index_bytes(const unordered_map< string, vector<T> >& index){
+    size_t bytes = index.bucket_count() * sizeof(void*);
+    for(typename unordered_map< string, vector<T> >::const_iterator it = index.begin();it != index.end();it++){
+      bytes += sizeof(*it) + 2 * sizeof(void*) + heap_bytes(it->first) + it->second.capacity() * sizeof(T);
+    }
+
+    return bytes;
+  }
+
+  /**
+    * Write the supplied string to file as a double quoted JSON string, or as
+    * a double quoted CSV field.
+    */
+  static void write_quoted(FILE* file, const string& str, const logical_t& json){
+    fputc('\"', file);
+    for(size_t i = 0;i < str.size();i++){
+      unsigned char c = str[i];
+      if(!json){
+        if(c == '\"'){
+          fputc('\"', file);
+        }
+        fputc(c, file);
+      }else if(c == '\"' or c == '\\'){
+        fputc('\\', file);
+        fputc(c, file);
+      }else if(c < 32){
+        fprintf(file, "\\u%04x", (unsigned)c);
+      }else{
+        fputc(c, file);
+      }
+    }
+    fputc('\"', file);
+
+    return;
+  }
+
+  // OptionManager CLASS METHODS
+
+  // PRIVATE VARIABLES
+
+  bool OptionManager::deallocated = false;
+
+  // PUBLIC METHODS
+
+  void OptionManager::clear_options() {
+    manager.context->clear_options();
+    
+    return;
+  }
+
+  void* OptionManager::get_manager() {
+    return (void*) manager.context->options;
+  }
+
+  void OptionManager::set_manager(void* m) {
+    delete manager.context->options;
+    manager.context->options = (Spud::OptionManager::Option*) m;
+    manager.context->invalidate_handles();
+    manager.context->generation++;
+    // The tree may hold copies made by copy_option
+    manager.context->shared = true;
+    return;
+  }
+
+  OptionContext& OptionManager::default_context(){
+    return *manager.context;
+  }
+
+  OptionError OptionManager::load_options(const string& filename){
+    return manager.context->load_options(filename);
+  }
+
+  OptionError OptionManager::write_options(const string& filename){
+    return manager.context->write_options(filename);
+  }
+
+  OptionError OptionManager::load_snapshot(const string& filename){
+    return manager.context->load_snapshot(filename);
+  }
+
+  OptionError OptionManager::write_snapshot(const string& filename){
+    return manager.context->write_snapshot(filename);
+  }
+
+  OptionError OptionManager::load_options_from_buffer(const string& buffer){
+    return manager.context->load_options_from_buffer(buffer);
+  }
+
+  OptionError OptionManager::write_options_to_buffer(string& buffer){
+    return manager.context->write_options_to_buffer(buffer);
+  }
+
+  OptionError OptionManager::load_snapshot_from_buffer(const string& buffer){
+    return manager.context->load_snapshot_from_buffer(buffer);
+  }
+
+  OptionError OptionManager::write_snapshot_to_buffer(string& buffer){
+    return manager.context->write_snapshot_to_buffer(buffer);
+  }
+
+  OptionError OptionManager::get_child_name(const string& key, const unsigned& index, string& child_name){
+    return manager.context->get_child_name(key, index, child_name);
+  }
+
+  OptionError OptionManager::get_number_of_children(const string& key, int& child_count){
+    return manager.context->get_number_of_children(key, child_count);
+  }
+
+  OptionError OptionManager::list_children(const string& key, vector<string>& names){
+    return manager.context->list_children(key, names);
+  }
+
+  OptionError OptionManager::list_children(const string& key, vector<string>& names, vector<OptionType>& types, vector<int>& ranks, vector< vector<int> >& shapes){
+    return manager.context->list_children(key, names, types, ranks, shapes);
+  }
+
+  int OptionManager::option_count(const string& key){
+    return manager.context->option_count(key);
+  }
+
+  OptionError OptionManager::find_options(const string& key, vector<string>& keys){
+    return manager.context->find_options(key, keys);
+  }
+
+  logical_t OptionManager::have_option(const string& key){
+    return manager.context->have_option(key);
+  }
+
+  OptionError OptionManager::get_option_type(const string& key, OptionType& type){
+    return manager.context->get_option_type(key, type);
+  }
+
+  OptionError OptionManager::get_option_rank(const string& key, int& rank){
+    return manager.context->get_option_rank(key, rank);
+  }
+
+  OptionError OptionManager::get_option_shape(const string& key, vector<int>& shape){
+    return manager.context->get_option_shape(key, shape);
+  }
+
+  OptionError OptionManager::get_option_data(const string& key, OptionType& type, int& rank, vector<int>& shape, string& data){
+    return manager.context->get_option_data(key, type, rank, shape, data);
+  }
+
+  OptionError OptionManager::get_option(const string& key, double& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, double& val, const double& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector<double>& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector<double>& val, const vector<double>& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector< vector<double> >& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector< vector<double> >& val, const vector< vector<double> >& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, int& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, int& val, const int& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector<int>& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector<int>& val, const vector<int>& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector< vector<int> >& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, vector< vector<int> >& val, const vector< vector<int> >& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, string& val){
+    return manager.context->get_option(key, val);
+  }
+
+  OptionError OptionManager::get_option(const string& key, string& val, const string& default_val){
+    return manager.context->get_option(key, val, default_val);
+  }
+
+  OptionError OptionManager::add_option(const string& key){
+    return manager.context->add_option(key);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const double& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const vector<double>& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const vector< vector<double> >& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const int& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const vector<int>& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const vector< vector<int> >& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option(const string& key, const string& val){
+    return manager.context->set_option(key, val);
+  }
+
+  OptionError OptionManager::set_option_attr(const string& key, const string& val){
+    return manager.context->set_option_attr(key, val);
+  }
+
+  OptionError OptionManager::set_option_attribute(const string& key, const string& val){
+    return manager.context->set_option_attribute(key, val);
+  }
+
+  OptionError OptionManager::move_option(const string& key1, const string& key2){
+    return manager.context->move_option(key1, key2);
+  }
+
+  OptionError OptionManager::copy_option(const string& key1, const string& key2){
+    return manager.context->copy_option(key1, key2);
+  }
+
+  OptionError OptionManager::delete_option(const string& key){
+    return manager.context->delete_option(key);
+  }
+
+  void OptionManager::print_options(){
+    manager.context->print_options();
+
+    return;
+  }
+
+  OptionError OptionManager::memory_stats(MemoryStats& stats){
+    return manager.context->memory_stats(stats);
+  }
+
+  void OptionManager::set_access_profile(const logical_t& enabled){
+    manager.context->set_access_profile(enabled);
+
+    return;
+  }
+
+  OptionError OptionManager::dump_access_profile(const string& filename){
+    return manager.context->dump_access_profile(filename);
+  }
+
+  OptionError OptionManager::lookup(const string& key, OptionHandle& handle){
+    return manager.context->lookup(key, handle);
+  }
+
+  OptionError OptionManager::release(const OptionHandle& handle){
+    return manager.context->release(handle);
+  }
+
+  logical_t OptionManager::have_option(const OptionHandle& handle){
+    return manager.context->have_option(handle);
+  }
+
+  OptionError OptionManager::get_option_type(const OptionHandle& handle, OptionType& type){
+    return manager.context->get_option_type(handle, type);
+  }
+
+  OptionError OptionManager::get_option_rank(const OptionHandle& handle, int& rank){
+    return manager.context->get_option_rank(handle, rank);
+  }
+
+  OptionError OptionManager::get_option_shape(const OptionHandle& handle, vector<int>& shape){
+    return manager.context->get_option_shape(handle, shape);
+  }
+
+  OptionError OptionManager::get_option_data(const OptionHandle& handle, OptionType& type, int& rank, vector<int>& shape, string& data){
+    return manager.context->get_option_data(handle, type, rank, shape, data);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, double& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, vector<double>& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, vector< vector<double> >& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, int& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, vector<int>& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, vector< vector<int> >& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::get_option(const OptionHandle& handle, string& val){
+    return manager.context->get_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const double& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const vector<double>& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const vector< vector<double> >& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const int& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const vector<int>& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const vector< vector<int> >& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  OptionError OptionManager::set_option(const OptionHandle& handle, const string& val){
+    return manager.context->set_option(handle, val);
+  }
+
+  // PRIVATE METHODS
+
+  OptionManager::OptionManager(){
+    context = new OptionContext();
+    deallocated = false;
+
+    const char* profile = getenv("SPUD_ACCESS_PROFILE");
+    if(profile != NULL and profile[0] != '\0'){
+      context->set_access_profile(true);
+    }
+
+    return;
+  }
+
+  OptionManager::OptionManager(const OptionManager& manager){
+    cerr << "SPUD ERROR: OptionManager copy constructor cannot be called" << endl;
+    exit(-1);
+  }
+
+  OptionManager::~OptionManager(){
+    if (!deallocated)
+    {
+      const char* profile = getenv("SPUD_ACCESS_PROFILE");
+      if(profile != NULL and profile[0] != '\0' and context->dump_access_profile(profile) != SPUD_NO_ERROR){
+        cerr << "SPUD WARNING: Failed to write access profile " << profile << endl;
+      }
+      delete context;
+      deallocated = true;
+    }
+
+    return;
+  }
+
+  OptionManager& OptionManager::operator=(const OptionManager& manager){
+    cerr << "SPUD ERROR: OptionManager assignment operator cannot be called" << endl;
+    exit(-1);
+  }
+
+  OptionError OptionManager::check_option(const Option* option, const OptionType& type, const int& rank){
+    if(option == NULL){
+      return SPUD_KEY_ERROR;
+    }else if(option->get_option_type() != type){
+      return SPUD_TYPE_ERROR;
+    }else if((int)option->get_option_rank() != rank){
+      return SPUD_RANK_ERROR;
+    }
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionManager::get_option(const Option* option, double& val){
+    OptionError check_err = check_option(option, SPUD_DOUBLE, 0);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
+
+    vector<double> val_handle;
+    OptionError get_err = option->get_option(val_handle);
+    if(get_err != SPUD_NO_ERROR){
+      return get_err;
+    }else if(val_handle.size() != 1){
+      return SPUD_RANK_ERROR;
+    }
+
+    val = val_handle[0];
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionManager::get_option(const Option* option, vector<double>& val){
+    OptionError check_err = check_option(option, SPUD_DOUBLE, 1);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
+
+    return option->get_option(val);
+  }
+
+  OptionError OptionManager::get_option(const Option* option, vector< vector<double> >& val){
+    OptionError check_err = check_option(option, SPUD_DOUBLE, 2);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
+
+    vector<int> shape = option->get_option_shape();
+
+    vector<double> val_handle;
+    OptionError get_err = option->get_option(val_handle);
+    if(get_err != SPUD_NO_ERROR){
+      return get_err;
+    }
+
+    val.clear();
+    for(int i = 0;i < shape[0];i++){
+      val.push_back(vector<double>(shape[1]));
+      for(int j = 0;j < shape[1];j++){
+        val[i][j] = val_handle[(i * shape[1]) + j];
+      }
+    }
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionManager::get_option(const Option* option, int& val){
+    OptionError check_err = check_option(option, SPUD_INT, 0);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
+
+    vector<int> val_handle;
+    OptionError get_err = option->get_option(val_handle);
+    if(get_err != SPUD_NO_ERROR){
+      return get_err;
+    }else if(val_handle.size() != 1){
+      return SPUD_RANK_ERROR;
+    }
+
+    val = val_handle[0];
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionManager::get_option(const Option* option, vector<int>& val){
+    OptionError check_err = check_option(option, SPUD_INT, 1);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
+
+    return option->get_option(val);
+  }
+
+  OptionError OptionManager::get_option(const Option* option, vector< vector<int> >& val){
+    OptionError check_err = check_option(option, SPUD_INT, 2);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
+
+    vector<int> shape = option->get_option_shape();
+
+    vector<int> val_handle;
+    OptionError get_err = option->get_option(val_handle);
+    if(get_err != SPUD_NO_ERROR){
+      return get_err;
+    }
+
+    val.clear();
+    for(int i = 0;i < shape[0];i++){
+      val.push_back(vector<int>(shape[1]));
+      for(int j = 0;j < shape[1];j++){
+        val[i][j] = val_handle[(i * shape[1]) + j];
+      }
+    }
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionManager::get_option(const Option* option, string& val){
+    OptionError check_err = check_option(option, SPUD_STRING, 1);
+    if(check_err != SPUD_NO_ERROR){
+      return check_err;
+    }
 
-  // OptionManager CLASS METHODS
+    return option->get_option(val);
+  }
 
-  // PRIVATE VARIABLES
+  OptionError OptionManager::set_option(Option* option, const vector<double>& val, const int& rank, const vector<int>& shape){
+    if(option == NULL){
+      return SPUD_KEY_ERROR;
+    }
 
-  bool OptionManager::deallocated = false;
+    return option->set_option("__value", val, rank, shape);
+  }
+
+  OptionError OptionManager::set_option(Option* option, const vector<int>& val, const int& rank, const vector<int>& shape){
+    if(option == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    return option->set_option("__value", val, rank, shape);
+  }
+
+  // End OptionManager CLASS METHODS
+
+  // OptionManager::OptionPool CLASS
+
+  /**
+    * Allocates the elements of one options tree. Elements are carved out of
+    * blocks holding many elements each, and elements that are deleted are
+    * kept on a free list for reuse, so that building and clearing a tree makes
+    * few calls to the system allocator and the elements of a tree lie close
+    * together in memory. A pool is only used under the exclusive lock of its
+    * context.
+    */
+  class OptionManager::OptionPool{
+
+    public:
+
+      OptionPool() : free_slots(NULL), next(0), block_slots(0), slots(0), used(0){
+      }
+
+      ~OptionPool(){
+        for(size_t i = 0;i < blocks.size();i++){
+          ::operator delete(blocks[i]);
+        }
+      }
+
+      void* allocate(){
+        used++;
+        if(free_slots != NULL){
+          void* slot = free_slots;
+          free_slots = *(void**)slot;
+          return slot;
+        }
+
+        if(next == block_slots){
+          // Each block is twice the size of the last, up to a limit
+          block_slots = min(max(2 * block_slots, min_block_slots), max_block_slots);
+          blocks.push_back((char*)::operator new(block_slots * slot_size));
+          slots += block_slots;
+          next = 0;
+        }
+
+        return blocks.back() + slot_size * next++;
+      }
+
+      void deallocate(void* slot){
+        used--;
+        *(void**)slot = free_slots;
+        free_slots = slot;
+      }
+
+      /**
+        * The bytes reserved by the pool, and the bytes of them holding
+        * elements.
+        */
+      size_t reserved_bytes() const{
+        return slots * slot_size;
+      }
+
+      size_t used_bytes() const{
+        return used * slot_size;
+      }
+
+      static const size_t slot_size = (sizeof(Option) + alignof(std::max_align_t) - 1) / alignof(std::max_align_t) * alignof(std::max_align_t);
+
+    private:
+
+      OptionPool(const OptionPool& pool);
+
+      OptionPool& operator=(const OptionPool& pool);
+
+      static const size_t min_block_slots = 64;
+      static const size_t max_block_slots = 4096;
+
+      std::vector<char*> blocks;
+      // Slots released for reuse, each holding a pointer to the next
+      void* free_slots;
+      // The next unused slot in the last block, and the slots in that block
+      size_t next, block_slots;
+      // The slots in all blocks, and those holding elements
+      size_t slots, used;
+
+  };
+
+  const size_t OptionManager::OptionPool::slot_size;
+  const size_t OptionManager::OptionPool::min_block_slots;
+  const size_t OptionManager::OptionPool::max_block_slots;
+
+  // End OptionManager::OptionPool CLASS
+
+  // OptionContext CLASS METHODS
+
+  class OptionContext::Lock{
+
+    public:
+
+      Lock(OptionContext& context, const logical_t& exclusive) : context(context), outer(held){
+        if(held == &context){
+          return;
+        }
+
+        if(exclusive){
+          pthread_rwlock_wrlock(&context.lock);
+        }else{
+          pthread_rwlock_rdlock(&context.lock);
+        }
+        held = &context;
+      }
+
+      ~Lock(){
+        if(outer == &context){
+          return;
+        }
+
+        held = outer;
+        pthread_rwlock_unlock(&context.lock);
+      }
+
+      /**
+        * Test whether the lock was already held by this thread, i.e. this
+        * Lock is held by a method called from another method of the context.
+        */
+      logical_t nested() const{
+        return outer == &context;
+      }
+
+    private:
+
+      OptionContext& context;
+      OptionContext* outer;
+
+      // The context whose lock is held by this thread
+      static thread_local OptionContext* held;
+
+  };
+
+  thread_local OptionContext* OptionContext::Lock::held = NULL;
+
+  class OptionContext::KeyCache{
+
+    public:
+
+      /**
+        * Get the cache of the calling thread for the supplied context, emptied
+        * if options may have been added to or removed from its tree since the
+        * cache was last used. A thread's own changes to the tree are seen
+        * as soon as they are made, rather than when the update making them
+        * ends.
+        */
+      static unordered_map<string, Option*>& of(const OptionContext& context){
+        unordered_map<unsigned long, KeyCache>::iterator it = caches.find(context.serial);
+        if(it == caches.end()){
+          // Drop the caches of contexts that may since have been destroyed
+          if(caches.size() >= max_contexts){
+            caches.clear();
+          }
+          it = caches.emplace(context.serial, KeyCache()).first;
+        }
+
+        KeyCache& cache = it->second;
+        if(cache.generation != context.generation or cache.changes != Option::changes or cache.options.size() >= max_keys){
+          cache.options.clear();
+          cache.generation = context.generation;
+          cache.changes = Option::changes;
+        }
+
+        return cache.options;
+      }
+
+    private:
+
+      KeyCache() : generation(0), changes(0){
+      }
+
+      static const size_t max_contexts = 16;
+      static const size_t max_keys = 4096;
+
+      // The generation of the context, and the changes made by this thread,
+      // when the options were cached
+      unsigned long generation, changes;
+      unordered_map<string, Option*> options;
+
+      // The caches of this thread, by context serial
+      static thread_local unordered_map<unsigned long, KeyCache> caches;
+
+  };
+
+  const size_t OptionContext::KeyCache::max_contexts;
+  const size_t OptionContext::KeyCache::max_keys;
+  thread_local unordered_map<unsigned long, OptionContext::KeyCache> OptionContext::KeyCache::caches;
+
+  // The last serial given to a context
+  static atomic<unsigned long> last_serial(0);
+
+  class OptionContext::Read{
+
+    public:
+
+      Read(OptionContext& context) : lock(context, false), context(context), method(NULL), key(NULL){
+      }
+
+      /**
+        * As above, but while profiling, and unless called from another method
+        * of the context, add the call to the supplied method with the
+        * supplied key, and the time until the Read leaves scope, to the access
+        * profile.
+        */
+      Read(OptionContext& context, const char* method, const string& key) : lock(context, false), context(context), method(NULL), key(NULL){
+        if(context.profiling.load(memory_order_relaxed) and !lock.nested()){
+          this->method = method;
+          this->key = &key;
+          start = chrono::steady_clock::now();
+        }
+      }
+
+      ~Read(){
+        if(method != NULL){
+          context.record_access(method, *key, chrono::duration<double>(chrono::steady_clock::now() - start).count());
+        }
+      }
+
+    private:
+
+      Lock lock;
+      OptionContext& context;
+      const char* method;
+      const string* key;
+      chrono::steady_clock::time_point start;
+
+  };
+
+  class OptionContext::Update{
+
+    public:
+
+      Update(OptionContext& context) : lock(context, true), context(context), changes(Option::changes){
+      }
+
+      ~Update(){
+        if(Option::changes != changes){
+          context.generation++;
+        }
+      }
+
+    private:
+
+      Lock lock;
+      OptionContext& context;
+      unsigned long changes;
+
+  };
 
   // PUBLIC METHODS
 
-  void OptionManager::clear_options() {
-    manager.reset();
-    
+  OptionContext::OptionContext(){
+    pool = new OptionManager::OptionPool();
+    options = new Option(pool);
+    generation = 0;
+    last_id = 0;
+    serial = ++last_serial;
+    shared = false;
+    // Readers take the lock often and briefly, so with the default policy a
+    // steady stream of them can keep a writer waiting indefinitely; prefer
+    // writers where the choice is available. A Lock never takes the lock
+    // again while it is held, as the writer preference would then deadlock.
+    pthread_rwlockattr_t attr;
+    pthread_rwlockattr_init(&attr);
+#ifdef __GLIBC__
+    pthread_rwlockattr_setkind_np(&attr, PTHREAD_RWLOCK_PREFER_WRITER_NONRECURSIVE_NP);
+#endif
+    pthread_rwlock_init(&lock, &attr);
+    pthread_rwlockattr_destroy(&attr);
+    profiling = false;
+    pthread_mutex_init(&profile_lock, NULL);
+
     return;
   }
 
-  void* OptionManager::get_manager() {
-    return (void*) manager.options;
+  OptionContext::~OptionContext(){
+    pthread_mutex_destroy(&profile_lock);
+    pthread_rwlock_destroy(&lock);
+    delete options;
+    delete pool;
+
+    return;
   }
 
-  void OptionManager::set_manager(void* m) {
-    delete manager.options;
-    manager.options = (Spud::OptionManager::Option*) m;
+  void OptionContext::clear_options(){
+    Update update(*this);
+
+    reset();
+
     return;
   }
 
-  OptionError OptionManager::load_options(const string& filename){
-    return manager.options->load_options(filename);
+  OptionError OptionContext::load_options(const string& filename){
+    Update update(*this);
+
+    return options->load_options(filename);
   }
 
-  OptionError OptionManager::write_options(const string& filename){
-    return manager.options->write_options(filename);
+  OptionError OptionContext::write_options(const string& filename){
+    Read read(*this);
+
+    return options->write_options(filename);
   }
 
-  OptionError OptionManager::get_child_name(const string& key, const unsigned& index, string& child_name){
-    deque<string> kids;
-    manager.options->list_children(key, kids);
-    if(kids.size() < index){
-      return SPUD_KEY_ERROR;
-    }
+  OptionError OptionContext::load_snapshot(const string& filename){
+    Update update(*this);
+
+    return options->load_snapshot(filename);
+  }
 
-    child_name = kids[index];
+  OptionError OptionContext::write_snapshot(const string& filename){
+    Read read(*this);
 
-    return SPUD_NO_ERROR;
+    return options->write_snapshot(filename);
   }
-  
-  OptionError OptionManager::get_number_of_children(const string& key, int& child_count){
-    deque<string> kids;
 
-    manager.options->list_children(key, kids);
-    
-    child_count = kids.size();
+  OptionError OptionContext::load_options_from_buffer(const string& buffer){
+    Update update(*this);
 
-    return check_key(key);
+    return options->load_options_from_buffer(buffer);
   }
 
-  int OptionManager::option_count(const string& key){
-    return manager.options->option_count(key);
+  OptionError OptionContext::write_options_to_buffer(string& buffer){
+    Read read(*this);
+
+    return options->write_options_to_buffer(buffer);
   }
 
-  logical_t OptionManager::have_option(const string& key){
-    return manager.options->have_option(key);
+  OptionError OptionContext::load_snapshot_from_buffer(const string& buffer){
+    Update update(*this);
+
+    return options->load_snapshot_from_buffer(buffer);
   }
 
-  OptionError OptionManager::get_option_type(const string& key, OptionType& type){
-    Option* child = manager.options->get_child(key);
-    if(child == NULL){
+  OptionError OptionContext::write_snapshot_to_buffer(string& buffer){
+    Read read(*this);
+
+    return options->write_snapshot_to_buffer(buffer);
+  }
+
+  OptionError OptionContext::get_child_name(const string& key, const unsigned& index, string& child_name){
+    Read read(*this, "get_child_name", key);
+
+    const Option* option = get_child(key);
+    if(option == NULL or option->get_child(index, child_name) == NULL){
       return SPUD_KEY_ERROR;
     }
 
-    type = child->get_option_type();
-
     return SPUD_NO_ERROR;
   }
+  
+  OptionError OptionContext::get_number_of_children(const string& key, int& child_count){
+    Read read(*this);
 
-  OptionError OptionManager::get_option_rank(const string& key, int& rank){
-    Option* child = manager.options->get_child(key);
-    if(child == NULL){
+    const Option* option = get_child(key);
+    if(option == NULL){
+      child_count = 0;
       return SPUD_KEY_ERROR;
     }
 
-    rank = child->get_option_rank();
+    child_count = option->get_number_of_children();
 
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::get_option_shape(const string& key, vector<int>& shape){
-    Option* child = manager.options->get_child(key);
-    if(child == NULL){
+  OptionError OptionContext::list_children(const string& key, vector<string>& names){
+    Read read(*this);
+
+    const Option* option = get_child(key);
+    if(option == NULL){
+      names.clear();
       return SPUD_KEY_ERROR;
     }
 
-    shape = child->get_option_shape();
+    names.resize(option->get_number_of_children());
+    for(size_t i = 0;i < names.size();i++){
+      option->get_child(i, names[i]);
+    }
 
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::get_option(const string& key, double& val){
-    OptionError check_err = check_option(key, SPUD_DOUBLE, 0);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
+  OptionError OptionContext::list_children(const string& key, vector<string>& names, vector<OptionType>& types, vector<int>& ranks, vector< vector<int> >& shapes){
+    Read read(*this);
 
-    vector<double> val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
-    }else if(val_handle.size() != 1){
-      return SPUD_RANK_ERROR;
+    const Option* option = get_child(key);
+    if(option == NULL){
+      names.clear();
+      types.clear();
+      ranks.clear();
+      shapes.clear();
+      return SPUD_KEY_ERROR;
     }
 
-    val = val_handle[0];
+    size_t child_count = option->get_number_of_children();
+    names.resize(child_count);
+    types.resize(child_count);
+    ranks.resize(child_count);
+    shapes.resize(child_count);
+    for(size_t i = 0;i < child_count;i++){
+      const Option* child = option->get_child(i, names[i]);
+      types[i] = child->get_option_type();
+      ranks[i] = child->get_option_rank();
+      shapes[i] = child->get_option_shape();
+    }
 
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::get_option(const string& key, double& val, const double& default_val){
-    if(!have_option(key)){
-      val = default_val;
-      return SPUD_NO_ERROR;
-    }
+  int OptionContext::option_count(const string& key){
+    Read read(*this, "option_count", key);
 
-    return get_option(key, val);
+    return options->option_count(key);
   }
 
-  OptionError OptionManager::get_option(const string& key, vector<double>& val){
-    OptionError check_err = check_option(key, SPUD_DOUBLE, 1);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
+  OptionError OptionContext::find_options(const string& key, vector<string>& keys){
+    Read read(*this);
 
-    vector<double> val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
+    return options->find_options(key, keys);
+  }
+
+  logical_t OptionContext::have_option(const string& key){
+    Read read(*this, "have_option", key);
+
+    return get_child(key) != NULL;
+  }
+
+  OptionError OptionContext::get_option_type(const string& key, OptionType& type){
+    Read read(*this, "get_option_type", key);
+
+    Option* child = get_child(key);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
     }
 
-    val = val_handle;
+    type = child->get_option_type();
 
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::get_option(const string& key, vector<double>& val, const vector<double>& default_val){
-    if(!have_option(key)){
-      val = default_val;
-      return SPUD_NO_ERROR;
+  OptionError OptionContext::get_option_rank(const string& key, int& rank){
+    Read read(*this, "get_option_rank", key);
+
+    Option* child = get_child(key);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
     }
 
-    return get_option(key, val);
+    rank = child->get_option_rank();
+
+    return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::get_option(const string& key, vector< vector<double> >& val){
-    OptionError check_err = check_option(key, SPUD_DOUBLE, 2);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
+  OptionError OptionContext::get_option_shape(const string& key, vector<int>& shape){
+    Read read(*this, "get_option_shape", key);
 
-    vector<int> shape;
-    OptionError shape_err = get_option_shape(key, shape);
-    if(shape_err != SPUD_NO_ERROR){
-      return shape_err;
+    Option* child = get_child(key);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
     }
 
-    vector<double> val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
-    }
+    shape = child->get_option_shape();
 
-    val.clear();
-    for(int i = 0;i < shape[0];i++){
-      val.push_back(vector<double>(shape[1]));
-      for(int j = 0;j < shape[1];j++){
-        val[i][j] = val_handle[(i * shape[1]) + j];
-      }
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionContext::get_option_data(const string& key, OptionType& type, int& rank, vector<int>& shape, string& data){
+    Read read(*this, "get_option", key);
+
+    Option* child = get_child(key);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
     }
 
+    child->get_option_data(type, rank, shape, data);
+
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::get_option(const string& key, vector< vector<double> >& val, const vector< vector<double> >& default_val){
+  OptionError OptionContext::get_option(const string& key, double& val){
+    Read read(*this, "get_option", key);
+
+    return OptionManager::get_option(get_child(key), val);
+  }
+
+  OptionError OptionContext::get_option(const string& key, double& val, const double& default_val){
+    Read read(*this, "get_option", key);
+
     if(!have_option(key)){
       val = default_val;
       return SPUD_NO_ERROR;
@@ -218,26 +1631,15 @@ namespace Spud{
     return get_option(key, val);
   }
 
-  OptionError OptionManager::get_option(const string& key, int& val){
-    OptionError check_err = check_option(key, SPUD_INT, 0);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
-
-    vector<int> val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
-    }else if(val_handle.size() != 1){
-      return SPUD_RANK_ERROR;
-    }
-
-    val = val_handle[0];
+  OptionError OptionContext::get_option(const string& key, vector<double>& val){
+    Read read(*this, "get_option", key);
 
-    return SPUD_NO_ERROR;
+    return OptionManager::get_option(get_child(key), val);
   }
 
-  OptionError OptionManager::get_option(const string& key, int& val, const int& default_val){
+  OptionError OptionContext::get_option(const string& key, vector<double>& val, const vector<double>& default_val){
+    Read read(*this, "get_option", key);
+
     if(!have_option(key)){
       val = default_val;
       return SPUD_NO_ERROR;
@@ -246,24 +1648,15 @@ namespace Spud{
     return get_option(key, val);
   }
 
-  OptionError OptionManager::get_option(const string& key, vector<int>& val){
-    OptionError check_err = check_option(key, SPUD_INT, 1);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
-
-    vector<int> val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
-    }
-
-    val = val_handle;
+  OptionError OptionContext::get_option(const string& key, vector< vector<double> >& val){
+    Read read(*this, "get_option", key);
 
-    return SPUD_NO_ERROR;
+    return OptionManager::get_option(get_child(key), val);
   }
 
-  OptionError OptionManager::get_option(const string& key, vector<int>& val, const vector<int>& default_val){
+  OptionError OptionContext::get_option(const string& key, vector< vector<double> >& val, const vector< vector<double> >& default_val){
+    Read read(*this, "get_option", key);
+
     if(!have_option(key)){
       val = default_val;
       return SPUD_NO_ERROR;
@@ -272,36 +1665,32 @@ namespace Spud{
     return get_option(key, val);
   }
 
-  OptionError OptionManager::get_option(const string& key, vector< vector<int> >& val){
-    OptionError check_err = check_option(key, SPUD_INT, 2);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
+  OptionError OptionContext::get_option(const string& key, int& val){
+    Read read(*this, "get_option", key);
 
-    vector<int> shape;
-    OptionError shape_err = get_option_shape(key, shape);
-    if(shape_err != SPUD_NO_ERROR){
-      return shape_err;
-    }
+    return OptionManager::get_option(get_child(key), val);
+  }
 
-    vector<int> val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
-    }
+  OptionError OptionContext::get_option(const string& key, int& val, const int& default_val){
+    Read read(*this, "get_option", key);
 
-    val.clear();
-    for(int i = 0;i < shape[0];i++){
-      val.push_back(vector<int>(shape[1]));
-      for(int j = 0;j < shape[1];j++){
-        val[i][j] = val_handle[(i * shape[1]) + j];
-      }
+    if(!have_option(key)){
+      val = default_val;
+      return SPUD_NO_ERROR;
     }
 
-    return SPUD_NO_ERROR;
+    return get_option(key, val);
   }
 
-  OptionError OptionManager::get_option(const string& key, vector< vector<int> >& val, const vector< vector<int> >& default_val){
+  OptionError OptionContext::get_option(const string& key, vector<int>& val){
+    Read read(*this, "get_option", key);
+
+    return OptionManager::get_option(get_child(key), val);
+  }
+
+  OptionError OptionContext::get_option(const string& key, vector<int>& val, const vector<int>& default_val){
+    Read read(*this, "get_option", key);
+
     if(!have_option(key)){
       val = default_val;
       return SPUD_NO_ERROR;
@@ -310,24 +1699,32 @@ namespace Spud{
     return get_option(key, val);
   }
 
-  OptionError OptionManager::get_option(const string& key, string& val){
-    OptionError check_err = check_option(key, SPUD_STRING, 1);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
-    }
+  OptionError OptionContext::get_option(const string& key, vector< vector<int> >& val){
+    Read read(*this, "get_option", key);
 
-    string val_handle;
-    OptionError get_err = manager.options->get_option(key, val_handle);
-    if(get_err != SPUD_NO_ERROR){
-      return get_err;
+    return OptionManager::get_option(get_child(key), val);
+  }
+
+  OptionError OptionContext::get_option(const string& key, vector< vector<int> >& val, const vector< vector<int> >& default_val){
+    Read read(*this, "get_option", key);
+
+    if(!have_option(key)){
+      val = default_val;
+      return SPUD_NO_ERROR;
     }
 
-    val = val_handle;
+    return get_option(key, val);
+  }
 
-    return SPUD_NO_ERROR;
+  OptionError OptionContext::get_option(const string& key, string& val){
+    Read read(*this, "get_option", key);
+
+    return OptionManager::get_option(get_child(key), val);
   }
 
-  OptionError OptionManager::get_option(const string& key, string& val, const string& default_val){
+  OptionError OptionContext::get_option(const string& key, string& val, const string& default_val){
+    Read read(*this, "get_option", key);
+
     if(!have_option(key)){
       val = default_val;
       return SPUD_NO_ERROR;
@@ -336,10 +1733,12 @@ namespace Spud{
     return get_option(key, val);
   }
 
-  OptionError OptionManager::add_option(const string& key){
+  OptionError OptionContext::add_option(const string& key){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
-    OptionError add_err = manager.options->add_option(key);
+    OptionError add_err = options->add_option(key);
     if(add_err != SPUD_NO_ERROR){
       return add_err;
     }else if(new_key){
@@ -349,14 +1748,16 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const double& val){
+  OptionError OptionContext::set_option(const string& key, const double& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
     vector<double> val_handle;
     val_handle.push_back(val);
     vector<int> shape(2);
     shape[0] = -1;  shape[1] = -1;
-    OptionError set_err = manager.options->set_option(key + "/__value", val_handle, 0, shape);
+    OptionError set_err = options->set_option(key + "/__value", val_handle, 0, shape);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -366,13 +1767,15 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const vector<double>& val){
+  OptionError OptionContext::set_option(const string& key, const vector<double>& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
     vector<double> val_handle = val;
     vector<int> shape(2);
     shape[0] = val.size();  shape[1] = -1;
-    OptionError set_err = manager.options->set_option(key + "/__value", val_handle, 1, shape);
+    OptionError set_err = options->set_option(key + "/__value", val_handle, 1, shape);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -382,26 +1785,18 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const vector< vector<double> >& val){
+  OptionError OptionContext::set_option(const string& key, const vector< vector<double> >& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
     vector<double> val_handle;
-    for(size_t i = 0;i < val.size();i++){
-      if(i > 0 and val[i].size() != val[0].size()){
-        return SPUD_SHAPE_ERROR;
-      }
-      for(size_t j = 0;j < val[i].size();j++){
-        val_handle.push_back(val[i][j]);
-      }
-    }
-    vector<int> shape(2);
-    shape[0] = val.size();
-    if(val.size() == 0){
-      shape[1] = 0;
-    }else{
-      shape[1] = val[0].size();
+    vector<int> shape;
+    OptionError flatten_err = flatten(val, val_handle, shape);
+    if(flatten_err != SPUD_NO_ERROR){
+      return flatten_err;
     }
-    OptionError set_err = manager.options->set_option(key + "/__value", val_handle, 2, shape);
+    OptionError set_err = options->set_option(key + "/__value", val_handle, 2, shape);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -411,14 +1806,16 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const int& val){
+  OptionError OptionContext::set_option(const string& key, const int& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
     vector<int> val_handle;
     val_handle.push_back(val);
     vector<int> shape(2);
     shape[0] = -1;  shape[1] = -1;
-    OptionError set_err = manager.options->set_option(key + "/__value", val_handle, 0, shape);
+    OptionError set_err = options->set_option(key + "/__value", val_handle, 0, shape);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -428,13 +1825,15 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const vector<int>& val){
+  OptionError OptionContext::set_option(const string& key, const vector<int>& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
     vector<int> val_handle = val;
     vector<int> shape(2);
     shape[0] = val.size();  shape[1] = -1;
-    OptionError set_err = manager.options->set_option(key + "/__value", val_handle, 1, shape);
+    OptionError set_err = options->set_option(key + "/__value", val_handle, 1, shape);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -444,26 +1843,18 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const vector< vector<int> >& val){
+  OptionError OptionContext::set_option(const string& key, const vector< vector<int> >& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
     vector<int> val_handle;
-    for(size_t i = 0;i < val.size();i++){
-      if(i > 0 and val[i].size() != val[0].size()){
-        return SPUD_SHAPE_ERROR;
-      }
-      for(size_t j = 0;j < val[i].size();j++){
-        val_handle.push_back(val[i][j]);
-      }
-    }
-    vector<int> shape(2);
-    shape[0] = val.size();
-    if(val.size() == 0){
-      shape[1] = 0;
-    }else{
-      shape[1] = val[0].size();
+    vector<int> shape;
+    OptionError flatten_err = flatten(val, val_handle, shape);
+    if(flatten_err != SPUD_NO_ERROR){
+      return flatten_err;
     }
-    OptionError set_err = manager.options->set_option(key + "/__value", val_handle, 2, shape);
+    OptionError set_err = options->set_option(key + "/__value", val_handle, 2, shape);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -473,10 +1864,12 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option(const string& key, const string& val){
+  OptionError OptionContext::set_option(const string& key, const string& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
-    OptionError set_err = manager.options->set_option(key + "/__value", val);
+    OptionError set_err = options->set_option(key + "/__value", val);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -486,10 +1879,12 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option_attr(const string& key, const string& val){
+  OptionError OptionContext::set_option_attr(const string& key, const string& val){
+    Update update(*this);
+
     logical_t new_key = !have_option(key);
 
-    OptionError set_err = manager.options->set_option(key, val);
+    OptionError set_err = options->set_option(key, val);
     if(set_err != SPUD_NO_ERROR){
       return set_err;
     }else if(new_key){
@@ -499,13 +1894,15 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::set_option_attribute(const string& key, const string& val){
+  OptionError OptionContext::set_option_attribute(const string& key, const string& val){
+    Update update(*this);
+
     OptionError set_err = set_option_attr(key, val);
     if(set_err != SPUD_NO_ERROR and set_err != SPUD_NEW_KEY_WARNING){
       return set_err;
     }
 
-    Option* child = manager.options->get_child(key);
+    Option* child = options->get_child(key);
     if(child == NULL){
       return SPUD_KEY_ERROR;
     }
@@ -520,144 +1917,487 @@ namespace Spud{
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::move_option(const string& key1, const string& key2){
-    OptionError move_err = manager.options->move_option(key1, key2);
+  OptionError OptionContext::move_option(const string& key1, const string& key2){
+    Update update(*this);
+
+    vector<HandleEntry*> moved;
+    find_handles(key1, moved);
+    OptionError move_err = options->move_option(key1, key2);
     if(move_err != SPUD_NO_ERROR){
       return move_err;
     }
+    for(size_t i = 0;i < moved.size();i++){
+      moved[i]->option = NULL;
+    }
     
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::copy_option(const string& key1, const string& key2){
-    OptionError copy_err = manager.options->copy_option(key1, key2);
+  OptionError OptionContext::copy_option(const string& key1, const string& key2){
+    Update update(*this);
+
+    OptionError copy_err = options->copy_option(key1, key2);
     if(copy_err != SPUD_NO_ERROR){
       return copy_err;
     }
+    shared = true;
     
     return SPUD_NO_ERROR;
   }
 
-  OptionError OptionManager::delete_option(const string& key){
-    OptionError del_err = manager.options->delete_option(key);
+  OptionError OptionContext::delete_option(const string& key){
+    Update update(*this);
+
+    vector<HandleEntry*> deleted;
+    find_handles(key, deleted);
+    OptionError del_err = options->delete_option(key);
     if(del_err != SPUD_NO_ERROR){
       return del_err;
     }
+    for(size_t i = 0;i < deleted.size();i++){
+      deleted[i]->option = NULL;
+    }
 
     return SPUD_NO_ERROR;
   }
 
-  void OptionManager::print_options(){
-    manager.options->print();
+  void OptionContext::print_options(){
+    Read read(*this);
+
+    options->print();
 
     return;
   }
 
-  // PRIVATE METHODS
+  OptionError OptionContext::memory_stats(MemoryStats& stats){
+    Read read(*this);
 
-  OptionManager::OptionManager(){
-    options = new Option();
-    deallocated = false;
+    memset(&stats, 0, sizeof(stats));
+    options->memory_stats(stats);
+    stats.pool_bytes = pool->reserved_bytes();
+    stats.pool_used_bytes = pool->used_bytes();
+
+    return SPUD_NO_ERROR;
+  }
+
+  void OptionContext::set_access_profile(const logical_t& enabled){
+    pthread_mutex_lock(&profile_lock);
+    if(enabled and !profiling){
+      access_profile.clear();
+    }
+    profiling = enabled;
+    pthread_mutex_unlock(&profile_lock);
 
     return;
   }
 
-  OptionManager::OptionManager(const OptionManager& manager){
-    cerr << "SPUD ERROR: OptionManager copy constructor cannot be called" << endl;
-    exit(-1);
+  OptionError OptionContext::dump_access_profile(const string& filename){
+    pthread_mutex_lock(&profile_lock);
+    vector< pair<double, pair<string, string> > > order;
+    for(map< pair<string, string>, AccessCount >::const_iterator it = access_profile.begin();it != access_profile.end();it++){
+      order.push_back(make_pair(-it->second.seconds, it->first));
+    }
+    sort(order.begin(), order.end());
+
+    FILE* file = fopen(filename.c_str(), "w");
+    if(file == NULL){
+      pthread_mutex_unlock(&profile_lock);
+      return SPUD_FILE_ERROR;
+    }
+
+    ClassicLocale classic;
+    logical_t json = filename.size() >= 5 and filename.compare(filename.size() - 5, 5, ".json") == 0;
+    fputs(json ? "[\n" : "method,key,calls,seconds\n", file);
+    for(size_t i = 0;i < order.size();i++){
+      const AccessCount& count = access_profile[order[i].second];
+      if(json){
+        fputs("  {\"method\": ", file);
+        write_quoted(file, order[i].second.first, true);
+        fputs(", \"key\": ", file);
+        write_quoted(file, order[i].second.second, true);
+        fprintf(file, ", \"calls\": %lu, \"seconds\": %.9g}%s\n", count.calls, count.seconds, i + 1 < order.size() ? "," : "");
+      }else{
+        fprintf(file, "%s,", order[i].second.first.c_str());
+        write_quoted(file, order[i].second.second, false);
+        fprintf(file, ",%lu,%.9g\n", count.calls, count.seconds);
+      }
+    }
+    if(json){
+      fputs("]\n", file);
+    }
+    pthread_mutex_unlock(&profile_lock);
+
+    logical_t success = ferror(file) == 0;
+    success = fclose(file) == 0 and success;
+
+    return success ? SPUD_NO_ERROR : SPUD_FILE_ERROR;
+  }
+
+  OptionError OptionContext::lookup(const string& key, OptionHandle& handle){
+    Update update(*this);
+
+    Option* option = options->get_child(key);
+    if(option == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    if(free_handles.empty()){
+      handles.emplace_back();
+      handle = handles.size();
+    }else{
+      handle = free_handles.back();
+      free_handles.pop_back();
+    }
+
+    if(option->get_id() == 0){
+      option->set_id(++last_id);
+    }
+
+    HandleEntry& entry = handles[handle - 1];
+    entry.key = key;
+    entry.option = option;
+    entry.generation = generation;
+    entry.id = option->get_id();
+    entry.active = true;
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionContext::release(const OptionHandle& handle){
+    Update update(*this);
+
+    if(handle < 1 or handle > (int)handles.size() or !handles[handle - 1].active){
+      return SPUD_KEY_ERROR;
+    }
+
+    HandleEntry& entry = handles[handle - 1];
+    entry.key.clear();
+    entry.option = NULL;
+    entry.active = false;
+    free_handles.push_back(handle);
+
+    return SPUD_NO_ERROR;
+  }
+
+  logical_t OptionContext::have_option(const OptionHandle& handle){
+    Read read(*this);
+
+    return resolve(handle) != NULL;
+  }
+
+  OptionError OptionContext::get_option_type(const OptionHandle& handle, OptionType& type){
+    Read read(*this);
+
+    Option* child = resolve(handle);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    type = child->get_option_type();
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionContext::get_option_rank(const OptionHandle& handle, int& rank){
+    Read read(*this);
+
+    Option* child = resolve(handle);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    rank = child->get_option_rank();
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionContext::get_option_shape(const OptionHandle& handle, vector<int>& shape){
+    Read read(*this);
+
+    Option* child = resolve(handle);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    shape = child->get_option_shape();
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionContext::get_option_data(const OptionHandle& handle, OptionType& type, int& rank, vector<int>& shape, string& data){
+    Read read(*this);
+
+    Option* child = resolve(handle);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    child->get_option_data(type, rank, shape, data);
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, double& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, vector<double>& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, vector< vector<double> >& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, int& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, vector<int>& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, vector< vector<int> >& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::get_option(const OptionHandle& handle, string& val){
+    Read read(*this);
+
+    return OptionManager::get_option(resolve(handle), val);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const double& val){
+    Update update(*this);
+
+    vector<double> val_handle(1, val);
+    vector<int> shape(2, -1);
+    return OptionManager::set_option(resolve_for_update(handle), val_handle, 0, shape);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const vector<double>& val){
+    Update update(*this);
+
+    vector<int> shape(2);
+    shape[0] = val.size();  shape[1] = -1;
+    return OptionManager::set_option(resolve_for_update(handle), val, 1, shape);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const vector< vector<double> >& val){
+    Update update(*this);
+
+    vector<double> val_handle;
+    vector<int> shape;
+    OptionError flatten_err = flatten(val, val_handle, shape);
+    if(flatten_err != SPUD_NO_ERROR){
+      return flatten_err;
+    }
+    return OptionManager::set_option(resolve_for_update(handle), val_handle, 2, shape);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const int& val){
+    Update update(*this);
+
+    vector<int> val_handle(1, val);
+    vector<int> shape(2, -1);
+    return OptionManager::set_option(resolve_for_update(handle), val_handle, 0, shape);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const vector<int>& val){
+    Update update(*this);
+
+    vector<int> shape(2);
+    shape[0] = val.size();  shape[1] = -1;
+    return OptionManager::set_option(resolve_for_update(handle), val, 1, shape);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const vector< vector<int> >& val){
+    Update update(*this);
+
+    vector<int> val_handle;
+    vector<int> shape;
+    OptionError flatten_err = flatten(val, val_handle, shape);
+    if(flatten_err != SPUD_NO_ERROR){
+      return flatten_err;
+    }
+    return OptionManager::set_option(resolve_for_update(handle), val_handle, 2, shape);
+  }
+
+  OptionError OptionContext::set_option(const OptionHandle& handle, const string& val){
+    Update update(*this);
+
+    Option* child = resolve_for_update(handle);
+    if(child == NULL){
+      return SPUD_KEY_ERROR;
+    }
+
+    return child->set_option("__value", val);
+  }
+
+  // PRIVATE METHODS
+
+  OptionContext::Option* OptionContext::resolve(const OptionHandle& handle){
+    if(handle < 1 or handle > (int)handles.size()){
+      return NULL;
+    }
+
+    HandleEntry& entry = handles[handle - 1];
+    if(entry.generation.load(memory_order_acquire) == generation){
+      return entry.option.load(memory_order_relaxed);
+    }
+
+    // The tree has changed since the handle was last used - check that its
+    // key still leads to the same option, or to a copy made of it when it
+    // was shared and modified. The id is compared even if the address is
+    // unchanged, as a new option may be allocated where a deleted one was.
+    // Concurrent readers see the same tree, so store the same result.
+    Option* option = entry.option.load(memory_order_relaxed);
+    if(option != NULL){
+      Option* current = options->get_child(entry.key);
+      if(current == NULL or current->get_id() != entry.id){
+        option = NULL;
+      }else{
+        option = current;
+      }
+    }
+    entry.option.store(option, memory_order_relaxed);
+    entry.generation.store(generation, memory_order_release);
+
+    return option;
   }
 
-  OptionManager::~OptionManager(){
-    if (!deallocated)
-    {
-      delete options;
-      deallocated = true;
+  OptionContext::Option* OptionContext::resolve_for_update(const OptionHandle& handle){
+    Option* option = resolve(handle);
+    if(option == NULL or !shared){
+      return option;
     }
 
-    return;
-  }
+    // The option, or an option above it, may be shared with a copy, so walk
+    // the key again taking copies of any shared options on the way
+    option = options->get_writable_child(handles[handle - 1].key);
+    handles[handle - 1].option.store(option, memory_order_relaxed);
 
-  OptionManager& OptionManager::operator=(const OptionManager& manager){
-    cerr << "SPUD ERROR: OptionManager assignment operator cannot be called" << endl;
-    exit(-1);
+    return option;
   }
 
-  OptionError OptionManager::check_key(const string& key){
-    if(!have_option(key)){
-      return SPUD_KEY_ERROR;
+  void OptionContext::record_access(const char* method, const string& key, const double& seconds){
+    pthread_mutex_lock(&profile_lock);
+    // Profiling may have been stopped since the call started
+    if(profiling){
+      AccessCount& count = access_profile[make_pair(string(method), key)];
+      count.calls++;
+      count.seconds += seconds;
     }
+    pthread_mutex_unlock(&profile_lock);
 
-    return SPUD_NO_ERROR;
+    return;
   }
 
-  OptionError OptionManager::check_rank(const string& key, const int& rank){
-    int rank_handle;
-    OptionError rank_err = get_option_rank(key, rank_handle);
-    if(rank_err != SPUD_NO_ERROR){
-      return rank_err;
-    }else if(rank_handle != rank){
-      return SPUD_RANK_ERROR;
+  OptionContext::Option* OptionContext::get_child(const string& key){
+    unordered_map<string, Option*>& cache = KeyCache::of(*this);
+    unordered_map<string, Option*>::const_iterator it = cache.find(key);
+    if(it != cache.end()){
+      return it->second;
     }
 
-    return SPUD_NO_ERROR;
+    Option* option = options->get_child(key);
+    cache.emplace(key, option);
+
+    return option;
   }
 
-  OptionError OptionManager::check_type(const string& key, const OptionType& type){
-    OptionType type_handle;
-    OptionError type_err = get_option_type(key, type_handle);
-    if(type_err != SPUD_NO_ERROR){
-      return type_err;
-    }else if(type_handle != type){
-      return SPUD_TYPE_ERROR;
+  void OptionContext::invalidate_handles(){
+    for(size_t i = 0;i < handles.size();i++){
+      handles[i].option = NULL;
     }
 
-    return SPUD_NO_ERROR;
+    return;
   }
 
-  OptionError OptionManager::check_option(const string& key, const OptionType& type, const int& rank){
-    OptionError check_err;
-    check_err = check_key(key);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
+  void OptionContext::find_handles(const string& key, vector<HandleEntry*>& found){
+    if(free_handles.size() == handles.size()){
+      return;
     }
-    check_err = check_type(key, type);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
+
+    // The options below a copy are shared with the original, so the keys of
+    // handles on the copy may lead through the option too until the walk to
+    // it is unshared
+    Option* option = shared ? options->get_writable_child(key) : options->get_child(key);
+    if(option == NULL){
+      return;
     }
-    check_err = check_rank(key, rank);
-    if(check_err != SPUD_NO_ERROR){
-      return check_err;
+
+    for(size_t i = 0;i < handles.size();i++){
+      HandleEntry& entry = handles[i];
+      if(entry.active and options->leads_through(entry.key, option)){
+        found.push_back(&entry);
+      }
     }
 
-    return SPUD_NO_ERROR;
+    return;
   }
-  
-  void OptionManager::reset(){
+
+  void OptionContext::reset(){
+    // Start a new pool, rather than reusing the free list of the old one, so
+    // that clearing a large tree returns its memory
     delete options;
-    options = new Option;
+    delete pool;
+    pool = new OptionManager::OptionPool();
+    options = new Option(pool);
+    invalidate_handles();
+    // The new tree may reuse the addresses of options in the old one
+    generation++;
+    shared = false;
     
     return;
   }
 
-  // End OptionManager CLASS METHODS
+  // End OptionContext CLASS METHODS
 
   // OptionManager::Option CLASS METHODS
 
+  // PUBLIC VARIABLES
+
+  thread_local unsigned long OptionManager::Option::changes = 0;
+
   // PUBLIC METHODS
 
   OptionManager::Option::Option(){
     verbose_off();
+    child_index = NULL;
+    data_type = SPUD_NONE;
+    data_size = 0;
+    pool = NULL;
     OptionError set_err = set_rank_and_shape(-1, vector<int>());
     if(set_err != SPUD_NO_ERROR){
       cerr << "SPUD ERROR: Failed to set rank and shape" << endl;
       exit(-1);
     }
     is_attribute = false;
+    refs = 1;
+    id = 0;
 
     return;
   }
 
   OptionManager::Option::Option(const OptionManager::Option& inOption){
+    child_index = NULL;
+    data_type = SPUD_NONE;
+    data_size = 0;
+    pool = inOption.pool;
+    refs = 1;
     *this = inOption;
 
     return;
@@ -666,20 +2406,46 @@ namespace Spud{
   OptionManager::Option::Option(string name){
     verbose_off();
     node_name = name;
+    child_index = NULL;
+    data_type = SPUD_NONE;
+    data_size = 0;
+    pool = NULL;
+    OptionError set_err = set_rank_and_shape(-1, vector<int>());
+    if(set_err != SPUD_NO_ERROR){
+      cerr << "SPUD ERROR: Failed to set rank and shape" << endl;
+      exit(-1);
+    }
+    is_attribute = false;
+    refs = 1;
+    id = 0;
+
+    return;
+  }
+
+  OptionManager::Option::Option(OptionPool* pool){
+    verbose_off();
+    child_index = NULL;
+    data_type = SPUD_NONE;
+    data_size = 0;
+    this->pool = pool;
     OptionError set_err = set_rank_and_shape(-1, vector<int>());
     if(set_err != SPUD_NO_ERROR){
       cerr << "SPUD ERROR: Failed to set rank and shape" << endl;
       exit(-1);
     }
     is_attribute = false;
+    refs = 1;
+    id = 0;
 
     return;
   }
 
   OptionManager::Option::~Option(){
-    for(deque< pair<string, Option*> >::iterator it=children.begin();it!=children.end();++it){
-      if(it->second) delete it->second;
+    for(vector< pair<string, Option*> >::iterator it=children.begin();it!=children.end();++it){
+      if(it->second) release(it->second);
     }
+    delete child_index;
+    set_data(SPUD_NONE, NULL, 0);
 
     return;
   }
@@ -690,11 +2456,18 @@ namespace Spud{
       cout << "const OptionManager::Option& OptionManager::Option::operator=(const OptionManager::Option& inOption)\n";
 
     node_name = inOption.node_name;
+    // Share the children, which are copied when they are first modified
+    for(vector< pair<string, Option*> >::const_iterator it = inOption.children.begin();it != inOption.children.end();it++){
+      it->second->refs++;
+    }
+    for(vector< pair<string, Option*> >::iterator it = children.begin();it != children.end();it++){
+      release(it->second);
+    }
     children = inOption.children;
+    delete child_index;
+    child_index = inOption.child_index == NULL ? NULL : new ChildIndex(*inOption.child_index);
 
-    data_double = inOption.data_double;
-    data_int = inOption.data_int;
-    data_string = inOption.data_string;
+    set_data(inOption.data_type, inOption.get_data(), inOption.data_size);
     vector<int> shape(2);
     shape[0] = inOption.shape[0];  shape[1] = inOption.shape[1];
     OptionError set_err = set_rank_and_shape(inOption.rank, shape);
@@ -704,6 +2477,7 @@ namespace Spud{
     }
 
     is_attribute = inOption.is_attribute;
+    id = inOption.id;
 
     return *this;
   }
@@ -721,6 +2495,26 @@ namespace Spud{
       return SPUD_FILE_ERROR;
     }
 
+    return load_document(doc);
+  }
+
+  OptionError OptionManager::Option::load_options_from_buffer(const string& buffer){
+    if(verbose)
+      cout << "OptionError OptionManager::Option::load_options_from_buffer(const string& buffer)\n";
+
+    delete_option("/");
+
+    TiXmlDocument doc;
+    doc.SetCondenseWhiteSpace(false);
+    doc.Parse(normalise_line_breaks(buffer).c_str());
+    if(doc.Error()){
+      return SPUD_FILE_ERROR;
+    }
+
+    return load_document(doc);
+  }
+
+  OptionError OptionManager::Option::load_document(TiXmlDocument& doc){
     TiXmlNode* header = doc.FirstChild();
     while(header != NULL and header->Type() != TiXmlNode::DECLARATION){
       header = header->NextSibling();
@@ -734,12 +2528,16 @@ namespace Spud{
     // Set the name of this element
     node_name = fluidity_options->ValueStr();
 
-    // Decend down through all the fluidity options
-    TiXmlNode* option_node;
-    for(option_node = fluidity_options->FirstChildElement();option_node;option_node = option_node->NextSiblingElement()){
+    // Decend down through all the fluidity options, releasing each part of
+    // the document once it has been converted
+    TiXmlNode* option_node = fluidity_options->FirstChildElement();
+    while(option_node){
+      TiXmlNode* next_node = option_node->NextSiblingElement();
       if(option_node->ToElement()){
-        parse_node("", option_node);
+        parse_node(option_node);
       }
+      fluidity_options->RemoveChild(option_node);
+      option_node = next_node;
     }
 
     return SPUD_NO_ERROR;
@@ -749,19 +2547,315 @@ namespace Spud{
     if(verbose)
       cout << "void OptionManager::Option::write_options(const string& filename = " << filename << ") const\n";
 
-    TiXmlDocument doc;
+    FILE* file = fopen(filename.c_str(), "w");
+    if(file == NULL){
+      //cerr << "SPUD WARNING: Failed to write options file" << endl;
+      return SPUD_FILE_ERROR;
+    }
+    setvbuf(file, NULL, _IOFBF, 1 << 16);
+    write_document(file);
+    logical_t success = ferror(file) == 0;
+    success = fclose(file) == 0 and success;
+
+    return success ? SPUD_NO_ERROR : SPUD_FILE_ERROR;
+  }
+
+  OptionError OptionManager::Option::write_options_to_buffer(string& buffer) const{
+    if(verbose)
+      cout << "OptionError OptionManager::Option::write_options_to_buffer(string& buffer) const\n";
+
+    // Write through a memory stream, so that the buffer is formatted exactly
+    // as write_options formats a file
+    char* data = NULL;
+    size_t size = 0;
+    FILE* file = open_memstream(&data, &size);
+    if(file == NULL){
+      return SPUD_FILE_ERROR;
+    }
+    write_document(file);
+    logical_t success = ferror(file) == 0;
+    success = fclose(file) == 0 and success;
+    if(success){
+      buffer.assign(data, size);
+    }
+    free(data);
 
+    return success ? SPUD_NO_ERROR : SPUD_FILE_ERROR;
+  }
+
+  void OptionManager::Option::write_document(FILE* file) const{
     // XML header
-    TiXmlDeclaration* header = new TiXmlDeclaration("1.0", "utf-8", "");
-    doc.LinkEndChild(header);
+    fputs("<?xml version=\"1.0\" encoding=\"utf-8\" ?>\n", file);
 
     // Root node
-    TiXmlNode* root_node = to_element();
-    doc.LinkEndChild(root_node);
+    write_element(file, 0);
+    fputc('\n', file);
+
+    return;
+  }
+
+  OptionError OptionManager::Option::load_snapshot(const string& filename){
+    if(verbose)
+      cout << "OptionError OptionManager::Option::load_snapshot(const string& filename = " << filename << ")\n";
 
-    if(!doc.SaveFile(filename)){
+    string buffer;
+    if(!read_file(filename, buffer)){
       return SPUD_FILE_ERROR;
-      //cerr << "SPUD WARNING: Failed to write options file" << endl;
+    }
+
+    return load_snapshot_from_buffer(buffer);
+  }
+
+  OptionError OptionManager::Option::load_snapshot_from_buffer(const string& buffer){
+    if(verbose)
+      cout << "OptionError OptionManager::Option::load_snapshot_from_buffer(const string& buffer)\n";
+
+    if(buffer.size() < sizeof(SnapshotHeader)){
+      return SPUD_FILE_ERROR;
+    }
+    const char* data = buffer.data();
+    size_t size = buffer.size();
+
+    SnapshotHeader header;
+    memcpy(&header, data, sizeof(header));
+    if(memcmp(header.magic, SNAPSHOT_MAGIC, sizeof(SNAPSHOT_MAGIC)) != 0){
+      return SPUD_FILE_ERROR;
+    }
+    logical_t swap = header.endian_tag == SNAPSHOT_SWAPPED_ENDIAN_TAG;
+    if(swap){
+      swap_bytes(header.version);
+      swap_bytes(header.strings);
+      swap_bytes(header.string_bytes);
+      swap_bytes(header.nodes);
+      swap_bytes(header.ints);
+      swap_bytes(header.doubles);
+    }else if(header.endian_tag != SNAPSHOT_ENDIAN_TAG){
+      return SPUD_FILE_ERROR;
+    }
+    if(header.version != SNAPSHOT_VERSION){
+      return SPUD_FILE_ERROR;
+    }
+
+    // Bound each count by the file size before computing offsets from them
+    if(header.strings >= size / sizeof(uint64_t) or header.string_bytes > size or header.nodes == 0
+      or header.nodes > size / sizeof(SnapshotNode) or header.ints > size / sizeof(int32_t) or header.doubles > size / sizeof(double)){
+      return SPUD_FILE_ERROR;
+    }
+    size_t offsets_pos = sizeof(SnapshotHeader);
+    size_t string_pos = offsets_pos + (header.strings + 1) * sizeof(uint64_t);
+    size_t nodes_pos = snapshot_align(string_pos + header.string_bytes);
+    size_t ints_pos = nodes_pos + header.nodes * sizeof(SnapshotNode);
+    size_t doubles_pos = snapshot_align(ints_pos + header.ints * sizeof(int32_t));
+    if(doubles_pos + header.doubles * sizeof(double) != size){
+      return SPUD_FILE_ERROR;
+    }
+
+    vector<string> strings(header.strings);
+    uint64_t begin, end;
+    memcpy(&begin, data + offsets_pos, sizeof(begin));
+    if(swap){
+      swap_bytes(begin);
+    }
+    for(size_t i = 0;i < strings.size();i++){
+      memcpy(&end, data + offsets_pos + (i + 1) * sizeof(end), sizeof(end));
+      if(swap){
+        swap_bytes(end);
+      }
+      if(begin > end or end > header.string_bytes){
+        return SPUD_FILE_ERROR;
+      }
+      strings[i].assign(data + string_pos + begin, end - begin);
+      begin = end;
+    }
+
+    // Build the tree separately, so that this element is unchanged if the
+    // snapshot is invalid
+    Option snapshot(pool);
+    vector< pair<Option*, uint32_t> > parents;
+    for(size_t i = 0;i < header.nodes;i++){
+      SnapshotNode node;
+      memcpy(&node, data + nodes_pos + i * sizeof(node), sizeof(node));
+      if(swap){
+        swap_bytes(node.key);
+        swap_bytes(node.name);
+        swap_bytes(node.children);
+        swap_bytes(node.is_attribute);
+        swap_bytes(node.rank);
+        swap_bytes(node.shape[0]);
+        swap_bytes(node.shape[1]);
+        swap_bytes(node.data_string);
+        swap_bytes(node.data_int);
+        swap_bytes(node.ints);
+        swap_bytes(node.data_double);
+        swap_bytes(node.doubles);
+      }
+      if(node.key >= strings.size() or node.name >= strings.size() or node.data_string >= strings.size()
+        or node.rank < -1 or node.rank > 2
+        or node.ints > header.ints or node.data_int > header.ints - node.ints
+        or node.doubles > header.doubles or node.data_double > header.doubles - node.doubles){
+        return SPUD_FILE_ERROR;
+      }
+
+      Option* option;
+      if(i == 0){
+        option = &snapshot;
+        option->node_name = strings[node.name];
+      }else if(parents.empty()){
+        return SPUD_FILE_ERROR;
+      }else{
+        Option* parent = parents.back().first;
+        if(--parents.back().second == 0){
+          parents.pop_back();
+        }
+        option = parent->new_option(strings[node.name]);
+        parent->add_child(strings[node.key], option);
+      }
+
+      option->is_attribute = node.is_attribute != 0;
+      option->rank = node.rank;
+      option->shape[0] = node.shape[0];
+      option->shape[1] = node.shape[1];
+      // An element holds data of one type only, as get_option_type reports
+      if(node.doubles > 0){
+        option->set_data(SPUD_DOUBLE, data + doubles_pos + node.data_double * sizeof(double), node.doubles);
+        if(swap){
+          double* values = (double*)option->get_data();
+          for(size_t j = 0;j < node.doubles;j++){
+            swap_bytes(values[j]);
+          }
+        }
+      }else if(node.ints > 0){
+        option->set_data(SPUD_INT, data + ints_pos + node.data_int * sizeof(int32_t), node.ints);
+        if(swap){
+          int* values = (int*)option->get_data();
+          for(size_t j = 0;j < node.ints;j++){
+            swap_bytes(values[j]);
+          }
+        }
+      }else{
+        option->set_data(SPUD_STRING, strings[node.data_string].data(), strings[node.data_string].size());
+      }
+
+      if(node.children > 0){
+        parents.push_back(pair<Option*, uint32_t>(option, node.children));
+      }
+    }
+    if(!parents.empty()){
+      return SPUD_FILE_ERROR;
+    }
+
+    // Take the snapshot's tree, leaving the snapshot to delete the old one
+    node_name.swap(snapshot.node_name);
+    children.swap(snapshot.children);
+    std::swap(child_index, snapshot.child_index);
+    std::swap(rank, snapshot.rank);
+    std::swap(shape[0], snapshot.shape[0]);
+    std::swap(shape[1], snapshot.shape[1]);
+    std::swap(data_type, snapshot.data_type);
+    std::swap(data_size, snapshot.data_size);
+    std::swap(payload, snapshot.payload);
+    std::swap(is_attribute, snapshot.is_attribute);
+    changes++;
+
+    return SPUD_NO_ERROR;
+  }
+
+  OptionError OptionManager::Option::write_snapshot(const string& filename) const{
+    if(verbose)
+      cout << "OptionError OptionManager::Option::write_snapshot(const string& filename = " << filename << ") const\n";
+
+    string buffer;
+    write_snapshot_to_buffer(buffer);
+
+    FILE* file = fopen(filename.c_str(), "wb");
+    if(file == NULL){
+      return SPUD_FILE_ERROR;
+    }
+    logical_t success = fwrite(buffer.data(), 1, buffer.size(), file) == buffer.size();
+    success = fclose(file) == 0 and success;
+
+    return success ? SPUD_NO_ERROR : SPUD_FILE_ERROR;
+  }
+
+  OptionError OptionManager::Option::write_snapshot_to_buffer(string& buffer) const{
+    if(verbose)
+      cout << "OptionError OptionManager::Option::write_snapshot_to_buffer(string& buffer) const\n";
+
+    vector<const string*> strings;
+    unordered_map<string, uint32_t> string_index;
+    vector<SnapshotNode> nodes;
+    uint64_t ints = 0, doubles = 0;
+
+    // Depth first, with children in order, each with its key
+    vector< pair<const string*, const Option*> > stack(1, pair<const string*, const Option*>(&node_name, this));
+    vector<const Option*> options;
+    while(!stack.empty()){
+      const string* key = stack.back().first;
+      const Option* option = stack.back().second;
+      stack.pop_back();
+
+      SnapshotNode node;
+      memset(&node, 0, sizeof(node));
+      node.key = snapshot_string(*key, strings, string_index);
+      node.name = snapshot_string(option->node_name, strings, string_index);
+      node.children = option->children.size();
+      node.is_attribute = option->is_attribute ? 1 : 0;
+      node.rank = option->rank;
+      node.shape[0] = option->shape[0];
+      node.shape[1] = option->shape[1];
+      node.data_string = snapshot_string(option->data_type == SPUD_STRING ? string((const char*)option->get_data(), option->data_size) : string(), strings, string_index);
+      node.data_int = ints;
+      node.ints = option->data_type == SPUD_INT ? option->data_size : 0;
+      node.data_double = doubles;
+      node.doubles = option->data_type == SPUD_DOUBLE ? option->data_size : 0;
+      ints += node.ints;
+      doubles += node.doubles;
+      nodes.push_back(node);
+      options.push_back(option);
+
+      for(vector< pair<string, Option*> >::const_reverse_iterator it = option->children.rbegin();it != option->children.rend();it++){
+        stack.push_back(pair<const string*, const Option*>(&it->first, it->second));
+      }
+    }
+
+    SnapshotHeader header;
+    memset(&header, 0, sizeof(header));
+    memcpy(header.magic, SNAPSHOT_MAGIC, sizeof(SNAPSHOT_MAGIC));
+    header.endian_tag = SNAPSHOT_ENDIAN_TAG;
+    header.version = SNAPSHOT_VERSION;
+    header.strings = strings.size();
+    for(size_t i = 0;i < strings.size();i++){
+      header.string_bytes += strings[i]->size();
+    }
+    header.nodes = nodes.size();
+    header.ints = ints;
+    header.doubles = doubles;
+
+    size_t offsets_pos = sizeof(SnapshotHeader);
+    size_t string_pos = offsets_pos + (header.strings + 1) * sizeof(uint64_t);
+    size_t nodes_pos = snapshot_align(string_pos + header.string_bytes);
+    size_t ints_pos = nodes_pos + header.nodes * sizeof(SnapshotNode);
+    size_t doubles_pos = snapshot_align(ints_pos + header.ints * sizeof(int32_t));
+
+    buffer.assign(doubles_pos + header.doubles * sizeof(double), '\0');
+    char* data = &buffer[0];
+    memcpy(data, &header, sizeof(header));
+    uint64_t offset = 0;
+    for(size_t i = 0;i <= strings.size();i++){
+      memcpy(data + offsets_pos + i * sizeof(offset), &offset, sizeof(offset));
+      if(i < strings.size()){
+        memcpy(data + string_pos + offset, strings[i]->data(), strings[i]->size());
+        offset += strings[i]->size();
+      }
+    }
+    memcpy(data + nodes_pos, &nodes[0], nodes.size() * sizeof(SnapshotNode));
+    for(size_t i = 0;i < options.size();i++){
+      if(nodes[i].ints > 0){
+        memcpy(data + ints_pos + nodes[i].data_int * sizeof(int32_t), options[i]->get_data(), nodes[i].ints * sizeof(int32_t));
+      }
+      if(nodes[i].doubles > 0){
+        memcpy(data + doubles_pos + nodes[i].data_double * sizeof(double), options[i]->get_data(), nodes[i].doubles * sizeof(double));
+      }
     }
 
     return SPUD_NO_ERROR;
@@ -779,65 +2873,100 @@ namespace Spud{
     return is_attribute;
   }
 
-  void OptionManager::Option::list_children(const string& name, deque<string>& kids) const{
+  size_t OptionManager::Option::get_number_of_children() const{
     if(verbose)
-      cout << "void OptionManager::Option::list_children(const string& name = " << name << ", deque<string>& kids) const\n";
+      cout << "size_t OptionManager::Option::get_number_of_children(void) const\n";
+
+    return children.size();
+  }
 
-    kids.clear();
+  const OptionManager::Option* OptionManager::Option::get_child(const size_t& index, string& name) const{
+    if(verbose)
+      cout << "const OptionManager::Option* OptionManager::Option::get_child(const size_t& index = " << index << ", string& name) const\n";
 
-    const Option* descendant = get_child(name);
-    if(descendant != NULL){
-      for(deque< pair<string, Option*> >::const_iterator it = descendant->children.begin();it != descendant->children.end();it++){
-        kids.push_back(it->first);
-      }
+    if(index >= children.size()){
+      return NULL;
     }
 
-    return;
+    name = children[index].first;
+
+    return children[index].second;
   }
 
   size_t OptionManager::Option::count(const string& key) const{
-    size_t cnt=0;
-    for(deque< pair<string, Option*> >::const_iterator it=children.begin();it!=children.end();++it){
-      if(it->first == key)
-        cnt++;
+    if(child_index != NULL){
+      const vector<Option*>* matches = indexed(key);
+      return matches == NULL ? 0 : matches->size();
     }
-    return cnt;
-  }
 
-  deque< pair<string, OptionManager::Option*> >::iterator OptionManager::Option::find(const string& key){
-    for(deque< pair<string, Option*> >::iterator it=children.begin();it!=children.end();++it){
-      if(it->first == key)
-        return it;
+    size_t count = 0;
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      if(it->first == key){
+        count++;
+      }
     }
-    return children.end();
+
+    return count;
   }
 
-  deque< pair<string, OptionManager::Option*> >::const_iterator OptionManager::Option::find(const string& key) const{
-    for(deque< pair<string, Option*> >::const_iterator it=children.begin();it!=children.end();++it){
-      if(it->first == key)
-        return it;
+  void OptionManager::Option::find(const string& key, vector<Option*>& matches) const{
+    matches.clear();
+    if(child_index != NULL){
+      const vector<Option*>* indexed_matches = indexed(key);
+      if(indexed_matches == NULL){
+        indexed_matches = prefixed(key);
+      }
+      if(indexed_matches != NULL){
+        matches = *indexed_matches;
+      }
+      return;
     }
-    return children.end();
-  }
 
-  deque< pair<string, OptionManager::Option*> >::iterator OptionManager::Option::find_next(deque< pair<string, OptionManager::Option*> >::iterator current, const string& key){
-    deque< pair<string, OptionManager::Option*> >::iterator it = current;
-    it++;
-    for(;it!=children.end();++it){
-      if(it->first == key)
-        return it;
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      if(it->first == key){
+        matches.push_back(it->second);
+      }
+    }
+    if(matches.empty()){
+      for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+        if(has_key_prefix(it->first, key)){
+          matches.push_back(it->second);
+        }
+      }
     }
-    return children.end();
+
+    return;
   }
 
-  deque< pair<string, OptionManager::Option*> >::const_iterator OptionManager::Option::find_next(deque< pair<string, OptionManager::Option*> >::const_iterator current, const string& key) const{
-    deque< pair<string, Option*> >::const_iterator it = current;
-    it++;
-    for(;it!=children.end();++it){
-      if(it->first == key)
-        return it;
+  OptionManager::Option* OptionManager::Option::find(const string& key, const int& index) const{
+    size_t skip = index < 0 ? 0 : index;
+    if(child_index != NULL){
+      const vector<Option*>* matches = indexed(key);
+      if(matches == NULL){
+        matches = prefixed(key);
+      }
+      return matches != NULL and skip < matches->size() ? (*matches)[skip] : NULL;
+    }
+
+    logical_t exact = false;
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      if(it->first == key){
+        if(skip-- == 0){
+          return it->second;
+        }
+        exact = true;
+      }
+    }
+    if(exact){
+      return NULL;
+    }
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      if(has_key_prefix(it->first, key) and skip-- == 0){
+        return it->second;
+      }
     }
-    return children.end();
+
+    return NULL;
   }
 
   const OptionManager::Option* OptionManager::Option::get_child(const string& key) const{
@@ -858,39 +2987,13 @@ namespace Spud{
       return NULL;
     }
 
-    deque< pair<string, Option*> >::const_iterator it;
-    if(count(name) == 0){
-      name += "::";
-      int i = 0;
-      for(it = children.begin();it != children.end();it++){
-        if(it->first.compare(0, name.size(), name) == 0){
-          if(index < 0 or i == index){
-            break;
-          }else{
-            i++;
-          }
-        }
-      }
-    }else{
-      if(index < 0){
-        it = find(name);
-      }else{
-        it = find(name);
-        for(size_t i = 0;it!=children.end();i++){
-          if((int)i == index){
-            break;
-          }
-          it = find_next(it, name);
-        }
-      }
-    }
-
-    if(it == children.end()){
+    const Option* child = find(name, index);
+    if(child == NULL){
       return NULL;
     }else if(branch.empty()){
-      return it->second;
+      return child;
     }else{
-      return it->second->get_child(branch);
+      return child->get_child(branch);
     }
   }
 
@@ -898,11 +3001,7 @@ namespace Spud{
     if(verbose)
       cout << "OptionManager::Option* OptionManager::Option::get_child(const string& key = " << key <<")\n";
 
-    if(!have_option(key)){
-      return NULL;
-    }else{
-      return create_child(key);
-    }
+    return const_cast<Option*>(static_cast<const Option*>(this)->get_child(key));
   }
 
   int OptionManager::Option::option_count(const string& key) const{
@@ -920,39 +3019,61 @@ namespace Spud{
       return 0;
     }
 
-    logical_t match_whole = true;
-    if(!count(name)){
-      // Apparently there is no such child but lets check for "name::*"
-      name += "::";
-      match_whole = false;
+    // If there is no such child, find counts the children "name::*"
+    vector<Option*> matches;
+    find(name, matches);
+    vector<Option*>::const_iterator begin = matches.begin(), end = matches.end();
+    if(index >= 0){
+      if((size_t)index >= matches.size()){
+        return 0;
+      }
+      begin += index;
+      end = begin + 1;
     }
 
-    int count = 0, i = 0;
-    for(deque< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
-      if(it->first.compare(0, name.size(), name) == 0 and (not match_whole or it->first.size() == name.size())){
-        if(index < 0){
-          if(branch.empty()){
-            count++;
-          }else{
-            count += it->second->option_count(branch);
-          }
-        }else{
-          if(i == index){
-            if(branch.empty()){
-              count++;
-            }else{
-              count += it->second->option_count(branch);
-            }
-            break;
-          }
-          i++;
-        }
+    int count = 0;
+    for(vector<Option*>::const_iterator it = begin;it != end;it++){
+      if(branch.empty()){
+        count++;
+      }else{
+        count += (*it)->option_count(branch);
       }
     }
 
     return count;
   }
 
+  OptionError OptionManager::Option::find_options(const string& key, vector<string>& keys) const{
+    if(verbose)
+      cout << "OptionError OptionManager::Option::find_options(const string& key = " << key << ", vector<string>& keys) const\n";
+
+    keys.clear();
+
+    // Split the key once, rather than at every element visited
+    vector< pair<string, int> > segments;
+    string remainder = key, name, branch;
+    int index;
+    while(true){
+      OptionError key_err = split_name(remainder, name, index, branch);
+      if(key_err != SPUD_NO_ERROR){
+        return key_err;
+      }
+      if(name.empty()){
+        break;
+      }
+      segments.push_back(pair<string, int>(name, index));
+      remainder = branch;
+    }
+
+    if(segments.empty()){
+      keys.push_back("/");
+    }else{
+      find_options(segments, 0, "", keys);
+    }
+
+    return SPUD_NO_ERROR;
+  }
+
   logical_t OptionManager::Option::have_option(const string& key) const{
     if(verbose)
       cout << "logical_t OptionManager::Option::have_option(const string& key = " << key << ") const\n";
@@ -968,27 +3089,21 @@ namespace Spud{
     if(verbose)
       cout << "OptionType OptionManager::Option::get_option_type(void) const\n";
 
-    if(have_option("__value")){
-      return find("__value")->second->get_option_type();
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      return value->get_option_type();
     }
 
-    if(!data_double.empty()){
-      return SPUD_DOUBLE;
-    }else if(!data_int.empty()){
-      return SPUD_INT;
-    }else if(!data_string.empty()){
-      return SPUD_STRING;
-    }else{
-      return SPUD_NONE;
-    }
+    return data_type;
   }
 
   size_t OptionManager::Option::get_option_rank() const{
     if(verbose)
       cout << "size_t OptionManager::Option::get_option_rank(void) const\n";
 
-    if(have_option("__value")){
-      return find("__value")->second->get_option_rank();
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      return value->get_option_rank();
     }else{
       return rank;
     }
@@ -998,8 +3113,9 @@ namespace Spud{
     if(verbose)
       cout << "vector<int> OptionManager::Option::get_option_shape(void) const\n";
 
-    if(have_option("__value")){
-      return find("__value")->second->get_option_shape();
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      return value->get_option_shape();
     }else{
       vector<int> shape(2);
       shape[0] = this->shape[0];
@@ -1008,16 +3124,35 @@ namespace Spud{
     }
   }
 
+  void OptionManager::Option::get_option_data(OptionType& type, int& rank, vector<int>& shape, string& data) const{
+    if(verbose)
+      cout << "void OptionManager::Option::get_option_data(OptionType& type, int& rank, vector<int>& shape, string& data) const\n";
+
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      value->get_option_data(type, rank, shape, data);
+    }else{
+      type = data_type;
+      rank = this->rank;
+      shape.resize(2);
+      shape[0] = this->shape[0];
+      shape[1] = this->shape[1];
+      data.assign((const char*)get_data(), value_bytes(data_type) * data_size);
+    }
+  }
+
   OptionError OptionManager::Option::get_option(vector<double>& val) const{
     if(verbose)
       cout << "OptionError OptionManager::Option::get_option(vector<double>& val) const\n";
 
-    if(have_option("__value")){
-      return get_option("__value", val);
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      return value->get_option(val);
     }else if(get_option_type() != SPUD_DOUBLE){
       return SPUD_TYPE_ERROR;
     }else{
-      val = data_double;
+      const double* values = (const double*)get_data();
+      val.assign(values, values + data_size);
       return SPUD_NO_ERROR;
     }
   }
@@ -1026,12 +3161,14 @@ namespace Spud{
     if(verbose)
       cout << "OptionError OptionManager::Option::get_option(vector<int>& val) const\n";
 
-    if(have_option("__value")){
-      return get_option("__value", val);
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      return value->get_option(val);
     }else if(get_option_type() != SPUD_INT){
       return SPUD_TYPE_ERROR;
     }else{
-      val = data_int;
+      const int* values = (const int*)get_data();
+      val.assign(values, values + data_size);
       return SPUD_NO_ERROR;
     }
   }
@@ -1040,12 +3177,13 @@ namespace Spud{
     if(verbose)
       cout << "OptionError OptionManager::Option::get_option(string& val = " << val << ") const\n";
 
-    if(have_option("__value")){
-      return get_option("__value", val);
+    const Option* value = find("__value", -1);
+    if(value != NULL){
+      return value->get_option(val);
     }else if(get_option_type() != SPUD_STRING){
       return SPUD_TYPE_ERROR;
     }else{
-      val = data_string;
+      val.assign((const char*)get_data(), data_size);
       return SPUD_NO_ERROR;
     }
   }
@@ -1100,7 +3238,7 @@ namespace Spud{
     if(have_option("__value")){
       return set_option("__value", val, rank, shape);
     }else{
-      data_double = val;
+      set_data(SPUD_DOUBLE, val.data(), val.size());
       OptionError set_err = set_option_type(SPUD_DOUBLE);
       if(set_err != SPUD_NO_ERROR){
         return set_err;
@@ -1120,7 +3258,7 @@ namespace Spud{
     if(have_option("__value")){
       return set_option("__value", val, rank, shape);
     }else{
-      data_int = val;
+      set_data(SPUD_INT, val.data(), val.size());
       OptionError set_err = set_option_type(SPUD_INT);
       if(set_err != SPUD_NO_ERROR){
         return set_err;
@@ -1140,7 +3278,7 @@ namespace Spud{
     if(have_option("__value")){
       return set_option("__value", val);
     }else{
-      data_string = val;
+      set_data(SPUD_STRING, val.data(), val.size());
       vector<int> shape(2);
       shape[0] = val.size();  shape[1] = -1;
       OptionError set_err = set_option_type(SPUD_STRING);
@@ -1222,35 +3360,51 @@ namespace Spud{
     if(verbose)
       cout << "OptionError OptionManager::Option::copy_option(const string& key1 = " << key1 << ", const string& key2 = " << key2 << ")\n";
 
-    const Option* option1 = get_child(key1);
-    if(option1 == NULL){
-      return SPUD_KEY_ERROR;
-    }
-    
-    const Option* option2 = get_child(key2);
-    if(option2 != NULL){
+    if(get_child(key1) == NULL or get_child(key2) != NULL){
       return SPUD_KEY_ERROR;
     }
     
-    string::size_type lastPos = key2.find_last_not_of("/");
+    string::size_type lastPos = key1.find_last_not_of("/");
+    lastPos = key1.find_last_of("/", lastPos);
+    string key1_parent = lastPos == string::npos ? "" : key1.substr(0, lastPos);
+    string key1_name = key1.substr(lastPos == string::npos ? 0 : lastPos + 1);
+
+    lastPos = key2.find_last_not_of("/");
     lastPos = key2.find_last_of("/", lastPos);
     string key2_parent = key2.substr(0, lastPos);
     string key2_name = key2.substr(lastPos + 1);
+
+    Option* option1_parent = get_writable_child(key1_parent);
+    Option* option1 = option1_parent == NULL ? NULL : option1_parent->get_child(key1_name);
+    if(option1 == NULL){
+      return SPUD_KEY_ERROR;
+    }
+    // The copy shares the children of option1, so it cannot be placed below
+    // option1. Once option1 is not shared it can only be reached through key1,
+    // so this is the case only if key2 leads through it.
+    if(option1 != option1_parent){
+      option1 = option1_parent->unshare(option1);
+    }
+    if(leads_through(key2_parent, option1)){
+      return SPUD_KEY_ERROR;
+    }
     
     Option* option2_parent = create_child(key2_parent);
     if(option2_parent == NULL){
       return SPUD_KEY_ERROR;
     }
 
-    Option* new_option1 = new Option(*option1);
+    // The copy shares the children of option1 rather than copying them
+    Option* new_option1 = new_option(*option1);
+    new_option1->id = 0;
     new_option1->node_name = key2_name;
     string new_node_name, name_attr;
     new_option1->split_node_name(new_node_name, name_attr);
     if(name_attr.size() == 0){
-      option2_parent->children.push_back(pair<string, Option*>(new_node_name, new_option1));
+      option2_parent->add_child(new_node_name, new_option1);
     }else{
       new_option1->set_attribute("name", name_attr);
-      option2_parent->children.push_back(pair<string, Option*>(new_node_name + "::" + name_attr, new_option1));
+      option2_parent->add_child(new_node_name + "::" + name_attr, new_option1);
     }
          
     return SPUD_NO_ERROR;
@@ -1260,38 +3414,48 @@ namespace Spud{
     if(verbose)
       cout << "OptionError OptionManager::Option::move_option(const string& key1 = " << key1 << ", const string& key2 = " << key2 << ")\n";
 
-    const Option* option1 = get_child(key1);
-    if(option1 == NULL){
-      return SPUD_KEY_ERROR;
-    }
-    
-    const Option* option2 = get_child(key2);
-    if(option2 != NULL){
+    if(get_child(key1) == NULL or get_child(key2) != NULL){
       return SPUD_KEY_ERROR;
     }
     
-    string::size_type lastPos = key2.find_last_not_of("/");
+    string::size_type lastPos = key1.find_last_not_of("/");
+    lastPos = key1.find_last_of("/", lastPos);
+    string key1_parent = lastPos == string::npos ? "" : key1.substr(0, lastPos);
+    string key1_name = key1.substr(lastPos == string::npos ? 0 : lastPos + 1);
+
+    lastPos = key2.find_last_not_of("/");
     lastPos = key2.find_last_of("/", lastPos);
     string key2_parent = key2.substr(0, lastPos);
     string key2_name = key2.substr(lastPos + 1);
+
+    Option* option1_parent = get_writable_child(key1_parent);
+    Option* option1 = option1_parent == NULL ? NULL : option1_parent->get_child(key1_name);
+    if(option1 == NULL or option1 == option1_parent){
+      return SPUD_KEY_ERROR;
+    }
+    // Once option1 is not shared it can only be reached through key1, so it
+    // cannot be moved below itself if key2 does not lead through it
+    option1 = option1_parent->unshare(option1);
+    if(leads_through(key2_parent, option1)){
+      return SPUD_KEY_ERROR;
+    }
     
     Option* option2_parent = create_child(key2_parent);
     if(option2_parent == NULL){
       return SPUD_KEY_ERROR;
     }
 
-    Option* new_option1 = new Option(*option1);
-    new_option1->node_name = key2_name;
+    // Relink option1, rather than copying it and deleting the original
+    option1_parent->detach_child(option1);
+    option1->node_name = key2_name;
     string new_node_name, name_attr;
-    new_option1->split_node_name(new_node_name, name_attr);
+    option1->split_node_name(new_node_name, name_attr);
     if(name_attr.size() == 0){
-      option2_parent->children.push_back(pair<string, Option*>(new_node_name, new_option1));
+      option2_parent->add_child(new_node_name, option1);
     }else{
-      new_option1->set_attribute("name", name_attr);
-      option2_parent->children.push_back(pair<string, Option*>(new_node_name + "::" + name_attr, new_option1));
+      option1->set_attribute("name", name_attr);
+      option2_parent->add_child(new_node_name + "::" + name_attr, option1);
     }
-         
-    delete_option(key1);
     
     return SPUD_NO_ERROR;
   }
@@ -1310,23 +3474,9 @@ namespace Spud{
     if(opt == NULL){
       return SPUD_KEY_ERROR;
     }else if(branch.empty()){
-      deque< pair<string, Option*> >::iterator iter = find(name);
-      while(iter!=children.end()){
-        if(iter->second == opt){
-          children.erase(iter);
-          return SPUD_NO_ERROR;
-        }
-        iter = find_next(iter, name);
-      }
-      for(iter = children.begin();iter != children.end();iter++){
-        if(iter->second == opt){
-          children.erase(iter);
-          return SPUD_NO_ERROR;
-        }
-      }
-      return SPUD_KEY_ERROR;
+      return remove_child(opt) ? SPUD_NO_ERROR : SPUD_KEY_ERROR;
     }else{
-      return opt->delete_option(branch);
+      return unshare(opt)->delete_option(branch);
     }
   }
 
@@ -1336,16 +3486,16 @@ namespace Spud{
 
     if(children.empty()){
       cout << ": ";
-      if(!data_double.empty()){
-        for(vector<double>::const_iterator i = data_double.begin();i != data_double.end();++i){
-          cout << *i << " ";
+      if(data_type == SPUD_DOUBLE){
+        for(size_t i = 0;i < data_size;i++){
+          cout << ((const double*)get_data())[i] << " ";
         }
-      }else if(!data_int.empty()){
-        for(vector<int>::const_iterator i=data_int.begin();i != data_int.end();++i){
-          cout << *i << " ";
+      }else if(data_type == SPUD_INT){
+        for(size_t i = 0;i < data_size;i++){
+          cout << ((const int*)get_data())[i] << " ";
         }
-      }else if(!data_string.empty()){
-        cout << data_string;
+      }else if(data_type == SPUD_STRING){
+        cout.write((const char*)get_data(), data_size);
       }else{
         cout << "NULL";
       }
@@ -1353,23 +3503,24 @@ namespace Spud{
     }else{
       cout << "/" << endl;
 
-      if(!data_double.empty()){
+      if(data_type == SPUD_DOUBLE){
         cout << lprefix << "<value>: ";
-        for(vector<double>::const_iterator i = data_double.begin();i != data_double.end();++i){
-          cout << *i<< " ";
+        for(size_t i = 0;i < data_size;i++){
+          cout << ((const double*)get_data())[i] << " ";
         }
         cout << endl;
-      }else if(!data_int.empty()){
+      }else if(data_type == SPUD_INT){
         cout << lprefix << "<value>: ";
-        for(vector<int>::const_iterator i=data_int.begin();i!=data_int.end();++i){
-          cout << *i << " ";
+        for(size_t i = 0;i < data_size;i++){
+          cout << ((const int*)get_data())[i] << " ";
         }
         cout << endl;
-      }else if(!data_string.empty()){
-        cout << lprefix << "<value>: " << data_string;
+      }else if(data_type == SPUD_STRING){
+        cout << lprefix << "<value>: ";
+        cout.write((const char*)get_data(), data_size);
         cout << endl;
       }
-      for(deque< pair<string, Option*> >::const_iterator i = children.begin();i!=children.end();++i){
+      for(vector< pair<string, Option*> >::const_iterator i = children.begin();i!=children.end();++i){
         i->second->print(lprefix + " ");
       }
     }
@@ -1377,6 +3528,48 @@ namespace Spud{
     return;
   }
 
+  OptionManager::Option* OptionManager::Option::get_writable_child(const string& key){
+    if(verbose)
+      cout << "OptionManager::Option* OptionManager::Option::get_writable_child(const string& key = " << key << ")\n";
+
+    if(key == "/" or key.empty())
+      return this;
+
+    string name, branch;
+    int index;
+    OptionError key_err = split_name(key, name, index, branch);
+    if(key_err != SPUD_NO_ERROR or name.empty()){
+      return NULL;
+    }
+
+    Option* child = find(name, index);
+    if(child == NULL){
+      return NULL;
+    }
+    child = unshare(child);
+
+    return branch.empty() ? child : child->get_writable_child(branch);
+  }
+
+  unsigned long OptionManager::Option::get_id() const{
+    return id;
+  }
+
+  void OptionManager::Option::set_id(const unsigned long& id){
+    this->id = id;
+
+    return;
+  }
+
+  void OptionManager::Option::memory_stats(MemoryStats& stats) const{
+    unordered_map<const Option*, size_t> visited;
+    size_t bytes = stats.bytes;
+    size_t unshared_bytes = memory_stats(stats, visited);
+    stats.saved_bytes += unshared_bytes - (stats.bytes - bytes);
+
+    return;
+  }
+
   void OptionManager::Option::verbose_on(){
     cout << "void OptionManager::Option::verbose_on(void)\n";
 
@@ -1407,60 +3600,322 @@ namespace Spud{
       return NULL;
     }
 
-    deque< pair<string, Option*> >::iterator child;
-    if(count(name) == 0){
-      string name2 = name + "::";
-      int i = 0;
-      for(child = children.begin();child != children.end();child++){
-        if(child->first.compare(0, name2.size(), name2) == 0){
-          if(index < 0 or i == index){
-            break;
-          }else{
-            i++;
-          }
-        }
-      }
-      if(child == children.end()){
+    Option* child = find(name, index);
+    if(child != NULL){
+      child = unshare(child);
+    }else{
+      if(count(name) == 0){
         if(name == "__value" and get_option_type() != SPUD_NONE){
           cerr << "SPUD WARNING: Creating __value child for non null element - deleting parent data" << endl;
           set_option_type(SPUD_NONE);
         }
-        children.push_back(pair<string, Option*>(name, new Option(name)));
+        child = new_option(name);
+        add_child(name, child);
         string new_node_name, name_attr;
-        child = children.end(); child--;
-        child->second->split_node_name(new_node_name, name_attr);
+        child->split_node_name(new_node_name, name_attr);
         if(name_attr.size() > 0){
-          child->second->set_attribute("name", name_attr);
+          child->set_attribute("name", name_attr);
         }
         is_attribute = false;
+      }else if(index == (int)count(name)){
+        child = new_option(name);
+        add_child(name, child);
+        is_attribute = false;
       }
+    }
+
+    if(child == NULL){
+      return NULL;
+    }else if(branch.empty()){
+      return child;
     }else{
-      if(index < 0){
-        child = find(name);
+      return child->create_child(branch);
+    }
+  }
+
+  void OptionManager::Option::add_child(const string& key, Option* child){
+    children.push_back(pair<string, Option*>(key, child));
+    if(child_index != NULL){
+      index_child(key, child);
+    }else if(children.size() > CHILD_INDEX_THRESHOLD){
+      child_index = new ChildIndex();
+      for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+        index_child(it->first, it->second);
+      }
+    }
+    changes++;
+
+    return;
+  }
+
+  logical_t OptionManager::Option::remove_child(const Option* child){
+    if(!detach_child(child)){
+      return false;
+    }
+    release(const_cast<Option*>(child));
+
+    return true;
+  }
+
+  logical_t OptionManager::Option::detach_child(const Option* child){
+    for(vector< pair<string, Option*> >::iterator iter = children.begin();iter != children.end();iter++){
+      if(iter->second == child){
+        if(child_index != NULL){
+          unindex_child(iter->first, child);
+        }
+        children.erase(iter);
+        changes++;
+        return true;
+      }
+    }
+
+    return false;
+  }
+
+  OptionManager::Option* OptionManager::Option::new_option(const string& name) const{
+    Option* option = pool == NULL ? new Option(name) : new(pool->allocate()) Option(name);
+    option->pool = pool;
+
+    return option;
+  }
+
+  OptionManager::Option* OptionManager::Option::new_option(const Option& option) const{
+    Option* copy = pool == NULL ? new Option(option) : new(pool->allocate()) Option(option);
+    copy->pool = pool;
+
+    return copy;
+  }
+
+  void OptionManager::Option::release(Option* option){
+    if(--option->refs == 0){
+      OptionPool* pool = option->pool;
+      if(pool == NULL){
+        delete option;
       }else{
-        child = find(name);
-        size_t i;
-        for(i = 0;child != children.end();i++){
-          if((int)i == index){
-            break;
+        option->~Option();
+        pool->deallocate(option);
+      }
+    }
+
+    return;
+  }
+
+  OptionManager::Option* OptionManager::Option::unshare(Option* child){
+    if(child->refs == 1){
+      return child;
+    }
+
+    // Take a copy of the child, itself sharing the grandchildren, in place of
+    // the shared child
+    Option* copy = new_option(*child);
+    for(vector< pair<string, Option*> >::iterator iter = children.begin();iter != children.end();iter++){
+      if(iter->second == child){
+        iter->second = copy;
+        if(child_index != NULL){
+          vector<Option*>& matches = child_index->keys[iter->first];
+          std::replace(matches.begin(), matches.end(), child, copy);
+          for(string::size_type pos = iter->first.find("::");pos != string::npos;pos = iter->first.find("::", pos + 1)){
+            vector<Option*>& prefix_matches = child_index->prefixes[iter->first.substr(0, pos)];
+            std::replace(prefix_matches.begin(), prefix_matches.end(), child, copy);
           }
-          child = find_next(child, name);
-        }
-        if(child == children.end() and index == (int)i){
-          children.push_back(pair<string, Option*>(name, new Option(name)));
-          child = children.end(); child--;
-          is_attribute = false;
         }
+        break;
+      }
+    }
+    child->refs--;
+    changes++;
+
+    return copy;
+  }
+
+  logical_t OptionManager::Option::leads_through(const string& key, const Option* option) const{
+    if(this == option){
+      return true;
+    }
+
+    string name, branch;
+    int index;
+    OptionError key_err = split_name(key, name, index, branch);
+    if(key_err != SPUD_NO_ERROR or name.empty()){
+      return false;
+    }
+
+    const Option* child = find(name, index);
+    return child != NULL and child->leads_through(branch, option);
+  }
+
+  size_t OptionManager::Option::memory_stats(MemoryStats& stats, unordered_map<const Option*, size_t>& visited) const{
+    if(refs > 1){
+      unordered_map<const Option*, size_t>::const_iterator it = visited.find(this);
+      if(it != visited.end()){
+        return it->second;
+      }
+    }
+
+    size_t node_bytes = pool == NULL ? sizeof(Option) : OptionPool::slot_size;
+    size_t name_bytes = heap_bytes(node_name);
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      name_bytes += heap_bytes(it->first);
+    }
+    size_t child_bytes = children.capacity() * sizeof(pair<string, Option*>);
+    if(child_index != NULL){
+      child_bytes += sizeof(ChildIndex) + index_bytes(child_index->keys) + index_bytes(child_index->prefixes);
+    }
+    size_t data_bytes = value_bytes(data_type) * data_size;
+    if(data_bytes <= sizeof(payload)){
+      data_bytes = 0;
+    }
+
+    size_t bytes = node_bytes + name_bytes + child_bytes + data_bytes;
+    stats.nodes++;
+    stats.bytes += bytes;
+    stats.node_bytes += node_bytes;
+    stats.name_bytes += name_bytes;
+    stats.child_bytes += child_bytes;
+    stats.data_bytes += data_bytes;
+
+    // The memory the children would use if none were shared
+    size_t unshared_bytes = bytes;
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      unshared_bytes += it->second->memory_stats(stats, visited);
+    }
+
+    if(refs > 1){
+      stats.shared_nodes++;
+      visited[this] = unshared_bytes;
+    }
+
+    return unshared_bytes;
+  }
+
+  void OptionManager::Option::index_child(const string& key, Option* child){
+    child_index->keys[key].push_back(child);
+    for(string::size_type pos = key.find("::");pos != string::npos;pos = key.find("::", pos + 1)){
+      child_index->prefixes[key.substr(0, pos)].push_back(child);
+    }
+
+    return;
+  }
+
+  void OptionManager::Option::unindex_child(const string& key, const Option* child){
+    vector<Option*>& matches = child_index->keys[key];
+    matches.erase(std::find(matches.begin(), matches.end(), child));
+    if(matches.empty()){
+      child_index->keys.erase(key);
+    }
+    for(string::size_type pos = key.find("::");pos != string::npos;pos = key.find("::", pos + 1)){
+      vector<Option*>& prefix_matches = child_index->prefixes[key.substr(0, pos)];
+      prefix_matches.erase(std::find(prefix_matches.begin(), prefix_matches.end(), child));
+      if(prefix_matches.empty()){
+        child_index->prefixes.erase(key.substr(0, pos));
       }
     }
 
-    if(child == children.end()){
+    return;
+  }
+
+  vector<OptionManager::Option*>* OptionManager::Option::indexed(const string& key) const{
+    if(child_index == NULL){
       return NULL;
-    }else if(branch.empty()){
-      return child->second;
-    }else{
-      return child->second->create_child(branch);
     }
+    unordered_map< string, vector<Option*> >::iterator it = child_index->keys.find(key);
+
+    return it == child_index->keys.end() ? NULL : &it->second;
+  }
+
+  vector<OptionManager::Option*>* OptionManager::Option::prefixed(const string& prefix) const{
+    if(child_index == NULL){
+      return NULL;
+    }
+    unordered_map< string, vector<Option*> >::iterator it = child_index->prefixes.find(prefix);
+
+    return it == child_index->prefixes.end() ? NULL : &it->second;
+  }
+
+  logical_t OptionManager::Option::has_prefix(const string& prefix) const{
+    if(child_index != NULL){
+      return prefixed(prefix) != NULL;
+    }
+
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      if(has_key_prefix(it->first, prefix)){
+        return true;
+      }
+    }
+
+    return false;
+  }
+
+  void OptionManager::Option::find_options(const vector< pair<string, int> >& segments, const size_t& depth, const string& path, vector<string>& keys) const{
+    if(depth == segments.size()){
+      keys.push_back(path);
+      return;
+    }
+
+    const string& name = segments[depth].first;
+    const int& index = segments[depth].second;
+
+    // An exact name is looked up in the index; the children of a wildcard
+    // segment, or of a name only matching children "name::*", are found by a
+    // scan in document order
+    vector<Option*> matches;
+    string prefix;
+    if(name.size() > 3 and name.compare(name.size() - 3, 3, "::*") == 0){
+      prefix = name.substr(0, name.size() - 1);
+      if(!has_prefix(name.substr(0, name.size() - 3))){
+        return;
+      }
+    }else if(name != "*"){
+      if(count(name) == 0){
+        if(!has_prefix(name)){
+          return;
+        }
+        prefix = name + "::";
+      }else{
+        find(name, matches);
+      }
+    }
+
+    if(!matches.empty()){
+      for(size_t i = 0;i < matches.size();i++){
+        if(index >= 0 and (size_t)index != i){
+          continue;
+        }
+        string child_path = path + "/" + name;
+        if(matches.size() > 1){
+          child_path += "[" + to_string(i) + "]";
+        }
+        matches[i]->find_options(segments, depth + 1, child_path, keys);
+      }
+      return;
+    }
+
+    // Repeated keys are disambiguated by their index among the children
+    // stored under the same key
+    unordered_map<string, int> repeats;
+    int match = 0;
+    for(vector< pair<string, Option*> >::const_iterator it = children.begin();it != children.end();it++){
+      if(it->first.compare(0, prefix.size(), prefix) != 0 or it->first.size() == prefix.size()){
+        continue;
+      }
+      int repeat = -1;
+      if(count(it->first) > 1){
+        repeat = repeats[it->first]++;
+      }
+      if(index >= 0 and index != match++){
+        continue;
+      }
+      string child_path = path + "/" + it->first;
+      if(repeat >= 0){
+        child_path += "[" + to_string(repeat) + "]";
+      }
+      it->second->find_options(segments, depth + 1, child_path, keys);
+      if(index >= 0){
+        return;
+      }
+    }
+
+    return;
   }
 
   OptionError OptionManager::Option::set_rank_and_shape(const int& rank, const vector<int>& shape){
@@ -1528,61 +3983,86 @@ namespace Spud{
 
     switch(option_type){
       case(SPUD_DOUBLE):
-        data_int.clear();
-        data_string = "";
-        is_attribute = false;
-        break;
       case(SPUD_INT):
-        data_double.clear();
-        data_string = "";
-        is_attribute = false;
-        break;
       case(SPUD_NONE):
-        data_double.clear();
-        data_int.clear();
-        data_string = "";
         is_attribute = false;
         break;
       case(SPUD_STRING):
-        data_double.clear();
-        data_int.clear();
         break;
       default:
         return SPUD_TYPE_ERROR;
     }
+    if(data_type != option_type){
+      set_data(SPUD_NONE, NULL, 0);
+    }
 
     return SPUD_NO_ERROR;
   }
 
-  void OptionManager::Option::parse_node(const string& root, const TiXmlNode* node){
+  void OptionManager::Option::set_data(const OptionType& type, const void* values, const size_t& size){
+    void* data = allocate_data(type, size);
+    if(data != NULL){
+      memcpy(data, values, value_bytes(type) * size);
+    }
+
+    return;
+  }
+
+  void* OptionManager::Option::allocate_data(const OptionType& type, const size_t& size){
+    size_t bytes = value_bytes(type) * size;
+    if(value_bytes(data_type) * data_size > sizeof(payload)){
+      free(payload.values);
+    }
+
+    if(bytes == 0){
+      data_type = SPUD_NONE;
+      data_size = 0;
+      return NULL;
+    }
+
+    data_type = type;
+    data_size = size;
+    if(bytes <= sizeof(payload)){
+      return payload.bytes;
+    }
+
+    payload.values = malloc(bytes);
+    if(payload.values == NULL){
+      cerr << "SPUD ERROR: Failed to allocate option data" << endl;
+      exit(-1);
+    }
+
+    return payload.values;
+  }
+
+  const void* OptionManager::Option::get_data() const{
+    return value_bytes(data_type) * data_size > sizeof(payload) ? payload.values : payload.bytes;
+  }
+
+  void OptionManager::Option::parse_node(const TiXmlNode* node){
     if(verbose)
-      cout << "void OptionManager::Option::parse_node(const string& root = " << root << ", const TiXmlNode* node)\n";
+      cout << "void OptionManager::Option::parse_node(const TiXmlNode* node = " << node->ValueStr() << ")\n";
 
     // Should only deal with TiXmlNode::ELEMENT types
     if(node->Type() != TiXmlNode::ELEMENT){
-      cerr << "SPUD WARNING - Non-element: " << root << " encountered" << endl;
+      cerr << "SPUD WARNING - Non-element: " << node->ValueStr() << " encountered" << endl;
       return;
     }
 
     const TiXmlElement* element = node->ToElement();
 
-    // Establish new base name of this node
-    string basename = root + "/" + node->ValueStr();
+    // Establish the key of this node relative to its parent
+    string name = node->ValueStr();
     if(element->Attribute("name")){
-      basename = basename + "::" + element->Attribute("name");
+      name = name + "::" + element->Attribute("name");
     }
 
-    // Ensure this path has been added
-    Option* child = create_child(basename);
-    if(child == NULL){
-      cerr << "SPUD ERROR: Unexpected failure when creating child element" << endl;
-      exit(-1);
-    }
+    // Ensure this child has been added
+    Option* child = load_child(name);
 
     // Store node attributes
     for(const TiXmlAttribute* att = element->FirstAttribute();att;att = att->Next()){
-      string att_name(basename + "/" + att->Name());
-      set_attribute(att_name, att->ValueStr());
+      child->load_attribute(att->Name(), att->ValueStr());
     }
 
     // Loop through all child elements
@@ -1592,7 +4072,7 @@ namespace Spud{
           break;
         case(TiXmlNode::TEXT):
           // Store node data
-          set_option(basename, cnode->ValueStr());
+          child->set_option(cnode->ValueStr());
           continue;
         default:
           continue;
@@ -1600,170 +4080,185 @@ namespace Spud{
 
       // Special case when the child of cnode is empty
       if(!cnode->FirstChild()){
-        parse_node(basename, cnode);
+        child->parse_node(cnode);
         continue;
       }
 
       const TiXmlElement* celement = cnode->ToElement();
 
+      Option* value = NULL;
       if(cnode->ValueStr() == string("integer_value")){
-        // Tokenise the data stored and convert to ints
-        vector<string> tokens;
-        tokenize(cnode->FirstChild()->ValueStr(), tokens);
+        // Parse the data straight into the __value element
+        value = child->load_child("__value");
+        const string& text = cnode->FirstChild()->ValueStr();
+        size_t size = count_tokens(text);
+        parse_ints(text, (int*)value->allocate_data(SPUD_INT, size));
 
-        // Find shape and rank
         int rank;
-        vector<int> shape(2);
-        istringstream(celement->Attribute("rank")) >> rank;
-        if(rank == 0){
-          shape[0] = -1;  shape[1] = -1;
-        }else if(rank == 1){
-          shape[0] = tokens.size();  shape[1] = -1;
-        }else if(rank == 2){
-          istringstream(celement->Attribute("shape")) >> shape[0] >> shape[1];
-        }
-
-        vector<int> val;
-        val.resize(tokens.size());
-        for(size_t i = 0;i<tokens.size();i++){
-          istringstream(tokens[i]) >> val[i];
-        }
+        vector<int> shape;
+        parse_rank_and_shape(celement, size, rank, shape);
 
-        set_option(basename + "/__value", val, rank, shape);
-        for(const TiXmlAttribute* att = celement->FirstAttribute();att;att = att->Next()){
-          string att_name(basename + "/__value/" + att->Name());
-          set_attribute(att_name, att->ValueStr());
-        }
+        value->set_option_type(SPUD_INT);
+        value->set_rank_and_shape(rank, shape);
       }else if(cnode->ValueStr() == string("real_value")){
-        // Tokenise the data stored and convert to doubles
-        vector<string> tokens;
-        tokenize(cnode->FirstChild()->ValueStr(), tokens);
+        // Parse the data straight into the __value element
+        value = child->load_child("__value");
+        const string& text = cnode->FirstChild()->ValueStr();
+        size_t size = count_tokens(text);
+        parse_doubles(text, (double*)value->allocate_data(SPUD_DOUBLE, size));
 
-        // Find shape and rank
         int rank;
-        vector<int> shape(2);
-        istringstream(celement->Attribute("rank")) >> rank;
-        if(rank == 0){
-          shape[0] = -1;  shape[1] = -1;
-        }else if(rank == 1){
-          shape[0] = tokens.size();  shape[1] = -1;
-        }else if(rank == 2){
-          istringstream(celement->Attribute("shape")) >> shape[0] >> shape[1];
-        }
-
-        vector<double> val;
-        val.resize(tokens.size());
-        for(size_t i = 0;i<tokens.size();i++){
-          for(size_t j = 0;j < tokens[i].size();j++){
-            tokens[i][j] = tolower(tokens[i][j]);
-          }
-          if(tokens[i] == "nan"){
-            val[i] = numeric_limits<double>::quiet_NaN();
-          }else if(tokens[i] == "inf"){
-            val[i] = numeric_limits<double>::infinity();
-          }else if(tokens[i] == "-inf"){
-            val[i] = -numeric_limits<double>::infinity();
-          }else{
-            istringstream(tokens[i]) >> val[i];
-          }
-        }
+        vector<int> shape;
+        parse_rank_and_shape(celement, size, rank, shape);
 
-        set_option(basename + "/__value", val, rank, shape);
-        for(const TiXmlAttribute* att = celement->FirstAttribute();att;att = att->Next()){
-          string att_name(basename + "/__value/" + att->Name());
-          set_attribute(att_name, att->ValueStr());
-        }
+        value->set_option_type(SPUD_DOUBLE);
+        value->set_rank_and_shape(rank, shape);
       }else if(cnode->ValueStr() == string("string_value")){
-        set_option(basename + "/__value", cnode->FirstChild()->ValueStr());
-        for(const TiXmlAttribute* att = celement->FirstAttribute();att;att = att->Next()){
-          string att_name(basename + "/__value/" + att->Name());
-          set_attribute(att_name, att->ValueStr());
-        }
+        value = child->load_child("__value");
+        value->set_option(cnode->FirstChild()->ValueStr());
       }else{
-        parse_node(basename, cnode);
+        child->parse_node(cnode);
+        continue;
+      }
+
+      for(const TiXmlAttribute* att = celement->FirstAttribute();att;att = att->Next()){
+        value->load_attribute(att->Name(), att->ValueStr());
+      }
+    }
+  }
+
+  OptionManager::Option* OptionManager::Option::load_child(const string& name){
+    Option* child = find(name, -1);
+    if(child != NULL){
+      child = unshare(child);
+    }else{
+      if(name == "__value" and get_option_type() != SPUD_NONE){
+        cerr << "SPUD WARNING: Creating __value child for non null element - deleting parent data" << endl;
+        set_option_type(SPUD_NONE);
       }
+      child = new_option(name);
+      add_child(name, child);
+      is_attribute = false;
     }
+
+    return child;
+  }
+
+  void OptionManager::Option::load_attribute(const string& name, const string& val){
+    Option* att = load_child(name);
+    att->set_option(val);
+    att->set_is_attribute(true);
+
+    return;
   }
 
-  TiXmlElement* OptionManager::Option::to_element() const{
+  void OptionManager::Option::write_element(FILE* file, const int& depth) const{
     if(verbose)
-      cout << "TiXmlElement* OptionManager::Option:to_element(void) const\n";
+      cout << "void OptionManager::Option::write_element(FILE* file, const int& depth = " << depth << ") const\n";
 
     if(is_attribute){
       cerr << "SPUD WARNING: Converting an attribute to an element" << endl;
     }
 
-    // Create new element
-    TiXmlElement* ele = new TiXmlElement(node_name);
-
-    // Set element name and name attribute if composite name
-    string node_name, name_attr;
-    split_node_name(node_name, name_attr);
+    // Element name and name attribute if composite name
+    string element_name, name_attr;
+    split_node_name(element_name, name_attr);
+    vector< pair<string, string> > attributes;
     if(name_attr.size() > 0){
-      ele->SetValue(node_name);
-      ele->SetAttribute("name", name_attr);
+      attributes.push_back(pair<string, string>("name", name_attr));
     }
 
-    // Set data
-    TiXmlText* data_ele = new TiXmlText("");
-    data_ele->SetValue(data_as_string());
-    ele->LinkEndChild(data_ele);
+    // Data sub-elements are named for their type
+    if(depth > 0 and this->node_name == "__value"){
+      switch(get_option_type()){
+        case(SPUD_DOUBLE):
+          element_name = "real_value";
+          break;
+        case(SPUD_INT):
+          element_name = "integer_value";
+          break;
+        case(SPUD_NONE):
+          break;
+        case(SPUD_STRING):
+          element_name = "string_value";
+          break;
+        default:
+          cerr << "SPUD ERROR: Invalid option type" << endl;
+          exit(-1);
+      }
+    }
 
-    for(deque< pair<string, Option*> >::const_iterator iter = children.begin();iter != children.end();iter++){
-      if(iter->second->is_attribute){
-        // Add attribute
-        ele->SetAttribute(iter->second->node_name, iter->second->data_as_string());
+    // Attributes, where a later attribute with the same name replaces the
+    // value of an earlier one
+    logical_t has_elements = false;
+    for(vector< pair<string, Option*> >::const_iterator iter = children.begin();iter != children.end();iter++){
+      if(!iter->second->is_attribute){
+        has_elements = true;
+        continue;
+      }
+      vector< pair<string, string> >::iterator attribute = attributes.begin();
+      while(attribute != attributes.end() and attribute->first != iter->second->node_name){
+        attribute++;
+      }
+      if(attribute == attributes.end()){
+        attributes.push_back(pair<string, string>(iter->second->node_name, iter->second->data_as_string()));
       }else{
-        TiXmlElement* child_ele = iter->second->to_element();
-        if(iter->second->node_name == "__value"){
-          // Detect data sub-element
-          switch(iter->second->get_option_type()){
-            case(SPUD_DOUBLE):
-              child_ele->SetValue("real_value");
-              break;
-            case(SPUD_INT):
-              child_ele->SetValue("integer_value");
-              break;
-            case(SPUD_NONE):
-              break;
-            case(SPUD_STRING):
-              child_ele->SetValue("string_value");
-              break;
-            default:
-              cerr << "SPUD ERROR: Invalid option type" << endl;
-              exit(-1);
-           }
-        }
-        // Add child
-        ele->LinkEndChild(child_ele);
+        attribute->second = iter->second->data_as_string();
       }
     }
-    return ele;
-  }
-
-  void OptionManager::Option::tokenize(const string& str, vector<string>& tokens, const string& delimiters) const{
-    if(verbose)
-      cout << "void OptionManager::Option::tokenize(const string& str = " << str << ", vector<string>& tokens, const string& delimiters = " << delimiters << ")\n";
-
-    tokens.clear();
-
-    // Skip delimiters at beginning.
-    string::size_type lastPos = str.find_first_not_of(delimiters, 0);
 
-    // Find first "non-delimiter".
-    string::size_type pos     = str.find_first_of(delimiters, lastPos);
-
-    while (string::npos != pos || string::npos != lastPos){
-      // Found a token, add it to the vector.
-      tokens.push_back(str.substr(lastPos, pos - lastPos));
+    for(int i = 0;i < depth;i++){
+      fputs("    ", file);
+    }
+    fputc('<', file);
+    fputs(element_name.c_str(), file);
+    for(vector< pair<string, string> >::const_iterator attribute = attributes.begin();attribute != attributes.end();attribute++){
+      char quote = attribute->second.find('"') == string::npos ? '"' : '\'';
+      fputc(' ', file);
+      write_escaped(file, attribute->first);
+      fputc('=', file);
+      fputc(quote, file);
+      write_escaped(file, attribute->second);
+      fputc(quote, file);
+    }
+    fputc('>', file);
 
-      // Skip delimiters.  Note the "not_of"
-      lastPos = str.find_first_not_of(delimiters, pos);
+    // Data
+    switch(get_option_type()){
+      case(SPUD_DOUBLE):
+        write_values(file, (const double*)get_data(), data_size, numeric_limits< double >::digits10);
+        break;
+      case(SPUD_INT):
+        write_values(file, (const int*)get_data(), data_size, 0);
+        break;
+      case(SPUD_NONE):
+        break;
+      case(SPUD_STRING):
+        write_escaped(file, string((const char*)get_data(), data_size));
+        break;
+      default:
+        cerr << "SPUD ERROR: Invalid option type" << endl;
+        exit(-1);
+    }
 
-      // Find next "non-delimiter"
-      pos = str.find_first_of(delimiters, lastPos);
+    // Child elements, each on its own line
+    if(has_elements){
+      for(vector< pair<string, Option*> >::const_iterator iter = children.begin();iter != children.end();iter++){
+        if(!iter->second->is_attribute){
+          fputc('\n', file);
+          iter->second->write_element(file, depth + 1);
+        }
+      }
+      fputc('\n', file);
+      for(int i = 0;i < depth;i++){
+        fputs("    ", file);
+      }
     }
 
+    fputs("</", file);
+    fputs(element_name.c_str(), file);
+    fputc('>', file);
+
     return;
   }
 
@@ -1838,29 +4333,15 @@ namespace Spud{
     if(verbose)
       cout << "string OptionManager::Option::data_as_string(void) const\n";
 
-    ostringstream data_as_string;
-    data_as_string.precision(numeric_limits< double >::digits10);
     switch(get_option_type()){
       case(SPUD_DOUBLE):
-        for(unsigned int i = 0;i < data_double.size();i++){
-          data_as_string << data_double[i];
-          if(i < data_double.size() - 1){
-            data_as_string << " ";
-          }
-        }
-        return data_as_string.str();
+        return format_values((const double*)get_data(), data_size, numeric_limits< double >::digits10);
       case(SPUD_INT):
-        for(unsigned int i = 0;i < data_int.size();i++){
-          data_as_string << data_int[i];
-          if(i < data_int.size() - 1){
-            data_as_string << " ";
-          }
-        }
-        return data_as_string.str();
+        return format_values((const int*)get_data(), data_size, 0);
       case(SPUD_NONE):
         return "";
       case(SPUD_STRING):
-        return data_string;
+        return string((const char*)get_data(), data_size);
       default:
         cerr << "SPUD ERROR: Invalid option type" << endl;
         exit(-1);
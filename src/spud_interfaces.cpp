@@ -28,40 +28,207 @@
 #include "spud.h"
 #include "spud"
 
+#include <climits>
+#include <cstdlib>
+#include <cstring>
+
 using namespace std;
 
 using namespace Spud;
 
+// The context passed through the C interface, where NULL is the default
+// context
+
+static OptionContext& context_of(void* context){
+  if(context == NULL){
+    return OptionManager::default_context();
+  }
+
+  return *((OptionContext*)context);
+}
+
+// Copy option data into, or out of, the raw buffers passed through the C
+// interface. Key is either a string key or an OptionHandle.
+
+template<class Key>
+static int get_option_data(OptionContext& context, const Key& key_handle, void* val){
+  OptionType type;
+  int rank;
+  vector<int> shape;
+  string data;
+  OptionError get_err = context.get_option_data(key_handle, type, rank, shape, data);
+  if(get_err != SPUD_NO_ERROR){
+    return get_err;
+  }
+
+  if(type == SPUD_DOUBLE or type == SPUD_INT){
+    if(rank < 0 or rank > 2){
+      return SPUD_RANK_ERROR;
+    }
+  }else if(type != SPUD_STRING){
+    return SPUD_TYPE_ERROR;
+  }
+  memcpy(val, data.data(), data.size());
+
+  return SPUD_NO_ERROR;
+}
+
+template<class Key>
+static int set_option_data(OptionContext& context, const Key& key_handle, const void* val, const int type, const int rank, const int* shape){
+  if(type == SPUD_DOUBLE){
+    if(rank == 0){
+      double val_handle = *((double*)val);
+      return context.set_option(key_handle, val_handle);
+    }else if(rank == 1){
+      vector<double> val_handle;
+      for(int i = 0;i < shape[0];i++){
+        val_handle.push_back(((double*)val)[i]);
+      }
+      return context.set_option(key_handle, val_handle);
+    }else if(rank == 2){
+      vector< vector<double> > val_handle;
+      for(int i = 0;i < shape[0];i++){
+        val_handle.push_back(vector<double>());
+        for(int j = 0;j < shape[1];j++){
+          val_handle[i].push_back(((double*)val)[i * val_handle[0].size() + j]);
+        }
+      }
+      return context.set_option(key_handle, val_handle);
+    }else{
+      return SPUD_RANK_ERROR;
+    }
+  }else if(type == SPUD_INT){
+    if(rank == 0){
+      int val_handle = *((int*)val);
+      return context.set_option(key_handle, val_handle);
+    }else if(rank == 1){
+      vector<int> val_handle;
+      for(int i = 0;i < shape[0];i++){
+        val_handle.push_back(((int*)val)[i]);
+      }
+      return context.set_option(key_handle, val_handle);
+    }else if(rank == 2){
+      vector< vector<int> > val_handle;
+      for(int i = 0;i < shape[0];i++){
+        val_handle.push_back(vector<int>());
+        for(int j = 0;j < shape[1];j++){
+          val_handle[i].push_back(((int*)val)[i * val_handle[0].size() + j]);
+        }
+      }
+      return context.set_option(key_handle, val_handle);
+    }else{
+      return SPUD_RANK_ERROR;
+    }
+  }else if(type == SPUD_STRING){
+    return context.set_option(key_handle, string((char*)val, shape[0]));
+  }else{
+    return SPUD_TYPE_ERROR;
+  }
+}
+
+// Copy a buffer written by libspud into newly allocated memory, to be
+// released with spud_free_buffer
+static int copy_buffer(const OptionError& write_err, const string& buffer_handle, char** buffer, int* buffer_len){
+  *buffer = NULL;
+  *buffer_len = 0;
+  if(write_err != SPUD_NO_ERROR){
+    return write_err;
+  }
+  if(buffer_handle.size() > INT_MAX){
+    return SPUD_FILE_ERROR;
+  }
+
+  *buffer = (char*)malloc(buffer_handle.size() > 0 ? buffer_handle.size() : 1);
+  if(*buffer == NULL){
+    return SPUD_FILE_ERROR;
+  }
+  memcpy(*buffer, buffer_handle.data(), buffer_handle.size());
+  *buffer_len = buffer_handle.size();
+
+  return SPUD_NO_ERROR;
+}
+
+// Get the type, rank, shape and data of an option with a single lookup,
+// copying the data into newly allocated memory, to be released with
+// spud_free_buffer
+
+template<class Key>
+static int copy_option_data(OptionContext& context, const Key& key_handle, int* type, int* rank, int* shape, char** val, int* val_len){
+  OptionType type_handle;
+  vector<int> shape_handle;
+  string val_handle;
+  OptionError get_err = context.get_option_data(key_handle, type_handle, *rank, shape_handle, val_handle);
+  if(get_err == SPUD_NO_ERROR){
+    *type = type_handle;
+    shape[0] = shape_handle[0];  shape[1] = shape_handle[1];
+  }
+
+  return copy_buffer(get_err, val_handle, val, val_len);
+}
+
 extern "C" {
 
-  void spud_clear_options(){
-    clear_options();
+  void* spud_context_create(){
+    return new OptionContext();
+  }
+
+  void spud_context_destroy(void* context){
+    if(context != NULL and context != &OptionManager::default_context()){
+      delete (OptionContext*)context;
+    }
+
+    return;
+  }
+
+  void spud_context_clear_options(void* context){
+    context_of(context).clear_options();
     
     return;
   }
 
-  void* spud_get_manager(){
-    return get_manager();
+  int spud_context_load_options(void* context, const char* filename, const int filename_len){
+    return context_of(context).load_options(string(filename, filename_len));
   }
 
-  void spud_set_manager(void* m){
-    set_manager(m);
-    return;
+  int spud_context_write_options(void* context, const char* filename, const int filename_len){
+    return context_of(context).write_options(string(filename, filename_len));
   }
 
-  int spud_load_options(const char* filename, const int filename_len)
-  {
-    return load_options(string(filename, filename_len));
+  int spud_context_load_snapshot(void* context, const char* filename, const int filename_len){
+    return context_of(context).load_snapshot(string(filename, filename_len));
   }
 
-  int spud_write_options(const char* filename, const int filename_len)
-  {
-    return write_options(string(filename, filename_len));
+  int spud_context_write_snapshot(void* context, const char* filename, const int filename_len){
+    return context_of(context).write_snapshot(string(filename, filename_len));
   }
 
-  int spud_get_child_name(const char* key, const int key_len, const int index, char* child_name, const int child_name_len){
+  int spud_context_load_options_from_buffer(void* context, const char* buffer, const int buffer_len){
+    return context_of(context).load_options_from_buffer(string(buffer, buffer_len));
+  }
+
+  int spud_context_write_options_to_buffer(void* context, char** buffer, int* buffer_len){
+    string buffer_handle;
+    OptionError write_err = context_of(context).write_options_to_buffer(buffer_handle);
+    return copy_buffer(write_err, buffer_handle, buffer, buffer_len);
+  }
+
+  int spud_context_load_snapshot_from_buffer(void* context, const char* buffer, const int buffer_len){
+    return context_of(context).load_snapshot_from_buffer(string(buffer, buffer_len));
+  }
+
+  int spud_context_write_snapshot_to_buffer(void* context, char** buffer, int* buffer_len){
+    string buffer_handle;
+    OptionError write_err = context_of(context).write_snapshot_to_buffer(buffer_handle);
+    return copy_buffer(write_err, buffer_handle, buffer, buffer_len);
+  }
+
+  void spud_free_buffer(char* buffer){
+    free(buffer);
+  }
+
+  int spud_context_get_child_name(void* context, const char* key, const int key_len, const int index, char* child_name, const int child_name_len){
     string child_name_handle;
-    OptionError get_name_err = get_child_name(string(key, key_len), index, child_name_handle);
+    OptionError get_name_err = context_of(context).get_child_name(string(key, key_len), index, child_name_handle);
     if(get_name_err != SPUD_NO_ERROR){
       return get_name_err;
     }
@@ -72,21 +239,69 @@ extern "C" {
     return SPUD_NO_ERROR;
   }
 
-  int spud_get_number_of_children(const char* key, const int key_len, int* child_count){
-    return get_number_of_children(string(key, key_len), *child_count);
+  int spud_context_get_number_of_children(void* context, const char* key, const int key_len, int* child_count){
+    return context_of(context).get_number_of_children(string(key, key_len), *child_count);
   }
 
-  int spud_option_count(const char* key, const int key_len){
-    return option_count(string(key, key_len));
+  int spud_context_list_children(void* context, const char* key, const int key_len, char** child_names, int* child_names_len, int* child_count, const int max_children, int* types, int* ranks, int* shapes){
+    vector<string> names_handle;
+    vector<OptionType> types_handle;
+    vector<int> ranks_handle;
+    vector< vector<int> > shapes_handle;
+    OptionError list_err;
+    if(types == NULL and ranks == NULL and shapes == NULL){
+      list_err = context_of(context).list_children(string(key, key_len), names_handle);
+    }else{
+      list_err = context_of(context).list_children(string(key, key_len), names_handle, types_handle, ranks_handle, shapes_handle);
+    }
+    *child_count = names_handle.size();
+
+    string child_names_handle;
+    for(size_t i = 0;i < names_handle.size();i++){
+      child_names_handle += names_handle[i];
+      child_names_handle += '\0';
+    }
+    for(size_t i = 0;i < types_handle.size() and (int)i < max_children;i++){
+      if(types != NULL){
+        types[i] = types_handle[i];
+      }
+      if(ranks != NULL){
+        ranks[i] = ranks_handle[i];
+      }
+      if(shapes != NULL){
+        shapes[2 * i] = shapes_handle[i][0];
+        shapes[2 * i + 1] = shapes_handle[i][1];
+      }
+    }
+
+    return copy_buffer(list_err, child_names_handle, child_names, child_names_len);
   }
 
-  int spud_have_option(const char* key, const int key_len){
-    return have_option(string(key, key_len)) ? 1 : 0;
+  int spud_context_option_count(void* context, const char* key, const int key_len){
+    return context_of(context).option_count(string(key, key_len));
   }
 
-  int spud_get_option_type(const char* key, const int key_len, int* type){
+  int spud_context_find_options(void* context, const char* key, const int key_len, char** keys, int* keys_len, int* key_count){
+    vector<string> keys_handle;
+    OptionError find_err = context_of(context).find_options(string(key, key_len), keys_handle);
+    *key_count = keys_handle.size();
+
+    string keys_buffer;
+    for(size_t i = 0;i < keys_handle.size();i++){
+      keys_buffer += keys_handle[i];
+      keys_buffer += '\0';
+    }
+
+    return copy_buffer(find_err, keys_buffer, keys, keys_len);
+  }
+
+  int spud_context_have_option(void* context, const char* key, const int key_len){
+    return context_of(context).have_option(string(key, key_len)) ? 1 : 0;
+  }
+
+  int spud_context_get_option_type(void* context, const char* key, const int key_len, int* type){
     OptionType type_handle;
-    OptionError get_type_err = get_option_type(string(key, key_len), type_handle);
+    OptionError get_type_err = context_of(context).get_option_type(string(key, key_len), type_handle);
     if(get_type_err != SPUD_NO_ERROR){
       return get_type_err;
     }
@@ -96,13 +311,13 @@ extern "C" {
     return SPUD_NO_ERROR;
   }
 
-  int spud_get_option_rank(const char* key, const int key_len, int* rank){
-    return get_option_rank(string(key, key_len), *rank);
+  int spud_context_get_option_rank(void* context, const char* key, const int key_len, int* rank){
+    return context_of(context).get_option_rank(string(key, key_len), *rank);
   }
 
-  int spud_get_option_shape(const char* key, const int key_len, int* shape){
+  int spud_context_get_option_shape(void* context, const char* key, const int key_len, int* shape){
     vector<int> shape_handle;
-    OptionError get_shape_err = get_option_shape(string(key, key_len), shape_handle);
+    OptionError get_shape_err = context_of(context).get_option_shape(string(key, key_len), shape_handle);
     if(get_shape_err != SPUD_NO_ERROR){
       return get_shape_err;
     }
@@ -115,174 +330,301 @@ extern "C" {
     return SPUD_NO_ERROR;
   }
 
-  int spud_get_option(const char* key, const int key_len, void* val){
-    string key_handle(key, key_len);
+  int spud_context_get_option(void* context, const char* key, const int key_len, void* val){
+    return get_option_data(context_of(context), string(key, key_len), val);
+  }
+
+  int spud_context_get_option_data(void* context, const char* key, const int key_len, int* type, int* rank, int* shape, char** val, int* val_len){
+    return copy_option_data(context_of(context), string(key, key_len), type, rank, shape, val, val_len);
+  }
+
+  int spud_context_add_option(void* context, const char* key, const int key_len){
+    return context_of(context).add_option(string(key, key_len));
+  }
+
+  int spud_context_set_option(void* context, const char* key, const int key_len, const void* val, const int type, const int rank, const int* shape){
+    return set_option_data(context_of(context), string(key, key_len), val, type, rank, shape);
+  }
+
+  int spud_context_set_option_attribute(void* context, const char* key, const int key_len, const char* val, const int val_len){
+    return context_of(context).set_option_attribute(string(key, key_len), string(val, val_len));
+  }
+
+  int spud_context_move_option(void* context, const char* key1, const int key1_len, const char* key2, const int key2_len){
+    return context_of(context).move_option(string(key1, key1_len), string(key2, key2_len));
+  }
 
-    OptionType type;
-    OptionError get_type_err = get_option_type(key_handle, type);
+  int spud_context_copy_option(void* context, const char* key1, const int key1_len, const char* key2, const int key2_len){
+    return context_of(context).copy_option(string(key1, key1_len), string(key2, key2_len));
+  }
+
+  int spud_context_delete_option(void* context, const char* key, const int key_len){
+    return context_of(context).delete_option(string(key, key_len));
+  }
+
+  void spud_context_print_options(void* context){
+    context_of(context).print_options();
+
+    return;
+  }
+
+  int spud_context_memory_stats(void* context, spud_memory_stats_t* stats){
+    MemoryStats stats_handle;
+    OptionError stats_err = context_of(context).memory_stats(stats_handle);
+    if(stats_err != SPUD_NO_ERROR){
+      return stats_err;
+    }
+
+    stats->nodes = stats_handle.nodes;
+    stats->bytes = stats_handle.bytes;
+    stats->shared_nodes = stats_handle.shared_nodes;
+    stats->saved_bytes = stats_handle.saved_bytes;
+    stats->node_bytes = stats_handle.node_bytes;
+    stats->name_bytes = stats_handle.name_bytes;
+    stats->child_bytes = stats_handle.child_bytes;
+    stats->data_bytes = stats_handle.data_bytes;
+    stats->pool_bytes = stats_handle.pool_bytes;
+    stats->pool_used_bytes = stats_handle.pool_used_bytes;
+
+    return SPUD_NO_ERROR;
+  }
+
+  void spud_context_set_access_profile(void* context, const int enabled){
+    context_of(context).set_access_profile(enabled != 0);
+
+    return;
+  }
+
+  int spud_context_dump_access_profile(void* context, const char* filename, const int filename_len){
+    return context_of(context).dump_access_profile(string(filename, filename_len));
+  }
+
+  int spud_context_lookup(void* context, const char* key, const int key_len, int* handle){
+    return context_of(context).lookup(string(key, key_len), *handle);
+  }
+
+  int spud_context_release_handle(void* context, const int handle){
+    return context_of(context).release(handle);
+  }
+
+  int spud_context_handle_have_option(void* context, const int handle){
+    return context_of(context).have_option(handle) ? 1 : 0;
+  }
+
+  int spud_context_handle_get_option_type(void* context, const int handle, int* type){
+    OptionType type_handle;
+    OptionError get_type_err = context_of(context).get_option_type(handle, type_handle);
     if(get_type_err != SPUD_NO_ERROR){
       return get_type_err;
     }
 
-    int rank;
-    OptionError get_rank_err = get_option_rank(key_handle, rank);
-    if(get_rank_err != SPUD_NO_ERROR){
-      return get_rank_err;
+    *type = type_handle;
+
+    return SPUD_NO_ERROR;
+  }
+
+  int spud_context_handle_get_option_rank(void* context, const int handle, int* rank){
+    return context_of(context).get_option_rank(handle, *rank);
+  }
+
+  int spud_context_handle_get_option_shape(void* context, const int handle, int* shape){
+    vector<int> shape_handle;
+    OptionError get_shape_err = context_of(context).get_option_shape(handle, shape_handle);
+    if(get_shape_err != SPUD_NO_ERROR){
+      return get_shape_err;
     }
 
-    if(type == SPUD_DOUBLE){
-      if(rank == 0){
-        double val_handle;
-        OptionError get_err = get_option(key_handle, val_handle);
-        if(get_err != SPUD_NO_ERROR){
-          return get_err;
-        }
-        *((double*)val) = val_handle;
-      }else if(rank == 1){
-        vector<double> val_handle;
-        OptionError get_err = get_option(key_handle, val_handle);
-        if(get_err != SPUD_NO_ERROR){
-          return get_err;
-        }
-        for(size_t i = 0;i < val_handle.size();i++){
-          ((double*)val)[i] = val_handle[i];
-        }
-      }else if(rank == 2){
-        vector< vector<double> > val_handle;
-        OptionError get_err = get_option(key_handle, val_handle);
-        if(get_err != SPUD_NO_ERROR){
-          return get_err;
-        }
-        for(size_t i = 0;i < val_handle.size();i++){
-          for(size_t j = 0;j < val_handle[0].size();j++){
-            ((double*)val)[i * val_handle[0].size() + j] = val_handle[i][j];
-          }
-        }
-      }else{
-        return SPUD_RANK_ERROR;
-      }
-    }else if(type == SPUD_INT){
-      if(rank == 0){
-        int val_handle;
-        OptionError get_err = get_option(key_handle, val_handle);
-        if(get_err != SPUD_NO_ERROR){
-          return get_err;
-        }
-        *((int*)val) = val_handle;
-      }else if(rank == 1){
-        vector<int> val_handle;
-        OptionError get_err = get_option(key_handle, val_handle);
-        if(get_err != SPUD_NO_ERROR){
-          return get_err;
-        }
-        for(size_t i = 0;i < val_handle.size();i++){
-          ((int*)val)[i] = val_handle[i];
-        }
-      }else if(rank == 2){
-        vector< vector<int> > val_handle;
-        OptionError get_err = get_option(key_handle, val_handle);
-        if(get_err != SPUD_NO_ERROR){
-          return get_err;
-        }
-        for(size_t i = 0;i < val_handle.size();i++){
-          for(size_t j = 0;j < val_handle[0].size();j++){
-            ((int*)val)[i * val_handle[0].size() + j] = val_handle[i][j];
-          }
-        }
-      }else{
-        return SPUD_RANK_ERROR;
-      }
-    }else if(type == SPUD_STRING){
-      string val_handle;
-      OptionError get_err = get_option(key_handle, val_handle);
-      if(get_err != SPUD_NO_ERROR){
-        return get_err;
-      }
-      memcpy(val, val_handle.c_str(), val_handle.size() * sizeof(char));
-    }else{
-      return SPUD_TYPE_ERROR;
+    shape[0] = -1;  shape[1] = -1;
+    for(size_t i = 0;i < shape_handle.size();i++){
+      shape[i] = shape_handle[i];
     }
 
     return SPUD_NO_ERROR;
   }
 
+  int spud_context_handle_get_option(void* context, const int handle, void* val){
+    return get_option_data(context_of(context), (OptionHandle)handle, val);
+  }
+
+  int spud_context_handle_get_option_data(void* context, const int handle, int* type, int* rank, int* shape, char** val, int* val_len){
+    return copy_option_data(context_of(context), (OptionHandle)handle, type, rank, shape, val, val_len);
+  }
+
+  int spud_context_handle_set_option(void* context, const int handle, const void* val, const int type, const int rank, const int* shape){
+    return set_option_data(context_of(context), (OptionHandle)handle, val, type, rank, shape);
+  }
+
+  // The default context
+
+  void spud_clear_options(){
+    spud_context_clear_options(NULL);
+
+    return;
+  }
+
+  void* spud_get_manager(){
+    return get_manager();
+  }
+
+  void spud_set_manager(void* m){
+    set_manager(m);
+    return;
+  }
+
+  int spud_load_options(const char* filename, const int filename_len){
+    return spud_context_load_options(NULL, filename, filename_len);
+  }
+
+  int spud_write_options(const char* filename, const int filename_len){
+    return spud_context_write_options(NULL, filename, filename_len);
+  }
+
+  int spud_load_snapshot(const char* filename, const int filename_len){
+    return spud_context_load_snapshot(NULL, filename, filename_len);
+  }
+
+  int spud_write_snapshot(const char* filename, const int filename_len){
+    return spud_context_write_snapshot(NULL, filename, filename_len);
+  }
+
+  int spud_load_options_from_buffer(const char* buffer, const int buffer_len){
+    return spud_context_load_options_from_buffer(NULL, buffer, buffer_len);
+  }
+
+  int spud_write_options_to_buffer(char** buffer, int* buffer_len){
+    return spud_context_write_options_to_buffer(NULL, buffer, buffer_len);
+  }
+
+  int spud_load_snapshot_from_buffer(const char* buffer, const int buffer_len){
+    return spud_context_load_snapshot_from_buffer(NULL, buffer, buffer_len);
+  }
+
+  int spud_write_snapshot_to_buffer(char** buffer, int* buffer_len){
+    return spud_context_write_snapshot_to_buffer(NULL, buffer, buffer_len);
+  }
+
+  int spud_get_child_name(const char* key, const int key_len, const int index, char* child_name, const int child_name_len){
+    return spud_context_get_child_name(NULL, key, key_len, index, child_name, child_name_len);
+  }
+
+  int spud_get_number_of_children(const char* key, const int key_len, int* child_count){
+    return spud_context_get_number_of_children(NULL, key, key_len, child_count);
+  }
+
+  int spud_list_children(const char* key, const int key_len, char** child_names, int* child_names_len, int* child_count, const int max_children, int* types, int* ranks, int* shapes){
+    return spud_context_list_children(NULL, key, key_len, child_names, child_names_len, child_count, max_children, types, ranks, shapes);
+  }
+
+  int spud_option_count(const char* key, const int key_len){
+    return spud_context_option_count(NULL, key, key_len);
+  }
+
+  int spud_find_options(const char* key, const int key_len, char** keys, int* keys_len, int* key_count){
+    return spud_context_find_options(NULL, key, key_len, keys, keys_len, key_count);
+  }
+
+  int spud_have_option(const char* key, const int key_len){
+    return spud_context_have_option(NULL, key, key_len);
+  }
+
+  int spud_get_option_type(const char* key, const int key_len, int* type){
+    return spud_context_get_option_type(NULL, key, key_len, type);
+  }
+
+  int spud_get_option_rank(const char* key, const int key_len, int* rank){
+    return spud_context_get_option_rank(NULL, key, key_len, rank);
+  }
+
+  int spud_get_option_shape(const char* key, const int key_len, int* shape){
+    return spud_context_get_option_shape(NULL, key, key_len, shape);
+  }
+
+  int spud_get_option(const char* key, const int key_len, void* val){
+    return spud_context_get_option(NULL, key, key_len, val);
+  }
+
+  int spud_get_option_data(const char* key, const int key_len, int* type, int* rank, int* shape, char** val, int* val_len){
+    return spud_context_get_option_data(NULL, key, key_len, type, rank, shape, val, val_len);
+  }
+
   int spud_add_option(const char* key, const int key_len){
-    return add_option(string(key, key_len));
+    return spud_context_add_option(NULL, key, key_len);
   }
 
   int spud_set_option(const char* key, const int key_len, const void* val, const int type, const int rank, const int* shape){
-    string key_handle(key, key_len);
-
-    if(type == SPUD_DOUBLE){
-      if(rank == 0){
-        double val_handle = *((double*)val);
-        return set_option(key_handle, val_handle);
-      }else if(rank == 1){
-        vector<double> val_handle;
-        for(int i = 0;i < shape[0];i++){
-          val_handle.push_back(((double*)val)[i]);
-        }
-        return set_option(key_handle, val_handle);
-      }else if(rank == 2){
-        vector< vector<double> > val_handle;
-        for(int i = 0;i < shape[0];i++){
-          val_handle.push_back(vector<double>());
-          for(int j = 0;j < shape[1];j++){
-            val_handle[i].push_back(((double*)val)[i * val_handle[0].size() + j]);
-          }
-        }
-        return set_option(key_handle, val_handle);
-      }else{
-        return SPUD_RANK_ERROR;
-      }
-    }else if(type == SPUD_INT){
-      if(rank == 0){
-        int val_handle = *((int*)val);
-        return set_option(key_handle, val_handle);
-      }else if(rank == 1){
-        vector<int> val_handle;
-        for(int i = 0;i < shape[0];i++){
-          val_handle.push_back(((int*)val)[i]);
-        }
-        return set_option(key_handle, val_handle);
-      }else if(rank == 2){
-        vector< vector<int> > val_handle;
-        for(int i = 0;i < shape[0];i++){
-          val_handle.push_back(vector<int>());
-          for(int j = 0;j < shape[1];j++){
-            val_handle[i].push_back(((int*)val)[i * val_handle[0].size() + j]);
-          }
-        }
-        return set_option(key_handle, val_handle);
-      }else{
-        return SPUD_RANK_ERROR;
-      }
-    }else if(type == SPUD_STRING){
-      return set_option(key_handle, string((char*)val, shape[0]));
-    }else{
-      return SPUD_TYPE_ERROR;
-    }
+    return spud_context_set_option(NULL, key, key_len, val, type, rank, shape);
   }
 
   int spud_set_option_attribute(const char* key, const int key_len, const char* val, const int val_len){
-    return set_option_attribute(string(key, key_len), string(val, val_len));
+    return spud_context_set_option_attribute(NULL, key, key_len, val, val_len);
   }
-  
+
   int spud_move_option(const char* key1, const int key1_len, const char* key2, const int key2_len){
-    return move_option(string(key1, key1_len), string(key2, key2_len));
+    return spud_context_move_option(NULL, key1, key1_len, key2, key2_len);
   }
 
   int spud_copy_option(const char* key1, const int key1_len, const char* key2, const int key2_len){
-    return copy_option(string(key1, key1_len), string(key2, key2_len));
+    return spud_context_copy_option(NULL, key1, key1_len, key2, key2_len);
   }
+
   int spud_delete_option(const char* key, const int key_len){
-    return delete_option(string(key, key_len));
+    return spud_context_delete_option(NULL, key, key_len);
   }
 
   void spud_print_options(){
-    print_options();
+    spud_context_print_options(NULL);
+
+    return;
+  }
+
+  int spud_memory_stats(spud_memory_stats_t* stats){
+    return spud_context_memory_stats(NULL, stats);
+  }
+
+  void spud_set_access_profile(const int enabled){
+    spud_context_set_access_profile(NULL, enabled);
 
     return;
   }
 
+  int spud_dump_access_profile(const char* filename, const int filename_len){
+    return spud_context_dump_access_profile(NULL, filename, filename_len);
+  }
+
+  int spud_lookup(const char* key, const int key_len, int* handle){
+    return spud_context_lookup(NULL, key, key_len, handle);
+  }
+
+  int spud_release_handle(const int handle){
+    return spud_context_release_handle(NULL, handle);
+  }
+
+  int spud_handle_have_option(const int handle){
+    return spud_context_handle_have_option(NULL, handle);
+  }
+
+  int spud_handle_get_option_type(const int handle, int* type){
+    return spud_context_handle_get_option_type(NULL, handle, type);
+  }
+
+  int spud_handle_get_option_rank(const int handle, int* rank){
+    return spud_context_handle_get_option_rank(NULL, handle, rank);
+  }
+
+  int spud_handle_get_option_shape(const int handle, int* shape){
+    return spud_context_handle_get_option_shape(NULL, handle, shape);
+  }
+
+  int spud_handle_get_option(const int handle, void* val){
+    return spud_context_handle_get_option(NULL, handle, val);
+  }
+
+  int spud_handle_get_option_data(const int handle, int* type, int* rank, int* shape, char** val, int* val_len){
+    return spud_context_handle_get_option_data(NULL, handle, type, rank, shape, val, val_len);
+  }
+
+  int spud_handle_set_option(const int handle, const void* val, const int type, const int rank, const int* shape){
+    return spud_context_handle_set_option(NULL, handle, val, type, rank, shape);
+  }
+
 }
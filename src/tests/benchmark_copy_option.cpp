@@ -0,0 +1,169 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+// Benchmark for copying and moving options. Copies a field template with
+// copy_option increasing numbers of times (by default 100, 200 and 400),
+// reporting the time taken and the memory shared between the copies, and
+// then modifies one option in each copy. Also moves subtrees of increasing
+// size with move_option, and fails if moving does not take roughly constant
+// time, or if copying does not scale roughly linearly with the number of
+// copies.
+
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+// The template has this many options, each holding this many values
+const int TEMPLATE_OPTIONS = 200;
+const int TEMPLATE_VALUES = 100;
+
+void add_template(){
+  Spud::clear_options();
+  vector<double> val(TEMPLATE_VALUES, 1.0);
+  for(int i = 0;i < TEMPLATE_OPTIONS;i++){
+    ostringstream key;
+    key << "/template/option" << i / 10 << "/value" << i % 10;
+    Spud::set_option(key.str(), val);
+  }
+}
+
+double time_copies(const int& copies, Spud::MemoryStats& stats){
+  add_template();
+
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  for(int i = 0;i < copies;i++){
+    ostringstream key;
+    key << "/scalar_field::Field" << i;
+    if(Spud::copy_option("/template", key.str()) != Spud::SPUD_NO_ERROR){
+      cerr << "Failed to copy to " << key.str() << endl;
+      exit(1);
+    }
+  }
+  double elapsed = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+  Spud::memory_stats(stats);
+
+  return elapsed;
+}
+
+double time_modify(const int& copies){
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  for(int i = 0;i < copies;i++){
+    ostringstream key;
+    key << "/scalar_field::Field" << i << "/option0/value0";
+    Spud::set_option(key.str(), (double)i);
+  }
+  double elapsed = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  vector<double> val;
+  if(Spud::get_option("/template/option0/value0", val) != Spud::SPUD_NO_ERROR or val.size() != (size_t)TEMPLATE_VALUES
+    or Spud::option_count("/scalar_field") != copies){
+    cerr << "Modifying the copies changed the template" << endl;
+    exit(1);
+  }
+
+  return elapsed;
+}
+
+double time_move(const int& options){
+  Spud::clear_options();
+  for(int i = 0;i < options;i++){
+    ostringstream key;
+    key << "/block/option" << i / 100 << "/value" << i % 100;
+    Spud::set_option(key.str(), i);
+  }
+
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  if(Spud::move_option("/block", "/moved/block") != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to move block of " << options << " options" << endl;
+    exit(1);
+  }
+  double elapsed = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  int val;
+  if(Spud::have_option("/block") or Spud::get_option("/moved/block/option0/value7", val) != Spud::SPUD_NO_ERROR or val != 7){
+    cerr << "Incorrect options after moving block of " << options << " options" << endl;
+    exit(1);
+  }
+
+  return elapsed;
+}
+
+int main(int argc, char **argv){
+  vector<int> copies;
+  for(int i = 1;i < argc;i++){
+    copies.push_back(atoi(argv[i]));
+  }
+  if(copies.empty()){
+    copies.push_back(100);
+    copies.push_back(200);
+    copies.push_back(400);
+  }
+
+  vector<double> timings;
+  for(size_t i = 0;i < copies.size();i++){
+    Spud::MemoryStats stats;
+    timings.push_back(time_copies(copies[i], stats));
+    double modify = time_modify(copies[i]);
+    cout << "copy_option: " << copies[i] << " copies in " << timings.back() << "s, using " << stats.bytes
+         << " bytes, " << stats.saved_bytes << " bytes saved by sharing; modified in " << modify << "s" << endl;
+  }
+
+  vector<int> sizes;
+  sizes.push_back(1000);
+  sizes.push_back(100000);
+  vector<double> moves;
+  for(size_t i = 0;i < sizes.size();i++){
+    moves.push_back(time_move(sizes[i]));
+    cout << "move_option: " << sizes[i] << " options moved in " << moves.back() << "s" << endl;
+  }
+  Spud::clear_options();
+
+  // Linear scaling would increase the time per copy by a factor of one,
+  // allow for timing noise
+  double first = max(timings.front(), 1.0e-3) / copies.front();
+  double last = timings.back() / copies.back();
+  if(last > 2.0 * first){
+    cerr << "copy_option does not scale linearly: " << first << "s per copy for " << copies.front()
+         << " copies, " << last << "s per copy for " << copies.back() << " copies" << endl;
+    return 1;
+  }
+
+  // Moving relinks the subtree, so should not depend on its size
+  if(moves.back() > max(10.0 * moves.front(), 1.0e-3)){
+    cerr << "move_option depends on the size of the option moved: " << moves.front() << "s for " << sizes.front()
+         << " options, " << moves.back() << "s for " << sizes.back() << " options" << endl;
+    return 1;
+  }
+
+  return 0;
+}
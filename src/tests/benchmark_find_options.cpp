@@ -0,0 +1,128 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+// Benchmark for wildcard queries. Builds trees with increasing numbers of
+// fields (by default 10000, 20000 and 40000) spread over several material
+// phases, and finds the prognostic fields in all phases both with nested loops
+// over option_count, get_option and have_option, as applications do, and in
+// one call with find_options. Fails if the two disagree or if find_options
+// does not scale roughly linearly with the number of fields.
+
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+const int PHASES = 4;
+
+void add_fields(const int& fields){
+  Spud::clear_options();
+  for(int i = 0;i < fields;i++){
+    ostringstream key;
+    key << "/material_phase::Phase" << i % PHASES << "/scalar_field::Field" << i
+        << (i % 2 == 0 ? "/prognostic" : "/diagnostic");
+    Spud::add_option(key.str());
+  }
+}
+
+double time_loops(vector<string>& keys){
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  keys.clear();
+  int phases = Spud::option_count("/material_phase");
+  for(int i = 0;i < phases;i++){
+    ostringstream phase_key;
+    phase_key << "/material_phase[" << i << "]";
+    string phase_name;
+    Spud::get_option(phase_key.str() + "/name", phase_name);
+
+    int fields = Spud::option_count(phase_key.str() + "/scalar_field");
+    for(int j = 0;j < fields;j++){
+      ostringstream field_key;
+      field_key << phase_key.str() << "/scalar_field[" << j << "]";
+      if(Spud::have_option(field_key.str() + "/prognostic")){
+        string field_name;
+        Spud::get_option(field_key.str() + "/name", field_name);
+        keys.push_back("/material_phase::" + phase_name + "/scalar_field::" + field_name + "/prognostic");
+      }
+    }
+  }
+
+  return chrono::duration<double>(chrono::steady_clock::now() - start).count();
+}
+
+double time_find_options(vector<string>& keys){
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  Spud::find_options("/material_phase::*/scalar_field::*/prognostic", keys);
+
+  return chrono::duration<double>(chrono::steady_clock::now() - start).count();
+}
+
+int main(int argc, char **argv){
+  vector<int> fields;
+  for(int i = 1;i < argc;i++){
+    fields.push_back(atoi(argv[i]));
+  }
+  if(fields.empty()){
+    fields.push_back(10000);
+    fields.push_back(20000);
+    fields.push_back(40000);
+  }
+
+  vector<double> timings;
+  for(size_t i = 0;i < fields.size();i++){
+    add_fields(fields[i]);
+
+    vector<string> looped, found;
+    double by_loops = time_loops(looped);
+    timings.push_back(time_find_options(found));
+    if(found.size() != (size_t)(fields[i] + 1) / 2 or found != looped){
+      cerr << "find_options and nested loops disagree for " << fields[i] << " fields" << endl;
+      return 1;
+    }
+
+    cout << "fields: " << fields[i] << ", " << found.size() << " prognostic found in " << by_loops << "s by nested loops, "
+         << timings.back() << "s by find_options" << endl;
+  }
+  Spud::clear_options();
+
+  // Linear scaling would increase the time per field by a factor of one,
+  // allow for timing noise
+  double first = max(timings.front(), 1.0e-3) / fields.front();
+  double last = timings.back() / fields.back();
+  if(last > 2.0 * first){
+    cerr << "find_options does not scale linearly: " << first << "s per field for " << fields.front()
+         << " fields, " << last << "s per field for " << fields.back() << " fields" << endl;
+    return 1;
+  }
+
+  return 0;
+}
@@ -0,0 +1,108 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+
+// Benchmark for the cache of keys resolved by get_option. Reads the values of
+// the requested number of fields (by default 1000) in rounds, each reading
+// every field once. The cached rounds read an unchanged tree, so that every
+// key is found in the cache; the uncached rounds each follow a change to the
+// tree, which empties the cache, so that every key is resolved again. Fails if
+// any read returns the wrong value, or if cached reads are not at least twice
+// as fast as uncached ones.
+
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+const int ROUNDS = 200;
+
+string field_key(const int& i){
+  ostringstream key;
+  key << "/material_phase::Phase/scalar_field::Field" << i << "/prognostic/value";
+  return key.str();
+}
+
+double time_reads(const vector<string>& keys, const bool& change, int& errors){
+  double elapsed = 0.0;
+  for(int round = 0;round < ROUNDS;round++){
+    if(change){
+      Spud::add_option("/changed");
+      Spud::delete_option("/changed");
+    }
+
+    chrono::steady_clock::time_point start = chrono::steady_clock::now();
+    for(size_t i = 0;i < keys.size();i++){
+      double val;
+      if(Spud::get_option(keys[i], val) != Spud::SPUD_NO_ERROR or val != i + 0.5){
+        errors++;
+      }
+    }
+    elapsed += chrono::duration<double>(chrono::steady_clock::now() - start).count();
+  }
+
+  return elapsed;
+}
+
+int main(int argc, char **argv){
+  int fields = 1000;
+  if(argc > 1){
+    fields = atoi(argv[1]);
+  }
+
+  Spud::clear_options();
+  vector<string> keys;
+  for(int i = 0;i < fields;i++){
+    keys.push_back(field_key(i));
+    Spud::set_option(keys[i], i + 0.5);
+  }
+
+  int errors = 0;
+  double uncached = time_reads(keys, true, errors);
+  double cached = time_reads(keys, false, errors);
+  Spud::clear_options();
+
+  int reads = ROUNDS * fields;
+  cout << "get_option: " << reads << " uncached reads in " << uncached << "s (" << reads / uncached << " per second)" << endl;
+  cout << "get_option: " << reads << " cached reads in " << cached << "s (" << reads / cached << " per second)" << endl;
+
+  if(errors != 0){
+    cerr << "Incorrect options read by " << errors << " reads" << endl;
+    return 1;
+  }
+  if(2.0 * cached > uncached){
+    cerr << "Cached reads are not at least twice as fast as uncached reads" << endl;
+    return 1;
+  }
+
+  return 0;
+}
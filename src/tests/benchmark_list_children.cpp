@@ -0,0 +1,114 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+// Benchmark for enumerating the children of an option. Times listing the
+// children of options with increasing numbers of children (by default 10000,
+// 20000 and 40000), one at a time with get_child_name and in one call with
+// list_children, and fails if the two disagree or if listing does not scale
+// roughly linearly with the number of children.
+
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+const string KEY = "/material_phase::Phase";
+
+void add_fields(const int& fields){
+  Spud::clear_options();
+  for(int i = 0;i < fields;i++){
+    ostringstream key;
+    key << KEY << "/scalar_field::Field" << i << "/prognostic";
+    Spud::add_option(key.str());
+  }
+}
+
+double time_get_child_name(vector<string>& names){
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  int child_count;
+  Spud::get_number_of_children(KEY, child_count);
+  names.resize(child_count);
+  for(int i = 0;i < child_count;i++){
+    Spud::get_child_name(KEY, i, names[i]);
+  }
+
+  return chrono::duration<double>(chrono::steady_clock::now() - start).count();
+}
+
+double time_list_children(vector<string>& names){
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  Spud::list_children(KEY, names);
+
+  return chrono::duration<double>(chrono::steady_clock::now() - start).count();
+}
+
+int main(int argc, char **argv){
+  vector<int> fields;
+  for(int i = 1;i < argc;i++){
+    fields.push_back(atoi(argv[i]));
+  }
+  if(fields.empty()){
+    fields.push_back(10000);
+    fields.push_back(20000);
+    fields.push_back(40000);
+  }
+
+  vector<double> timings;
+  for(size_t i = 0;i < fields.size();i++){
+    add_fields(fields[i]);
+
+    vector<string> by_index, listed;
+    double by_get_child_name = time_get_child_name(by_index);
+    timings.push_back(time_list_children(listed));
+    // The children are the name attribute and the fields
+    if(listed.size() != (size_t)fields[i] + 1 or listed != by_index){
+      cerr << "list_children and get_child_name disagree for " << fields[i] << " children" << endl;
+      return 1;
+    }
+
+    cout << "children: " << fields[i] << " listed in " << by_get_child_name << "s by get_child_name, "
+         << timings.back() << "s by list_children" << endl;
+  }
+  Spud::clear_options();
+
+  // Linear scaling would increase the time per child by a factor of one,
+  // allow for timing noise
+  double first = max(timings.front(), 1.0e-3) / fields.front();
+  double last = timings.back() / fields.back();
+  if(last > 2.0 * first){
+    cerr << "list_children does not scale linearly: " << first << "s per child for " << fields.front()
+         << " children, " << last << "s per child for " << fields.back() << " children" << endl;
+    return 1;
+  }
+
+  return 0;
+}
@@ -0,0 +1,203 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+
+// Benchmark for loading large options files. Writes synthetic options files
+// with the requested numbers of elements (by default 25000, 50000 and 100000),
+// times Spud::load_options on each, and fails if loading does not scale
+// roughly linearly with the file size. Also times loading and writing a file
+// containing a single array of 10^6 real values, as XML and as a binary
+// snapshot.
+
+#include <chrono>
+#include <cmath>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <iostream>
+#include <string>
+#include <vector>
+
+#include <unistd.h>
+
+#include "spud"
+
+using namespace std;
+
+// Each field is written as this many elements
+const int ELEMENTS_PER_FIELD = 5;
+
+void write_options(const string& filename, const int& fields){
+  ofstream file(filename.c_str());
+  file << "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<options>\n";
+  for(int i = 0;i < fields;i++){
+    file << "  <scalar_field name=\"Field" << i << "\">\n"
+         << "    <prognostic>\n"
+         << "      <mesh name=\"CoordinateMesh\"/>\n"
+         << "      <value>\n"
+         << "        <real_value rank=\"0\">" << i << ".5</real_value>\n"
+         << "      </value>\n"
+         << "    </prognostic>\n"
+         << "  </scalar_field>\n";
+  }
+  file << "</options>\n";
+  file.close();
+}
+
+double time_load(const string& filename, const int& fields){
+  Spud::clear_options();
+
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  if(Spud::load_options(filename) != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to load " << filename << endl;
+    exit(1);
+  }
+  double elapsed = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  double val;
+  if(Spud::option_count("/scalar_field") != fields
+    or Spud::get_option("/scalar_field::Field7/prognostic/value", val) != Spud::SPUD_NO_ERROR
+    or val != 7.5){
+    cerr << "Incorrect options loaded from " << filename << endl;
+    exit(1);
+  }
+
+  return elapsed;
+}
+
+void write_array(const string& filename, const int& size){
+  ofstream file(filename.c_str());
+  file.precision(15);
+  file << "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<options>\n"
+       << "  <profile>\n"
+       << "    <real_value rank=\"1\" shape=\"" << size << "\">";
+  for(int i = 0;i < size;i++){
+    if(i > 0){
+      file << " ";
+    }
+    file << 1.0 / (i + 1);
+  }
+  file << "</real_value>\n"
+       << "  </profile>\n"
+       << "</options>\n";
+  file.close();
+}
+
+void time_array(const string& filename, const int& size){
+  write_array(filename, size);
+  Spud::clear_options();
+
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  if(Spud::load_options(filename) != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to load " << filename << endl;
+    exit(1);
+  }
+  double load = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  vector<int> shape;
+  vector<double> val;
+  if(Spud::get_option_shape("/profile", shape) != Spud::SPUD_NO_ERROR or shape[0] != size
+    or Spud::get_option("/profile", val) != Spud::SPUD_NO_ERROR or fabs(val[size - 1] - 1.0 / size) > 1.0e-15){
+    cerr << "Incorrect options loaded from " << filename << endl;
+    exit(1);
+  }
+
+  start = chrono::steady_clock::now();
+  if(Spud::write_options(filename) != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to write " << filename << endl;
+    exit(1);
+  }
+  double write = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  start = chrono::steady_clock::now();
+  if(Spud::write_snapshot(filename) != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to write snapshot " << filename << endl;
+    exit(1);
+  }
+  double write_snapshot = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  Spud::clear_options();
+  start = chrono::steady_clock::now();
+  if(Spud::load_snapshot(filename) != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to load snapshot " << filename << endl;
+    exit(1);
+  }
+  double load_snapshot = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  vector<double> snapshot_val;
+  if(Spud::get_option("/profile", snapshot_val) != Spud::SPUD_NO_ERROR or snapshot_val != val){
+    cerr << "Incorrect options loaded from snapshot " << filename << endl;
+    exit(1);
+  }
+
+  cout << "load_options: " << size << " real values in " << load << "s" << endl;
+  cout << "write_options: " << size << " real values in " << write << "s" << endl;
+  cout << "load_snapshot: " << size << " real values in " << load_snapshot << "s" << endl;
+  cout << "write_snapshot: " << size << " real values in " << write_snapshot << "s" << endl;
+}
+
+int main(int argc, char **argv){
+  vector<int> elements;
+  for(int i = 1;i < argc;i++){
+    elements.push_back(atoi(argv[i]));
+  }
+  if(elements.empty()){
+    elements.push_back(25000);
+    elements.push_back(50000);
+    elements.push_back(100000);
+  }
+
+  char filename[] = "/tmp/spud_benchmark_XXXXXX";
+  int fd = mkstemp(filename);
+  if(fd < 0){
+    cerr << "Failed to create temporary file" << endl;
+    return 1;
+  }
+  close(fd);
+
+  vector<double> timings;
+  for(size_t i = 0;i < elements.size();i++){
+    int fields = elements[i] / ELEMENTS_PER_FIELD;
+    write_options(filename, fields);
+    timings.push_back(time_load(filename, fields));
+    cout << "load_options: " << fields * ELEMENTS_PER_FIELD << " elements in " << timings.back() << "s" << endl;
+  }
+  time_array(filename, 1000000);
+  remove(filename);
+  Spud::clear_options();
+
+  // Linear scaling would increase the time per element by a factor of one,
+  // allow for timing noise
+  double first = max(timings.front(), 1.0e-3) / elements.front();
+  double last = timings.back() / elements.back();
+  if(last > 2.0 * first){
+    cerr << "load_options does not scale linearly: " << first << "s per element for " << elements.front()
+         << " elements, " << last << "s per element for " << elements.back() << " elements" << endl;
+    return 1;
+  }
+
+  return 0;
+}
@@ -0,0 +1,136 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+
+// Benchmark for the memory used by large options trees. Loads synthetic
+// options with the requested numbers of fields (by default 5000, 10000 and
+// 20000), reports the memory used by the tree by category as returned by
+// Spud::memory_stats, and times clearing the tree. Fails if the memory used
+// per option exceeds a fixed budget, or grows with the size of the tree.
+
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+// The most bytes each option in the tree may use
+const double BYTES_PER_NODE = 320.0;
+
+string write_options(const int& fields){
+  ostringstream buffer;
+  buffer << "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<options>\n";
+  for(int i = 0;i < fields;i++){
+    buffer << "  <scalar_field name=\"Field" << i << "\">\n"
+           << "    <prognostic>\n"
+           << "      <mesh name=\"CoordinateMesh\"/>\n"
+           << "      <value>\n"
+           << "        <real_value rank=\"0\">" << i << ".5</real_value>\n"
+           << "      </value>\n"
+           << "      <tolerance>\n"
+           << "        <real_value rank=\"1\" shape=\"3\">1e-07 1e-08 1e-09</real_value>\n"
+           << "      </tolerance>\n"
+           << "      <stabilisation>\n"
+           << "        <no_stabilisation/>\n"
+           << "      </stabilisation>\n"
+           << "    </prognostic>\n"
+           << "  </scalar_field>\n";
+  }
+  buffer << "</options>\n";
+
+  return buffer.str();
+}
+
+double measure(const int& fields, Spud::MemoryStats& stats, double& clear){
+  string buffer = write_options(fields);
+
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  if(Spud::load_options_from_buffer(buffer) != Spud::SPUD_NO_ERROR){
+    cerr << "Failed to load " << fields << " fields" << endl;
+    exit(1);
+  }
+  double load = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  if(Spud::option_count("/scalar_field") != fields){
+    cerr << "Incorrect options loaded for " << fields << " fields" << endl;
+    exit(1);
+  }
+  Spud::memory_stats(stats);
+
+  start = chrono::steady_clock::now();
+  Spud::clear_options();
+  clear = chrono::duration<double>(chrono::steady_clock::now() - start).count();
+
+  return load;
+}
+
+int main(int argc, char **argv){
+  vector<int> fields;
+  for(int i = 1;i < argc;i++){
+    fields.push_back(atoi(argv[i]));
+  }
+  if(fields.empty()){
+    fields.push_back(5000);
+    fields.push_back(10000);
+    fields.push_back(20000);
+  }
+
+  vector<double> bytes_per_node;
+  for(size_t i = 0;i < fields.size();i++){
+    Spud::MemoryStats stats;
+    double clear;
+    double load = measure(fields[i], stats, clear);
+    bytes_per_node.push_back((double)stats.bytes / stats.nodes);
+    cout << "memory_stats: " << fields[i] << " fields, " << stats.nodes << " options in " << stats.bytes << " bytes ("
+         << bytes_per_node.back() << " per option): " << stats.node_bytes << " in options, " << stats.name_bytes
+         << " in names, " << stats.child_bytes << " in children, " << stats.data_bytes << " in data; pool "
+         << stats.pool_used_bytes << " of " << stats.pool_bytes << " bytes used" << endl;
+    cout << "load_options_from_buffer: " << fields[i] << " fields in " << load << "s, clear_options in " << clear << "s" << endl;
+  }
+
+  for(size_t i = 0;i < bytes_per_node.size();i++){
+    if(bytes_per_node[i] > BYTES_PER_NODE){
+      cerr << "Options use " << bytes_per_node[i] << " bytes each for " << fields[i] << " fields, more than "
+           << BYTES_PER_NODE << endl;
+      return 1;
+    }
+  }
+
+  // The memory per option should not depend on the size of the tree, allow
+  // for the index of the root
+  if(bytes_per_node.back() > 1.1 * bytes_per_node.front()){
+    cerr << "Memory per option grows with the size of the tree: " << bytes_per_node.front() << " bytes for "
+         << fields.front() << " fields, " << bytes_per_node.back() << " bytes for " << fields.back() << " fields" << endl;
+    return 1;
+  }
+
+  return 0;
+}
@@ -0,0 +1,125 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+
+// Benchmark for concurrent reads of the options tree. Times a fixed number of
+// get_option calls, by key and by handle, shared between increasing numbers of
+// threads (by default 1, 2, 4 and 8), and fails if any read returns the wrong
+// value.
+
+#include <atomic>
+#include <chrono>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+const int FIELDS = 1000;
+const int READS = 500000;
+
+string field_key(const int& i){
+  ostringstream key;
+  key << "/material_phase::Phase/scalar_field::Field" << i << "/prognostic/value";
+  return key.str();
+}
+
+void read_by_key(const vector<string>* keys, const int reads, atomic<int>* errors){
+  for(int n = 0;n < reads;n++){
+    int i = n % FIELDS;
+    double val;
+    if(Spud::get_option((*keys)[i], val) != Spud::SPUD_NO_ERROR or val != i + 0.5){
+      (*errors)++;
+    }
+  }
+}
+
+void read_by_handle(const vector<Spud::OptionHandle>* handles, const int reads, atomic<int>* errors){
+  for(int n = 0;n < reads;n++){
+    int i = n % FIELDS;
+    double val;
+    if(Spud::get_option((*handles)[i], val) != Spud::SPUD_NO_ERROR or val != i + 0.5){
+      (*errors)++;
+    }
+  }
+}
+
+template<class Reader, class Keys>
+double time_reads(Reader reader, const Keys& keys, const int& nthreads, atomic<int>& errors){
+  chrono::steady_clock::time_point start = chrono::steady_clock::now();
+  vector<thread> threads;
+  for(int i = 0;i < nthreads;i++){
+    threads.push_back(thread(reader, &keys, READS / nthreads, &errors));
+  }
+  for(size_t i = 0;i < threads.size();i++){
+    threads[i].join();
+  }
+
+  return chrono::duration<double>(chrono::steady_clock::now() - start).count();
+}
+
+int main(int argc, char **argv){
+  vector<int> nthreads;
+  for(int i = 1;i < argc;i++){
+    nthreads.push_back(atoi(argv[i]));
+  }
+  if(nthreads.empty()){
+    nthreads.push_back(1);
+    nthreads.push_back(2);
+    nthreads.push_back(4);
+    nthreads.push_back(8);
+  }
+
+  Spud::clear_options();
+  vector<string> keys;
+  vector<Spud::OptionHandle> handles(FIELDS);
+  for(int i = 0;i < FIELDS;i++){
+    keys.push_back(field_key(i));
+    Spud::set_option(keys[i], i + 0.5);
+    Spud::lookup(keys[i], handles[i]);
+  }
+
+  atomic<int> errors(0);
+  for(size_t i = 0;i < nthreads.size();i++){
+    double by_key = time_reads(read_by_key, keys, nthreads[i], errors);
+    double by_handle = time_reads(read_by_handle, handles, nthreads[i], errors);
+    cout << "get_option: " << READS << " reads on " << nthreads[i] << " threads in " << by_key
+         << "s by key, " << by_handle << "s by handle" << endl;
+  }
+  Spud::clear_options();
+
+  if(errors != 0){
+    cerr << "Incorrect options read by " << errors << " reads" << endl;
+    return 1;
+  }
+
+  return 0;
+}
@@ -70,12 +70,39 @@ subroutine test_fspud
   print *, "*** Testing set_option for integer scalar, with option index ***"
   call test_indexed_key("/integer_scalar", 42)
   
+  print *, "*** Testing set_option for integer scalar, with many named siblings ***"
+  call test_named_siblings("/integer_scalar", 100)
+  
+  print *, "*** Testing option handles ***"
+  call test_handles("/real_tensor", "/real_tensor_2")
+  
   print *, "*** Testing move_option ***"
   call test_move_option("/type_none", "/type_none_2")
       
   print *, "*** Testing copy_option ***"
   call test_copy_option("/type_none", "/type_none_2")
   
+  print *, "*** Testing option contexts ***"
+  call test_contexts("/integer_vector", "/type_none")
+  
+  print *, "*** Testing snapshots ***"
+  call test_snapshot("/real_tensor", "/character", "test_fspud.snapshot")
+  
+  print *, "*** Testing buffers ***"
+  call test_buffers("/real_tensor", "/character")
+  
+  print *, "*** Testing list_children ***"
+  call test_list_children("/parent")
+  
+  print *, "*** Testing find_options ***"
+  call test_find_options("/phase")
+  
+  print *, "*** Testing memory_stats ***"
+  call test_memory_stats("/field", 20)
+  
+  print *, "*** Testing access profiles ***"
+  call test_access_profile("/profiled", "test_fspud_profile.csv")
+  
 contains
   
   subroutine test_key_errors(key)
@@ -869,6 +896,451 @@ contains
     
   end subroutine test_indexed_key
   
+  subroutine test_named_siblings(key, count)
+    character(len = *), intent(in) :: key
+    integer, intent(in) :: count
+    
+    character(len = 255) :: name
+    integer :: i, integer_val, stat
+    
+    do i = 0, count - 1
+      write(name, "(a,i0)") "Name", i
+      call set_option(trim(key) // "::" // trim(name), i, stat)
+      call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    end do
+    call report_test("[Option count]", option_count(key) /= count, .false., "Incorrect option count")
+    call report_test("[Option count]", option_count(trim(key) // "::Name7") /= 1, .false., "Incorrect option count")
+    
+    call get_option(trim(key) // "::Name7", integer_val, stat)
+    call report_test("[Extracted option data]", stat /= SPUD_NO_ERROR, .false., "Returned error code when retrieving option data")
+    call report_test("[Extracted correct option data]", integer_val /= 7, .false., "Retrieved incorrect option data")
+    call get_option(trim(key) // "[7]", integer_val, stat)
+    call report_test("[Extracted option data]", stat /= SPUD_NO_ERROR, .false., "Returned error code when retrieving option data")
+    call report_test("[Extracted correct option data]", integer_val /= 7, .false., "Retrieved incorrect option data")
+    
+    call test_delete_option(trim(key) // "::Name7")
+    call report_test("[Option count]", option_count(key) /= count - 1, .false., "Incorrect option count")
+    call get_option(trim(key) // "[7]", integer_val, stat)
+    call report_test("[Extracted option data]", stat /= SPUD_NO_ERROR, .false., "Returned error code when retrieving option data")
+    call report_test("[Extracted correct option data]", integer_val /= 8, .false., "Retrieved incorrect option data")
+    call get_option(trim(key) // "[0]", integer_val, stat)
+    call report_test("[Extracted correct option data]", integer_val /= 0, .false., "Retrieved incorrect option data")
+    
+    do i = 0, count - 3
+      call delete_option(trim(key) // "[0]", stat)
+      call report_test("[Deleted option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when deleting option")
+    end do
+    call report_test("[Option count]", option_count(key) /= 1, .false., "Incorrect option count")
+    call test_delete_option(trim(key) // "[0]")
+    call test_key_errors(key)
+    
+  end subroutine test_named_siblings
+  
+  subroutine test_handles(key1, key2)
+    character(len = *), intent(in) :: key1
+    character(len = *), intent(in) :: key2
+    
+    integer :: handle, handle2, handle3, handle4, i, j, stat
+    integer, dimension(2) :: shape
+    real(D), dimension(3, 4) :: real_tensor_val, test_real_tensor
+    character(len = 255) :: test_char
+    
+    do i = 1, size(test_real_tensor, 1)
+      do j = 1, size(test_real_tensor, 2)
+        test_real_tensor(i, j) = 42.0_D + i * size(test_real_tensor, 2) + j
+      end do
+    end do
+    
+    call lookup_option(key1, handle, stat)
+    call report_test("[Key error when looking up option]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when looking up option")
+    
+    call set_option(key1, test_real_tensor, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call lookup_option(key1, handle, stat)
+    call report_test("[Looked up option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when looking up option")
+    
+    call report_test("[Option present]", .not. have_option(handle), .false., "Present option reported missing")
+    call report_test("[Option type]", option_type(handle) /= SPUD_REAL, .false., "Incorrect option type returned")
+    call report_test("[Option rank]", option_rank(handle) /= 2, .false., "Incorrect option rank returned")
+    shape = option_shape(handle, stat)
+    call report_test("[Option shape]", any(shape /= (/3, 4/)), .false., "Incorrect option shape returned")
+    call get_option(handle, real_tensor_val, stat)
+    call report_test("[Extracted option data]", stat /= SPUD_NO_ERROR, .false., "Returned error code when retrieving option data")
+    call report_test("[Extracted correct option data]", maxval(abs(real_tensor_val - test_real_tensor)) > 0.0_D, .false., "Retrieved incorrect option data")
+    call get_option(handle, test_char, stat)
+    call report_test("[Type error when extracting option data]", stat /= SPUD_TYPE_ERROR, .false., "Returned incorrect error code when retrieving option data")
+    
+    call set_option(handle, test_real_tensor + 1.0_D, stat)
+    call report_test("[Set option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when setting option")
+    call get_option(key1, real_tensor_val)
+    call report_test("[Extracted correct option data]", maxval(abs(real_tensor_val - test_real_tensor - 1.0_D)) > 0.0_D, .false., "Retrieved incorrect option data")
+    
+    ! Handles survive unrelated changes to the tree
+    call add_option(key2, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call get_option(handle, real_tensor_val, stat)
+    call report_test("[Extracted option data]", stat /= SPUD_NO_ERROR, .false., "Returned error code when retrieving option data")
+    call test_delete_option(key2)
+    
+    ! ... but not the deletion or move of their option
+    call move_option(key1, key2, stat = stat)
+    call report_test("[Moved option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when moving option")
+    call report_test("[Missing option]", have_option(handle), .false., "Missing option reported present")
+    call get_option(handle, real_tensor_val, stat)
+    call report_test("[Key error when extracting option data]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when retrieving option data")
+    call set_option(handle, test_real_tensor, stat)
+    call report_test("[Key error when setting option]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when setting option")
+    
+    call lookup_option(key2, handle2, stat)
+    call report_test("[Looked up option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when looking up option")
+    call test_delete_option(key2)
+    call report_test("[Missing option]", have_option(handle2), .false., "Missing option reported present")
+    
+    ! ... nor the replacement of their option by a new one at the same key
+    call set_option(key2, test_real_tensor, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call lookup_option(key2, handle3, stat)
+    call report_test("[Looked up option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when looking up option")
+    call test_delete_option(key2)
+    call set_option(key2, test_real_tensor, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call report_test("[Missing option]", have_option(handle3), .false., "Replaced option reported present")
+    call get_option(handle3, real_tensor_val, stat)
+    call report_test("[Key error when extracting option data]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when retrieving option data")
+    call test_delete_option(key2)
+    
+    ! ... nor the deletion of their option, once a copy made of it is moved
+    ! to its key
+    call set_option(key1 // "/value", test_real_tensor, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call lookup_option(key1 // "/value", handle4, stat)
+    call report_test("[Looked up option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when looking up option")
+    call copy_option(key1, key2, stat)
+    call report_test("[Copied option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when copying option")
+    call set_option(key2 // "/value", test_real_tensor + 2.0_D, stat)
+    call report_test("[Set option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when setting option")
+    call test_delete_option(key1)
+    call move_option(key2, key1, stat = stat)
+    call report_test("[Moved option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when moving option")
+    call report_test("[Missing option]", have_option(handle4), .false., "Deleted option reported present")
+    call get_option(handle4, real_tensor_val, stat)
+    call report_test("[Key error when extracting option data]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when retrieving option data")
+    call test_delete_option(key1)
+    
+    call release_option_handle(handle, stat)
+    call report_test("[Released handle]", stat /= SPUD_NO_ERROR, .false., "Returned error code when releasing handle")
+    call release_option_handle(handle, stat)
+    call report_test("[Key error when releasing handle]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when releasing handle")
+    call release_option_handle(handle2, stat)
+    call report_test("[Released handle]", stat /= SPUD_NO_ERROR, .false., "Returned error code when releasing handle")
+    call release_option_handle(handle3, stat)
+    call report_test("[Released handle]", stat /= SPUD_NO_ERROR, .false., "Returned error code when releasing handle")
+    call release_option_handle(handle4, stat)
+    call report_test("[Released handle]", stat /= SPUD_NO_ERROR, .false., "Returned error code when releasing handle")
+    
+  end subroutine test_handles
+
+  subroutine test_contexts(key1, key2)
+    character(len = *), intent(in) :: key1
+    character(len = *), intent(in) :: key2
+    
+    type(spud_context) :: context1, context2
+    integer :: handle, nchildren, stat
+    integer, dimension(3) :: integer_vector_val
+    
+    context1 = create_context()
+    context2 = create_context()
+    
+    call set_option(key1, (/1, 2, 3/), stat, context = context1)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call set_option(key1, (/4, 5, 6/), stat, context = context2)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call report_test("[Missing option]", have_option(key1), .false., "Option in a context reported present in the default context")
+    call add_option(key2, stat, context = context1)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when adding option")
+    call report_test("[Missing option]", have_option(key2, context = context2), .false., "Option reported present in another context")
+    call get_number_of_children("/", nchildren, stat, context = context1)
+    call report_test("[Number of children]", nchildren /= 2, .false., "Incorrect number of children returned")
+    
+    call get_option(key1, integer_vector_val, stat, context = context1)
+    call report_test("[Extracted option data]", stat /= SPUD_NO_ERROR, .false., "Returned error code when retrieving option data")
+    call report_test("[Extracted correct option data]", any(integer_vector_val /= (/1, 2, 3/)), .false., "Retrieved incorrect option data")
+    call get_option(key1, integer_vector_val, stat, context = context2)
+    call report_test("[Extracted correct option data]", any(integer_vector_val /= (/4, 5, 6/)), .false., "Retrieved incorrect option data")
+    
+    ! Handles belong to the context they were looked up in
+    call lookup_option(key1, handle, stat, context = context2)
+    call report_test("[Looked up option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when looking up option")
+    call get_option(handle, integer_vector_val, stat, context = context2)
+    call report_test("[Extracted correct option data]", any(integer_vector_val /= (/4, 5, 6/)), .false., "Retrieved incorrect option data")
+    call report_test("[Missing option]", have_option(handle), .false., "Handle reported valid in the default context")
+    
+    call clear_options(context = context1)
+    call report_test("[Cleared options]", have_option(key1, context = context1), .false., "Option present after clearing context")
+    call report_test("[Option present]", .not. have_option(handle, context = context2), .false., "Clearing one context cleared another")
+    
+    call destroy_context(context1)
+    call destroy_context(context2)
+    
+  end subroutine test_contexts
+  
+  subroutine test_snapshot(key1, key2, filename)
+    character(len = *), intent(in) :: key1
+    character(len = *), intent(in) :: key2
+    character(len = *), intent(in) :: filename
+    
+    integer :: stat, unit
+    character(len = 9) :: character_val
+    real(D), dimension(2, 3) :: real_tensor_val
+    real(D), dimension(2, 3), parameter :: test_real_tensor = reshape((/42.0_D, 43.0_D, 44.0_D, 45.0_D, 46.0_D, 47.0_D/), (/2, 3/))
+    
+    call set_option(key1, test_real_tensor, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call set_option(key2, "Forty Two", stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    
+    call write_snapshot(filename, stat)
+    call report_test("[Wrote snapshot]", stat /= SPUD_NO_ERROR, .false., "Returned error code when writing snapshot")
+    call clear_options()
+    call test_key_errors(key1)
+    
+    call load_snapshot(filename, stat)
+    call report_test("[Loaded snapshot]", stat /= SPUD_NO_ERROR, .false., "Returned error code when loading snapshot")
+    call test_shape(key1, (/2, 3/))
+    call get_option(key1, real_tensor_val, stat)
+    call report_test("[Extracted correct option data]", any(real_tensor_val /= test_real_tensor), .false., "Retrieved incorrect option data")
+    call get_option(key2, character_val, stat)
+    call report_test("[Extracted correct option data]", character_val /= "Forty Two", .false., "Retrieved incorrect option data")
+    
+    ! An invalid snapshot leaves the options tree unchanged
+    open(newunit = unit, file = filename, status = "replace", action = "write")
+    write(unit, "(a)") "Not a snapshot"
+    close(unit)
+    call load_snapshot(filename, stat)
+    call report_test("[Invalid snapshot]", stat /= SPUD_FILE_ERROR, .false., "Failed to return file error when loading invalid snapshot")
+    call test_key_present(key1)
+    open(newunit = unit, file = filename)
+    close(unit, status = "delete")
+    
+    call test_delete_option(key1)
+    call test_delete_option(key2)
+    
+  end subroutine test_snapshot
+  
+  subroutine test_buffers(key1, key2)
+    character(len = *), intent(in) :: key1
+    character(len = *), intent(in) :: key2
+    
+    integer :: stat
+    character(len = :), allocatable :: buffer, snapshot_buffer
+    character(len = 9) :: character_val
+    real(D), dimension(2, 3) :: real_tensor_val
+    real(D), dimension(2, 3), parameter :: test_real_tensor = reshape((/42.0_D, 43.0_D, 44.0_D, 45.0_D, 46.0_D, 47.0_D/), (/2, 3/))
+    
+    ! XML needs a named root element
+    call load_options_from_buffer('<?xml version="1.0" encoding="utf-8" ?><options/>', stat)
+    call report_test("[Loaded options from buffer]", stat /= SPUD_NO_ERROR, .false., "Returned error code when loading options from buffer")
+    call set_option(key1, test_real_tensor, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call set_option(key2, "Forty Two", stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    
+    call write_options_to_buffer(buffer, stat)
+    call report_test("[Wrote options to buffer]", stat /= SPUD_NO_ERROR, .false., "Returned error code when writing options to buffer")
+    call report_test("[Wrote XML]", index(buffer, "<?xml") /= 1, .false., "Buffer does not contain XML")
+    call write_snapshot_to_buffer(snapshot_buffer, stat)
+    call report_test("[Wrote snapshot to buffer]", stat /= SPUD_NO_ERROR, .false., "Returned error code when writing snapshot to buffer")
+    
+    call clear_options()
+    call load_options_from_buffer(buffer, stat)
+    call report_test("[Loaded options from buffer]", stat /= SPUD_NO_ERROR, .false., "Returned error code when loading options from buffer")
+    real_tensor_val = 0.0_D
+    call get_option(key1, real_tensor_val, stat)
+    call report_test("[Extracted correct option data]", any(real_tensor_val /= test_real_tensor), .false., "Retrieved incorrect option data")
+    character_val = ""
+    call get_option(key2, character_val, stat)
+    call report_test("[Extracted correct option data]", character_val /= "Forty Two", .false., "Retrieved incorrect option data")
+    
+    call clear_options()
+    call load_snapshot_from_buffer(snapshot_buffer, stat)
+    call report_test("[Loaded snapshot from buffer]", stat /= SPUD_NO_ERROR, .false., "Returned error code when loading snapshot from buffer")
+    real_tensor_val = 0.0_D
+    call get_option(key1, real_tensor_val, stat)
+    call report_test("[Extracted correct option data]", any(real_tensor_val /= test_real_tensor), .false., "Retrieved incorrect option data")
+    
+    call load_snapshot_from_buffer(buffer, stat)
+    call report_test("[Invalid snapshot]", stat /= SPUD_FILE_ERROR, .false., "Failed to return file error when loading invalid snapshot")
+    call load_options_from_buffer("<options>", stat)
+    call report_test("[Invalid options]", stat /= SPUD_FILE_ERROR, .false., "Failed to return file error when loading invalid options")
+    
+    call clear_options()
+    
+  end subroutine test_buffers
+  
+  subroutine test_list_children(key)
+    character(len = *), intent(in) :: key
+    
+    integer :: stat
+    character(len = 32), dimension(:), allocatable :: child_names
+    integer, dimension(:), allocatable :: types, ranks
+    integer, dimension(:, :), allocatable :: shapes
+    
+    call add_option(key // "/type_none", stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when adding option")
+    call set_option(key // "/real_scalar", 42.0_D, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call set_option(key // "/integer_vector::name", (/42, 43, 44/), stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    
+    call list_children(key, child_names, stat)
+    call report_test("[Listed children]", stat /= SPUD_NO_ERROR, .false., "Returned error code when listing children")
+    call report_test("[Number of children]", size(child_names) /= 3, .false., "Incorrect number of children listed")
+    call report_test("[Child names]", child_names(1) /= "type_none" .or. child_names(2) /= "real_scalar" &
+      & .or. child_names(3) /= "integer_vector::name", .false., "Incorrect child names listed")
+    
+    call list_children(key, child_names, stat, types = types, ranks = ranks, shapes = shapes)
+    call report_test("[Listed children]", stat /= SPUD_NO_ERROR, .false., "Returned error code when listing children")
+    call report_test("[Child types]", any(types /= (/SPUD_NONE, SPUD_REAL, SPUD_INTEGER/)), .false., "Incorrect child types listed")
+    call report_test("[Child ranks]", any(ranks /= (/-1, 0, 1/)), .false., "Incorrect child ranks listed")
+    call report_test("[Child shapes]", shapes(1, 3) /= 3, .false., "Incorrect child shapes listed")
+    
+    call list_children(key // "/missing", child_names, stat)
+    call report_test("[Missing option]", stat /= SPUD_KEY_ERROR, .false., "Failed to return key error when listing children of missing option")
+    
+    call test_delete_option(key)
+    
+  end subroutine test_list_children
+  
+  subroutine test_find_options(key)
+    character(len = *), intent(in) :: key
+    
+    integer :: stat
+    character(len = 64), dimension(:), allocatable :: keys
+    
+    call add_option(key // "::Water/field::Temperature/prognostic", stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when adding option")
+    call add_option(key // "::Water/field::Salinity/diagnostic", stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when adding option")
+    call add_option(key // "::Air/field::Temperature/prognostic", stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when adding option")
+    
+    call find_options(key // "::*/field::*/prognostic", keys, stat)
+    call report_test("[Found options]", stat /= SPUD_NO_ERROR, .false., "Returned error code when finding options")
+    call report_test("[Number of options found]", size(keys) /= 2, .false., "Incorrect number of options found")
+    call report_test("[Found keys]", keys(1) /= key // "::Water/field::Temperature/prognostic" &
+      & .or. keys(2) /= key // "::Air/field::Temperature/prognostic", .false., "Incorrect keys found")
+    
+    call find_options(key // "[1]/*", keys, stat)
+    call report_test("[Found options]", stat /= SPUD_NO_ERROR, .false., "Returned error code when finding options")
+    call report_test("[Found keys]", size(keys) /= 2, .false., "Incorrect keys found")
+    call report_test("[Found keys]", keys(1) /= key // "::Air/name" .or. keys(2) /= key // "::Air/field::Temperature", &
+      & .false., "Incorrect keys found")
+    
+    call find_options(key // "::*/missing", keys, stat)
+    call report_test("[Found options]", stat /= SPUD_NO_ERROR, .false., "Returned error code when finding options")
+    call report_test("[Number of options found]", size(keys) /= 0, .false., "Incorrect number of options found")
+    
+    call test_delete_option(key // "::Water")
+    call test_delete_option(key // "::Air")
+    
+  end subroutine test_find_options
+  
+  subroutine test_memory_stats(key, n)
+    character(len = *), intent(in) :: key
+    integer, intent(in) :: n
+    
+    integer :: i, stat
+    real(D), dimension(100) :: real_vector
+    type(spud_context) :: context
+    type(spud_memory_stats) :: stats, filled_stats
+    
+    call memory_stats(stats, stat)
+    call report_test("[Memory stats]", stat /= SPUD_NO_ERROR, .false., "Returned error code when reporting memory")
+    
+    real_vector = 42.0_D
+    do i = 1, n
+      call set_option(key // "::Field" // int2str(i) // "/value", real_vector, stat)
+      call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    end do
+    
+    call memory_stats(filled_stats, stat)
+    call report_test("[Memory stats]", stat /= SPUD_NO_ERROR, .false., "Returned error code when reporting memory")
+    call report_test("[Nodes counted]", filled_stats%nodes <= stats%nodes + 2 * n, .false., "Too few nodes counted")
+    call report_test("[Bytes by category]", filled_stats%bytes /= filled_stats%node_bytes + filled_stats%name_bytes &
+      & + filled_stats%child_bytes + filled_stats%data_bytes, .false., "Bytes by category do not add up to total bytes")
+    call report_test("[Data bytes]", filled_stats%data_bytes - stats%data_bytes < n * size(real_vector) * 8, .false., &
+      & "Too few data bytes counted")
+    call report_test("[Pool bytes]", filled_stats%pool_used_bytes > filled_stats%pool_bytes &
+      & .or. filled_stats%pool_used_bytes > filled_stats%node_bytes, .false., "Incorrect pool bytes")
+    
+    do i = 1, n
+      call test_delete_option(key // "::Field" // int2str(i))
+    end do
+    
+    call memory_stats(filled_stats, stat)
+    call report_test("[Memory stats]", stat /= SPUD_NO_ERROR, .false., "Returned error code when reporting memory")
+    call report_test("[Nodes released]", filled_stats%nodes /= stats%nodes, .false., "Deleted nodes counted")
+    call report_test("[Data released]", filled_stats%data_bytes /= stats%data_bytes, .false., "Deleted data counted")
+    
+    context = create_context()
+    call memory_stats(stats, stat, context = context)
+    call report_test("[Memory stats]", stat /= SPUD_NO_ERROR, .false., "Returned error code when reporting memory")
+    call report_test("[Empty context]", stats%nodes /= 1 .or. stats%pool_used_bytes /= 0, .false., &
+      & "Incorrect memory reported for empty context")
+    call destroy_context(context)
+    
+  end subroutine test_memory_stats
+  
+  subroutine test_access_profile(key, filename)
+    character(len = *), intent(in) :: key
+    character(len = *), intent(in) :: filename
+    
+    character(len = 255) :: line
+    integer :: i, ios, stat, unit, test_integer
+    logical :: found_have_option, found_get_option, found_unprofiled
+    
+    call set_option(key, 42, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    
+    call set_access_profile(.true.)
+    do i = 1, 3
+      call report_test("[Option present]", .not. have_option(key), .false., "Option missing")
+    end do
+    call get_option(key, test_integer, stat)
+    call report_test("[Extracted option]", stat /= SPUD_NO_ERROR .or. test_integer /= 42, .false., "Failed to get option")
+    call set_access_profile(.false.)
+    ! Not profiled
+    call report_test("[Option absent]", have_option(key // "/unprofiled"), .false., "Option present")
+    
+    call dump_access_profile(filename, stat)
+    call report_test("[Dumped access profile]", stat /= SPUD_NO_ERROR, .false., "Returned error code when dumping access profile")
+    
+    found_have_option = .false.
+    found_get_option = .false.
+    found_unprofiled = .false.
+    open(newunit = unit, file = filename, status = "old", action = "read")
+    read(unit, "(a)") line
+    call report_test("[Access profile header]", trim(line) /= "method,key,calls,seconds", .false., "Incorrect access profile header")
+    do
+      read(unit, "(a)", iostat = ios) line
+      if(ios /= 0) exit
+      ! get_option itself calls have_option, option_type and option_rank
+      if(index(line, 'have_option,"' // key // '",') == 1) found_have_option = .true.
+      if(index(line, 'get_option,"' // key // '",1,') == 1) found_get_option = .true.
+      if(index(line, "unprofiled") > 0) found_unprofiled = .true.
+    end do
+    close(unit, status = "delete")
+    call report_test("[Profiled have_option]", .not. found_have_option, .false., "have_option calls not profiled")
+    call report_test("[Profiled get_option]", .not. found_get_option, .false., "get_option calls not profiled")
+    call report_test("[Profiling stopped]", found_unprofiled, .false., "Calls profiled after profiling stopped")
+    
+    call dump_access_profile("/nonexistent/" // filename, stat)
+    call report_test("[File error]", stat /= SPUD_FILE_ERROR, .false., "Failed to return file error when dumping access profile")
+    
+    call test_delete_option(key)
+    
+  end subroutine test_access_profile
+  
   subroutine test_move_option(key1, key2)
     character(len = *), intent(in) :: key1
     character(len = *), intent(in) :: key2
@@ -909,6 +1381,10 @@ contains
     call test_key_present(key2)
     call test_key_present(trim(key2) // key2)
     
+    call move_option(trim(key2), trim(key2) // trim(key2) // trim(key1), stat)
+    call report_test("[Key error when moving option below itself]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when moving option below itself")
+    call test_key_present(trim(key2) // key2)
+    
     call test_delete_option(key1)
     call test_delete_option(key2)
   
@@ -918,7 +1394,7 @@ contains
     character(len = *), intent(in) :: key1
     character(len = *), intent(in) :: key2
   
-    integer :: stat
+    integer :: integer_val, stat
   
     call add_option(trim(key1), stat)
     call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
@@ -956,8 +1432,34 @@ contains
     call test_key_present(key2)
     call test_key_present(trim(key2) // key2)
     
+    ! A copy shares its contents with the original, but is not below it
+    call copy_option(trim(key1) // trim(key1), trim(key2) // trim(key2) // trim(key1), stat)
+    call report_test("[Copied option below a copy of itself]", stat /= SPUD_NO_ERROR, .false., "Returned error code when copying option below a copy of itself")
+    call test_key_present(trim(key2) // trim(key2) // key1)
+    call test_key_errors(trim(key1) // trim(key1) // key1)
+    
+    call copy_option(trim(key2), trim(key2) // trim(key2) // trim(key2), stat)
+    call report_test("[Key error when copying option below itself]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when copying option below itself")
+    call test_key_errors(trim(key2) // trim(key2) // key2)
+    call copy_option("/", trim(key2) // trim(key2) // trim(key2), stat)
+    call report_test("[Key error when copying root option]", stat /= SPUD_KEY_ERROR, .false., "Returned incorrect error code when copying root option")
+    
     call test_delete_option(key1)
     call test_delete_option(key2)
+    
+    ! Copies are independent of the original once either is modified
+    call set_option(trim(key1) // "/child", 42, stat)
+    call report_test("[New option]", stat /= SPUD_NEW_KEY_WARNING, .false., "Failed to return new key warning when setting option")
+    call copy_option(trim(key1), trim(key2))
+    call set_option(trim(key2) // "/child", 43, stat)
+    call report_test("[Set option]", stat /= SPUD_NO_ERROR, .false., "Returned error code when setting option")
+    call get_option(trim(key1) // "/child", integer_val, stat)
+    call report_test("[Original unchanged by setting copy]", integer_val /= 42, .false., "Setting copy changed original")
+    call test_delete_option(key1)
+    call get_option(trim(key2) // "/child", integer_val, stat)
+    call report_test("[Copy unchanged by deleting original]", integer_val /= 43, .false., "Deleting original changed copy")
+    
+    call test_delete_option(key2)
   
   end subroutine test_copy_option
     
@@ -0,0 +1,266 @@
+/*  Copyright (C) 2006 Imperial College London and others.
+
+    Please see the AUTHORS file in the main source directory for a full list
+    of copyright holders.
+
+    Applied Modelling and Computation Group
+    Department of Earth Science and Engineering
+    Imperial College London
+
+    David.Ham@Imperial.ac.uk
+
+    This library is free software; you can redistribute it and/or
+    modify it under the terms of the GNU Lesser General Public
+    License as published by the Free Software Foundation,
+    version 2.1 of the License.
+
+    This library is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+    Lesser General Public License for more details.
+
+    You should have received a copy of the GNU Lesser General Public
+    License along with this library; if not, write to the Free Software
+    Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307
+    USA
+*/
+
+// Stress test for concurrent access to the options tree. Reader threads read
+// options by key and by handle while a writer thread changes values in place
+// and adds and deletes other options, and every value read is checked. Also
+// checks that options added or deleted by one thread are seen by another that
+// has already read their keys, and that a writer is not held up indefinitely
+// by a steady stream of readers.
+
+#include <atomic>
+#include <iostream>
+#include <sstream>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "spud"
+
+using namespace std;
+
+const int FIELDS = 200;
+const int READERS = 8;
+const int ITERATIONS = 200;
+const int WRITES = 2000;
+const int MOVES = 100;
+// Far more reads than the readers should need for the writer to finish
+const long READ_LIMIT = 1000000;
+
+string field_key(const int& i){
+  ostringstream key;
+  key << "/field::Field" << i;
+  return key.str();
+}
+
+void report_test(const string& title, const bool& fail, const string& msg){
+  if(fail){
+    cout << "Fail: " << title << "; error: " << msg << endl;
+  }else{
+    cout << "Pass: " << title << endl;
+  }
+}
+
+void setup(){
+  Spud::clear_options();
+  for(int i = 0;i < FIELDS;i++){
+    Spud::set_option(field_key(i) + "/value", i);
+    Spud::set_option(field_key(i) + "/vector", vector<double>(3, i + 0.5));
+  }
+}
+
+void read_options(atomic<int>* errors){
+  vector<Spud::OptionHandle> handles(FIELDS);
+  for(int i = 0;i < FIELDS;i++){
+    if(Spud::lookup(field_key(i) + "/value", handles[i]) != Spud::SPUD_NO_ERROR){
+      (*errors)++;
+    }
+  }
+
+  for(int n = 0;n < ITERATIONS;n++){
+    for(int i = 0;i < FIELDS;i++){
+      string key = field_key(i);
+      int val = -1;
+      vector<double> vec;
+      vector<int> shape;
+      int children = -1;
+      if(!Spud::have_option(key)
+        or Spud::option_count(key) != 1
+        or Spud::get_option(key + "/value", val) != Spud::SPUD_NO_ERROR or val != i
+        or Spud::get_option(key + "/vector", vec) != Spud::SPUD_NO_ERROR or vec.size() != 3 or vec[2] != i + 0.5
+        or Spud::get_option_shape(key + "/vector", shape) != Spud::SPUD_NO_ERROR or shape[0] != 3
+        or Spud::get_number_of_children(key, children) != Spud::SPUD_NO_ERROR or children != 3){
+        (*errors)++;
+      }
+
+      val = -1;
+      if(Spud::get_option(handles[i], val) != Spud::SPUD_NO_ERROR or val != i){
+        (*errors)++;
+      }
+    }
+  }
+
+  for(int i = 0;i < FIELDS;i++){
+    Spud::release(handles[i]);
+  }
+}
+
+void write_options(atomic<int>* errors){
+  for(int n = 0;n < WRITES;n++){
+    int i = n % FIELDS;
+    // Rewrite values in place, with the values the readers expect
+    if(Spud::set_option(field_key(i) + "/value", i) != Spud::SPUD_NO_ERROR
+      or Spud::set_option(field_key(i) + "/vector", vector<double>(3, i + 0.5)) != Spud::SPUD_NO_ERROR){
+      (*errors)++;
+    }
+
+    // Change the structure of the tree, invalidating the readers' handles
+    ostringstream key;
+    key << "/scratch::Scratch" << n;
+    Spud::add_option(key.str());
+    if(n >= 10){
+      key.str("");
+      key << "/scratch::Scratch" << n - 10;
+      if(Spud::delete_option(key.str()) != Spud::SPUD_NO_ERROR){
+        (*errors)++;
+      }
+    }
+  }
+}
+
+void read_while_writing(atomic<bool>* done, atomic<int>* stalls){
+  vector<string> names;
+  for(long n = 0;n < READ_LIMIT and !*done;n++){
+    int val = -1;
+    Spud::have_option("/field::Field0");
+    Spud::get_option("/field::Field0/value", val);
+    Spud::list_children("/field::Field0", names);
+  }
+  if(!*done){
+    (*stalls)++;
+  }
+}
+
+void write_while_reading(atomic<bool>* done, atomic<int>* errors){
+  for(int n = 0;n < MOVES;n++){
+    if(Spud::set_option("/moved::A/value", n) != Spud::SPUD_NO_ERROR
+      or Spud::copy_option("/moved::A", "/moved::B") != Spud::SPUD_NO_ERROR
+      or Spud::move_option("/moved::B", "/moved::C") != Spud::SPUD_NO_ERROR
+      or Spud::delete_option("/moved::C") != Spud::SPUD_NO_ERROR){
+      (*errors)++;
+    }
+  }
+  *done = true;
+}
+
+void wait_for(atomic<int>* step, const int& n){
+  while(*step != n){
+    this_thread::yield();
+  }
+}
+
+void read_changes(atomic<int>* step, atomic<int>* errors){
+  if(Spud::have_option("/changed")){
+    (*errors)++;
+  }
+  *step = 1;
+
+  wait_for(step, 2);
+  int val = -1;
+  if(!Spud::have_option("/changed") or Spud::get_option("/changed", val) != Spud::SPUD_NO_ERROR or val != 1){
+    (*errors)++;
+  }
+  *step = 3;
+
+  wait_for(step, 4);
+  if(Spud::have_option("/changed") or Spud::get_option("/changed", val) != Spud::SPUD_KEY_ERROR){
+    (*errors)++;
+  }
+}
+
+void test_changes_seen(){
+  atomic<int> step(0), errors(0);
+  thread reader(read_changes, &step, &errors);
+
+  wait_for(&step, 1);
+  Spud::set_option("/changed", 1);
+  step = 2;
+
+  wait_for(&step, 3);
+  Spud::delete_option("/changed");
+  step = 4;
+
+  reader.join();
+
+  report_test("[Changes seen]", errors != 0, "Option added or deleted by another thread not seen");
+}
+
+void test_concurrent_reads(){
+  atomic<int> errors(0);
+  vector<thread> threads;
+  for(int i = 0;i < READERS;i++){
+    threads.push_back(thread(read_options, &errors));
+  }
+  for(size_t i = 0;i < threads.size();i++){
+    threads[i].join();
+  }
+
+  report_test("[Concurrent reads]", errors != 0, "Incorrect option read");
+}
+
+void test_concurrent_reads_and_writes(){
+  atomic<int> errors(0);
+  vector<thread> threads;
+  threads.push_back(thread(write_options, &errors));
+  for(int i = 0;i < READERS;i++){
+    threads.push_back(thread(read_options, &errors));
+  }
+  for(size_t i = 0;i < threads.size();i++){
+    threads[i].join();
+  }
+
+  report_test("[Concurrent reads and writes]", errors != 0, "Incorrect option read or write");
+  report_test("[Options written]", Spud::option_count("/scratch") != 10, "Incorrect options written");
+}
+
+void test_writer_progress(){
+  atomic<bool> done(false);
+  atomic<int> errors(0), stalls(0);
+  Spud::set_option("/moved::A/value", 0);
+  vector<thread> threads;
+  for(int i = 0;i < READERS;i++){
+    threads.push_back(thread(read_while_writing, &done, &stalls));
+  }
+  threads.push_back(thread(write_while_reading, &done, &errors));
+  for(size_t i = 0;i < threads.size();i++){
+    threads[i].join();
+  }
+
+  report_test("[Writes between reads]", errors != 0, "Incorrect option write");
+  report_test("[Writer progress]", stalls != 0, "Writer did not finish while readers were reading");
+  Spud::delete_option("/moved::A");
+}
+
+int main(int argc, char **argv){
+  setup();
+
+  cout << " *** Testing concurrent reads ***" << endl;
+  test_concurrent_reads();
+
+  cout << " *** Testing concurrent reads and writes ***" << endl;
+  test_concurrent_reads_and_writes();
+
+  cout << " *** Testing changes seen by other threads ***" << endl;
+  test_changes_seen();
+
+  cout << " *** Testing writer progress while reading ***" << endl;
+  test_writer_progress();
+
+  Spud::clear_options();
+
+  return 0;
+}